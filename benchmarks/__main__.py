@@ -0,0 +1,97 @@
+# Запуск замеров:
+#   python -m benchmarks run [--suite parsing --suite api --suite db --suite analytics --suite export --suite archive
+#                             --suite startup]
+#                            [--size 100000] [--output FILE]
+#   python -m benchmarks compare OLD.json NEW.json
+#   python -m benchmarks load [--employers 50 --vacancies 400 --latency-ms 20 --error-rate 0.01 --rate-limit 50]
+# Результаты по умолчанию пишутся в benchmarks/results/<commit>.json.
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+import benchmarks.bench_startup  # noqa: F401
+from benchmarks import bench_analytics, bench_api, bench_archive, bench_db, bench_export, bench_parsing  # noqa: F401
+from benchmarks.load_test import format_load_report, run_load_test
+from benchmarks.runner import compare_reports, format_report, run_benchmarks, save_report
+from benchmarks.stub_server import LATENCY_DISTRIBUTIONS, Faults, StubData
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="прогнать замеры")
+    run.add_argument(
+        "--suite",
+        action="append",
+        choices=["parsing", "api", "db", "analytics", "export", "archive", "startup"],
+        help="подсистема (можно несколько)",
+    )
+    run.add_argument("--size", type=int, default=10_000, help="число синтетических вакансий (10k–1M)")
+    run.add_argument("--repeat", type=int, default=5, help="повторов на бенчмарк")
+    run.add_argument("-k", dest="pattern", default="", help="подстрока имени бенчмарка")
+    run.add_argument("--output", type=Path, help="файл отчёта (по умолчанию results/<commit>.json)")
+
+    compare = commands.add_parser("compare", help="сравнить два отчёта")
+    compare.add_argument("old", type=Path)
+    compare.add_argument("new", type=Path)
+    compare.add_argument("--threshold", type=float, default=0.1, help="порог изменения медианы (0.1 = 10%%)")
+
+    load = commands.add_parser("load", help="нагрузочный прогон HHApi против заглушки с задержками и ошибками")
+    load.add_argument("--employers", type=int, default=50, help="работодателей в заглушке")
+    load.add_argument("--vacancies", type=int, default=400, help="вакансий у каждого работодателя")
+    load.add_argument("--workers", type=int, default=4, help="потоков сборщика")
+    load.add_argument("--latency-ms", type=float, default=20.0, help="медиана задержки ответа, мс")
+    load.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    load.add_argument("--latency-spread", type=float, default=0.5, help="разброс задержки (sigma для lognormal)")
+    load.add_argument("--error-rate", type=float, default=0.0, help="доля ответов 500/502/503")
+    load.add_argument("--timeout-rate", type=float, default=0.0, help="доля зависающих запросов")
+    load.add_argument("--hang", type=float, default=3.0, help="на сколько секунд зависает запрос")
+    load.add_argument("--read-timeout", type=int, default=2, help="таймаут ответа HHApi, сек")
+    load.add_argument("--rate-limit", type=float, default=None, help="запросов в секунду, сверх — 429")
+    load.add_argument("--retries", type=int, default=3, help="повторов HHApi на запрос (max_retries)")
+    load.add_argument("--seed", type=int, default=0)
+    load.add_argument("--output", type=Path, help="сохранить отчёт в JSON")
+
+    args = parser.parse_args(argv)
+    if args.command == "load":
+        faults = Faults(
+            latency_ms=args.latency_ms,
+            latency_dist=args.latency_dist,
+            latency_spread=args.latency_spread,
+            error_rate=args.error_rate,
+            timeout_rate=args.timeout_rate,
+            hang_seconds=args.hang,
+            rate_limit=args.rate_limit,
+            seed=args.seed,
+        )
+        data = StubData(employers=args.employers, vacancies_per_employer=args.vacancies, seed=args.seed)
+        result = run_load_test(
+            data, faults, workers=args.workers, max_retries=args.retries, read_timeout=args.read_timeout
+        )
+        print(format_load_report(result))
+        if args.output:
+            save_report(result.to_dict(), args.output)
+        return 0 if result.completeness == 1 else 1
+    if args.command == "run":
+        report = run_benchmarks(args.suite, args.size, args.repeat, args.pattern)
+        print(format_report(report))
+        output = args.output or RESULTS_DIR / f"{report['commit']}.json"
+        save_report(report, output)
+        print(f"Отчёт сохранён в {output}")
+        return 0
+
+    old = json.loads(args.old.read_text(encoding="utf-8"))
+    new = json.loads(args.new.read_text(encoding="utf-8"))
+    lines = compare_reports(old, new, args.threshold)
+    print("\n".join(lines))
+    return 1 if any(line.endswith("REGRESSION") for line in lines) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
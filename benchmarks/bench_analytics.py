@@ -0,0 +1,49 @@
+# Подсистема analytics: построение VacancyAnalytics и отчёты в памяти по выгрузке вакансий.
+
+from contextlib import ExitStack
+from typing import Callable
+
+from benchmarks.generators import iter_parsed_vacancies, make_companies
+from benchmarks.runner import benchmark
+from src.analytics import VacancyAnalytics
+
+
+def _analytics(size: int) -> VacancyAnalytics:
+    return VacancyAnalytics.from_records(iter_parsed_vacancies(size), make_companies(100))
+
+
+@benchmark("analytics", "build")
+def bench_build(size: int, stack: ExitStack) -> Callable[[], int]:
+    vacancies = list(iter_parsed_vacancies(size))
+    companies = make_companies(100)
+    return lambda: len(VacancyAnalytics.from_records(vacancies, companies))
+
+
+@benchmark("analytics", "keyword_search")
+def bench_keyword_search(size: int, stack: ExitStack) -> Callable[[], int]:
+    analytics = _analytics(size)
+    return lambda: len(analytics.get_vacancies_with_keyword("python"))
+
+
+@benchmark("analytics", "term_search")
+def bench_term_search(size: int, stack: ExitStack) -> Callable[[], int]:
+    analytics = _analytics(size)
+    return lambda: len(analytics.find("питон разработчики"))
+
+
+@benchmark("analytics", "higher_salary")
+def bench_higher_salary(size: int, stack: ExitStack) -> Callable[[], int]:
+    analytics = _analytics(size)
+    return lambda: len(analytics.get_vacancies_with_higher_salary())
+
+
+@benchmark("analytics", "percentiles+companies")
+def bench_percentiles(size: int, stack: ExitStack) -> Callable[[], int]:
+    analytics = _analytics(size)
+
+    def run() -> int:
+        analytics._sorted_salaries = {}  # Без кэша: замеряем сам расчёт.
+        analytics.salary_percentiles()
+        return len(analytics.get_companies_and_vacancies_count())
+
+    return run
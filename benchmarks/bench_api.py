@@ -0,0 +1,83 @@
+# Подсистема api: HHApi против локальной заглушки hh.ru (HTTP, пагинация, разбор ответов).
+
+from contextlib import ExitStack
+from typing import Callable
+
+from benchmarks.runner import SkipBenchmark, benchmark
+from benchmarks.stub_server import StubData, run_stub_server
+
+PER_PAGE = 100
+
+
+def _api(size: int, stack: ExitStack) -> tuple:
+    """Поднимает заглушку на size вакансий (15 работодателей) и создаёт HHApi, смотрящий на неё."""
+    try:
+        from src.hh_api import HHApi
+    except ImportError as e:  # requests/certifi не установлены — HTTP-замеры невозможны.
+        raise SkipBenchmark(str(e)) from e
+    data = StubData(employers=15, vacancies_per_employer=max(1, size // 15))
+    base_url = stack.enter_context(run_stub_server(data))
+    api = HHApi(per_page=PER_PAGE)
+    api.BASE_URL = base_url
+    stack.callback(api.session.close)
+    return api, [int(e["id"]) for e in data.employers]
+
+
+@benchmark("api", "get_vacancies_for_company")
+def bench_get_vacancies(size: int, stack: ExitStack) -> Callable[[], int]:
+    api, employer_ids = _api(size, stack)
+    return lambda: sum(len(api.get_vacancies_for_company(e)) for e in employer_ids)
+
+
+@benchmark("api", "get_vacancy_columns_for_company")
+def bench_get_vacancy_columns(size: int, stack: ExitStack) -> Callable[[], int]:
+    api, employer_ids = _api(size, stack)
+    return lambda: sum(len(api.get_vacancy_columns_for_company(e)) for e in employer_ids)
+
+
+@benchmark("api", "get_companies")
+def bench_get_companies(size: int, stack: ExitStack) -> Callable[[], int]:
+    api, _ = _api(size, stack)
+    return lambda: len(api.get_companies())
+
+
+def _long_tail_api(size: int, stack: ExitStack) -> tuple:
+    """Заглушка с «длинным хвостом»: много работодателей по 3 вакансии."""
+    try:
+        from src.hh_api import HHApi
+    except ImportError as e:
+        raise SkipBenchmark(str(e)) from e
+    data = StubData(employers=max(1, size // 3), vacancies_per_employer=3)
+    base_url = stack.enter_context(run_stub_server(data))
+    api = HHApi(per_page=PER_PAGE)
+    api.BASE_URL = base_url
+    api.open_vacancies = {int(e["id"]): e["open_vacancies"] for e in data.employers}
+    stack.callback(api.session.close)
+    return api, [int(e["id"]) for e in data.employers]
+
+
+@benchmark("api", "long tail: per employer")
+def bench_long_tail_per_employer(size: int, stack: ExitStack) -> Callable[[], int]:
+    api, employer_ids = _long_tail_api(size, stack)
+    return lambda: sum(len(api.get_vacancies_for_company(e)) for e in employer_ids)
+
+
+@benchmark("api", "long tail: batched employers")
+def bench_long_tail_batched(size: int, stack: ExitStack) -> Callable[[], int]:
+    api, employer_ids = _long_tail_api(size, stack)
+    return lambda: sum(len(v) for v in api.get_vacancies_for_companies(employer_ids).values())
+
+
+@benchmark("api", "large employer: partitioned by date")
+def bench_partitioned(size: int, stack: ExitStack) -> Callable[[], int]:
+    """Один работодатель с size вакансиями при ограничении выдачи 2000, как у hh.ru."""
+    try:
+        from src.hh_api import HHApi
+    except ImportError as e:
+        raise SkipBenchmark(str(e)) from e
+    data = StubData(employers=1, vacancies_per_employer=size, max_depth=HHApi.MAX_SEARCH_DEPTH)
+    base_url = stack.enter_context(run_stub_server(data))
+    api = HHApi(per_page=PER_PAGE)
+    api.BASE_URL = base_url
+    stack.callback(api.session.close)
+    return lambda: len(api.get_vacancies_for_company_partitioned(1))
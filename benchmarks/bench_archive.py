@@ -0,0 +1,37 @@
+# Подсистема archive: запись ответов API в архив (сжатие и индекс) и повторный разбор архива без сети.
+
+import tempfile
+from contextlib import ExitStack
+from typing import Callable
+
+from benchmarks.generators import make_raw_pages
+from benchmarks.runner import benchmark
+from src import json_codec
+from src.response_archive import ResponseArchive, iter_archived_vacancies
+
+
+def _archive(size: int, path: str) -> ResponseArchive:
+    archive = ResponseArchive(path)
+    for page, data in enumerate(make_raw_pages(size)):
+        archive.record("vacancies", {"employer_id": 1, "page": page, "per_page": 100}, json_codec.dumps(data))
+    return archive
+
+
+@benchmark("archive", "record pages")
+def bench_record(size: int, stack: ExitStack) -> Callable[[], int]:
+    bodies = [json_codec.dumps(data) for data in make_raw_pages(size)]
+
+    def run() -> int:
+        with tempfile.TemporaryDirectory() as path:
+            archive = ResponseArchive(path)
+            for page, body in enumerate(bodies):
+                archive.record("vacancies", {"employer_id": 1, "page": page, "per_page": 100}, body)
+        return size
+
+    return run
+
+
+@benchmark("archive", "replay parse")
+def bench_replay_parse(size: int, stack: ExitStack) -> Callable[[], int]:
+    archive = _archive(size, stack.enter_context(tempfile.TemporaryDirectory()))
+    return lambda: sum(len(batch) for batch in iter_archived_vacancies(archive))
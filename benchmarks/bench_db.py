@@ -0,0 +1,111 @@
+# Подсистема db: загрузка вакансий и отчётные запросы DBManager.
+# Нужна отдельная одноразовая БД: параметры берутся из BENCH_DB_NAME / BENCH_DB_USER / BENCH_DB_PASSWORD /
+# BENCH_DB_HOST / BENCH_DB_PORT (см. сервис postgres_bench в docker-compose.yml). Таблицы hh_schema в ней
+# очищаются перед каждым замером загрузки — не указывайте здесь рабочую базу.
+
+import os
+from contextlib import ExitStack
+from typing import Any, Callable
+
+from benchmarks.generators import iter_parsed_vacancies, make_companies, make_raw_pages
+from benchmarks.runner import SkipBenchmark, benchmark
+
+EMPLOYERS = 100
+
+
+def _db(stack: ExitStack) -> Any:
+    """DBManager для одноразовой БД из переменных BENCH_DB_*; без BENCH_DB_NAME замер пропускается."""
+    if not os.getenv("BENCH_DB_NAME"):
+        raise SkipBenchmark("не задан BENCH_DB_NAME")
+    try:
+        from src.db_manager import DBConfig, DBManager
+    except ImportError as e:
+        raise SkipBenchmark(str(e)) from e
+    db = DBManager(
+        DBConfig(
+            name=os.environ["BENCH_DB_NAME"],
+            user=os.getenv("BENCH_DB_USER", "postgres"),
+            password=os.getenv("BENCH_DB_PASSWORD", "postgres"),
+            host=os.getenv("BENCH_DB_HOST", "localhost"),
+            port=int(os.getenv("BENCH_DB_PORT", "5433")),
+        )
+    )
+    db.create_tables()
+    return db
+
+
+def _reset(db: Any) -> None:
+    """Очищает таблицы и заново заводит компании, на которые ссылаются вакансии."""
+    with db._get_conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("TRUNCATE hh_schema.vacancies, hh_schema.companies CASCADE;")
+        conn.commit()
+    db.insert_companies(make_companies(EMPLOYERS))
+
+
+def _fill(db: Any, size: int) -> None:
+    """Готовит таблицы с size вакансиями для замеров чтения."""
+    from src.work_vacancies import parse_vacancy_pages
+
+    _reset(db)
+    db.insert_vacancy_columns(parse_vacancy_pages(make_raw_pages(size, employers=EMPLOYERS)))
+    with db._get_conn() as conn:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute("VACUUM ANALYZE hh_schema.vacancies;")
+
+
+@benchmark("db", "insert_vacancies")
+def bench_insert_vacancies(size: int, stack: ExitStack) -> Callable[[], int]:
+    db = _db(stack)
+    vacancies = list(iter_parsed_vacancies(size, employers=EMPLOYERS))
+
+    def run() -> int:
+        _reset(db)
+        db.insert_vacancies(vacancies)
+        return len(vacancies)
+
+    return run
+
+
+@benchmark("db", "insert_vacancy_columns")
+def bench_insert_vacancy_columns(size: int, stack: ExitStack) -> Callable[[], int]:
+    from src.work_vacancies import parse_vacancy_pages
+
+    db = _db(stack)
+    columns = parse_vacancy_pages(make_raw_pages(size, employers=EMPLOYERS))
+
+    def run() -> int:
+        _reset(db)
+        db.insert_vacancy_columns(columns)
+        return len(columns)
+
+    return run
+
+
+@benchmark("db", "get_all_vacancies")
+def bench_get_all_vacancies(size: int, stack: ExitStack) -> Callable[[], int]:
+    db = _db(stack)
+    _fill(db, size)
+    return lambda: len(db.get_all_vacancies())
+
+
+@benchmark("db", "get_vacancies_with_keyword")
+def bench_get_vacancies_with_keyword(size: int, stack: ExitStack) -> Callable[[], int]:
+    db = _db(stack)
+    _fill(db, size)
+    return lambda: len(db.get_vacancies_with_keyword("python"))
+
+
+@benchmark("db", "get_vacancies_with_higher_salary")
+def bench_get_vacancies_with_higher_salary(size: int, stack: ExitStack) -> Callable[[], int]:
+    db = _db(stack)
+    _fill(db, size)
+    return lambda: len(db.get_vacancies_with_higher_salary())
+
+
+@benchmark("db", "get_companies_and_vacancies_count")
+def bench_get_companies_and_vacancies_count(size: int, stack: ExitStack) -> Callable[[], int]:
+    db = _db(stack)
+    _fill(db, size)
+    return lambda: len(db.get_companies_and_vacancies_count())
@@ -0,0 +1,54 @@
+# Подсистема export: выгрузка вакансий в JSON и CSV последовательно (как main.py), шардами в текущем процессе
+# и шардами через пул процессов ParallelExporter. Пул оправдан, только если на больших выгрузках (--size 100000)
+# последний вариант быстрее шардов в текущем процессе — это зависит от числа ядер.
+
+import os
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from benchmarks.generators import iter_parsed_vacancies
+from benchmarks.runner import benchmark
+from src.exporter import EXPORT_FIELDS, ParallelExporter
+from src.work_files import save_to_csv, save_to_json
+
+
+def _batches(size: int, batch_size: int = 5000) -> List[List[Dict]]:
+    rows = list(iter_parsed_vacancies(size))
+    batches = []
+    for start in range(0, size, batch_size):
+        end = start + batch_size
+        batches.append(rows[start:end])
+    return batches
+
+
+@benchmark("export", "sequential json+csv")
+def bench_sequential(size: int, stack: ExitStack) -> Callable[[], int]:
+    out = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+    rows = [row for batch in _batches(size) for row in batch]
+
+    def run() -> int:
+        save_to_json(out / "vacancies.json", rows)
+        save_to_csv(out / "vacancies.csv", rows, fieldnames=EXPORT_FIELDS)
+        return len(rows)
+
+    return run
+
+
+@benchmark("export", "sharded json+csv (in-process)")
+def bench_sharded_inline(size: int, stack: ExitStack) -> Callable[[], int]:
+    out = stack.enter_context(tempfile.TemporaryDirectory())
+    batches = _batches(size)
+    exporter = ParallelExporter(out, formats=("json", "csv"), shard_size=max(size // 8, 1), workers=0)
+    return lambda: size if exporter.export(batches) else 0
+
+
+@benchmark("export", "parallel json+csv (shards)")
+def bench_parallel(size: int, stack: ExitStack) -> Callable[[], int]:
+    out = stack.enter_context(tempfile.TemporaryDirectory())
+    batches = _batches(size)
+    exporter = ParallelExporter(
+        out, formats=("json", "csv"), shard_size=max(size // 8, 1), workers=max(os.cpu_count() or 1, 2)
+    )
+    return lambda: size if exporter.export(batches) else 0
@@ -0,0 +1,39 @@
+# Подсистема parsing: разбор ответов API (построчный и колоночный) и декодирование JSON.
+
+from contextlib import ExitStack
+from typing import Callable
+
+from benchmarks.generators import make_raw_pages, make_raw_vacancies
+from benchmarks.runner import benchmark
+from src import json_codec
+from src.work_vacancies import parse_vacancies, parse_vacancy_pages
+
+
+@benchmark("parsing", "parse_vacancies")
+def bench_parse_vacancies(size: int, stack: ExitStack) -> Callable[[], int]:
+    items = make_raw_vacancies(size)
+    return lambda: len(parse_vacancies(items))
+
+
+@benchmark("parsing", "parse_vacancy_pages")
+def bench_parse_vacancy_pages(size: int, stack: ExitStack) -> Callable[[], int]:
+    pages = make_raw_pages(size)
+    return lambda: len(parse_vacancy_pages(pages))
+
+
+@benchmark("parsing", "json_codec.loads(pages)")
+def bench_json_loads(size: int, stack: ExitStack) -> Callable[[], int]:
+    raw_pages = [json_codec.dumps(p) for p in make_raw_pages(size)]
+
+    def run() -> int:
+        for raw in raw_pages:
+            json_codec.loads(raw)
+        return size
+
+    return run
+
+
+@benchmark("parsing", "json_codec.dumps(vacancies)")
+def bench_json_dumps(size: int, stack: ExitStack) -> Callable[[], int]:
+    vacancies = parse_vacancies(make_raw_vacancies(size))
+    return lambda: len(vacancies) if json_codec.dumps(vacancies, indent=4) else 0
@@ -0,0 +1,58 @@
+# Подсистема startup: время запуска main.py в отдельном процессе — импорт модуля, --help и короткий запрос
+# --query к SQLite. Тяжёлые зависимости (requests, psycopg2, tqdm) main.py импортирует только в режимах,
+# которым они нужны; замер показывает, сколько стоит запуск интерпретатора вместе с импортами проекта.
+
+import os
+import subprocess
+import sys
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from benchmarks.generators import iter_parsed_vacancies, make_companies
+from benchmarks.runner import benchmark
+
+ROOT = Path(__file__).resolve().parent.parent
+EMPLOYERS = 100
+
+
+def _runner(args: List[str], env: Dict[str, str]) -> Callable[[], int]:
+    """Функция замера: один запуск python с аргументами args из корня проекта."""
+
+    def run() -> int:
+        subprocess.run([sys.executable, *args], cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL)
+        return 1
+
+    return run
+
+
+@benchmark("startup", "python (baseline)")
+def bench_python(size: int, stack: ExitStack) -> Callable[[], int]:
+    return _runner(["-c", "pass"], dict(os.environ))
+
+
+@benchmark("startup", "import main")
+def bench_import_main(size: int, stack: ExitStack) -> Callable[[], int]:
+    return _runner(["-c", "import main"], dict(os.environ))
+
+
+@benchmark("startup", "main.py --help")
+def bench_help(size: int, stack: ExitStack) -> Callable[[], int]:
+    return _runner(["main.py", "--help"], dict(os.environ))
+
+
+@benchmark("startup", "main.py --query sqlite")
+def bench_query_sqlite(size: int, stack: ExitStack) -> Callable[[], int]:
+    from src.sqlite_manager import SQLiteManager
+
+    path = os.path.join(stack.enter_context(tempfile.TemporaryDirectory()), "hh.sqlite3")
+    db = SQLiteManager(path)
+    db.create_tables()
+    db.insert_companies(make_companies(EMPLOYERS))
+    db.insert_vacancies(list(iter_parsed_vacancies(size, EMPLOYERS)))
+    db.record_salary_snapshot()
+    db.close()
+    env = dict(os.environ, DB_BACKEND="sqlite", SQLITE_PATH=path)
+    # Динамика зарплат — несколько строк вывода: замер не упирается в печать всех вакансий.
+    return _runner(["main.py", "--query", "trend"], env)
@@ -0,0 +1,76 @@
+# Генераторы синтетических данных в форматах API hh.ru и таблиц БД.
+# Все генераторы детерминированы (seed), чтобы замеры на разных коммитах шли на одинаковых данных.
+
+import random
+from typing import Dict, Iterator, List, Optional
+
+TITLES = [
+    "Python разработчик",
+    "Java Developer",
+    "Senior Go Engineer",
+    "Аналитик данных",
+    "DevOps инженер",
+    "Frontend разработчик (React)",
+    "QA Automation Engineer",
+    "Системный администратор",
+    "Data Scientist",
+    "Руководитель проекта",
+]
+CURRENCIES = ["RUR", "RUR", "RUR", "USD", "EUR", "KZT"]  # RUR встречается чаще, как и в реальных данных.
+
+
+def make_raw_vacancy(vacancy_id: int, employer_id: int, rnd: random.Random) -> Dict:
+    """Одна вакансия в формате элемента data["items"] ответа /vacancies."""
+    salary: Optional[Dict] = None
+    if rnd.random() < 0.6:  # Примерно у 40% вакансий зарплата не указана.
+        low = rnd.randrange(30_000, 300_000, 5_000)
+        salary = {
+            "from": low if rnd.random() < 0.8 else None,
+            "to": low + rnd.randrange(0, 150_000, 5_000) if rnd.random() < 0.6 else None,
+            "currency": rnd.choice(CURRENCIES),
+        }
+    return {
+        "id": str(vacancy_id),
+        "name": f"{rnd.choice(TITLES)} #{vacancy_id}",
+        "employer": {"id": str(employer_id), "name": f"Company {employer_id}"},
+        "salary": salary,
+        "alternate_url": f"https://hh.ru/vacancy/{vacancy_id}",
+    }
+
+
+def make_raw_vacancies(count: int, employers: int = 100, seed: int = 0) -> List[Dict]:
+    """Список из count «сырых» вакансий, равномерно распределённых по employers работодателям."""
+    rnd = random.Random(seed)
+    return [make_raw_vacancy(i + 1, i % employers + 1, rnd) for i in range(count)]
+
+
+def make_raw_pages(count: int, per_page: int = 100, employers: int = 100, seed: int = 0) -> List[Dict]:
+    """Те же вакансии, нарезанные на страницы ответа /vacancies ({"items", "pages", "page", "found"})."""
+    items = make_raw_vacancies(count, employers, seed)
+    pages = max(1, (count + per_page - 1) // per_page)
+    bounds = [(p * per_page, (p + 1) * per_page) for p in range(pages)]
+    return [
+        {"items": items[start:end], "page": p, "pages": pages, "found": count} for p, (start, end) in enumerate(bounds)
+    ]
+
+
+def make_companies(count: int) -> List[Dict]:
+    """Компании в формате результата HHApi.get_companies()."""
+    return [{"id": i + 1, "name": f"Company {i + 1}"} for i in range(count)]
+
+
+def iter_parsed_vacancies(count: int, employers: int = 100, seed: int = 0) -> Iterator[Dict]:
+    """Вакансии в формате parse_vacancy / DBManager.insert_vacancies (ленивая генерация для 1M строк)."""
+    rnd = random.Random(seed)
+    for i in range(count):
+        raw = make_raw_vacancy(i + 1, i % employers + 1, rnd)
+        salary = raw["salary"] or {}
+        yield {
+            "vacancy_id": i + 1,
+            "company_id": i % employers + 1,
+            "name": raw["name"],
+            "salary_from": salary.get("from"),
+            "salary_to": salary.get("to"),
+            "salary_currency": salary.get("currency"),
+            "url": raw["alternate_url"],
+        }
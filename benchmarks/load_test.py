@@ -0,0 +1,139 @@
+# Нагрузочный прогон сборщика: HHApi в нескольких потоках против локальной заглушки hh.ru с деградацией
+# (stub_server.Faults: задержки, 5xx, зависания, 429). Отчёт — пропускная способность, перцентили задержки
+# каждой HTTP-попытки, распределение статусов, число повторов и полнота собранных данных.
+#
+#   python -m benchmarks load --employers 100 --vacancies 300 --latency-ms 30 --latency-dist lognormal \
+#       --error-rate 0.02 --rate-limit 50 --workers 8 --retries 3
+
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, cast
+
+from benchmarks.stub_server import Faults, StubData, run_stub_server
+from src.analytics import percentile
+from src.hh_api import HHApi
+
+PERCENTILES = (50, 90, 99)
+
+
+@dataclass
+class LoadTestResult:
+    duration: float  # сек на весь прогон
+    vacancies: int  # собрано уникальных вакансий
+    expected: int  # вакансий в заглушке
+    latencies: List[float] = field(default_factory=list)  # длительность каждой HTTP-попытки, сек (по возрастанию)
+    statuses: Dict[str, int] = field(default_factory=dict)  # статус попытки глазами клиента: 200, 429, error, ...
+    retries: int = 0
+    server: Dict[str, int] = field(default_factory=dict)  # что отдала заглушка (Faults.counts)
+
+    @property
+    def completeness(self) -> float:
+        return self.vacancies / self.expected if self.expected else 1.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("latencies")
+        data.update(
+            requests=len(self.latencies),
+            requests_per_s=len(self.latencies) / self.duration if self.duration else 0.0,
+            vacancies_per_s=self.vacancies / self.duration if self.duration else 0.0,
+            completeness=self.completeness,
+            latency={f"p{q}": percentile(self.latencies, q) for q in PERCENTILES},
+        )
+        data["latency"]["max"] = self.latencies[-1] if self.latencies else 0.0
+        return data
+
+
+def _timed(get: Callable[..., Any], samples: List, statuses: Counter) -> Callable[..., Any]:
+    """Обёртка Session.get: длительность и статус каждой попытки (в том числе неудачной)."""
+
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = get(*args, **kwargs)
+            status = str(response.status_code)
+            return response
+        finally:
+            samples.append(time.perf_counter() - started)
+            statuses[status] += 1
+
+    return wrapper
+
+
+def run_load_test(
+    data: StubData,
+    faults: Faults,
+    workers: int = 4,
+    max_retries: int = 3,
+    retry_backoff: float = 0.2,
+    read_timeout: int = 5,
+) -> LoadTestResult:
+    """Поднимает заглушку с деградацией faults и собирает все её данные так же, как main.py: поиск
+    работодателей (get_companies), затем вакансии каждого работодателя (get_vacancies_for_company)
+    в workers потоках, у каждого потока — свой HHApi со своей HTTP-сессией."""
+    samples: List[float] = []
+    statuses: Counter = Counter()
+    retries: List[float] = []
+    local = threading.local()
+    apis: List[HHApi] = []
+
+    def sleep(delay: float) -> None:
+        retries.append(delay)
+        time.sleep(delay)
+
+    with run_stub_server(data, faults=faults) as base_url:
+
+        def api() -> HHApi:
+            if not hasattr(local, "api"):
+                client = HHApi(
+                    per_page=HHApi.MAX_PER_PAGE,
+                    read_timeout=read_timeout,
+                    max_retries=max_retries,
+                    retry_backoff=retry_backoff,
+                )
+                client.BASE_URL = base_url
+                setattr(client.session, "get", _timed(client.session.get, samples, statuses))
+                client.sleep = sleep
+                local.api = client
+                apis.append(client)
+            return cast(HHApi, local.api)
+
+        started = time.perf_counter()
+        api().get_companies()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            employer_ids = [int(e["id"]) for e in data.employers]
+            results = list(pool.map(lambda e: api().get_vacancies_for_company(e), employer_ids))
+        duration = time.perf_counter() - started
+        for client in apis:
+            client.session.close()
+
+    collected = {v["vacancy_id"] for vacancies in results for v in vacancies}
+    return LoadTestResult(
+        duration=duration,
+        vacancies=len(collected),
+        expected=sum(len(v) for v in data.vacancies.values()),
+        latencies=sorted(samples),
+        statuses=dict(statuses),
+        retries=len(retries),
+        server=dict(faults.counts),
+    )
+
+
+def format_load_report(result: LoadTestResult) -> str:
+    report = result.to_dict()
+    latency = ", ".join(f"{name} {value * 1000:.1f} мс" for name, value in report["latency"].items())
+    statuses = ", ".join(f"{status}: {count}" for status, count in sorted(result.statuses.items()))
+    return "\n".join(
+        [
+            f"Длительность:   {result.duration:.2f} с",
+            f"Запросов:       {report['requests']} ({report['requests_per_s']:.1f}/с), повторов {result.retries}",
+            f"Задержка:       {latency}",
+            f"Статусы:        {statuses}",
+            f"Вакансий:       {result.vacancies} из {result.expected} ({result.completeness:.1%}), "
+            f"{report['vacancies_per_s']:,.0f}/с",
+        ]
+    )
@@ -0,0 +1,148 @@
+# Минимальный раннер замеров в духе asv: реестр бенчмарков, повторные прогоны,
+# сохранение результатов в JSON с привязкой к коммиту и сравнение двух прогонов.
+
+import json
+import platform
+import statistics
+import subprocess
+import time
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+# Бенчмарк получает размер данных и ExitStack для освобождения ресурсов (сервер, соединения),
+# выполняет подготовку и возвращает функцию замера, которая возвращает число обработанных элементов.
+BenchFactory = Callable[[int, ExitStack], Callable[[], int]]
+
+
+class SkipBenchmark(Exception):
+    """Бенчмарк нельзя выполнить в текущем окружении (например, не задана тестовая БД)."""
+
+
+@dataclass
+class Benchmark:
+    suite: str  # подсистема: parsing / api / db
+    name: str
+    factory: BenchFactory
+
+
+@dataclass
+class BenchResult:
+    suite: str
+    name: str
+    items: int  # сколько элементов обрабатывает один прогон
+    timings: List[float] = field(default_factory=list)  # длительность каждого прогона, сек
+    skipped: Optional[str] = None
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.timings) if self.timings else 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Элементов в секунду по медианному прогону."""
+        return self.items / self.median if self.median else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.update(
+            median=self.median,
+            min=min(self.timings) if self.timings else 0.0,
+            max=max(self.timings) if self.timings else 0.0,
+            throughput=self.throughput,
+        )
+        return data
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(suite: str, name: str) -> Callable[[BenchFactory], BenchFactory]:
+    """Декоратор регистрации бенчмарка в BENCHMARKS."""
+
+    def decorator(factory: BenchFactory) -> BenchFactory:
+        BENCHMARKS.append(Benchmark(suite, name, factory))
+        return factory
+
+    return decorator
+
+
+def git_commit() -> str:
+    """Короткий хеш текущего коммита (или "unknown", если git недоступен)."""
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmark(bench: Benchmark, size: int, repeat: int) -> BenchResult:
+    """Подготавливает и прогоняет один бенчмарк repeat раз."""
+    result = BenchResult(bench.suite, bench.name, items=0)
+    with ExitStack() as stack:
+        try:
+            func = bench.factory(size, stack)
+        except SkipBenchmark as e:
+            result.skipped = str(e)
+            return result
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result.items = func()
+            result.timings.append(time.perf_counter() - start)
+    return result
+
+
+def run_benchmarks(
+    suites: Optional[List[str]] = None, size: int = 10_000, repeat: int = 5, pattern: str = ""
+) -> Dict[str, Any]:
+    """Прогоняет выбранные бенчмарки и возвращает отчёт с метаданными окружения."""
+    from src import json_codec
+
+    results = [
+        run_benchmark(b, size, repeat) for b in BENCHMARKS if (not suites or b.suite in suites) and pattern in b.name
+    ]
+    return {
+        "commit": git_commit(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "json_backend": json_codec.backend(),
+        "size": size,
+        "repeat": repeat,
+        "results": [r.to_dict() for r in results],
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Таблица результатов: подсистема, бенчмарк, медиана, пропускная способность."""
+    lines = [f"commit {report['commit']}  size={report['size']}  json={report['json_backend']}"]
+    for r in report["results"]:
+        title = f"{r['suite']:<8} {r['name']:<36}"
+        if r["skipped"]:
+            lines.append(f"{title} SKIP ({r['skipped']})")
+        else:
+            lines.append(f"{title} {r['median'] * 1000:10.2f} ms {r['throughput']:14,.0f} items/s")
+    return "\n".join(lines)
+
+
+def save_report(report: Dict[str, Any], path: Union[str, Path]) -> None:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def compare_reports(old: Dict[str, Any], new: Dict[str, Any], threshold: float = 0.1) -> List[str]:
+    """Сравнивает медианы двух отчётов; изменение больше threshold помечается как регрессия/ускорение."""
+    before = {(r["suite"], r["name"]): r for r in old["results"] if not r["skipped"]}
+    lines = [f"{old['commit']} -> {new['commit']}"]
+    for r in new["results"]:
+        prev = before.get((r["suite"], r["name"]))
+        if r["skipped"] or prev is None or not prev["median"]:
+            continue
+        ratio = r["median"] / prev["median"]
+        mark = "REGRESSION" if ratio > 1 + threshold else "faster" if ratio < 1 - threshold else ""
+        lines.append(
+            f"{r['suite']:<8} {r['name']:<36} {prev['median'] * 1000:10.2f} -> {r['median'] * 1000:10.2f} ms"
+            f"  x{ratio:5.2f} {mark}".rstrip()
+        )
+    return lines
@@ -0,0 +1,203 @@
+# Локальная заглушка API hh.ru (/employers и /vacancies) на стандартном http.server.
+# Отдаёт синтетические данные из generators.py, чтобы замерять HHApi без сети и квот hh.ru.
+# Faults добавляет к ответам задержку из заданного распределения, ошибки 5xx, «зависшие» запросы
+# и ограничение частоты запросов с ответом 429 — для нагрузочных прогонов (benchmarks/load_test.py).
+
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.generators import make_raw_vacancies
+
+
+class StubData:
+    """Набор работодателей и их вакансий, который обслуживает заглушка."""
+
+    def __init__(
+        self, employers: int = 15, vacancies_per_employer: int = 200, seed: int = 0, max_depth: Optional[int] = None
+    ):
+        """
+        :param max_depth: ограничение глубины выдачи, как у hh.ru (2000): страницы глубже — ошибка 400
+        """
+        self.max_depth = max_depth
+        self.employers: List[Dict[str, Any]] = [
+            {"id": str(i + 1), "name": f"Company {i + 1}", "open_vacancies": vacancies_per_employer}
+            for i in range(employers)
+        ]
+        raw = make_raw_vacancies(employers * vacancies_per_employer, employers=employers, seed=seed)
+        # Даты публикации — за последние 30 дней от запуска заглушки, от новых к старым, как в выдаче hh.ru.
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        rnd = random.Random(seed)
+        for v in raw:
+            v["published_at"] = (now - timedelta(seconds=rnd.randrange(30 * 24 * 3600))).isoformat()
+        raw.sort(key=lambda v: v["published_at"], reverse=True)
+        self.vacancies: Dict[str, List[Dict]] = {}
+        for v in raw:
+            self.vacancies.setdefault(v["employer"]["id"], []).append(v)
+
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+
+@dataclass
+class Faults:
+    """Параметры деградации заглушки. По умолчанию — без задержек и ошибок."""
+
+    latency_ms: float = 0.0  # медиана задержки ответа (для exponential — среднее)
+    latency_dist: str = "fixed"  # одно из LATENCY_DISTRIBUTIONS
+    latency_spread: float = 0.5  # uniform: ± доля от latency_ms; lognormal: sigma (чем больше, тем длиннее хвост)
+    error_rate: float = 0.0  # доля ответов 500/502/503
+    timeout_rate: float = 0.0  # доля запросов, ответ на которые задерживается на hang_seconds
+    hang_seconds: float = 30.0
+    rate_limit: Optional[float] = None  # запросов в секунду на всю заглушку; сверх — 429 с Retry-After
+    burst: Optional[float] = None  # запас токенов (по умолчанию — rate_limit)
+    seed: int = 0
+    counts: Counter = field(default_factory=Counter, init=False)  # что заглушка отдала: ok, 429, 500..., hang
+
+    def __post_init__(self) -> None:
+        if self.latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"latency_dist должен быть одним из {LATENCY_DISTRIBUTIONS}")
+        self._rnd = random.Random(self.seed)
+        self._lock = threading.Lock()
+        self._tokens = self.burst if self.burst is not None else (self.rate_limit or 0.0)
+        self._updated = time.monotonic()
+
+    def latency(self) -> float:
+        """Задержка очередного ответа, сек."""
+        median = self.latency_ms / 1000
+        if median <= 0:
+            return 0.0
+        with self._lock:
+            if self.latency_dist == "uniform":
+                return self._rnd.uniform(median * (1 - self.latency_spread), median * (1 + self.latency_spread))
+            if self.latency_dist == "exponential":
+                return self._rnd.expovariate(1 / median)
+            if self.latency_dist == "lognormal":
+                return self._rnd.lognormvariate(math.log(median), self.latency_spread)
+        return median
+
+    def _take_token(self) -> float:
+        """0 — запрос укладывается в лимит, иначе — через сколько секунд появится токен."""
+        if self.rate_limit is None:
+            return 0.0
+        capacity = self.burst if self.burst is not None else self.rate_limit
+        now = time.monotonic()
+        self._tokens = min(capacity, self._tokens + (now - self._updated) * self.rate_limit)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate_limit
+
+    def decide(self) -> Tuple[str, float]:
+        """Исход очередного запроса: ("ok" | "429" | "500" | "502" | "503" | "hang", пауза перед ответом, сек)."""
+        with self._lock:
+            wait = self._take_token()
+            roll = self._rnd.random()
+            if wait > 0:
+                outcome = "429"
+            elif roll < self.error_rate:
+                outcome = str(self._rnd.choice((500, 502, 503)))
+            elif roll < self.error_rate + self.timeout_rate:
+                outcome = "hang"
+            else:
+                outcome = "ok"
+            self.counts[outcome] += 1
+        if outcome == "429":
+            return outcome, wait
+        return outcome, self.hang_seconds if outcome == "hang" else self.latency()
+
+
+def _page(items: List[Dict], page: int, per_page: int) -> Dict[str, Any]:
+    """Формирует страницу в формате ответа hh.ru."""
+    pages = max(1, (len(items) + per_page - 1) // per_page)
+    start, end = page * per_page, (page + 1) * per_page
+    return {
+        "items": items[start:end],
+        "found": len(items),
+        "page": page,
+        "pages": pages,
+        "per_page": per_page,
+    }
+
+
+def make_handler(data: StubData, faults: Optional[Faults] = None) -> type:
+    """Создаёт класс обработчика запросов, привязанный к набору данных data (и деградации faults)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive: requests.Session переиспользует соединение.
+        disable_nagle_algorithm = True  # Иначе заголовки и тело уходят с задержкой delayed ACK (~40 мс).
+
+        def do_GET(self) -> None:  # noqa: N802 - имя задано BaseHTTPRequestHandler
+            if faults is not None:
+                outcome, pause = faults.decide()
+                if outcome == "429":
+                    self.send_response(429)
+                    self.send_header("Retry-After", str(max(1, math.ceil(pause))))
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                time.sleep(pause)
+                if outcome not in ("ok", "hang"):
+                    self.send_error(int(outcome))
+                    return
+            parsed = urlparse(self.path)
+            params = parse_qs(parsed.query)
+            query = {k: v[0] for k, v in params.items()}
+            page = int(query.get("page", 0))
+            per_page = int(query.get("per_page", 20))
+            if parsed.path == "/employers":
+                body = _page(data.employers, page, per_page)
+            elif parsed.path == "/vacancies":
+                # Несколько employer_id в одном запросе — общая выдача по всем работодателям.
+                items = [
+                    v for employer_id in params.get("employer_id", []) for v in data.vacancies.get(employer_id, [])
+                ]
+                if "date_from" in query:
+                    date_from = datetime.fromisoformat(query["date_from"])
+                    items = [v for v in items if datetime.fromisoformat(v["published_at"]) >= date_from]
+                if "date_to" in query:
+                    date_to = datetime.fromisoformat(query["date_to"])
+                    items = [v for v in items if datetime.fromisoformat(v["published_at"]) <= date_to]
+                if data.max_depth is not None and (page + 1) * per_page > data.max_depth:
+                    self.send_error(400)
+                    return
+                body = _page(items, page, per_page)
+            else:
+                self.send_error(404)
+                return
+            raw = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def log_message(self, format: str, *args: Any) -> None:  # Не засоряем вывод замеров логом запросов.
+            pass
+
+    return Handler
+
+
+@contextmanager
+def run_stub_server(
+    data: StubData, host: str = "127.0.0.1", port: int = 0, faults: Optional[Faults] = None
+) -> Iterator[str]:
+    """Запускает заглушку в фоновом потоке и отдаёт её базовый URL (port=0 — свободный порт)."""
+    server = ThreadingHTTPServer((host, port), make_handler(data, faults))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{host}:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -1,15 +1,34 @@
+from __future__ import annotations
+
+import argparse
+import atexit
 import os
 import time
-import requests
-from src.hh_api import HHApi
-from src.db_manager import DBManager, DBConfig
-from src.work_files import save_to_json, save_to_csv
-from src.services import format_vacancy
-from dotenv import load_dotenv
-from tqdm import tqdm
-
-#load_dotenv(encoding="utf-8", override=True)
+from functools import partial
+from typing import TYPE_CHECKING
+
+from src import metrics
+from src.storage import Storage
+
+# Тяжёлые зависимости (requests, psycopg2, tqdm, python-dotenv, многопроцессная выгрузка) импортируются
+# внутри режимов, которым они нужны: короткий запрос (--query) к SQLite не загружает ни сетевой стек,
+# ни драйвер PostgreSQL и запускается за десятки миллисекунд (python -m benchmarks run --suite startup).
+if TYPE_CHECKING:
+    from src.checkpoint import CrawlCheckpoint
+    from src.hh_api import HHApi
+    from src.query_profiler import QueryProfiler
+
+QUERY_ACTIONS = ("all", "higher", "keyword", "trend")
+EMPTY_LISTINGS = {
+    "all": "Вакансий нет.",
+    "higher": "Вакансий с зарплатой выше средней нет.",
+    "keyword": "Вакансий не найдено.",
+}
+
+
 def load_env_safe() -> None:
+    from dotenv import load_dotenv
+
     try:
         load_dotenv(encoding="utf-8", override=True)
     except UnicodeDecodeError as e:
@@ -27,7 +46,7 @@ def sanitize_env(val: str | None) -> str | None:
            .replace("“", '"').replace("”", '"').replace("’", "'")
            .strip()
     )
-load_env_safe()
+
 
 def safe_hh_request(func, *args, retries=3, delay=2, **kwargs):
     """
@@ -39,36 +58,261 @@ def safe_hh_request(func, *args, retries=3, delay=2, **kwargs):
     :param kwargs: именованные аргументы для метода
     :return: результат функции или пустой список при неудаче
     """
+    import requests
+
     for attempt in range(1, retries + 1):
         try:
             return func(*args, **kwargs)
         except requests.exceptions.RequestException as e:
             print(f"Ошибка при запросе к HH API: {e}. Попытка {attempt} из {retries}...")
             if attempt < retries:
+                metrics.HTTP_RETRIES.inc(method=getattr(func, "__name__", "unknown"))
                 time.sleep(delay)
             else:
                 print("Не удалось получить данные после нескольких попыток.")
                 return []
 
-def wait_for_db(db: DBManager, retries: int = 5, delay: float = 1.5) -> bool:
+
+def small_employers(hh: HHApi, checkpoint: CrawlCheckpoint, companies: list[dict]) -> list[int]:
+    """Ещё не загруженные работодатели для общих запросов hh.get_vacancies_for_companies: у которых по
+    get_companies (или журналу при --resume) открытых вакансий не больше MAX_PER_PAGE. Компании с неизвестным
+    числом вакансий в общие запросы не попадают: среди них может оказаться крупный работодатель."""
+    return [
+        company['id'] for company in companies
+        if company['id'] not in checkpoint.synced
+        and checkpoint.next_page(company['id']) == 0
+        and company['id'] in hh.open_vacancies
+        and hh.open_vacancies[company['id']] <= hh.MAX_PER_PAGE
+    ]
+
+
+def fetch_company_vacancies(hh: HHApi, checkpoint: CrawlCheckpoint, employer_id: int) -> None:
+    """Загружает вакансии компании со страницы, на которой остановилась контрольная точка. Каждая страница
+    сразу попадает в журнал. strict: ошибка запроса — исключение (safe_hh_request повторит вызов с новой
+    next_page), а не обрыв списка, поэтому после возврата компания отмечается полностью загруженной."""
+    hh.get_vacancies_for_company(
+        employer_id,
+        start_page=checkpoint.next_page(employer_id),
+        on_page=partial(checkpoint.record_page, employer_id),
+        strict=True,
+    )
+    # Выдача обрезается на MAX_SEARCH_DEPTH вакансиях: столько вакансий — возможно, не все.
+    if len(checkpoint.vacancies(employer_id)) < hh.MAX_SEARCH_DEPTH:
+        checkpoint.mark_complete(employer_id)
+
+
+def wait_for_db(db: Storage, retries: int = 5, delay: float = 1.5) -> bool:
     """
     Пытается получить соединение с БД несколько раз, чтобы дождаться готовности сервера.
+    retries=1 — одна проверка без пауз: сразу сообщить о недоступной БД.
     Возвращает True при успехе, False при неудаче.
     """
     for attempt in range(1, retries + 1):
         try:
             # быстрый ping через открытие и закрытие соединения
-            with db._get_conn() as conn:  # type: ignore[attr-defined]
-                with conn.cursor() as cur:
-                    cur.execute("SELECT 1;")
+            db.ping()
             return True
         except Exception as e:
             print(f"Не удалось подключиться к БД (попытка {attempt}/{retries}): {e}")
-            time.sleep(delay)
+            if attempt < retries:
+                time.sleep(delay)
     return False
 
 
-def main():
+def report_metrics() -> None:
+    """Выгружает метрики запуска: в файл HH_METRICS_FILE (формат Prometheus) и/или сводкой в консоль,
+    если задан HH_METRICS_SUMMARY=1."""
+    metrics_file = sanitize_env(os.getenv("HH_METRICS_FILE"))
+    if metrics_file:
+        metrics.REGISTRY.dump(metrics_file)
+        print(f"Метрики сохранены в {metrics_file}")
+    if sanitize_env(os.getenv("HH_METRICS_SUMMARY")) == "1":
+        print("\n--- Метрики запуска ---")
+        print(metrics.REGISTRY.summary())
+
+
+def make_profiler() -> QueryProfiler | None:
+    """Режим профилирования SQL включается через .env:
+    DB_PROFILE=1 — записывать длительность и число строк каждого запроса DBManager;
+    DB_SLOW_QUERY_MS — порог медленного запроса в мс (по умолчанию 100);
+    DB_EXPLAIN=1 — снимать EXPLAIN (ANALYZE, BUFFERS) для медленных SELECT;
+    DB_PROFILE_LOG — файл JSON Lines для медленных запросов (иначе вывод в консоль)."""
+    if sanitize_env(os.getenv("DB_PROFILE")) != "1":
+        return None
+    from src.query_profiler import QueryProfiler
+
+    threshold_str = sanitize_env(os.getenv("DB_SLOW_QUERY_MS")) or "100"
+    try:
+        threshold = float(threshold_str)
+    except ValueError:
+        print(f"Некорректный DB_SLOW_QUERY_MS='{threshold_str}', используется 100")
+        threshold = 100.0
+    profiler = QueryProfiler(
+        slow_threshold_ms=threshold,
+        explain=sanitize_env(os.getenv("DB_EXPLAIN")) == "1",
+        log_path=sanitize_env(os.getenv("DB_PROFILE_LOG")),
+    )
+    atexit.register(lambda: print("\n--- Профиль SQL-запросов ---\n" + profiler.report()))
+    return profiler
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Сбор вакансий hh.ru в PostgreSQL или SQLite")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="продолжить прерванный сбор с последней контрольной точки (CRAWL_CHECKPOINT)",
+    )
+    parser.add_argument(
+        "--export",
+        metavar="DIR",
+        help="только выгрузить все вакансии из БД в каталог DIR параллельными процессами и завершиться",
+    )
+    parser.add_argument(
+        "--formats",
+        default="json,csv",
+        # Список не берётся из src.exporter.FORMATS, чтобы --help не импортировал модуль выгрузки.
+        help="форматы выгрузки через запятую: json, csv, parquet (по умолчанию json,csv)",
+    )
+    parser.add_argument("--shard-size", type=int, default=100_000, help="строк в одном файле выгрузки, 0 — один файл")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="процессов выгрузки (по умолчанию — число ядер; 0 — без пула)"
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="работать обработчиком общей очереди задач сбора в PostgreSQL (можно запускать на нескольких машинах)",
+    )
+    parser.add_argument(
+        "--enqueue",
+        metavar="KEYWORD",
+        help="поставить в очередь сбор компаний и вакансий по ключевому слову (вместе с --worker или отдельно)",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=5.0,
+        help="общий для всех обработчиков лимит запросов к API hh.ru в секунду (по умолчанию 5)",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="DIR",
+        help="загрузить в БД компании и вакансии из архива ответов API (HH_ARCHIVE_DIR) без обращения к hh.ru",
+    )
+    parser.add_argument(
+        "--archive",
+        action="store_true",
+        help="перенести давно закрытые вакансии в архив hh_schema.vacancies_archive и завершиться (PostgreSQL)",
+    )
+    parser.add_argument(
+        "--archive-after-days",
+        type=int,
+        default=30,
+        help="через сколько дней после закрытия вакансия уходит в архив (по умолчанию 30)",
+    )
+    parser.add_argument(
+        "--query",
+        choices=QUERY_ACTIONS,
+        help="только показать вакансии из БД и завершиться, без сбора: all — все, higher — с зарплатой выше "
+        "средней, keyword — по ключевому слову (--keyword), trend — динамика средней зарплаты (RUR)",
+    )
+    parser.add_argument("--keyword", default="", help="ключевое слово для --query keyword")
+    parser.add_argument(
+        "--pager",
+        action="store_true",
+        help="показывать результат --query постранично (по умолчанию весь список выводится сразу)",
+    )
+    parser.add_argument("--page-size", type=int, default=20, help="вакансий на странице в меню и с --pager")
+    return parser.parse_args(argv)
+
+
+def export_database(db: Storage, args: argparse.Namespace) -> None:
+    """Режим --export: потоковое чтение вакансий из БД и параллельная запись шардов во всех форматах."""
+    from src.exporter import ParallelExporter
+
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    exporter = ParallelExporter(args.export, formats=formats, shard_size=args.shard_size, workers=args.workers)
+    started = time.perf_counter()
+    files = exporter.export(db.iter_vacancy_records())
+    print(f"Выгрузка в {args.export} за {time.perf_counter() - started:.1f} с:")
+    for fmt, paths in files.items():
+        print(f"  {fmt}: файлов {len(paths)}")
+
+
+def run_crawl_queue(db: Storage, args: argparse.Namespace) -> None:
+    """Режимы --enqueue и --worker: задачи сбора берутся из общей очереди hh_schema.crawl_tasks."""
+    from src.crawl_worker import CrawlWorker, employers_task
+    from src.db_manager import DBManager
+    from src.hh_api import HHApi
+
+    if not isinstance(db, DBManager):
+        print("Очередь задач сбора требует PostgreSQL (DB_BACKEND=postgres)")
+        return
+    if args.enqueue:
+        added = db.enqueue_crawl_tasks([employers_task(args.enqueue)])
+        print(f"В очередь добавлено задач: {added}")
+    if args.worker:
+        worker = CrawlWorker(db, HHApi(max_retries=3), rate_per_second=args.rate)
+        print(f"Обработчик {worker.worker_id} запущен")
+        done = worker.run()
+        print(f"Выполнено задач: {done}")
+    print(f"Очередь: {db.get_crawl_queue_stats()}")
+
+
+def archive_vacancies(db: Storage, args: argparse.Namespace) -> None:
+    """Режим --archive (запускать по расписанию, например из cron): перенос закрытых вакансий в архив."""
+    from src.db_manager import DBManager
+
+    if not isinstance(db, DBManager):
+        print("Архив закрытых вакансий требует PostgreSQL (DB_BACKEND=postgres)")
+        return
+    started = time.perf_counter()
+    moved = db.archive_closed_vacancies(closed_days=args.archive_after_days)
+    stats = db.get_archive_stats()
+    print(
+        f"В архив перенесено вакансий: {moved} за {time.perf_counter() - started:.1f} с. "
+        f"В рабочей таблице {stats['hot']} (закрытых {stats['closed']}, {stats['hot_bytes'] // 1024} КБ), "
+        f"в архиве {stats['archived']} ({stats['archive_bytes'] // 1024} КБ)"
+    )
+
+
+def run_query(db: Storage, action: str, keyword: str = "", page_size: int | None = None) -> None:
+    """Печатает результат одного запроса к БД: пункт меню или режим --query (см. QUERY_ACTIONS).
+    page_size — листать список страницами (src/pager.py), None — вывести весь список пачками строк."""
+    if action == "trend":
+        trend = db.get_salary_trend(currency="RUR", days=90, window=7)
+        if not trend:
+            print("Снимков зарплат пока нет.")
+        for row in trend:
+            avg = row["avg_salary"]
+            moving = row["moving_avg"]
+            delta = row["delta"]
+            print(
+                f"{row['snapshot_date']}: вакансий {row['vacancies_count']}, "
+                f"средняя {'—' if avg is None else f'{avg:.0f}'}, "
+                f"скользящая за 7 снимков {'—' if moving is None else f'{moving:.0f}'}, "
+                f"изменение {'—' if delta is None else f'{delta:+.0f}'}"
+            )
+        return
+    from src.pager import VacancyPager, write_vacancies
+
+    # Строки читаются с сервера частями (серверный курсор), а не загружаются в память все сразу.
+    with db.open_vacancy_cursor(action, keyword) as cursor:
+        shown = VacancyPager(cursor, page_size).run() if page_size else write_vacancies(cursor)
+    if not shown:
+        print(EMPTY_LISTINGS[action])
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    # .env читается здесь, а не при импорте: python main.py --help и импорт модуля его не трогают.
+    load_env_safe()
+    # HH_METRICS_PORT — поднять эндпоинт /metrics для Prometheus на время работы программы.
+    metrics_port = sanitize_env(os.getenv("HH_METRICS_PORT"))
+    if metrics_port:
+        metrics.start_http_server(int(metrics_port))
+        print(f"Метрики доступны на http://localhost:{metrics_port}/metrics")
+
     # Читаем env и санитизируем
     name = sanitize_env(os.getenv("DB_NAME")) or "hh_db"
     user = sanitize_env(os.getenv("DB_USER")) or "postgres"
@@ -81,53 +325,158 @@ def main():
         print(f"Некорректный DB_PORT='{port_str}', используется 5432")
         port = 5432
 
-    # --- Настройка подключения к базе ---
-    db_config = DBConfig(
-        name=os.getenv("DB_NAME", "hh_db"),
-        user=os.getenv("DB_USER", "postgres"),
-        password=os.getenv("DB_PASSWORD", "postgres"),
-        host=os.getenv("DB_HOST", "localhost"),
-        port=int(os.getenv("DB_PORT", 5432))
-    )
-    db = DBManager(db_config)
+    db: Storage
+    # DB_BACKEND=sqlite — встроенная БД в одном файле (SQLITE_PATH), сервер PostgreSQL не нужен.
+    if (sanitize_env(os.getenv("DB_BACKEND")) or "postgres").lower() == "sqlite":
+        from src.sqlite_manager import SQLiteManager
 
-    # Перед созданием таблиц — дождаться доступности БД
-    if not wait_for_db(db):
+        sqlite_path = sanitize_env(os.getenv("SQLITE_PATH")) or "data/hh.sqlite3"
+        db = SQLiteManager(sqlite_path)
+        print(f"Хранилище: SQLite ({sqlite_path})")
+        db.create_tables()
+    else:
+        from src.db_manager import DBConfig, DBManager, parse_replicas
+
+        # --- Настройка подключения к базе ---
+        # DB_CONNECT_TIMEOUT — сколько секунд ждать подключения; для --query по умолчанию 5.
+        timeout_str = sanitize_env(os.getenv("DB_CONNECT_TIMEOUT"))
+        db_config = DBConfig(
+            name=os.getenv("DB_NAME", "hh_db"),
+            user=os.getenv("DB_USER", "postgres"),
+            password=os.getenv("DB_PASSWORD", "postgres"),
+            host=os.getenv("DB_HOST", "localhost"),
+            port=int(os.getenv("DB_PORT", 5432)),
+            connect_timeout=int(timeout_str) if timeout_str else (5 if args.query else None),
+            # DB_REPLICAS=host1:5432,host2 — реплики для отчётов; DB_MAX_REPLICA_LAG — допустимое отставание, сек.
+            replicas=parse_replicas(sanitize_env(os.getenv("DB_REPLICAS"))),
+            max_replica_lag=float(sanitize_env(os.getenv("DB_MAX_REPLICA_LAG")) or 30),
+        )
+        db = DBManager(db_config, profiler=make_profiler())
+
+        # Перед созданием таблиц — дождаться доступности БД. Короткий запрос не ждёт запуска сервера:
+        # одна попытка без пауз.
+        if not wait_for_db(db, retries=1 if args.query else 5):
+            print(
+                "База данных недоступна. Проверьте, что PostgreSQL запущен и параметры подключения корректны:\n"
+                f"DB_HOST={db_config.host} DB_PORT={db_config.port} DB_NAME={db_config.name} "
+                f"DB_USER={db_config.user}"
+            )
+            return
+        # Запрос только читает: DDL (ALTER TABLE берёт исключительную блокировку) выполняется при сборе.
+        if not args.query:
+            db.create_tables()
+
+    if args.query:
+        run_query(db, args.query, args.keyword, args.page_size if args.pager else None)
+        return
+    if args.export:
+        export_database(db, args)
+        return
+    if args.worker or args.enqueue:
+        run_crawl_queue(db, args)
+        return
+    if args.archive:
+        archive_vacancies(db, args)
+        return
+    if args.replay:
+        from src.response_archive import ResponseArchive, replay_archive
+
+        started = time.perf_counter()
+        totals = replay_archive(ResponseArchive(args.replay), db)
         print(
-            "База данных недоступна. Проверьте, что PostgreSQL запущен и параметры подключения корректны:\n"
-            f"DB_HOST={db_config.host} DB_PORT={db_config.port} DB_NAME={db_config.name} "
-            f"DB_USER={db_config.user}"
+            f"Из архива {args.replay} за {time.perf_counter() - started:.1f} с: ответов {totals['responses']}, "
+            f"компаний {totals['companies']}, вакансий новых {totals['inserted']}, "
+            f"изменённых {totals['updated']}, без изменений {totals['unchanged']}"
         )
         return
 
-    db.create_tables()
+    from tqdm import tqdm
+
+    from src.checkpoint import CrawlCheckpoint
+    from src.hh_api import HHApi
+    from src.response_archive import ResponseArchive
+    from src.work_files import save_to_csv, save_to_json
 
     # --- Создание API клиента HH.ru ---
-    hh = HHApi()
+    # HH_ARCHIVE_DIR — сохранять «сырые» ответы API в архив для повторной загрузки (python main.py --replay DIR).
+    archive_dir = sanitize_env(os.getenv("HH_ARCHIVE_DIR"))
+    # Временные ошибки (429, 5xx, обрыв соединения) повторяются внутри HHApi, не обрывая загрузку страниц.
+    hh = HHApi(archive=ResponseArchive(archive_dir) if archive_dir else None, max_retries=3)
 
-    # --- Ввод ключевого слова ---
-    keyword = input("Введите ключевое слово для поиска вакансий (по умолчанию IT): ").strip() or "IT"
+    # --- Контрольная точка: прогресс сбора пишется в журнал, --resume продолжает с места остановки ---
+    checkpoint = CrawlCheckpoint(sanitize_env(os.getenv("CRAWL_CHECKPOINT")) or "data/crawl_checkpoint.jsonl")
+    if args.resume and checkpoint.active:
+        keyword = checkpoint.keyword
+        companies = checkpoint.companies
+        # Число вакансий знает только get_companies: без него крупные работодатели считались бы мелкими.
+        hh.open_vacancies.update(checkpoint.open_vacancies)
+        print(
+            f"\nПродолжаем сбор по ключевому слову '{keyword}': "
+            f"обработано компаний {len(checkpoint.synced)} из {len(companies)}"
+        )
+    else:
+        if args.resume:
+            print("Контрольная точка не найдена, начинаем новый сбор.")
+        # --- Ввод ключевого слова ---
+        keyword = input("Введите ключевое слово для поиска вакансий (по умолчанию IT): ").strip() or "IT"
 
-    print(f"\nИщем компании по ключевому слову '{keyword}'...")
+        print(f"\nИщем компании по ключевому слову '{keyword}'...")
 
-    # --- Получаем компании через безопасный вызов ---
-    companies = safe_hh_request(hh.get_companies, text=keyword)
-    if not companies:
-        print(f"По ключевому слову '{keyword}' компании не найдены. Завершение программы.")
-        return
+        # --- Получаем компании через безопасный вызов ---
+        companies = safe_hh_request(hh.get_companies, text=keyword)
+        if not companies:
+            print(f"По ключевому слову '{keyword}' компании не найдены. Завершение программы.")
+            return
+        checkpoint.start(keyword, companies, hh.open_vacancies)
 
     db.insert_companies(companies)
     print(f"Найдено компаний: {len(companies)}")
 
-    all_vacancies = []
+    sync_totals = {"inserted": 0, "updated": 0, "unchanged": 0, "closed": 0}
 
     # --- Получаем вакансии для каждой компании с прогресс-баром ---
     print("\nПолучаем вакансии для компаний...")
+    # Мелкие работодатели (до 100 открытых вакансий) загружаются общими запросами по нескольку employer_id;
+    # крупные, а также те, чей общий запрос не удался, — постранично в цикле ниже.
+    small = small_employers(hh, checkpoint, companies)
+    if len(small) > 1:
+        batched = safe_hh_request(hh.get_vacancies_for_companies, small) or {}
+        for employer_id, vacancies in batched.items():
+            checkpoint.record_page(employer_id, 0, 1, vacancies)
+            # Работодатели с ошибкой запроса в результат не попадают: остальные загружены полностью.
+            if len(vacancies) < hh.MAX_SEARCH_DEPTH:
+                checkpoint.mark_complete(employer_id)
     for company in tqdm(companies, desc="Компании"):
-        vacancies = safe_hh_request(hh.get_vacancies_for_company, company['id'])
+        employer_id = company['id']
+        if employer_id in checkpoint.synced:
+            continue  # Уже загружена и записана в БД до прерывания.
+        if hh.open_vacancies.get(employer_id, 0) > hh.MAX_SEARCH_DEPTH and checkpoint.next_page(employer_id) == 0:
+            # Выдача глубже 2000 вакансий: поиск делится по датам публикации, интервалы загружаются параллельно.
+            vacancies = safe_hh_request(hh.get_vacancies_for_company_partitioned, employer_id)
+            if vacancies:
+                checkpoint.record_page(employer_id, 0, 1, vacancies)
+        if not checkpoint.is_fetched(employer_id):
+            # Каждая страница сразу попадает в журнал; после прерывания загрузка продолжится со следующей.
+            safe_hh_request(fetch_company_vacancies, hh, checkpoint, employer_id)
+        vacancies = checkpoint.vacancies(employer_id)
         if vacancies:
-            db.insert_vacancies(vacancies)
-            all_vacancies.extend(vacancies)
+            # Неизменившиеся вакансии не переписываются, изменения попадают в историю vacancy_changes.
+            for key, count in db.sync_vacancies(vacancies).items():
+                sync_totals[key] += count
+        if checkpoint.is_fetched(employer_id):
+            # Только после загрузки, про которую известно, что список полный (CrawlCheckpoint.mark_complete),
+            # остальные вакансии компании в БД закрыты. Разбиение выдачи по датам полноты не гарантирует.
+            if checkpoint.is_complete(employer_id):
+                closed = db.mark_closed_vacancies(employer_id, [v["vacancy_id"] for v in vacancies])
+                sync_totals["closed"] += closed["closed"]
+            checkpoint.mark_synced(employer_id)
+    print(
+        f"Вакансии: новых {sync_totals['inserted']}, изменённых {sync_totals['updated']}, "
+        f"без изменений {sync_totals['unchanged']}, закрытых {sync_totals['closed']}"
+    )
+    all_vacancies = [v for company in companies for v in checkpoint.vacancies(company['id'])]
+    # Дневной снимок зарплат по компаниям — для отчётов о динамике без пересчёта по всем вакансиям.
+    db.record_salary_snapshot()
 
     # --- Сохраняем данные ---
     os.makedirs("data", exist_ok=True)
@@ -141,6 +490,11 @@ def main():
             all_vacancies,
             fieldnames=["vacancy_id", "name", "company_id", "salary_from", "salary_to", "salary_currency", "url"]
         )
+    # Выгрузка сохранена — журнал больше не нужен, если все компании загружены полностью.
+    if all(company['id'] in checkpoint.synced for company in companies):
+        checkpoint.clear()
+    else:
+        print("Часть вакансий загрузить не удалось. Продолжить загрузку: python main.py --resume")
 
     # --- Интерфейс пользователя ---
     while True:
@@ -148,34 +502,14 @@ def main():
         print("1 - Показать все вакансии")
         print("2 - Показать вакансии с зарплатой выше средней")
         print("3 - Показать вакансии по ключевому слову")
+        print("4 - Показать динамику средней зарплаты (RUR)")
         print("0 - Выйти")
         choice = input("Введите номер действия: ").strip()
 
-        if choice == "1":
-            vacancies = db.get_all_vacancies()
-            if not vacancies:
-                print("Вакансий нет.")
-            else:
-                for v in vacancies:
-                    print(format_vacancy(v))
-
-        elif choice == "2":
-            vacancies = db.get_vacancies_with_higher_salary()
-            if not vacancies:
-                print("Вакансий с зарплатой выше средней нет.")
-            else:
-                for v in vacancies:
-                    print(format_vacancy(v))
-
+        if choice in ("1", "2", "4"):
+            run_query(db, {"1": "all", "2": "higher", "4": "trend"}[choice], page_size=args.page_size)
         elif choice == "3":
-            kw = input("Введите ключевое слово для поиска: ").strip()
-            vacancies = db.get_vacancies_with_keyword(kw)
-            if not vacancies:
-                print("Вакансий не найдено.")
-            else:
-                for v in vacancies:
-                    print(format_vacancy(v))
-
+            run_query(db, "keyword", input("Введите ключевое слово для поиска: ").strip(), args.page_size)
         elif choice == "0":
             print("Выход.")
             break
@@ -184,4 +518,7 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    try:
+        main()
+    finally:
+        report_metrics()  # Метрики выгружаются при любом завершении, в том числе по ошибке или Ctrl+C.
\ No newline at end of file
@@ -0,0 +1,184 @@
+# Аналитика в памяти по выгруженным вакансиям (data/vacancies.json) без базы данных.
+# Данные один раз раскладываются по колонкам (VacancyColumns + массивы array), по названиям строится
+# обратный индекс термов (src/search_engine.py), после чего отчёты в духе DBManager считаются за миллисекунды:
+# фильтры проходят по одной колонке, поиск по словам (find) — по индексу, а отчёт по ключевому слову — подстрокой
+# в названии, как ILIKE '%слово%' в get_vacancies_with_keyword DBManager.
+
+import math
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+from src.search_engine import SearchIndex
+from src.work_files import load_from_json
+from src.work_vacancies import VacancyColumns
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Перцентиль q (0..100) отсортированного ряда с линейной интерполяцией (как percentile_cont в PostgreSQL)."""
+    if not sorted_values:
+        return math.nan
+    position = (len(sorted_values) - 1) * q / 100
+    low = math.floor(position)
+    high = math.ceil(position)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+
+
+class VacancyAnalytics:
+    """Колоночное хранилище вакансий в памяти с отчётами, повторяющими DBManager.
+    Строки отчётов — словари vacancy_id, company, vacancy, salary_from, salary_to, salary_currency, url
+    (отсутствующая зарплата — None, как NULL в БД)."""
+
+    def __init__(self, columns: VacancyColumns, companies: Optional[Dict[int, str]] = None):
+        """
+        :param columns: вакансии в колоночном виде
+        :param companies: {company_id: название} — для названий компаний и компаний без вакансий
+        """
+        self.columns = columns
+        self.companies = dict(companies or {})
+        # Название компании по строкам — ещё одна колонка, чтобы отчёты не искали его в словаре на каждой строке.
+        self.company = [None if cid is None else self.companies.get(cid) for cid in columns.company_id]
+        # Средняя зарплата вакансии, как в SQL: (COALESCE(from, to) + COALESCE(to, from)) / 2; NaN — не указана.
+        self.salary = array("d", (self._mid(low, high) for low, high in zip(columns.salary_from, columns.salary_to)))
+        self.index = SearchIndex()  # термы названий → номера строк
+        self.index.add_many(enumerate(columns.name))
+        # Названия в нижнем регистре — колонка для поиска подстроки без перевода регистра на каждой строке.
+        self._folded_names = [None if name is None else name.casefold() for name in columns.name]
+        self._sorted_salaries: Dict[Optional[str], List[float]] = {}  # кэш отсортированных зарплат по валюте
+
+    @staticmethod
+    def _mid(low: float, high: float) -> float:
+        if math.isnan(low):
+            return high
+        if math.isnan(high):
+            return low
+        return (low + high) / 2
+
+    @classmethod
+    def from_records(cls, vacancies: Iterable[Dict], companies: Optional[Iterable[Dict]] = None) -> "VacancyAnalytics":
+        """Из списков словарей: вакансии — формат parse_vacancy, компании — формат HHApi.get_companies()."""
+        names = {int(c["id"]): c["name"] for c in companies or []}
+        return cls(VacancyColumns.from_records(vacancies), names)
+
+    @classmethod
+    def from_json(
+        cls,
+        vacancies_path: Union[str, Path] = "data/vacancies.json",
+        companies_path: Optional[Union[str, Path]] = "data/companies.json",
+    ) -> "VacancyAnalytics":
+        """Загружает выгрузку main.py (data/vacancies.json и, если есть, data/companies.json)."""
+        companies = load_from_json(companies_path) if companies_path and Path(companies_path).exists() else None
+        return cls.from_records(load_from_json(vacancies_path), companies)
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    # --- Фильтры: возвращают номера строк по возрастанию ---
+
+    def search(self, keyword: str) -> List[int]:
+        """Строки, в названии которых есть keyword как подстрока без учёта регистра — те же вакансии, что
+        отбирает ILIKE '%keyword%' в DBManager.get_vacancies_with_keyword (пустая строка — все с названием)."""
+        needle = keyword.casefold()
+        return [i for i, name in enumerate(self._folded_names) if name is not None and needle in name]
+
+    def find(self, query: str, mode: str = "and", limit: Optional[int] = None) -> List[int]:
+        """Строки по словам запроса через обратный индекс, от более релевантных к менее: термы те же, что
+        у DBManager.search_vacancies («питон разработчики» найдёт «Python-разработчик»).
+        :param mode: "and" — все термы запроса, "or" — хотя бы один"""
+        return [row for row, _ in self.index.search(query, mode=mode, limit=limit)]
+
+    def filter(
+        self,
+        keyword: Optional[str] = None,
+        currency: Optional[str] = None,
+        min_salary: Optional[float] = None,
+        max_salary: Optional[float] = None,
+        company_id: Optional[int] = None,
+    ) -> List[int]:
+        """Строки, удовлетворяющие всем заданным условиям; условия по зарплате отбрасывают строки без неё."""
+        rows: Iterable[int] = self.search(keyword) if keyword is not None else range(len(self))
+        if currency is not None:
+            currencies = self.columns.salary_currency
+            rows = [i for i in rows if currencies[i] == currency]
+        if company_id is not None:
+            company_ids = self.columns.company_id
+            rows = [i for i in rows if company_ids[i] == company_id]
+        salary = self.salary
+        if min_salary is not None:
+            rows = [i for i in rows if salary[i] >= min_salary]  # NaN не проходит ни одно сравнение.
+        if max_salary is not None:
+            rows = [i for i in rows if salary[i] <= max_salary]
+        return list(rows)
+
+    def rows(self, positions: Iterable[int]) -> List[Dict]:
+        """Строки в формате отчётов DBManager в порядке positions."""
+        c = self.columns
+        return [
+            {
+                "vacancy_id": c.vacancy_id[i],
+                "company": self.company[i],
+                "vacancy": c.name[i],
+                "salary_from": None if math.isnan(c.salary_from[i]) else c.salary_from[i],
+                "salary_to": None if math.isnan(c.salary_to[i]) else c.salary_to[i],
+                "salary_currency": c.salary_currency[i],
+                "url": c.url[i],
+            }
+            for i in positions
+        ]
+
+    def _by_id(self, positions: Iterable[int]) -> List[Dict]:
+        vacancy_ids = self.columns.vacancy_id
+        return self.rows(sorted(positions, key=lambda i: vacancy_ids[i]))
+
+    # --- Отчёты в духе DBManager ---
+
+    def get_all_vacancies(self) -> List[Dict]:
+        return self._by_id(range(len(self)))
+
+    def get_vacancies_with_keyword(self, keyword: str) -> List[Dict]:
+        return self._by_id(self.search(keyword))
+
+    def search_vacancies(self, query: str, mode: str = "and", limit: int = 100) -> List[Dict]:
+        """Поиск по словам с ранжированием, как DBManager.search_vacancies (см. find)."""
+        return self.rows(self.find(query, mode=mode, limit=limit))
+
+    def get_avg_salary(self) -> Optional[float]:
+        """Средняя зарплата по вакансиям с указанной зарплатой (без учёта валюты, как в DBManager)."""
+        values = [s for s in self.salary if not math.isnan(s)]
+        return sum(values) / len(values) if values else None
+
+    def get_vacancies_with_higher_salary(self) -> List[Dict]:
+        """Вакансии с зарплатой выше средней, по убыванию зарплаты."""
+        avg = self.get_avg_salary()
+        if avg is None:
+            return []
+        salary = self.salary
+        positions = [i for i in self.filter(min_salary=avg) if salary[i] > avg]
+        positions.sort(key=lambda i: (-salary[i], self.columns.vacancy_id[i]))
+        return self.rows(positions)
+
+    def get_companies_and_vacancies_count(self) -> List[Dict]:
+        """Компании с количеством вакансий (включая компании без вакансий из companies), по убыванию."""
+        counts: Dict[int, int] = dict.fromkeys(self.companies, 0)
+        for company_id in self.columns.company_id:
+            if company_id is not None:
+                counts[company_id] = counts.get(company_id, 0) + 1
+        ordered = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        return [
+            {"company_id": company_id, "name": self.companies.get(company_id), "vacancies_count": count}
+            for company_id, count in ordered
+        ]
+
+    def salary_percentiles(
+        self, percentiles: Sequence[float] = (10, 25, 50, 75, 90), currency: Optional[str] = None
+    ) -> Dict[Optional[str], Dict[float, float]]:
+        """Перцентили зарплаты по валютам: {валюта: {перцентиль: значение}}.
+        :param currency: посчитать только для одной валюты"""
+        if not self._sorted_salaries:
+            by_currency: Dict[Optional[str], List[float]] = {}
+            for value, code in zip(self.salary, self.columns.salary_currency):
+                if not math.isnan(value):
+                    by_currency.setdefault(code, []).append(value)
+            self._sorted_salaries = {code: sorted(values) for code, values in by_currency.items()}
+        codes = [currency] if currency is not None else list(self._sorted_salaries)
+        return {code: {q: percentile(self._sorted_salaries.get(code, []), q) for q in percentiles} for code in codes}
@@ -0,0 +1,138 @@
+# Асинхронный вариант DBManager на psycopg 3 (psycopg.AsyncConnection + psycopg_pool.AsyncConnectionPool).
+# Используется там, где запросы обслуживаются из asyncio-приложения: вызовы не блокируют цикл событий,
+# соединения берутся из собственного пула, а несколько запросов можно отправить одним конвейером (pipeline).
+# SQL-запросы общие с синхронным DBManager (константы SQL_* из src.db_manager).
+
+from types import TracebackType
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, Union, cast
+
+from psycopg.conninfo import make_conninfo
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+from src import db_manager
+from src.db_manager import DBConfig
+
+Statement = Tuple[str, Optional[Sequence[Any]]]  # (SQL, параметры)
+
+
+class AsyncDBManager:
+    """Асинхронный доступ к hh_schema с теми же методами, что и DBManager.
+    Пул открывается явно (await open()) или через async with:
+
+        async with AsyncDBManager(config) as db:
+            rows = await db.get_vacancies_with_keyword("python")
+    """
+
+    def __init__(self, db_config: DBConfig, min_size: int = 1, max_size: int = 10):
+        """
+        :param db_config: параметры подключения (тот же DBConfig, что и у DBManager)
+        :param min_size: сколько соединений пул держит открытыми постоянно
+        :param max_size: максимум одновременных соединений (= одновременно выполняемых запросов)
+        """
+        self._db_config = db_config
+        conninfo = make_conninfo(**db_config.connect_kwargs())
+        # open=False: пул открывается в open() уже внутри работающего цикла событий.
+        self._pool = AsyncConnectionPool(conninfo, min_size=min_size, max_size=max_size, open=False)
+
+    async def open(self) -> None:
+        """Открывает пул и дожидается создания min_size соединений."""
+        await self._pool.open(wait=True)
+
+    async def close(self) -> None:
+        """Закрывает пул и все его соединения."""
+        await self._pool.close()
+
+    async def __aenter__(self) -> "AsyncDBManager":
+        await self.open()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        await self.close()
+
+    async def _fetchall(self, sql: str, params: Optional[Sequence[Any]] = None) -> List[Dict]:
+        """Выполняет запрос на соединении из пула и возвращает строки как словари."""
+        async with self._pool.connection() as conn:
+            async with conn.cursor(row_factory=dict_row) as cur:
+                await cur.execute(sql, params)
+                return cast(List[Dict[str, Any]], await cur.fetchall())
+
+    async def run_pipeline(self, statements: Sequence[Statement]) -> List[List[Dict]]:
+        """Отправляет несколько запросов одним конвейером (pipeline mode libpq): все запросы уходят на сервер
+        без ожидания ответов, результаты читаются после — одно соединение и один сетевой цикл вместо N.
+        :param statements: список пар (SQL, параметры)
+        :return: строки каждого запроса в том же порядке"""
+        async with self._pool.connection() as conn:
+            async with conn.pipeline():
+                cursors = []
+                for sql, params in statements:
+                    cur = conn.cursor(row_factory=dict_row)
+                    await cur.execute(sql, params)
+                    cursors.append(cur)
+                results = [cast(List[Dict[str, Any]], await cur.fetchall()) for cur in cursors]
+            for cur in cursors:
+                await cur.close()
+            return results
+
+    async def create_tables(self) -> None:
+        """Создает таблицы companies и vacancies в схеме hh_schema."""
+        async with self._pool.connection() as conn:  # При выходе из блока пул сам фиксирует транзакцию.
+            await conn.execute(db_manager.SQL_CREATE_TABLES)
+
+    async def insert_companies(self, companies: List[Dict[str, Union[str, int]]]) -> None:
+        """Сохраняет список компаний в БД (executemany в psycopg 3 отправляет строки конвейером)."""
+        async with self._pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.executemany(db_manager.SQL_INSERT_COMPANY, [(c["id"], c["name"]) for c in companies])
+
+    async def insert_vacancies(self, vacancies: List[Dict]) -> None:
+        """Сохраняет список вакансий в БД; отсутствующие поля зарплаты уходят как NULL."""
+        rows = [
+            (
+                v["vacancy_id"],
+                v["company_id"],
+                v["name"],
+                v.get("salary_from"),
+                v.get("salary_to"),
+                v.get("salary_currency"),
+                v["url"],
+            )
+            for v in vacancies
+        ]
+        async with self._pool.connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.executemany(db_manager.SQL_INSERT_VACANCY, rows)
+
+    async def get_companies_and_vacancies_count(self) -> List[Dict]:
+        """Все компании с количеством вакансий, по убыванию количества."""
+        return await self._fetchall(db_manager.SQL_COMPANIES_AND_VACANCIES_COUNT)
+
+    async def get_all_vacancies(self) -> List[Dict]:
+        """Список всех вакансий с названием компании, зарплатой и ссылкой."""
+        return await self._fetchall(db_manager.SQL_ALL_VACANCIES)
+
+    async def get_avg_salary(self) -> Optional[float]:
+        """Средняя зарплата по вакансиям, где указана хотя бы одна граница."""
+        rows = await self._fetchall(db_manager.SQL_AVG_SALARY)
+        return rows[0]["avg_salary"] if rows else None
+
+    async def get_vacancies_with_higher_salary(self) -> List[Dict]:
+        """Вакансии с зарплатой выше средней."""
+        avg = await self.get_avg_salary()
+        if avg is None:
+            return []
+        return await self._fetchall(db_manager.SQL_VACANCIES_WITH_HIGHER_SALARY, (avg,))
+
+    async def get_vacancies_with_keyword(self, keyword: str) -> List[Dict]:
+        """Все вакансии, в названии которых есть keyword (регистронезависимо)."""
+        return await self._fetchall(db_manager.SQL_VACANCIES_WITH_KEYWORD, (f"%{keyword}%",))
+
+    async def get_vacancies_with_keywords(self, keywords: Sequence[str]) -> Dict[str, List[Dict]]:
+        """Поиск сразу по нескольким ключевым словам одним конвейером: {keyword: вакансии}."""
+        results = await self.run_pipeline([(db_manager.SQL_VACANCIES_WITH_KEYWORD, (f"%{kw}%",)) for kw in keywords])
+        return dict(zip(keywords, results))
@@ -0,0 +1,125 @@
+# Подписка на изменения вакансий: DBManager.sync_vacancies в той же транзакции, что и запись, публикует
+# через NOTIFY компактные события — id новых и изменённых вакансий по компаниям. Потребители слушают канал
+# на отдельном соединении (LISTEN) и дочитывают только эти строки (DBManager.get_vacancies_by_ids),
+# вместо того чтобы периодически перечитывать get_all_vacancies целиком.
+
+import select
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+import psycopg2
+from psycopg2 import sql
+
+from src import json_codec
+from src.db_manager import VACANCY_CHANGES_CHANNEL, DBManager
+
+
+@dataclass
+class VacancyChange:
+    """Событие канала изменений.
+    resync=True — подписчик переподключался и мог пропустить события: нужна полная перезагрузка."""
+
+    company_id: Optional[int]
+    inserted: List[int] = field(default_factory=list)
+    updated: List[int] = field(default_factory=list)
+    resync: bool = False
+
+    @classmethod
+    def from_payload(cls, payload: str) -> "VacancyChange":
+        data = json_codec.loads(payload)
+        return cls(data.get("company_id"), list(data.get("inserted", [])), list(data.get("updated", [])))
+
+
+def changed_ids(changes: Iterable[VacancyChange]) -> Set[int]:
+    """Id всех вакансий из событий (повторы в нескольких событиях схлопываются)."""
+    return {vacancy_id for change in changes for vacancy_id in (*change.inserted, *change.updated)}
+
+
+class VacancyChangeSubscriber:
+    """Подписчик на канал изменений вакансий.
+
+    subscriber = VacancyChangeSubscriber(db)
+    for changes in subscriber.listen():
+        if any(change.resync for change in changes):
+            reload_everything()
+        else:
+            update(subscriber.fetch(changes))  # только новые и изменённые строки
+    """
+
+    def __init__(
+        self,
+        db: DBManager,
+        channel: str = VACANCY_CHANGES_CHANNEL,
+        reconnect_delay: float = 5.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        :param db: менеджер БД: из него берутся параметры соединения и дочитываются изменённые строки
+        :param reconnect_delay: пауза перед повторным подключением после обрыва соединения
+        """
+        self.db = db
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self.sleep = sleep
+        self._conn: Optional[Any] = None
+
+    def connect(self) -> Any:
+        """Открывает отдельное соединение в режиме autocommit, подписывается на канал и возвращает соединение."""
+        self.close()
+        conn = self.db.listen_connection()
+        with conn.cursor() as cur:
+            cur.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+        self._conn = conn
+        return conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> "VacancyChangeSubscriber":
+        self.connect()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def poll(self, timeout: Optional[float] = None) -> List[VacancyChange]:
+        """Ждёт события не дольше timeout секунд (None — без ограничения) и возвращает все накопившиеся."""
+        conn = self._conn if self._conn is not None else self.connect()
+        if not conn.notifies:
+            ready, _, _ = select.select([conn], [], [], timeout)
+            if ready:
+                conn.poll()
+        changes = []
+        while conn.notifies:
+            notify = conn.notifies.pop(0)
+            try:
+                changes.append(VacancyChange.from_payload(notify.payload))
+            except (ValueError, AttributeError):
+                print(f"Пропущено некорректное уведомление канала {self.channel}: {notify.payload[:100]}")
+        return changes
+
+    def listen(self, timeout: float = 5.0) -> Iterator[List[VacancyChange]]:
+        """Бесконечно выдаёт пачки событий. После обрыва соединения переподключается и выдаёт
+        [VacancyChange(None, resync=True)]: события, отправленные без подписчика, не сохраняются."""
+        while True:
+            try:
+                changes = self.poll(timeout)
+            except psycopg2.OperationalError as e:
+                print(f"Соединение подписчика {self.channel} потеряно: {e}")
+                self.close()
+                self.sleep(self.reconnect_delay)
+                try:
+                    self.connect()
+                except psycopg2.OperationalError:
+                    continue
+                yield [VacancyChange(None, resync=True)]
+                continue
+            if changes:
+                yield changes
+
+    def fetch(self, changes: Iterable[VacancyChange]) -> List[Dict]:
+        """Текущие строки вакансий из событий одним запросом (в формате get_all_vacancies)."""
+        return self.db.get_vacancies_by_ids(changed_ids(changes))
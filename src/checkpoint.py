@@ -0,0 +1,128 @@
+# Контрольные точки сбора вакансий: прогресс main.py (список компаний, загруженные страницы вакансий,
+# компании, уже записанные в БД) пишется в журнал JSON Lines. Каждая запись дописывается в конец файла
+# и сбрасывается на диск (fsync), поэтому после падения или Ctrl+C теряется не больше одной страницы,
+# а запуск с --resume продолжает загрузку с места остановки, не тратя лимит запросов к API повторно.
+
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Union
+
+from src import json_codec
+
+
+class CrawlCheckpoint:
+    """Журнал прогресса сбора вакансий.
+
+    Записи журнала:
+    {"type": "start", "keyword": ..., "companies": [...], "open_vacancies": {employer_id: ...}} — начало сбора
+    (open_vacancies — число открытых вакансий компаний по get_companies, чтобы при продолжении крупные
+    работодатели снова загружались с разбиением выдачи, а не объединялись с мелкими);
+    {"type": "page", "employer_id": ..., "page": ..., "pages": ..., "vacancies": [...]} — загруженная страница;
+    {"type": "complete", "employer_id": ...} — загружен полный список вакансий компании (без ошибок запросов
+    и обрезки выдачи): отсутствующие в нём вакансии закрыты;
+    {"type": "synced", "employer_id": ...} — вакансии компании записаны в БД.
+    Оборванная последняя строка (падение во время записи) при чтении пропускается."""
+
+    def __init__(self, path: Union[str, Path] = "data/crawl_checkpoint.jsonl"):
+        self.path = Path(path)
+        self.keyword: Optional[str] = None
+        self.companies: List[Dict] = []
+        self.open_vacancies: Dict[int, int] = {}  # employer_id → открытых вакансий (HHApi.open_vacancies)
+        self.pages: Dict[int, Dict[int, List[Dict]]] = {}  # employer_id → {номер страницы: вакансии}
+        self.total_pages: Dict[int, int] = {}  # employer_id → число страниц по ответу API
+        self.complete: Set[int] = set()
+        self.synced: Set[int] = set()
+        if self.path.exists():
+            self._load()
+
+    def _load(self) -> None:
+        valid = 0  # Длина подтверждённой части журнала.
+        with open(self.path, "rb+") as f:
+            for line in f:
+                try:
+                    record = json_codec.loads(line)
+                except ValueError:
+                    # Недописанная строка: отрезаем её, чтобы новые записи не оказались после мусора.
+                    f.truncate(valid)
+                    break
+                self._apply(record)
+                valid += len(line)
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        kind = record.get("type")
+        if kind == "start":
+            self.keyword = record["keyword"]
+            self.companies = record["companies"]
+            # Ключи JSON — строки; в журналах старого формата поля нет (число вакансий неизвестно).
+            self.open_vacancies = {int(k): int(v) for k, v in record.get("open_vacancies", {}).items()}
+        elif kind == "page":
+            employer_id = int(record["employer_id"])
+            self.pages.setdefault(employer_id, {})[int(record["page"])] = record["vacancies"]
+            self.total_pages[employer_id] = int(record["pages"])
+        elif kind == "complete":
+            self.complete.add(int(record["employer_id"]))
+        elif kind == "synced":
+            self.synced.add(int(record["employer_id"]))
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(json_codec.dumps(record) + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._apply(record)
+
+    @property
+    def active(self) -> bool:
+        """Есть ли незавершённый сбор, который можно продолжить."""
+        return self.keyword is not None
+
+    def start(self, keyword: str, companies: List[Dict], open_vacancies: Optional[Dict[int, int]] = None) -> None:
+        """Начинает новый сбор: прежний журнал удаляется.
+        :param open_vacancies: {employer_id: открытых вакансий} — HHApi.open_vacancies после get_companies"""
+        self.clear()
+        counts = {str(k): v for k, v in (open_vacancies or {}).items()}
+        self._append({"type": "start", "keyword": keyword, "companies": companies, "open_vacancies": counts})
+
+    def record_page(self, employer_id: int, page: int, pages: int, vacancies: List[Dict]) -> None:
+        """Сохраняет загруженную страницу вакансий (подходит как on_page для HHApi.get_vacancies_for_company)."""
+        self._append(
+            {"type": "page", "employer_id": employer_id, "page": page, "pages": pages, "vacancies": vacancies}
+        )
+
+    def mark_complete(self, employer_id: int) -> None:
+        """Отмечает, что загружен полный список вакансий компании."""
+        self._append({"type": "complete", "employer_id": employer_id})
+
+    def mark_synced(self, employer_id: int) -> None:
+        """Отмечает, что вакансии компании записаны в БД и при продолжении повторно не нужны."""
+        self._append({"type": "synced", "employer_id": employer_id})
+
+    def next_page(self, employer_id: int) -> int:
+        """Страница, с которой продолжать загрузку вакансий компании."""
+        pages = self.pages.get(employer_id)
+        return max(pages) + 1 if pages else 0
+
+    def is_fetched(self, employer_id: int) -> bool:
+        """Все страницы вакансий компании загружены."""
+        return employer_id in self.total_pages and self.next_page(employer_id) >= self.total_pages[employer_id]
+
+    def is_complete(self, employer_id: int) -> bool:
+        """Загружен ли полный список вакансий компании (mark_complete)."""
+        return employer_id in self.complete
+
+    def vacancies(self, employer_id: int) -> List[Dict]:
+        """Сохранённые вакансии компании в порядке страниц."""
+        pages = self.pages.get(employer_id, {})
+        return [vacancy for page in sorted(pages) for vacancy in pages[page]]
+
+    def clear(self) -> None:
+        """Удаляет журнал (после успешного завершения сбора или перед новым)."""
+        self.path.unlink(missing_ok=True)
+        self.keyword = None
+        self.companies = []
+        self.open_vacancies = {}
+        self.pages = {}
+        self.total_pages = {}
+        self.complete = set()
+        self.synced = set()
@@ -0,0 +1,151 @@
+# Распределённый сбор вакансий: задачи лежат в таблице hh_schema.crawl_tasks той же БД, что использует
+# DBManager, и разбираются любым числом процессов на любом числе машин (python main.py --worker).
+# Задача выдаётся через FOR UPDATE SKIP LOCKED и арендуется на время обработки; если обработчик упал,
+# по истечении аренды задачу возьмёт другой. Ошибки повторяются с экспоненциальной задержкой,
+# а все обработчики делят один бюджет запросов к API (hh_schema.crawl_rate), чтобы не упереться в лимиты hh.ru.
+
+import os
+import socket
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:  # Модулю нужны только методы переданных объектов: psycopg2 и requests не импортируются.
+    from src.db_manager import DBManager
+    from src.hh_api import HHApi
+
+TASK_EMPLOYERS_PAGE = "employers_page"  # payload: {"text": ..., "page": ..., "max_pages": ...}
+TASK_EMPLOYER_VACANCIES = "employer_vacancies"  # payload: {"employer_id": ..., "open_vacancies": ...}
+RATE_BUCKET = "hh_api"
+
+
+class LeaseLost(Exception):
+    """Аренду задачи перехватил другой обработчик: результат текущего обработчика не нужен."""
+
+
+def employers_task(text: str, page: int = 0, max_pages: int = 20) -> Tuple[str, Dict]:
+    """Задача поиска работодателей по ключевому слову: со страницы 0 добавляются остальные страницы."""
+    return TASK_EMPLOYERS_PAGE, {"text": text, "page": page, "max_pages": max_pages}
+
+
+class CrawlWorker:
+    """Обработчик очереди задач сбора.
+
+    db = DBManager(config, max_connections=4)
+    db.enqueue_crawl_tasks([employers_task("python")])
+    CrawlWorker(db, HHApi(), rate_per_second=5).run()
+    """
+
+    def __init__(
+        self,
+        db: "DBManager",
+        api: "HHApi",
+        worker_id: Optional[str] = None,
+        lease_seconds: float = 300,
+        rate_per_second: Optional[float] = None,
+        retry_base_delay: float = 30,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        :param worker_id: имя обработчика в leased_by (по умолчанию host:pid)
+        :param lease_seconds: срок аренды задачи; продлевается после каждой загруженной страницы
+        :param rate_per_second: общий для всех обработчиков лимит запросов к API в секунду
+            (None — без общего лимита)
+        :param retry_base_delay: задержка перед первым повтором, дальше удваивается
+        """
+        self.db = db
+        self.api = api
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.retry_base_delay = retry_base_delay
+        self.sleep = sleep
+        self.handlers: Dict[str, Callable[[Dict, int], None]] = {
+            TASK_EMPLOYERS_PAGE: self._employers_page,
+            TASK_EMPLOYER_VACANCIES: self._employer_vacancies,
+        }
+        if rate_per_second is not None:
+            db.setup_rate_budget(RATE_BUCKET, rate_per_second)
+            api.rate_limiter = self._wait_for_budget
+
+    def _wait_for_budget(self, endpoint: str) -> None:
+        """Ждёт, пока в общем бюджете появится токен на один запрос."""
+        while True:
+            wait = self.db.take_rate_tokens(RATE_BUCKET)
+            if wait <= 0:
+                return
+            self.sleep(wait)
+
+    # --- Обработчики задач ---
+
+    def _employers_page(self, payload: Dict, task_id: int) -> None:
+        data = self.api.get_employers_page(payload["text"], payload["page"])
+        companies = [item for item in data.get("items", []) if item.get("open_vacancies", 0) > 0]
+        self.db.insert_companies([{"id": int(item["id"]), "name": item["name"]} for item in companies])
+        tasks: List[Tuple[str, Dict]] = [
+            (TASK_EMPLOYER_VACANCIES, {"employer_id": int(item["id"]), "open_vacancies": item["open_vacancies"]})
+            for item in companies
+        ]
+        if payload["page"] == 0:  # Первая страница знает число страниц — остальные ставятся в очередь.
+            last_page = min(data.get("pages", 1), payload.get("max_pages", 20))
+            tasks += [
+                employers_task(payload["text"], page, payload.get("max_pages", 20)) for page in range(1, last_page)
+            ]
+        self.db.enqueue_crawl_tasks(tasks)
+
+    def _employer_vacancies(self, payload: Dict, task_id: int) -> None:
+        employer_id = int(payload["employer_id"])
+        if payload.get("open_vacancies", 0) > self.api.MAX_SEARCH_DEPTH:
+            vacancies = self.api.get_vacancies_for_company_partitioned(
+                employer_id, on_page=lambda: self._extend_lease(task_id)
+            )
+            self.db.sync_vacancies(vacancies)
+            return
+        vacancies = self.api.get_vacancies_for_company(
+            employer_id,
+            on_page=lambda page, pages, items: self._extend_lease(task_id),
+            strict=True,
+        )
+        self.db.sync_vacancies(vacancies)
+        # strict: ошибка запроса — исключение, а не обрыв списка. Если выдача не обрезана на MAX_SEARCH_DEPTH,
+        # список полный и отсутствующие в нём вакансии закрыты. Разбиение по датам полноты не гарантирует.
+        if len(vacancies) < self.api.MAX_SEARCH_DEPTH:
+            self.db.mark_closed_vacancies(employer_id, [v["vacancy_id"] for v in vacancies])
+
+    def _extend_lease(self, task_id: int) -> None:
+        if not self.db.extend_crawl_lease(task_id, self.worker_id, self.lease_seconds):
+            raise LeaseLost(f"Аренда задачи {task_id} потеряна")
+
+    # --- Цикл обработки ---
+
+    def run_once(self) -> bool:
+        """Берёт и выполняет одну задачу. Возвращает False, если готовых задач нет."""
+        tasks = self.db.claim_crawl_tasks(self.worker_id, limit=1, lease_seconds=self.lease_seconds)
+        if not tasks:
+            return False
+        task = tasks[0]
+        try:
+            self.handlers[task["kind"]](task["payload"], task["task_id"])
+        except LeaseLost as e:
+            print(e)  # Задачу уже выполняет другой обработчик.
+        except Exception as e:
+            delay = self.retry_base_delay * 2 ** (task["attempts"] - 1)
+            status = self.db.fail_crawl_task(task["task_id"], self.worker_id, f"{type(e).__name__}: {e}", delay)
+            print(f"Задача {task['task_id']} ({task['kind']}) завершилась ошибкой: {e}; статус: {status}")
+        else:
+            self.db.complete_crawl_task(task["task_id"], self.worker_id)
+        return True
+
+    def run(self, max_tasks: Optional[int] = None, idle_sleep: float = 5.0, until_empty: bool = True) -> int:
+        """Обрабатывает задачи, пока они есть. Возвращает число выполненных задач.
+        :param max_tasks: остановиться после стольких задач
+        :param until_empty: остановиться, когда в очереди не осталось ожидающих и выполняемых задач
+            (задачи, отложенные до повтора, тоже дожидаются); иначе работать бесконечно"""
+        done = 0
+        while max_tasks is None or done < max_tasks:
+            if self.run_once():
+                done += 1
+                continue
+            stats = self.db.get_crawl_queue_stats()
+            if until_empty and not stats.get("pending") and not stats.get("running"):
+                break
+            self.sleep(idle_sleep)
+        return done
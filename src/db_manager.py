@@ -1,8 +1,478 @@
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Union, cast
+import functools
+import itertools
+import re
+import threading
+import time
+import weakref
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field, replace
+from datetime import date, timedelta
+from typing import (Any, Callable, Dict, Generator, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, TypeVar,
+                    Union, cast)
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
+import psycopg2.errors
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
+
+from src import json_codec, metrics
+from src.queries import (SQL_ALL_VACANCIES, SQL_AVG_SALARY, SQL_COMPANIES_AND_VACANCIES_COUNT, SQL_COUNT_VACANCIES,
+                         SQL_EXPORT_VACANCIES, SQL_RECORD_SALARY_SNAPSHOT, SQL_SALARY_TREND, SQL_VACANCIES_BY_COMPANY,
+                         SQL_VACANCIES_BY_IDS, SQL_VACANCIES_PAGE, SQL_VACANCIES_WITH_HIGHER_SALARY,
+                         SQL_VACANCIES_WITH_KEYWORD, SQL_VACANCY_CHANGES)
+from src.query_profiler import QueryProfiler
+from src.search_engine import analyze
+from src.storage import Storage, VacancyCursor
+from src.work_vacancies import HASH_FIELDS, VacancyColumns, diff_vacancy_fields, normalize_vacancy_fields, vacancy_hash
+
+# SQL-запросы DBManager вынесены в константы модуля, чтобы их без копирования использовали
+# и другие реализации хранилища (например, AsyncDBManager). Запросы чтения, общие с SQLiteManager, —
+# в src/queries.py (без зависимости от psycopg2).
+SQL_CREATE_TABLES = """
+    CREATE SCHEMA IF NOT EXISTS hh_schema;
+
+    CREATE TABLE IF NOT EXISTS hh_schema.companies (
+        company_id BIGINT PRIMARY KEY,
+        name VARCHAR(255) NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS hh_schema.vacancies (
+        vacancy_id BIGINT PRIMARY KEY,
+        company_id BIGINT REFERENCES hh_schema.companies(company_id),
+        name VARCHAR(255) NOT NULL,
+        salary_from NUMERIC,
+        salary_to NUMERIC,
+        salary_currency VARCHAR(10),
+        url TEXT
+    );
+    CREATE INDEX IF NOT EXISTS vacancies_company_id_idx ON hh_schema.vacancies (company_id);
+    ALTER TABLE hh_schema.vacancies ADD COLUMN IF NOT EXISTS content_hash BYTEA;
+
+    CREATE TABLE IF NOT EXISTS hh_schema.vacancy_changes (
+        change_id BIGSERIAL PRIMARY KEY,
+        vacancy_id BIGINT NOT NULL,
+        changed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        changes JSONB NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS vacancy_changes_vacancy_id_idx ON hh_schema.vacancy_changes (vacancy_id, changed_at);
+
+    CREATE TABLE IF NOT EXISTS hh_schema.salary_daily (
+        snapshot_date DATE NOT NULL,
+        company_id BIGINT NOT NULL,
+        salary_currency VARCHAR(10) NOT NULL,
+        vacancies_count INTEGER NOT NULL,
+        salary_count INTEGER NOT NULL,
+        avg_salary NUMERIC,
+        min_salary NUMERIC,
+        max_salary NUMERIC,
+        PRIMARY KEY (snapshot_date, company_id, salary_currency)
+    );
+    CREATE INDEX IF NOT EXISTS salary_daily_date_brin ON hh_schema.salary_daily USING BRIN (snapshot_date);
+
+    CREATE TABLE IF NOT EXISTS hh_schema.vacancy_terms (
+        term VARCHAR(255) NOT NULL,
+        vacancy_id BIGINT NOT NULL,
+        tf SMALLINT NOT NULL,
+        PRIMARY KEY (term, vacancy_id)
+    );
+    CREATE INDEX IF NOT EXISTS vacancy_terms_vacancy_id_idx ON hh_schema.vacancy_terms (vacancy_id);
+
+    CREATE TABLE IF NOT EXISTS hh_schema.crawl_tasks (
+        task_id BIGSERIAL PRIMARY KEY,
+        kind VARCHAR(32) NOT NULL,
+        payload JSONB NOT NULL,
+        status VARCHAR(16) NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL DEFAULT 5,
+        run_after TIMESTAMPTZ NOT NULL DEFAULT now(),
+        leased_by VARCHAR(255),
+        lease_until TIMESTAMPTZ,
+        last_error TEXT,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS crawl_tasks_active_uniq ON hh_schema.crawl_tasks (kind, payload)
+        WHERE status IN ('pending', 'running');
+    CREATE INDEX IF NOT EXISTS crawl_tasks_pending_idx ON hh_schema.crawl_tasks (run_after, task_id)
+        WHERE status = 'pending';
+    CREATE INDEX IF NOT EXISTS crawl_tasks_lease_idx ON hh_schema.crawl_tasks (lease_until)
+        WHERE status = 'running';
+
+    ALTER TABLE hh_schema.vacancies ADD COLUMN IF NOT EXISTS closed_at TIMESTAMPTZ;
+    CREATE INDEX IF NOT EXISTS vacancies_closed_at_idx ON hh_schema.vacancies (closed_at)
+        WHERE closed_at IS NOT NULL;
+    CREATE TABLE IF NOT EXISTS hh_schema.vacancies_archive (
+        batch_id BIGSERIAL PRIMARY KEY,
+        company_id BIGINT,
+        archived_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        closed_from TIMESTAMPTZ,
+        closed_to TIMESTAMPTZ,
+        vacancies_count INTEGER NOT NULL,
+        vacancies JSONB NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS vacancies_archive_company_id_idx ON hh_schema.vacancies_archive (company_id);
+
+    CREATE TABLE IF NOT EXISTS hh_schema.crawl_rate (
+        bucket VARCHAR(64) PRIMARY KEY,
+        tokens DOUBLE PRECISION NOT NULL,
+        rate DOUBLE PRECISION NOT NULL,
+        capacity DOUBLE PRECISION NOT NULL,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp()
+    );
+    """
+
+SQL_INSERT_COMPANY = """
+    INSERT INTO hh_schema.companies (company_id, name)
+    VALUES (%s, %s)
+    ON CONFLICT (company_id) DO NOTHING;
+    """
+
+SQL_INSERT_VACANCY = """
+    INSERT INTO hh_schema.vacancies
+    (vacancy_id, company_id, name, salary_from, salary_to, salary_currency, url)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (vacancy_id) DO NOTHING;
+    """
+
+SQL_INSERT_VACANCY_VALUES = """
+    INSERT INTO hh_schema.vacancies
+    (vacancy_id, company_id, name, salary_from, salary_to, salary_currency, url)
+    VALUES %s
+    ON CONFLICT (vacancy_id) DO NOTHING;
+    """
+
+# --- Синхронизация вакансий с проверкой хэша содержимого (sync_vacancies) ---
+SQL_VACANCY_HASHES = """
+    SELECT vacancy_id, content_hash FROM hh_schema.vacancies WHERE vacancy_id = ANY(%s);
+    """
+
+SQL_VACANCY_FIELDS = """
+    SELECT vacancy_id, company_id, name, salary_from, salary_to, salary_currency, url
+    FROM hh_schema.vacancies
+    WHERE vacancy_id = ANY(%s);
+    """
+
+SQL_INSERT_VACANCY_HASHED_VALUES = """
+    INSERT INTO hh_schema.vacancies
+    (vacancy_id, company_id, name, salary_from, salary_to, salary_currency, url, content_hash)
+    VALUES %s
+    ON CONFLICT (vacancy_id) DO NOTHING;
+    """
+
+# Явные приведения типов: в VALUES столбец, где во всех строках NULL, иначе получил бы тип text.
+SQL_UPDATE_VACANCY_VALUES = """
+    UPDATE hh_schema.vacancies AS v
+    SET company_id = n.company_id::bigint,
+        name = n.name,
+        salary_from = n.salary_from::numeric,
+        salary_to = n.salary_to::numeric,
+        salary_currency = n.salary_currency,
+        url = n.url,
+        content_hash = n.content_hash::bytea
+    FROM (VALUES %s) AS n (vacancy_id, company_id, name, salary_from, salary_to, salary_currency, url, content_hash)
+    WHERE v.vacancy_id = n.vacancy_id::bigint;
+    """
+
+SQL_INSERT_VACANCY_CHANGES = """
+    INSERT INTO hh_schema.vacancy_changes (vacancy_id, changes) VALUES %s;
+    """
+
+# --- Уведомления об изменениях вакансий (LISTEN/NOTIFY, src/change_feed.py) ---
+VACANCY_CHANGES_CHANNEL = "hh_vacancy_changes"
+# Полезная нагрузка NOTIFY ограничена 8000 байт: id одной компании режутся на события по NOTIFY_MAX_IDS.
+NOTIFY_MAX_IDS = 400
+
+# Все события пачки — одним запросом. NOTIFY транзакционен: подписчики получат события только после commit.
+SQL_NOTIFY_VACANCY_CHANGES = """
+    SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload;
+    """
+
+# --- Поиск по обратному индексу термов названий (src/search_engine.py, hh_schema.vacancy_terms) ---
+SQL_DELETE_VACANCY_TERMS = """
+    DELETE FROM hh_schema.vacancy_terms WHERE vacancy_id = ANY(%s);
+    """
+
+SQL_INSERT_VACANCY_TERMS = """
+    INSERT INTO hh_schema.vacancy_terms (term, vacancy_id, tf) VALUES %s
+    ON CONFLICT (term, vacancy_id) DO UPDATE SET tf = EXCLUDED.tf;
+    """
+
+SQL_VACANCY_NAMES = """
+    SELECT vacancy_id, name FROM hh_schema.vacancies;
+    """
+
+# Ранжирование как в SearchIndex: сумма tf · ln(1 + N / df) по найденным термам.
+# HAVING COUNT(*) >= %s: для AND — все термы запроса, для OR — хотя бы один.
+SQL_SEARCH_VACANCIES = """
+    WITH q AS (
+        SELECT term, COUNT(*) AS df FROM hh_schema.vacancy_terms WHERE term = ANY(%s) GROUP BY term
+    ),
+    n AS (
+        SELECT COUNT(*) AS total FROM hh_schema.vacancies
+    ),
+    hits AS (
+        SELECT t.vacancy_id, SUM(t.tf * LN(1 + n.total::numeric / q.df)) AS score
+        FROM hh_schema.vacancy_terms t
+        JOIN q ON q.term = t.term
+        CROSS JOIN n
+        GROUP BY t.vacancy_id
+        HAVING COUNT(*) >= %s
+    )
+    SELECT v.vacancy_id, c.name AS company, v.name AS vacancy,
+           v.salary_from, v.salary_to, v.salary_currency, v.url, hits.score
+    FROM hits
+    JOIN hh_schema.vacancies v ON v.vacancy_id = hits.vacancy_id
+    JOIN hh_schema.companies c ON v.company_id = c.company_id
+    ORDER BY hits.score DESC, v.vacancy_id
+    LIMIT %s;
+    """
+
+# --- Временные ряды зарплат: дневные агрегаты по компании и валюте (hh_schema.salary_daily) ---
+# Запись снимка и динамика средней зарплаты — общие запросы src/queries.py.
+# Сравнение последнего снимка с последним снимком не позже чем за period дней до него.
+SQL_SALARY_DELTAS = """
+    WITH last AS (
+        SELECT MAX(snapshot_date) AS day FROM hh_schema.salary_daily
+    ),
+    prev AS (
+        SELECT MAX(snapshot_date) AS day FROM hh_schema.salary_daily, last
+        WHERE snapshot_date <= last.day - %s::int
+    )
+    SELECT cur.company_id, c.name, cur.snapshot_date, old.snapshot_date AS prev_date,
+           cur.avg_salary, old.avg_salary AS prev_avg_salary,
+           cur.avg_salary - old.avg_salary AS delta,
+           ROUND(100 * (cur.avg_salary - old.avg_salary) / NULLIF(old.avg_salary, 0), 2) AS delta_pct,
+           cur.vacancies_count - COALESCE(old.vacancies_count, 0) AS vacancies_delta
+    FROM hh_schema.salary_daily cur
+    JOIN last ON cur.snapshot_date = last.day
+    JOIN hh_schema.companies c ON c.company_id = cur.company_id
+    LEFT JOIN hh_schema.salary_daily old
+        ON old.company_id = cur.company_id
+       AND old.salary_currency = cur.salary_currency
+       AND old.snapshot_date = (SELECT day FROM prev)
+    WHERE cur.salary_currency = %s
+    ORDER BY delta DESC NULLS LAST, cur.company_id;
+    """
+
+# --- Архив закрытых вакансий (hh_schema.vacancies_archive) ---
+# Вакансия закрыта, если полный сбор её работодателя её больше не вернул: closed_at — когда это обнаружено.
+# Вернувшаяся в выдачу вакансия снова открывается (closed_at = NULL). Параметры: id открытых вакансий,
+# company_id, снова id открытых вакансий. Меняются только строки, у которых состояние действительно изменилось.
+SQL_MARK_CLOSED_VACANCIES = """
+    UPDATE hh_schema.vacancies
+    SET closed_at = CASE WHEN vacancy_id = ANY(%s::bigint[]) THEN NULL ELSE now() END
+    WHERE company_id = %s AND (closed_at IS NULL) <> (vacancy_id = ANY(%s::bigint[]))
+    RETURNING closed_at IS NOT NULL AS closed;
+    """
+
+# Перенос пачки вакансий, закрытых больше %s дней назад, одним оператором: строки удаляются из горячей таблицы
+# (вместе с термами поиска) и записываются в архив — по строке на компанию, вакансии пачки в одном JSONB.
+# Большие значения JSONB PostgreSQL сжимает (TOAST), поэтому архив занимает в разы меньше места, чем строки
+# vacancies с индексами, и не попадает в shared_buffers при запросах к открытым вакансиям.
+# SKIP LOCKED: пачку не задерживают строки, которые в этот момент обновляет сбор.
+SQL_ARCHIVE_CLOSED_VACANCIES = """
+    WITH moved AS (
+        DELETE FROM hh_schema.vacancies
+        WHERE vacancy_id IN (
+            SELECT vacancy_id FROM hh_schema.vacancies
+            WHERE closed_at < now() - make_interval(days => %s)
+            ORDER BY vacancy_id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING vacancy_id, company_id, name, salary_from, salary_to, salary_currency, url, closed_at
+    ),
+    terms AS (
+        DELETE FROM hh_schema.vacancy_terms t USING moved m WHERE t.vacancy_id = m.vacancy_id
+    ),
+    archived AS (
+        INSERT INTO hh_schema.vacancies_archive (company_id, closed_from, closed_to, vacancies_count, vacancies)
+        SELECT company_id, MIN(closed_at), MAX(closed_at), COUNT(*),
+               jsonb_agg(jsonb_build_object(
+                   'vacancy_id', vacancy_id, 'name', name, 'salary_from', salary_from, 'salary_to', salary_to,
+                   'salary_currency', salary_currency, 'url', url, 'closed_at', closed_at
+               ) ORDER BY vacancy_id)
+        FROM moved
+        GROUP BY company_id
+        RETURNING vacancies_count
+    )
+    SELECT COALESCE(SUM(vacancies_count), 0) FROM archived;
+    """
+
+SQL_ARCHIVE_STATS = """
+    SELECT (SELECT COUNT(*) FROM hh_schema.vacancies) AS hot,
+           (SELECT COUNT(*) FROM hh_schema.vacancies WHERE closed_at IS NOT NULL) AS closed,
+           (SELECT COALESCE(SUM(vacancies_count), 0) FROM hh_schema.vacancies_archive) AS archived,
+           pg_total_relation_size('hh_schema.vacancies') AS hot_bytes,
+           pg_total_relation_size('hh_schema.vacancies_archive') AS archive_bytes;
+    """
+
+# Списки вакансий вместе с архивом (include_archive=True): строки архива разворачиваются из JSONB.
+# Вакансия, которая после архивации снова открылась, берётся из горячей таблицы; из нескольких архивных
+# копий одной вакансии — последняя.
+_SQL_VACANCIES_WITH_ARCHIVE = """
+    SELECT v.vacancy_id, c.name AS company, v.name AS vacancy,
+           v.salary_from, v.salary_to, v.salary_currency, v.url
+    FROM hh_schema.vacancies v
+    JOIN hh_schema.companies c ON v.company_id = c.company_id
+    {hot_filter}
+    UNION ALL
+    SELECT * FROM (
+        SELECT DISTINCT ON (r.vacancy_id) r.vacancy_id, c.name, r.name,
+               r.salary_from, r.salary_to, r.salary_currency, r.url
+        FROM hh_schema.vacancies_archive a
+        CROSS JOIN LATERAL jsonb_to_recordset(a.vacancies) AS r(
+            vacancy_id BIGINT, name TEXT, salary_from NUMERIC, salary_to NUMERIC, salary_currency TEXT, url TEXT
+        )
+        JOIN hh_schema.companies c ON a.company_id = c.company_id
+        WHERE NOT EXISTS (SELECT 1 FROM hh_schema.vacancies v WHERE v.vacancy_id = r.vacancy_id)
+        {archive_filter}
+        ORDER BY r.vacancy_id, a.batch_id DESC
+    ) archived
+    ORDER BY vacancy_id;
+    """
+SQL_ALL_VACANCIES_WITH_ARCHIVE = _SQL_VACANCIES_WITH_ARCHIVE.format(hot_filter="", archive_filter="")
+SQL_VACANCIES_WITH_KEYWORD_WITH_ARCHIVE = _SQL_VACANCIES_WITH_ARCHIVE.format(
+    hot_filter="WHERE v.name ILIKE %s", archive_filter="AND r.name ILIKE %s"
+)
+
+# --- Очередь задач сбора для нескольких процессов (src/crawl_worker.py) ---
+# Задача: kind + payload (JSONB). Активная (pending/running) задача с тем же kind и payload не дублируется.
+SQL_ENQUEUE_CRAWL_TASKS = """
+    INSERT INTO hh_schema.crawl_tasks (kind, payload, max_attempts) VALUES %s
+    ON CONFLICT (kind, payload) WHERE status IN ('pending', 'running') DO NOTHING;
+    """
+
+# Задачи, аренда которых истекла после последней попытки, больше не выдаются.
+SQL_FAIL_EXPIRED_CRAWL_TASKS = """
+    UPDATE hh_schema.crawl_tasks
+    SET status = 'failed', last_error = 'lease expired', leased_by = NULL, lease_until = NULL, updated_at = now()
+    WHERE status = 'running' AND lease_until < now() AND attempts >= max_attempts;
+    """
+
+# Выдача задач: готовые к запуску и задачи с истёкшей арендой (упавший обработчик). SKIP LOCKED —
+# параллельные обработчики не ждут друг друга и не получают одну и ту же задачу.
+SQL_CLAIM_CRAWL_TASKS = """
+    WITH ready AS (
+        SELECT task_id FROM hh_schema.crawl_tasks
+        WHERE (status = 'pending' AND run_after <= now())
+           OR (status = 'running' AND lease_until < now() AND attempts < max_attempts)
+        ORDER BY run_after, task_id
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE hh_schema.crawl_tasks t
+    SET status = 'running', attempts = t.attempts + 1, leased_by = %s,
+        lease_until = now() + make_interval(secs => %s), updated_at = now()
+    FROM ready
+    WHERE t.task_id = ready.task_id
+    RETURNING t.task_id, t.kind, t.payload, t.attempts, t.max_attempts;
+    """
+
+# Все изменения задачи проверяют leased_by: обработчик, у которого аренду перехватили, ничего не испортит.
+SQL_EXTEND_CRAWL_LEASE = """
+    UPDATE hh_schema.crawl_tasks SET lease_until = now() + make_interval(secs => %s), updated_at = now()
+    WHERE task_id = %s AND leased_by = %s AND status = 'running';
+    """
+
+SQL_COMPLETE_CRAWL_TASK = """
+    UPDATE hh_schema.crawl_tasks
+    SET status = 'done', last_error = NULL, leased_by = NULL, lease_until = NULL, updated_at = now()
+    WHERE task_id = %s AND leased_by = %s AND status = 'running';
+    """
+
+SQL_FAIL_CRAWL_TASK = """
+    UPDATE hh_schema.crawl_tasks
+    SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END,
+        run_after = now() + make_interval(secs => %s), last_error = %s,
+        leased_by = NULL, lease_until = NULL, updated_at = now()
+    WHERE task_id = %s AND leased_by = %s AND status = 'running'
+    RETURNING status;
+    """
+
+SQL_CRAWL_QUEUE_STATS = """
+    SELECT status, COUNT(*) AS tasks FROM hh_schema.crawl_tasks GROUP BY status;
+    """
+
+# Общий для всех обработчиков бюджет запросов к API — «ведро токенов» в одной строке таблицы.
+SQL_SETUP_RATE_BUCKET = """
+    INSERT INTO hh_schema.crawl_rate (bucket, tokens, rate, capacity) VALUES (%s, %s, %s, %s)
+    ON CONFLICT (bucket) DO UPDATE SET rate = EXCLUDED.rate, capacity = EXCLUDED.capacity;
+    """
+
+# Пополнение по прошедшему времени и списание одним UPDATE (строка блокируется на время оператора).
+# Если токенов не хватает, строка не меняется, а запрос возвращает, сколько секунд ждать.
+SQL_TAKE_RATE_TOKENS = """
+    WITH level AS (
+        SELECT bucket, rate, LEAST(capacity, tokens + EXTRACT(EPOCH FROM clock_timestamp() - updated_at) * rate)
+               AS tokens
+        FROM hh_schema.crawl_rate WHERE bucket = %s FOR UPDATE
+    ),
+    taken AS (
+        UPDATE hh_schema.crawl_rate r SET tokens = level.tokens - %s, updated_at = clock_timestamp()
+        FROM level WHERE r.bucket = level.bucket AND level.tokens >= %s
+        RETURNING r.bucket
+    )
+    SELECT CASE WHEN EXISTS (SELECT 1 FROM taken) THEN 0.0 ELSE (%s - level.tokens) / level.rate END AS wait
+    FROM level;
+    """
+
+
+# Отставание реплики от основного сервера в секундах. Реплика, которая применила весь полученный WAL, не отстаёт,
+# даже если на основном сервере давно не было записей (время последней применённой транзакции тогда старое).
+# Сервер не в режиме восстановления (основной или логическая реплика) — 0.
+SQL_REPLICA_LAG = """
+    SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END;
+    """
+
+
+# Отчёты, которые DBManager.get_reports получает за одно обращение к серверу: имя → SQL отчёта.
+# Скалярные отчёты возвращают одно значение, остальные — список строк (собирается на сервере через json_agg).
+# Средняя зарплата для vacancies_with_higher_salary считается подзапросом в том же SQL.
+_SCALAR_REPORTS = {"avg_salary", "count_vacancies"}
+REPORTS = {
+    "avg_salary": SQL_AVG_SALARY,
+    "count_vacancies": SQL_COUNT_VACANCIES,
+    "companies_and_vacancies_count": SQL_COMPANIES_AND_VACANCIES_COUNT,
+    "vacancies_with_higher_salary": SQL_VACANCIES_WITH_HIGHER_SALARY % ("(" + SQL_AVG_SALARY.strip(" \n;") + ")",),
+    "vacancies_with_keyword": SQL_VACANCIES_WITH_KEYWORD,  # единственный отчёт с параметром (keyword)
+}
+
+
+def _to_positional(sql: str) -> str:
+    """Переводит плейсхолдеры psycopg2 (%s) в нумерованные параметры PREPARE ($1, $2, ...)."""
+    counter = iter(range(1, sql.count("%s") + 1))
+    return re.sub(r"%s", lambda _: f"${next(counter)}", sql).strip(" \n;")
+
+
+# Ошибки, после которых соединение с репликой непригодно (сервер недоступен или оборвал соединение).
+_CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+_Read = TypeVar("_Read", bound=Callable[..., Any])
+
+
+def _primary_fallback(method: _Read) -> _Read:
+    """Декоратор метода чтения DBManager: если реплика отказала посреди запроса, чтение один раз повторяется
+    на основном сервере. Повтор безопасен — метод только читает. Ошибки основного сервера не повторяются."""
+
+    @functools.wraps(method)
+    def wrapper(self: "DBManager", *args: Any, **kwargs: Any) -> Any:
+        if getattr(self._local, "primary_only", False):  # Уже повтор (или вложенный вызов внутри повтора).
+            return method(self, *args, **kwargs)
+        self._local.replica_failed = False
+        try:
+            return method(self, *args, **kwargs)
+        except _CONNECTION_ERRORS:
+            if not self._local.replica_failed:
+                raise
+        self._local.primary_only = True
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._local.primary_only = False
+
+    return cast(_Read, wrapper)
 
 
 @dataclass  # Декоратор, который автоматически генерирует для класса:
@@ -17,28 +487,322 @@ class DBConfig:
     password: str  # password: str → пароль пользователя.
     host: str  # host: str → адрес сервера БД (например "localhost" или "127.0.0.1").
     port: int  # порт PostgreSQL (обычно 5432).
+    # Сколько секунд ждать установки соединения (None — значение libpq по умолчанию, без ограничения):
+    # короткий таймаут позволяет сразу сообщить о недоступном сервере, а не зависать на подключении.
+    connect_timeout: Optional[int] = None
+    # Реплики чтения (host, port) с той же базой и учётными данными. На них DBManager отправляет отчёты,
+    # а запись и остальные запросы — на основной сервер (host, port).
+    replicas: List[Tuple[str, int]] = field(default_factory=list)
+    # Реплика, отставшая от основного сервера больше чем на столько секунд, запросов не получает.
+    max_replica_lag: float = 30.0
+
+    def replica_configs(self) -> List["DBConfig"]:
+        """Конфигурации подключения к репликам."""
+        return [replace(self, host=host, port=port, replicas=[]) for host, port in self.replicas]
+
+    def connect_kwargs(self) -> Dict[str, Any]:
+        """Параметры psycopg2.connect / пула соединений."""
+        kwargs: Dict[str, Any] = {
+            "dbname": self.name,
+            "user": self.user,
+            "password": self.password,
+            "host": self.host,
+            "port": self.port,
+        }
+        if self.connect_timeout is not None:
+            kwargs["connect_timeout"] = self.connect_timeout
+        return kwargs
+
+
+def parse_replicas(value: Optional[str], default_port: int = 5432) -> List[Tuple[str, int]]:
+    """Реплики из строки вида "replica1:5432,replica2" (переменная окружения DB_REPLICAS)."""
+    replicas = []
+    for item in (value or "").split(","):
+        host, _, port = item.strip().partition(":")
+        if host:
+            replicas.append((host, int(port) if port else default_port))
+    return replicas
+
+
+class _Server:
+    """Сервер БД, к которому DBManager открывает соединения: основной или реплика чтения. Для реплики
+    хранится и состояние маршрутизации: отставание по последней проверке и до какого момента она недоступна."""
+
+    def __init__(self, config: DBConfig):
+        self.config = config
+        self.pool: Optional[ThreadedConnectionPool] = None  # Пул создаётся лениво при первом запросе.
+        self.lag: Optional[float] = None  # секунды
+        self.checked_at = float("-inf")  # time.monotonic() последней проверки отставания
+        self.down_until = 0.0  # time.monotonic(), до которого реплика не получает запросов
+
+    @property
+    def address(self) -> str:
+        return f"{self.config.host}:{self.config.port}"
+
+
+class _ScrollVacancyCursor(VacancyCursor):
+    """Список вакансий DBManager на прокручиваемом серверном курсоре (DECLARE ... SCROLL CURSOR): страница —
+    MOVE ABSOLUTE к её началу и FETCH её строк, поэтому с сервера приходят только показанные строки, а переход
+    назад или на любую страницу не выполняет запрос заново. Число строк — MOVE ALL: сервер проходит результат,
+    не передавая строки клиенту. Соединение (и транзакция) заняты, пока курсор не закрыт."""
+
+    NAME = "vacancy_listing"
+
+    def __init__(self, manager: "DBManager", query: str, sql: str, params: Sequence[Any]):
+        super().__init__()
+        self._manager = manager
+        self._query = query
+        self._count: Optional[int] = None
+        self._stack = ExitStack()
+        try:
+            self._conn = self._stack.enter_context(manager._connection(replica=True))
+            self._cur = self._stack.enter_context(
+                self._conn.cursor(name=self.NAME, cursor_factory=RealDictCursor, scrollable=True)
+            )
+            manager._execute(self._cur, query, sql, params)
+        except BaseException:
+            self._stack.close()
+            raise
+
+    def fetch(self, offset: int, limit: int) -> List[Dict]:
+        self._cur.scroll(offset, mode="absolute")
+        return cast(List[Dict[str, Any]], self._cur.fetchmany(limit))
+
+    def iter_batches(self, batch_size: int = 1000) -> Iterator[List[Dict]]:
+        self._cur.scroll(0, mode="absolute")
+        while True:
+            rows = self._cur.fetchmany(batch_size)  # Пачки идут подряд: FETCH без MOVE перед каждой.
+            if not rows:
+                return
+            yield cast(List[Dict[str, Any]], rows)
+
+    def count(self) -> int:
+        if self._count is None:
+            self._cur.scroll(0, mode="absolute")
+            with self._conn.cursor() as cur:
+                self._manager._execute(cur, f"{self._query}_count", f"MOVE ALL IN {self.NAME};")
+                self._count = int(cur.rowcount)
+        return self._count
+
+    def close(self) -> None:
+        self._stack.close()
 
 
-class DBManager:
+class DBManager(Storage):
     """Класс для работы с базой данных PostgreSQL для хранения и чтения информации о компаниях и вакансиях с HH.ru."""
 
+    REPLICA_CHECK_INTERVAL = 5.0  # как часто (с) проверять отставание реплики
+    REPLICA_RETRY_DELAY = 30.0  # сколько секунд не обращаться к реплике после ошибки соединения
+
     # Прослойка» между Python-кодом и PostgreSQL. Он получает конфигурацию (DBConfig) и создаёт подключения к базе.
 
-    def __init__(self, db_config: DBConfig):  # Конструктор принимает объект DBConfig
+    def __init__(
+        self,
+        db_config: DBConfig,
+        profiler: Optional[QueryProfiler] = None,
+        max_connections: int = 0,
+        prepare: bool = True,
+    ):
+        # Конструктор принимает объект DBConfig и, по желанию, QueryProfiler для режима профилирования.
+        # max_connections > 0 включает пул соединений (для многопоточных сервисов, например query_service);
+        # при 0 каждый метод открывает собственное соединение, как раньше.
+        # prepare: частые запросы чтения выполняются как подготовленные (PREPARE/EXECUTE) на соединениях пула.
         self._db_config = (
             db_config  # Эти параметры сохраняются в _db_config, чтобы потом использовать при подключении.
         )
+        self.profiler = profiler  # None — профилирование выключено, запросы только пишут метрики.
+        self._max_connections = max_connections
+        self._primary = _Server(db_config)
+        # Реплики чтения (DBConfig.replicas) перебираются по кругу, начиная со следующей после предыдущего чтения.
+        self._replicas = [_Server(config) for config in db_config.replica_configs()]
+        self._replica_turn = itertools.count()
+        self._local = threading.local()  # Состояние повтора чтения на основном сервере (см. _primary_fallback).
+        self._pool_lock = threading.Lock()
+        # Подготовленные запросы живут в сессии PostgreSQL, поэтому их имена хранятся по соединению.
+        # Без пула соединение закрывается после каждого метода и подготовка только добавила бы обращение к серверу.
+        self._prepare = prepare and max_connections > 0
+        self._prepared: "weakref.WeakKeyDictionary[Any, Set[str]]" = weakref.WeakKeyDictionary()
 
     def _get_conn(self) -> psycopg2.extensions.connection:
         """Вспомогательный метод «для внутреннего использования». Возвращает подключение к базе данных."""
-        return psycopg2.connect(  # Здесь используются все параметры из DBConfig.
-            dbname=self._db_config.name,
-            user=self._db_config.user,
-            password=self._db_config.password,
-            host=self._db_config.host,
-            port=self._db_config.port,
-        )  # И возвращает объект подключения connection,
+        # Здесь используются все параметры из DBConfig. Возвращается объект подключения connection,
         # через который можно создавать курсоры и выполнять SQL-запросы.
+        return cast(psycopg2.extensions.connection, psycopg2.connect(**self._db_config.connect_kwargs()))
+
+    @contextmanager
+    def _connection(self, replica: bool = False) -> Iterator[psycopg2.extensions.connection]:
+        """Соединение на время одного метода: из пула (если задан max_connections) или новое.
+        По выходу из блока транзакция фиксируется (или откатывается при ошибке), соединение
+        возвращается в пул либо закрывается.
+        replica=True — метод только читает: соединение с репликой (см. _replica_connection), а если
+        подходящей реплики нет — с основным сервером (и всегда с ним при повторе из _primary_fallback)."""
+        server, raw = self._primary, None
+        if replica and self._replicas and not getattr(self._local, "primary_only", False):
+            server, raw = self._replica_connection()
+            metrics.DB_READ_ROUTES.inc(server=server.address, role="primary" if raw is None else "replica")
+        if raw is None:
+            raw = self._open(server)
+        try:
+            with raw as conn:  # commit при успехе, rollback при исключении.
+                yield conn
+        except _CONNECTION_ERRORS:
+            if server is not self._primary:  # Реплика оборвала соединение: следующие чтения — на других серверах.
+                server.down_until = time.monotonic() + self.REPLICA_RETRY_DELAY
+                self._local.replica_failed = True
+            raise
+        finally:
+            self._release(server, raw)
+
+    def _open(self, server: _Server) -> psycopg2.extensions.connection:
+        """Соединение с сервером: из его пула (если задан max_connections) или новое."""
+        if self._max_connections <= 0:
+            return cast(psycopg2.extensions.connection, psycopg2.connect(**server.config.connect_kwargs()))
+        if server.pool is None:
+            with self._pool_lock:  # Пул создаётся один раз, даже если первые запросы пришли из разных потоков.
+                if server.pool is None:
+                    server.pool = ThreadedConnectionPool(
+                        1,
+                        self._max_connections,
+                        **server.config.connect_kwargs(),
+                    )
+        return server.pool.getconn()
+
+    @staticmethod
+    def _release(server: _Server, raw: psycopg2.extensions.connection) -> None:
+        if server.pool is None:
+            raw.close()  # Контекст соединения psycopg2 только завершает транзакцию, но не закрывает его.
+        else:
+            # Оборванное соединение пул закрывает, остальные возвращаются для переиспользования.
+            server.pool.putconn(raw, close=bool(raw.closed))
+
+    def _lag_ok(self, server: _Server) -> bool:
+        return server.lag is None or server.lag <= self._db_config.max_replica_lag
+
+    def _replica_connection(self) -> Tuple[_Server, Optional[psycopg2.extensions.connection]]:
+        """Соединение с репликой для чтения. Реплики перебираются по кругу (нагрузка делится между ними поровну),
+        недоступные и отстающие больше max_replica_lag секунд пропускаются. Отставание измеряется на полученном
+        соединении не чаще раза в REPLICA_CHECK_INTERVAL секунд — это же и проверка, что реплика отвечает.
+        Если подходящей реплики нет, возвращает (основной сервер, None)."""
+        start = next(self._replica_turn)
+        for offset in range(len(self._replicas)):
+            server = self._replicas[(start + offset) % len(self._replicas)]
+            now = time.monotonic()
+            if server.down_until > now:
+                continue
+            checked = now - server.checked_at < self.REPLICA_CHECK_INTERVAL
+            if checked and not self._lag_ok(server):
+                continue
+            raw = None
+            try:
+                raw = self._open(server)
+                if not checked:
+                    server.lag = self._measure_lag(raw)
+                    server.checked_at = now
+            except psycopg2.OperationalError:
+                server.down_until = now + self.REPLICA_RETRY_DELAY
+                if raw is not None:
+                    self._release(server, raw)
+                continue
+            if self._lag_ok(server):
+                return server, raw
+            self._release(server, raw)
+        return self._primary, None
+
+    @staticmethod
+    def _measure_lag(raw: psycopg2.extensions.connection) -> float:
+        with raw.cursor() as cur:
+            cur.execute(SQL_REPLICA_LAG)
+            row = cur.fetchone()
+        raw.rollback()  # Проверка не оставляет открытой транзакции.
+        return float(row[0]) if row and row[0] is not None else 0.0
+
+    def ping(self) -> None:
+        """Проверяет доступность сервера запросом SELECT 1 (исключение psycopg2 при недоступности)."""
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+
+    def listen_connection(self) -> psycopg2.extensions.connection:
+        """Отдельное соединение с основным сервером для LISTEN (см. change_feed): в режиме autocommit,
+        потому что уведомления доставляются только вне открытой транзакции, и не из пула — оно держится
+        всё время подписки. Закрывает соединение вызывающий код."""
+        conn = self._get_conn()
+        conn.autocommit = True
+        return conn
+
+    def close(self) -> None:
+        """Закрывает пулы соединений с основным сервером и репликами (если они создавались)."""
+        for server in [self._primary, *self._replicas]:
+            if server.pool is not None:
+                server.pool.closeall()
+                server.pool = None
+
+    def _prepared_sql(self, cur: Any, query: str, sql: str, params: Optional[Sequence[Any]]) -> str:
+        """Готовит sql на соединении курсора (один раз на соединение) и возвращает вызов EXECUTE для него.
+        Сервер разбирает и планирует запрос при PREPARE, повторные вызовы передают только параметры."""
+        conn = cur.connection
+        prepared = self._prepared.setdefault(conn, set())
+        name = "hh_" + query
+        if name not in prepared:
+            with conn.cursor() as prepare_cur:
+                prepare_cur.execute(f"PREPARE {name} AS {_to_positional(sql)}")
+            prepared.add(name)
+        if not params:
+            return f"EXECUTE {name}"
+        return f"EXECUTE {name} (" + ", ".join(["%s"] * len(params)) + ")"
+
+    def _execute(
+        self, cur: Any, query: str, sql: str, params: Optional[Sequence[Any]] = None, prepared: bool = False
+    ) -> None:
+        """Выполняет SQL через курсор cur и записывает метрики запроса query: длительность,
+        число строк (cursor.rowcount) и статус (ok/error). В режиме профилирования запрос
+        дополнительно передаётся в QueryProfiler.
+        prepared=True — выполнить как подготовленный запрос (если включено prepare и есть пул)."""
+        start = time.perf_counter()
+        prepared = prepared and self._prepare
+        try:
+            try:
+                cur.execute(self._prepared_sql(cur, query, sql, params) if prepared else sql, params)
+            except psycopg2.errors.InvalidSqlStatementName:
+                if not prepared:
+                    raise
+                # Сессия потеряла подготовленные запросы (например, DISCARD ALL у пулера): имена забываются,
+                # а запрос готовится и выполняется ещё раз. Подготавливаются только запросы чтения, первые
+                # в транзакции метода, поэтому откат прерванной ошибкой транзакции ничего не теряет.
+                self._prepared.pop(cur.connection, None)
+                cur.connection.rollback()
+                cur.execute(self._prepared_sql(cur, query, sql, params), params)
+        except psycopg2.Error:
+            metrics.DB_QUERIES.inc(query=query, status="error")
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            metrics.DB_LATENCY.observe(duration, query=query)
+        metrics.DB_QUERIES.inc(query=query, status="ok")
+        rowcount = cur.rowcount if isinstance(cur.rowcount, int) else -1  # -1 — драйвер не знает число строк.
+        if rowcount >= 0:
+            metrics.DB_ROWS.observe(rowcount, query=query)
+        if self.profiler is not None:
+            self.profiler.record(cur, query, sql, params, duration, rowcount)
+
+    def _execute_values(
+        self, cur: Any, query: str, sql: str, rows: List[Tuple[Any, ...]], page_size: int = 1000
+    ) -> None:
+        """Пакетный запрос через execute_values (по page_size строк в одном VALUES) с теми же метриками,
+        что и у _execute; число строк — размер пачки."""
+        start = time.perf_counter()
+        try:
+            execute_values(cur, sql, rows, page_size=page_size)
+        except psycopg2.Error:
+            metrics.DB_QUERIES.inc(query=query, status="error")
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            metrics.DB_LATENCY.observe(duration, query=query)
+        metrics.DB_QUERIES.inc(query=query, status="ok")
+        metrics.DB_ROWS.observe(len(rows), query=query)
+        if self.profiler is not None:
+            self.profiler.record(cur, query, sql, None, duration, len(rows))
 
     def create_tables(self) -> None:
         """Создает таблицы companies и vacancies в схеме hh_schema."""
@@ -61,26 +825,10 @@ class DBManager:
         #     salary_from NUMERIC, salary_to NUMERIC — зарплата «от» и «до».
         #     salary_currency VARCHAR(10) — валюта(например, RUR, USD).
         #     url TEXT — ссылка на вакансию.
-        sql = """
-        CREATE SCHEMA IF NOT EXISTS hh_schema;
-
-        CREATE TABLE IF NOT EXISTS hh_schema.companies (
-            company_id BIGINT PRIMARY KEY,
-            name VARCHAR(255) NOT NULL
-        );
-        CREATE TABLE IF NOT EXISTS hh_schema.vacancies (
-            vacancy_id BIGINT PRIMARY KEY,
-            company_id BIGINT REFERENCES hh_schema.companies(company_id),
-            name VARCHAR(255) NOT NULL,
-            salary_from NUMERIC,
-            salary_to NUMERIC,
-            salary_currency VARCHAR(10),
-            url TEXT
-        );
-        """
-        with self._get_conn() as conn:  # создаётся соединение с базой.
+        sql = SQL_CREATE_TABLES
+        with self._connection() as conn:  # создаётся соединение с базой.
             with conn.cursor() as cur:  # создаётся курсор для выполнения SQL-запросов.
-                cur.execute(sql)  # выполняется SQL-скрипт.
+                self._execute(cur, "create_tables", sql)  # выполняется SQL-скрипт.
                 conn.commit()  # фиксируются изменения.
 
     def insert_companies(self, companies: list[dict[str, Union[str, int]]]) -> None:
@@ -96,15 +844,12 @@ class DBManager:
         # VALUES (%s, %s) → вместо %s подставятся реальные значения (id и name).
         # ON CONFLICT (company_id) DO NOTHING → если в таблице уже есть компания с таким company_id,
         # то ошибка не будет выброшена, вставка просто пропускается.
-        sql = """
-        INSERT INTO hh_schema.companies (company_id, name)
-        VALUES (%s, %s)
-        ON CONFLICT (company_id) DO NOTHING;
-        """
-        with self._get_conn() as conn:  # открываем подключение к базе.
+        sql = SQL_INSERT_COMPANY
+        with self._connection() as conn:  # открываем подключение к базе.
             with conn.cursor() as cur:  # cоздаём курсор для выполнения SQL.
                 for c in companies:  # идём по списку компаний.
-                    cur.execute(sql, (c["id"], c["name"]))  # вставляем компанию в таблицу (подставляем id и название).
+                    # вставляем компанию в таблицу (подставляем id и название).
+                    self._execute(cur, "insert_companies", sql, (c["id"], c["name"]))
                 conn.commit()  # фиксируем изменения, чтобы данные сохранились.
 
     def insert_vacancies(self, vacancies: List[Dict]) -> None:
@@ -116,20 +861,17 @@ class DBManager:
         # %s → плейсхолдеры (значения подставятся через Python).        #
         # ON CONFLICT (vacancy_id) DO NOTHING; → если вакансия с таким vacancy_id уже есть, ошибка не произойдёт,
         # а строка просто не будет добавлена (избежание дублей).
-        sql = """
-        INSERT INTO hh_schema.vacancies
-        (vacancy_id, company_id, name, salary_from, salary_to, salary_currency, url)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
-        ON CONFLICT (vacancy_id) DO NOTHING;
-        """
-        with self._get_conn() as conn:  # Открываем соединение с БД.
+        sql = SQL_INSERT_VACANCY
+        with self._connection() as conn:  # Открываем соединение с БД.
             with conn.cursor() as cur:  # cоздаём курсор для выполнения SQL.
                 for v in vacancies:  # идём по списку компаний.
                     salary_from = v.get("salary_from")  # Используем .get() вместо v["..."],
                     # чтобы избежать ошибки KeyError, если вдруг ключа нет.
                     salary_to = v.get("salary_to")  # чтобы избежать ошибки KeyError, если вдруг ключа нет.
                     salary_currency = v.get("salary_currency")  # (например, не всегда зарплата указана в HH API).
-                    cur.execute(
+                    self._execute(
+                        cur,
+                        "insert_vacancies",
                         sql,
                         (  # Подставляем значения конкретной вакансии в SQL-запрос.
                             v["vacancy_id"],
@@ -143,6 +885,171 @@ class DBManager:
                     )
                 conn.commit()  # Подтверждаем изменения
 
+    def insert_vacancy_columns(self, columns: VacancyColumns, page_size: int = 1000) -> None:
+        """Сохраняет пачку вакансий в колоночном виде (VacancyColumns) одним пакетным INSERT."""
+        # execute_values склеивает строки в один многострочный VALUES (по page_size строк за запрос),
+        # поэтому на пачку уходит несколько обращений к серверу вместо одного на каждую вакансию.
+        # NaN в зарплатах заменяются на None внутри VacancyColumns.iter_rows().
+        sql = SQL_INSERT_VACANCY_VALUES
+        if not len(columns):  # Пустую пачку в БД не отправляем.
+            return
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                self._execute_values(cur, "insert_vacancy_columns", sql, list(columns.iter_rows()), page_size)
+                conn.commit()
+
+    def sync_vacancies(self, vacancies: Union[List[Dict], VacancyColumns], page_size: int = 1000) -> Dict[str, int]:
+        """Загружает вакансии с учётом изменений: новые вставляются, изменённые обновляются,
+        неизменённые не переписываются. Сравнение идёт по хэшу содержимого (content_hash), поэтому
+        при повторном обходе из БД читаются только хэши, а записываются лишь действительно изменённые строки.
+        Для каждой изменённой вакансии в hh_schema.vacancy_changes пишется компактная история:
+        только изменившиеся поля в виде {"поле": [старое, новое]}. Id новых и изменённых вакансий
+        по компаниям публикуются в канал VACANCY_CHANGES_CHANNEL (см. src/change_feed.py).
+        :return: {"inserted": ..., "updated": ..., "unchanged": ...}"""
+        records = vacancies.to_records() if isinstance(vacancies, VacancyColumns) else vacancies
+        incoming = {int(v["vacancy_id"]): v for v in records}  # Дубли внутри пачки: побеждает последняя версия.
+        if not incoming:
+            return {"inserted": 0, "updated": 0, "unchanged": 0}
+        hashes = {vacancy_id: vacancy_hash(v) for vacancy_id, v in incoming.items()}
+
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                self._execute(cur, "sync_vacancies_hashes", SQL_VACANCY_HASHES, (list(incoming),))
+                stored = {row[0]: None if row[1] is None else bytes(row[1]) for row in cur.fetchall()}
+                new_ids = [vacancy_id for vacancy_id in incoming if vacancy_id not in stored]
+                # Строки без хэша (загружены до появления content_hash) тоже сверяются по полям.
+                changed_ids = [
+                    vacancy_id
+                    for vacancy_id in incoming
+                    if vacancy_id in stored and stored[vacancy_id] != hashes[vacancy_id]
+                ]
+
+                history = []
+                updated_ids = []  # Изменилось содержимое, а не только отсутствовавший хэш.
+                renamed_ids = []  # Термы поиска пересчитываются только при смене названия.
+                if changed_ids:
+                    self._execute(cur, "sync_vacancies_old", SQL_VACANCY_FIELDS, (changed_ids,))
+                    for row in cur.fetchall():
+                        diff = diff_vacancy_fields(dict(zip(VacancyColumns.FIELDS, row)), incoming[row[0]])
+                        if diff:
+                            history.append((row[0], json_codec.dumps(diff).decode("utf-8")))
+                            updated_ids.append(row[0])
+                        if "name" in diff:
+                            renamed_ids.append(row[0])
+
+                def rows(ids: List[int]) -> List[Tuple[Any, ...]]:
+                    result = []
+                    for vacancy_id in ids:
+                        values = normalize_vacancy_fields(incoming[vacancy_id])
+                        result.append((vacancy_id, *(values[name] for name in HASH_FIELDS), hashes[vacancy_id]))
+                    return result
+
+                if new_ids:
+                    self._execute_values(
+                        cur, "sync_vacancies_insert", SQL_INSERT_VACANCY_HASHED_VALUES, rows(new_ids), page_size
+                    )
+                if changed_ids:  # В том числе строки, где изменился только отсутствовавший хэш.
+                    self._execute_values(
+                        cur, "sync_vacancies_update", SQL_UPDATE_VACANCY_VALUES, rows(changed_ids), page_size
+                    )
+                if history:
+                    self._execute_values(cur, "sync_vacancies_history", SQL_INSERT_VACANCY_CHANGES, history, page_size)
+                if renamed_ids:
+                    self._execute(cur, "sync_vacancies_terms_delete", SQL_DELETE_VACANCY_TERMS, (renamed_ids,))
+                terms = self._term_rows(
+                    (vacancy_id, incoming[vacancy_id].get("name")) for vacancy_id in new_ids + renamed_ids
+                )
+                if terms:
+                    self._execute_values(cur, "sync_vacancies_terms", SQL_INSERT_VACANCY_TERMS, terms, page_size)
+                payloads = self._change_payloads(incoming, new_ids, updated_ids)
+                if payloads:
+                    self._execute(
+                        cur, "sync_vacancies_notify", SQL_NOTIFY_VACANCY_CHANGES, (VACANCY_CHANGES_CHANNEL, payloads)
+                    )
+                conn.commit()
+        return {
+            "inserted": len(new_ids),
+            "updated": len(history),
+            "unchanged": len(incoming) - len(new_ids) - len(history),
+        }
+
+    @staticmethod
+    def _change_payloads(incoming: Dict[int, Dict], inserted: List[int], updated: List[int]) -> List[str]:
+        """События NOTIFY для пачки: {"company_id": ..., "inserted": [id, ...], "updated": [id, ...]}
+        на каждую компанию, не больше NOTIFY_MAX_IDS id в одном событии."""
+        by_company: Dict[Optional[int], List[Tuple[str, int]]] = {}
+        for kind, ids in (("inserted", inserted), ("updated", updated)):
+            for vacancy_id in ids:
+                company_id = incoming[vacancy_id].get("company_id")
+                key = int(company_id) if company_id is not None else None
+                by_company.setdefault(key, []).append((kind, vacancy_id))
+        payloads = []
+        for company_id, changes in by_company.items():
+            for start in range(0, len(changes), NOTIFY_MAX_IDS):
+                end = start + NOTIFY_MAX_IDS
+                event: Dict[str, Any] = {"company_id": company_id, "inserted": [], "updated": []}
+                for kind, vacancy_id in changes[start:end]:
+                    event[kind].append(vacancy_id)
+                payloads.append(json_codec.dumps(event).decode("utf-8"))
+        return payloads
+
+    @staticmethod
+    def _term_rows(documents: Iterable[Tuple[int, Optional[str]]]) -> List[Tuple[str, int, int]]:
+        """Строки vacancy_terms (терм, vacancy_id, частота) для названий вакансий."""
+        rows = []
+        for vacancy_id, name in documents:
+            for term, tf in Counter(analyze(name)).items():
+                rows.append((term[:255], vacancy_id, min(tf, 32767)))
+        return rows
+
+    def rebuild_search_index(self, batch_size: int = 5000) -> int:
+        """Полностью перестраивает hh_schema.vacancy_terms по всем вакансиям (например, для строк,
+        загруженных через insert_vacancies, или после изменения анализатора). Возвращает число вакансий."""
+        total = 0
+        with self._connection() as conn:
+            with conn.cursor(name="rebuild_search_index") as read_cur, conn.cursor() as cur:
+                self._execute(cur, "rebuild_search_index_truncate", "TRUNCATE hh_schema.vacancy_terms;")
+                read_cur.itersize = batch_size
+                self._execute(read_cur, "rebuild_search_index_read", SQL_VACANCY_NAMES)
+                while True:
+                    batch = read_cur.fetchmany(batch_size)
+                    if not batch:
+                        break
+                    total += len(batch)
+                    self._execute_values(
+                        cur, "rebuild_search_index", SQL_INSERT_VACANCY_TERMS, self._term_rows(batch), batch_size
+                    )
+                conn.commit()
+        return total
+
+    @_primary_fallback
+    def search_vacancies(self, query: str, mode: str = "and", limit: int = 100) -> List[Dict]:
+        """Поиск по термам названий (стемминг, транслитерация «питон» → python) с ранжированием.
+        В отличие от get_vacancies_with_keyword использует индекс vacancy_terms, а не перебор ILIKE.
+        :param query: слова запроса
+        :param mode: "and" — все слова запроса, "or" — хотя бы одно
+        :return: строки в формате get_all_vacancies с дополнительным полем score, по убыванию score"""
+        if mode not in ("and", "or"):
+            raise ValueError("mode должен быть 'and' или 'or'")
+        terms = sorted(set(analyze(query)))
+        if not terms:
+            return []
+        required = len(terms) if mode == "and" else 1
+        with self._connection(replica=True) as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                self._execute(cur, "search_vacancies", SQL_SEARCH_VACANCIES, (terms, required, limit), prepared=True)
+                rows = cur.fetchall()
+                return cast(List[Dict[str, Any]], rows)
+
+    def get_vacancy_changes(self, vacancy_id: int) -> List[Dict]:
+        """История изменений вакансии (записи sync_vacancies) в хронологическом порядке."""
+        with self._connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                self._execute(cur, "get_vacancy_changes", SQL_VACANCY_CHANGES, (vacancy_id,))
+                rows = cur.fetchall()
+                return cast(List[Dict[str, Any]], rows)
+
+    @_primary_fallback
     def get_companies_and_vacancies_count(self) -> List[Dict]:
         """Возвращает список всех компаний с количеством вакансий у каждой, включая компании без вакансий,
         и сортирует их по количеству вакансий от большего к меньшему."""
@@ -156,22 +1063,18 @@ class DBManager:
         # LEFT JOIN гарантирует, что компании без вакансий тоже попадут в результат (кол-во вакансий будет 0).        #
         # GROUP BY: группируем по компании, чтобы COUNT корректно посчитал вакансии.        #
         # ORDER BY vacancies_count DESC: сортируем по количеству вакансий по убыванию.
-        sql = """
-        SELECT c.company_id, c.name, COUNT(v.vacancy_id) AS vacancies_count
-        FROM hh_schema.companies c
-        LEFT JOIN hh_schema.vacancies v ON c.company_id = v.company_id
-        GROUP BY c.company_id, c.name
-        ORDER BY vacancies_count DESC;
-        """
-        with self._get_conn() as conn:  # Открываем соединение с БД
+        sql = SQL_COMPANIES_AND_VACANCIES_COUNT
+        with self._connection(replica=True) as conn:  # Открываем соединение с БД
             with conn.cursor(cursor_factory=RealDictCursor) as cur:  # Создаём курсор с RealDictCursor →
                 # возвращает строки как словари (ключи — имена столбцов).
-                cur.execute(sql)  # Выполняем SQL-запрос.
+                self._execute(cur, "get_companies_and_vacancies_count", sql, prepared=True)  # Выполняем SQL-запрос.
                 rows = cur.fetchall()
                 return cast(List[Dict[str, Any]], rows)  # возвращает все строки результата как список словарей.
 
-    def get_all_vacancies(self) -> List[Dict]:
-        """Список всех вакансий с указанием названия компании, вакансии, зарплаты и ссылки."""
+    @_primary_fallback
+    def get_all_vacancies(self, include_archive: bool = False) -> List[Dict]:
+        """Список всех вакансий с указанием названия компании, вакансии, зарплаты и ссылки.
+        include_archive=True — вместе с вакансиями из архива закрытых (archive_closed_vacancies)."""
         # Метод класса DBManager. Возвращает список словарей (List[Dict]), где каждый словарь —
         # это одна вакансия с данными о компании, названии вакансии, зарплате и ссылке.
         # Метод возвращает все вакансии из БД с информацией о: компании, названии вакансии,
@@ -186,20 +1089,80 @@ class DBManager:
         # JOIN: соединяем таблицу vacancies с таблицей companies по company_id, чтобы получить имя компании
         #       для каждой вакансии.
         # ORDER BY v.vacancy_id: сортируем результат по идентификатору вакансии.\
-        sql = """
-        SELECT v.vacancy_id, c.name AS company, v.name AS vacancy,
-               v.salary_from, v.salary_to, v.salary_currency, v.url
-        FROM hh_schema.vacancies v
-        JOIN hh_schema.companies c ON v.company_id = c.company_id
-        ORDER BY v.vacancy_id;
-        """
-        with self._get_conn() as conn:  # Открываем соединение с базой данных
+        sql = SQL_ALL_VACANCIES_WITH_ARCHIVE if include_archive else SQL_ALL_VACANCIES
+        query = "get_all_vacancies_archive" if include_archive else "get_all_vacancies"
+        with self._connection(replica=True) as conn:  # Открываем соединение с базой данных
             with conn.cursor(cursor_factory=RealDictCursor) as cur:  # Создаём курсор с RealDictCursor →
                 # строки будут возвращаться как словари (ключи — имена столбцов).
-                cur.execute(sql)  # Выполняем SQL-запрос
+                self._execute(cur, query, sql)  # Выполняем SQL-запрос
                 rows = cur.fetchall()
                 return cast(List[Dict[str, Any]], rows)  # возвращает все строки результата как список словарей.
 
+    @_primary_fallback
+    def get_vacancies_page(self, limit: int = 100, after_id: int = 0) -> List[Dict]:
+        """Страница вакансий (в формате get_all_vacancies) с vacancy_id больше after_id.
+        Keyset-пагинация: следующая страница запрашивается с after_id = vacancy_id последней строки,
+        поэтому глубина страницы не влияет на скорость (в отличие от OFFSET)."""
+        with self._connection(replica=True) as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                self._execute(cur, "get_vacancies_page", SQL_VACANCIES_PAGE, (after_id, limit), prepared=True)
+                rows = cur.fetchall()
+                return cast(List[Dict[str, Any]], rows)
+
+    def get_vacancies_by_company(self, company_id: int) -> List[Dict]:
+        """Вакансии одной компании (в формате get_all_vacancies)."""
+        with self._connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                self._execute(cur, "get_vacancies_by_company", SQL_VACANCIES_BY_COMPANY, (company_id,), prepared=True)
+                rows = cur.fetchall()
+                return cast(List[Dict[str, Any]], rows)
+
+    def get_vacancies_by_ids(self, vacancy_ids: Iterable[int]) -> List[Dict]:
+        """Вакансии с указанными id (в формате get_all_vacancies): подписчики уведомлений
+        дочитывают только изменившиеся строки вместо полной выгрузки."""
+        ids = sorted({int(vacancy_id) for vacancy_id in vacancy_ids})
+        if not ids:
+            return []
+        with self._connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                self._execute(cur, "get_vacancies_by_ids", SQL_VACANCIES_BY_IDS, (ids,), prepared=True)
+                rows = cur.fetchall()
+                return cast(List[Dict[str, Any]], rows)
+
+    @_primary_fallback
+    def count_vacancies(self) -> int:
+        """Общее число вакансий."""
+        with self._connection(replica=True) as conn:
+            with conn.cursor() as cur:
+                self._execute(cur, "count_vacancies", SQL_COUNT_VACANCIES, prepared=True)
+                row = cur.fetchone()
+                return int(row[0]) if row else 0
+
+    def _iter_batches(self, query: str, sql: str, batch_size: int) -> Generator[List[Dict], None, None]:
+        """Потоково отдаёт результат запроса пачками по batch_size строк через именованный (серверный) курсор:
+        строки приходят с сервера по мере чтения, и весь результат не держится в памяти.
+        Соединение занято, пока генератор не исчерпан или не закрыт. Обрыв реплики здесь не повторяется на основном
+        сервере (см. _primary_fallback): часть пачек уже может быть отдана вызывающему коду."""
+        with self._connection(replica=True) as conn:
+            with conn.cursor(name=query, cursor_factory=RealDictCursor) as cur:
+                cur.itersize = batch_size
+                self._execute(cur, query, sql)
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield cast(List[Dict[str, Any]], rows)
+
+    def iter_all_vacancies(self, batch_size: int = 1000) -> Generator[List[Dict], None, None]:
+        """Потоково отдаёт все вакансии (как get_all_vacancies) пачками по batch_size строк."""
+        return self._iter_batches("iter_all_vacancies", SQL_ALL_VACANCIES, batch_size)
+
+    def iter_vacancy_records(self, batch_size: int = 5000) -> Generator[List[Dict], None, None]:
+        """Потоково отдаёт вакансии в формате data/vacancies.json (company_id вместо названия компании)
+        пачками по batch_size строк — для выгрузки в файлы (src/exporter.py)."""
+        return self._iter_batches("iter_vacancy_records", SQL_EXPORT_VACANCIES, batch_size)
+
+    @_primary_fallback
     def get_avg_salary(self) -> Optional[float]:
         """Средняя зарплата по вакансиям, берём среднее (salary_from + salary_to)/2 там, где есть числа."""
         # Метод класса DBManager. Возвращает среднюю зарплату по всем вакансиям в базе.
@@ -211,17 +1174,14 @@ class DBManager:
         # (среднее между from и to).
         # AVG(...) — вычисляем среднее значение по всем вакансиям.
         # WHERE salary_from IS NOT NULL OR salary_to IS NOT NULL — исключаем вакансии без данных о зарплате.
-        sql = """
-        SELECT AVG((COALESCE(salary_from, salary_to) + COALESCE(salary_to, salary_from))/2.0) AS avg_salary
-        FROM hh_schema.vacancies
-        WHERE salary_from IS NOT NULL OR salary_to IS NOT NULL;
-        """
-        with self._get_conn() as conn:  # Открываем соединение с БД.
+        sql = SQL_AVG_SALARY
+        with self._connection(replica=True) as conn:  # Открываем соединение с БД.
             with conn.cursor() as cur:  # Создаём обычный курсор.
-                cur.execute(sql)  # Выполняем SQL-запрос.
+                self._execute(cur, "get_avg_salary", sql, prepared=True)  # Выполняем SQL-запрос.
                 row = cur.fetchone()  # возвращает одну строку результата (в данном случае среднее значение).
                 return row[0] if row else None  # значение средней зарплаты. Если строка отсутствует, возвращаем None.
 
+    @_primary_fallback
     def get_vacancies_with_higher_salary(self) -> List[Dict]:
         """Возвращает вакансии с зарплатой выше средней."""
         # Метод класса DBManager.Возвращает список вакансий, у которых средняя зарплата выше средней по всем вакансиям.
@@ -239,23 +1199,20 @@ class DBManager:
         # Среднее (salary_from + salary_to)/2.
         # WHERE … > %s — фильтруем вакансии, средняя зарплата которых выше переданного значения (avg).
         # ORDER BY … DESC — сортируем по средней зарплате по убыванию.
-        sql = """
-        SELECT v.vacancy_id, c.name AS company, v.name AS vacancy,
-               v.salary_from, v.salary_to, v.salary_currency, v.url
-        FROM hh_schema.vacancies v
-        JOIN hh_schema.companies c ON v.company_id = c.company_id
-        WHERE ((COALESCE(v.salary_from, v.salary_to) + COALESCE(v.salary_to, v.salary_from))/2.0) > %s
-        ORDER BY ((COALESCE(v.salary_from, v.salary_to) + COALESCE(v.salary_to, v.salary_from))/2.0) DESC;
-        """
-        with self._get_conn() as conn:  # Создаём подключение к базе.
+        sql = SQL_VACANCIES_WITH_HIGHER_SALARY
+        with self._connection(replica=True) as conn:  # Создаём подключение к базе.
             with conn.cursor(cursor_factory=RealDictCursor) as cur:  # Используем RealDictCursor, чтобы возвращать
                 # результат в виде списка словарей (ключи — имена столбцов).
-                cur.execute(sql, (avg,))  # выполняем SQL, подставляя среднюю зарплату.
+                self._execute(
+                    cur, "get_vacancies_with_higher_salary", sql, (avg,), prepared=True
+                )  # выполняем SQL, подставляя среднюю зарплату.
                 rows = cur.fetchall()
                 return cast(List[Dict[str, Any]], rows)  # получаем все строки результата.
 
-    def get_vacancies_with_keyword(self, keyword: str) -> List[Dict]:
-        """Все вакансии, в названии которых есть keyword (регистронезависимо)."""
+    @_primary_fallback
+    def get_vacancies_with_keyword(self, keyword: str, include_archive: bool = False) -> List[Dict]:
+        """Все вакансии, в названии которых есть keyword (регистронезависимо).
+        include_archive=True — искать и среди вакансий в архиве закрытых."""
         # Метод класса DBManager. Возвращает список вакансий, где в названии вакансии встречается
         # заданное ключевое слово. Параметр keyword: str — слово для поиска.
         # Метод ищет все вакансии по ключевому слову в названии, без учёта регистра, и возвращает
@@ -267,17 +1224,232 @@ class DBManager:
         # Берём вакансии и их компании (JOIN hh_schema.companies).        #
         # v.name ILIKE %s — ищем вакансии, где название содержит keyword, регистронезависимо         #
         # Сортируем по vacancy_id.
-        sql = """
-        SELECT v.vacancy_id, c.name AS company, v.name AS vacancy,
-               v.salary_from, v.salary_to, v.salary_currency, v.url
-        FROM hh_schema.vacancies v
-        JOIN hh_schema.companies c ON v.company_id = c.company_id
-        WHERE v.name ILIKE %s
-        ORDER BY v.vacancy_id;
-        """
-        with self._get_conn() as conn:  # Создаём подключение к базе
+        if include_archive:
+            with self._connection(replica=True) as conn:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    self._execute(
+                        cur,
+                        "get_vacancies_with_keyword_archive",
+                        SQL_VACANCIES_WITH_KEYWORD_WITH_ARCHIVE,
+                        (like_expr, like_expr),
+                    )
+                    return cast(List[Dict[str, Any]], cur.fetchall())
+        sql = SQL_VACANCIES_WITH_KEYWORD
+        with self._connection(replica=True) as conn:  # Создаём подключение к базе
             with conn.cursor(cursor_factory=RealDictCursor) as cur:  # Используем RealDictCursor, чтобы результат
                 # был списком словарей (ключи — имена столбцов).
-                cur.execute(sql, (like_expr,))  # выполняем SQL, передавая выражение для поиска.
+                self._execute(
+                    cur, "get_vacancies_with_keyword", sql, (like_expr,), prepared=True
+                )  # выполняем SQL, передавая выражение для поиска.
                 rows = cur.fetchall()
                 return cast(List[Dict[str, Any]], rows)  # возвращаем все найденные вакансии.
+
+    @_primary_fallback
+    def open_vacancy_cursor(self, listing: str, keyword: str = "") -> VacancyCursor:
+        """Список вакансий listing (см. storage.LISTINGS) на серверном курсоре: первая страница читается сразу,
+        не дожидаясь передачи всего результата. Курсор нужно закрыть (with ... as cursor)."""
+        if listing == "all":
+            return _ScrollVacancyCursor(self, "get_all_vacancies", SQL_ALL_VACANCIES, ())
+        if listing == "higher":
+            avg = self.get_avg_salary()
+            if avg is None:
+                return VacancyCursor()
+            return _ScrollVacancyCursor(
+                self, "get_vacancies_with_higher_salary", SQL_VACANCIES_WITH_HIGHER_SALARY, (avg,)
+            )
+        if listing == "keyword":
+            return _ScrollVacancyCursor(
+                self, "get_vacancies_with_keyword", SQL_VACANCIES_WITH_KEYWORD, (f"%{keyword}%",)
+            )
+        return super().open_vacancy_cursor(listing, keyword)
+
+    @_primary_fallback
+    def get_reports(
+        self,
+        reports: Sequence[str] = ("avg_salary", "vacancies_with_higher_salary", "companies_and_vacancies_count"),
+        keyword: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Несколько отчётов (имена из REPORTS) одним SQL-запросом — одно обращение к серверу вместо одного на отчёт.
+        Возвращает {имя: результат}: для avg_salary и count_vacancies — значение, для остальных — список строк
+        в формате соответствующего метода get_*. Строки собираются на сервере в JSON, поэтому числа в них
+        приходят как int/float, а не Decimal. Для vacancies_with_keyword нужен keyword."""
+        unknown = [name for name in reports if name not in REPORTS]
+        if unknown:
+            raise ValueError(f"Неизвестные отчёты: {', '.join(unknown)}")
+        columns = []
+        params: List[Any] = []
+        for name in reports:
+            report_sql = REPORTS[name].strip(" \n;")
+            if name in _SCALAR_REPORTS:
+                columns.append(f"({report_sql}) AS {name}")
+            else:
+                columns.append(f"(SELECT COALESCE(json_agg(r), '[]'::json) FROM ({report_sql}) r) AS {name}")
+            if name == "vacancies_with_keyword":
+                if keyword is None:
+                    raise ValueError("Для отчёта vacancies_with_keyword нужен keyword")
+                params.append(f"%{keyword}%")
+        sql = "SELECT " + ",\n       ".join(columns)
+        with self._connection(replica=True) as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                self._execute(cur, "get_reports", sql, params or None)
+                row = cur.fetchone()
+                return dict(row) if row else {}
+
+    def record_salary_snapshot(self, snapshot_date: Optional[date] = None) -> int:
+        """Сохраняет дневной снимок зарплат: по каждой компании и валюте число вакансий, число вакансий
+        с зарплатой, средняя, минимальная и максимальная зарплата. Повторный вызов за тот же день
+        перезаписывает снимок. Возвращает число записанных строк."""
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                self._execute(
+                    cur, "record_salary_snapshot", SQL_RECORD_SALARY_SNAPSHOT, (snapshot_date or date.today(),)
+                )
+                conn.commit()
+                return int(cur.rowcount)
+
+    @_primary_fallback
+    def get_salary_trend(
+        self, currency: str = "RUR", days: int = 90, window: int = 7, company_id: Optional[int] = None
+    ) -> List[Dict]:
+        """Динамика средней зарплаты по дням из дневных снимков (без обращения к таблице вакансий).
+        :param currency: валюта зарплаты
+        :param days: за сколько последних дней
+        :param window: ширина скользящего среднего (moving_avg) в снимках
+        :param company_id: одна компания; по умолчанию — все компании вместе
+        :return: строки snapshot_date, vacancies_count, avg_salary, moving_avg, delta (к предыдущему снимку)"""
+        since = date.today() - timedelta(days=days)
+        params = (max(window, 1) - 1, currency, since, company_id, company_id)
+        with self._connection(replica=True) as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                self._execute(cur, "get_salary_trend", SQL_SALARY_TREND, params, prepared=True)
+                rows = cur.fetchall()
+                return cast(List[Dict[str, Any]], rows)
+
+    @_primary_fallback
+    def get_salary_deltas(self, period_days: int = 7, currency: str = "RUR") -> List[Dict]:
+        """Изменение средней зарплаты и числа вакансий по компаниям: последний снимок против снимка
+        period_days дней назад (или ближайшего более раннего). Компании без прошлого снимка идут в конце."""
+        with self._connection(replica=True) as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                self._execute(cur, "get_salary_deltas", SQL_SALARY_DELTAS, (period_days, currency), prepared=True)
+                rows = cur.fetchall()
+                return cast(List[Dict[str, Any]], rows)
+
+    # --- Архив закрытых вакансий ---
+
+    def mark_closed_vacancies(self, company_id: int, open_ids: Iterable[int]) -> Dict[str, int]:
+        """Отмечает закрытыми вакансии компании, которых нет среди open_ids (полный список её открытых вакансий
+        из API), и снова открывает вернувшиеся в выдачу. Вызывать только после полного сбора компании.
+        :return: {"closed": ..., "reopened": ...}"""
+        ids = list(open_ids)
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                self._execute(cur, "mark_closed_vacancies", SQL_MARK_CLOSED_VACANCIES, (ids, company_id, ids))
+                closed = sum(1 for (is_closed,) in cur.fetchall() if is_closed)
+                conn.commit()
+                return {"closed": closed, "reopened": int(cur.rowcount) - closed}
+
+    def archive_closed_vacancies(self, closed_days: int = 30, batch_size: int = 5000) -> int:
+        """Переносит в архив вакансии, закрытые больше closed_days дней назад, пачками по batch_size строк
+        (каждая пачка — отдельная короткая транзакция). Возвращает число перенесённых вакансий."""
+        total = 0
+        while True:
+            with self._connection() as conn:
+                with conn.cursor() as cur:
+                    self._execute(
+                        cur, "archive_closed_vacancies", SQL_ARCHIVE_CLOSED_VACANCIES, (closed_days, batch_size)
+                    )
+                    row = cur.fetchone()
+                    conn.commit()
+            moved = int(row[0]) if row else 0
+            total += moved
+            if moved < batch_size:
+                return total
+
+    def get_archive_stats(self) -> Dict[str, int]:
+        """Вакансии в горячей таблице (hot, из них закрытых — closed) и в архиве (archived), а также размер
+        обеих таблиц с индексами в байтах (hot_bytes, archive_bytes)."""
+        with self._connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                self._execute(cur, "get_archive_stats", SQL_ARCHIVE_STATS)
+                row: Dict[str, Any] = cur.fetchone() or {}
+                return {key: int(value) for key, value in row.items()}
+
+    # --- Очередь задач сбора ---
+
+    def enqueue_crawl_tasks(self, tasks: Iterable[Tuple[str, Dict]], max_attempts: int = 5) -> int:
+        """Добавляет задачи (kind, payload) в очередь; уже ожидающие или выполняемые такие же задачи пропускаются.
+        Возвращает число добавленных задач."""
+        rows = [(kind, json_codec.dumps(payload).decode("utf-8"), max_attempts) for kind, payload in tasks]
+        if not rows:
+            return 0
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                self._execute_values(cur, "enqueue_crawl_tasks", SQL_ENQUEUE_CRAWL_TASKS, rows, len(rows))
+                conn.commit()
+                return int(cur.rowcount)
+
+    def claim_crawl_tasks(self, worker_id: str, limit: int = 1, lease_seconds: float = 300) -> List[Dict]:
+        """Берёт в работу до limit задач и арендует их на lease_seconds секунд.
+        :return: задачи: task_id, kind, payload, attempts, max_attempts"""
+        with self._connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                self._execute(cur, "fail_expired_crawl_tasks", SQL_FAIL_EXPIRED_CRAWL_TASKS)
+                self._execute(cur, "claim_crawl_tasks", SQL_CLAIM_CRAWL_TASKS, (limit, worker_id, lease_seconds))
+                rows = cur.fetchall()
+                conn.commit()
+                return [dict(row) for row in rows]
+
+    def extend_crawl_lease(self, task_id: int, worker_id: str, lease_seconds: float = 300) -> bool:
+        """Продлевает аренду задачи; False — аренда уже потеряна (истекла и задачу взял другой обработчик)."""
+        return self._update_crawl_task(
+            "extend_crawl_lease", SQL_EXTEND_CRAWL_LEASE, (lease_seconds, task_id, worker_id)
+        )
+
+    def complete_crawl_task(self, task_id: int, worker_id: str) -> bool:
+        """Отмечает задачу выполненной; False — аренда была потеряна."""
+        return self._update_crawl_task("complete_crawl_task", SQL_COMPLETE_CRAWL_TASK, (task_id, worker_id))
+
+    def fail_crawl_task(self, task_id: int, worker_id: str, error: str, retry_delay: float = 0) -> Optional[str]:
+        """Возвращает задачу в очередь через retry_delay секунд или, если попытки исчерпаны, отмечает её
+        неудачной. Возвращает новый статус ("pending" / "failed") или None, если аренда была потеряна."""
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                self._execute(cur, "fail_crawl_task", SQL_FAIL_CRAWL_TASK, (retry_delay, error, task_id, worker_id))
+                row = cur.fetchone()
+                conn.commit()
+                return row[0] if row else None
+
+    def _update_crawl_task(self, query: str, sql: str, params: Tuple) -> bool:
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                self._execute(cur, query, sql, params)
+                conn.commit()
+                return bool(cur.rowcount)
+
+    def get_crawl_queue_stats(self) -> Dict[str, int]:
+        """Число задач очереди по статусам: pending, running, done, failed."""
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                self._execute(cur, "get_crawl_queue_stats", SQL_CRAWL_QUEUE_STATS)
+                return {status: int(count) for status, count in cur.fetchall()}
+
+    def setup_rate_budget(self, bucket: str, rate: float, capacity: Optional[float] = None) -> None:
+        """Создаёт или перенастраивает общий бюджет запросов: rate токенов в секунду, не больше capacity в запасе."""
+        capacity = capacity if capacity is not None else max(rate, 1.0)
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                self._execute(cur, "setup_rate_budget", SQL_SETUP_RATE_BUCKET, (bucket, capacity, rate, capacity))
+                conn.commit()
+
+    def take_rate_tokens(self, bucket: str, tokens: float = 1.0) -> float:
+        """Пытается списать tokens из общего бюджета. Возвращает 0.0 при успехе, иначе — сколько секунд
+        подождать до следующей попытки (бюджет не изменяется)."""
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                self._execute(cur, "take_rate_tokens", SQL_TAKE_RATE_TOKENS, (bucket, tokens, tokens, tokens))
+                row = cur.fetchone()
+                conn.commit()
+                if row is None:
+                    raise ValueError(f"Бюджет запросов {bucket} не настроен (setup_rate_budget)")
+                return max(float(row[0]), 0.0)
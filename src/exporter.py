@@ -0,0 +1,140 @@
+# Параллельная выгрузка вакансий в файлы. Строки читаются из хранилища потоково (серверный курсор
+# DBManager.iter_vacancy_records), набираются в шарды по shard_size строк, и каждый шард в каждом формате
+# сериализуется и пишется отдельным процессом пула, а в памяти родительского процесса держится лишь несколько
+# шардов. JSON-шарды пишутся без отступов, чтобы их кодировал быстрый бэкенд json_codec. Пул выигрывает только
+# на нескольких ядрах: каждая строка пересылается в процесс пула, и на одном ядре это чистые накладные расходы,
+# поэтому там по умолчанию шарды пишутся в текущем процессе (сравнение — python -m benchmarks run --suite export).
+
+import os
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, TypeVar, Union
+
+from src import metrics
+from src.work_files import save_to_csv, save_to_json
+from src.work_vacancies import VacancyColumns
+
+FORMATS = ("json", "csv", "parquet")
+# Порядок колонок CSV — как в data/vacancies.csv, который main.py писал раньше.
+EXPORT_FIELDS = ["vacancy_id", "name", "company_id", "salary_from", "salary_to", "salary_currency", "url"]
+
+T = TypeVar("T")
+
+
+def write_shard(fmt: str, path: str, rows: List[Dict]) -> Tuple[str, int, int]:
+    """Записывает один шард в формате fmt. Выполняется в процессе пула.
+    :return: (путь, число строк, размер файла в байтах)"""
+    if fmt == "json":
+        save_to_json(path, rows, indent=None)  # Без отступов шард кодирует быстрый бэкенд json_codec.
+    elif fmt == "csv":
+        save_to_csv(path, rows, fieldnames=EXPORT_FIELDS)
+    elif fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq  # type: ignore[import-not-found]
+        except ImportError as e:  # pyarrow — необязательная зависимость.
+            raise ImportError("Для выгрузки в Parquet требуется пакет pyarrow") from e
+        with metrics.timer(metrics.EXPORT_LATENCY, format="parquet"):
+            pq.write_table(VacancyColumns.from_records(rows).to_arrow(), path)
+    else:
+        raise ValueError(f"Неизвестный формат выгрузки: {fmt}")
+    return path, len(rows), os.path.getsize(path)
+
+
+class InlineExecutor(Executor):
+    """Исполнитель без пула: задачи выполняются сразу в текущем процессе (workers=0, отладка и тесты)."""
+
+    def submit(self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> "Future[T]":
+        future: "Future[T]" = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+class ParallelExporter:
+    """Выгрузка вакансий в несколько форматов параллельными процессами.
+
+    exporter = ParallelExporter("data/export", formats=("json", "csv"), shard_size=100_000)
+    files = exporter.export(db.iter_vacancy_records())  # {"json": [...], "csv": [...]}
+    """
+
+    def __init__(
+        self,
+        out_dir: Union[str, Path] = "data/export",
+        formats: Sequence[str] = ("json", "csv"),
+        shard_size: int = 100_000,
+        workers: Optional[int] = None,
+        prefix: str = "vacancies",
+    ):
+        """
+        :param out_dir: каталог для файлов выгрузки
+        :param formats: форматы из FORMATS
+        :param shard_size: строк в одном файле; 0 — один файл на формат без номера шарда ({prefix}.json)
+        :param workers: число процессов (по умолчанию — число ядер, а на одноядерной машине 0);
+            0 — писать в текущем процессе
+        :param prefix: начало имени файлов: {prefix}-00000.json, {prefix}-00001.json, ...
+        """
+        unknown = [fmt for fmt in formats if fmt not in FORMATS]
+        if unknown or not formats:
+            raise ValueError(f"Форматы выгрузки должны быть из {FORMATS}, получено: {list(formats)}")
+        self.out_dir = Path(out_dir)
+        self.formats = tuple(formats)
+        self.shard_size = shard_size
+        if workers is None:
+            cores = os.cpu_count() or 1
+            workers = cores if cores > 1 else 0  # Один процесс пула без параллелизма только пересылал бы строки.
+        self.workers = workers
+        self.prefix = prefix
+
+    def _path(self, shard: int, fmt: str) -> str:
+        name = self.prefix if self.shard_size <= 0 else f"{self.prefix}-{shard:05d}"
+        return str(self.out_dir / f"{name}.{fmt}")
+
+    def _shards(self, batches: Iterable[List[Dict]]) -> Iterable[List[Dict]]:
+        """Перекладывает пачки из хранилища в шарды по shard_size строк."""
+        if self.shard_size <= 0:
+            yield [row for batch in batches for row in batch]
+            return
+        shard: List[Dict] = []
+        for batch in batches:
+            start = 0
+            while start < len(batch):
+                end = start + self.shard_size - len(shard)
+                shard.extend(batch[start:end])
+                start = end
+                if len(shard) >= self.shard_size:
+                    yield shard
+                    shard = []
+        if shard:
+            yield shard
+
+    def export(self, batches: Iterable[List[Dict]]) -> Dict[str, List[str]]:
+        """Выгружает все строки из batches. Возвращает {формат: [пути файлов по порядку шардов]}."""
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        files: Dict[str, List[str]] = {fmt: [] for fmt in self.formats}
+        in_process = self.workers <= 0
+        executor: Executor = InlineExecutor() if in_process else ProcessPoolExecutor(max_workers=self.workers)
+        # Не больше двух задач на процесс в очереди: шарды в памяти родителя ограничены, а пул не простаивает.
+        max_pending = max(1, self.workers) * 2
+        pending: Set[Future] = set()
+
+        def collect(done: Iterable[Future]) -> None:
+            for future in done:
+                path, rows, size = future.result()
+                if not in_process:  # В процессе пула метрики save_to_* остаются в его собственном реестре.
+                    fmt = path.rsplit(".", 1)[1]
+                    metrics.EXPORT_ROWS.inc(rows, format=fmt)
+                    metrics.EXPORT_BYTES.inc(size, format=fmt)
+
+        with executor:
+            for index, shard in enumerate(self._shards(batches)):
+                for fmt in self.formats:
+                    path = self._path(index, fmt)
+                    files[fmt].append(path)
+                    pending.add(executor.submit(write_shard, fmt, path, shard))
+                    if len(pending) >= max_pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(done)
+            collect(wait(pending).done)
+        return files
@@ -2,15 +2,26 @@
 # использует requests, реализует класс для получения компаний и вакансий
 
 import os
-from typing import Dict, List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, cast
 
 import certifi
 import requests
-from dotenv import load_dotenv
 
+from src import json_codec, metrics
 from src.services import safe_get_salary
+from src.work_vacancies import VacancyColumns, parse_vacancy_pages
 
-load_dotenv(encoding="utf-8")
+if TYPE_CHECKING:
+    from src.response_archive import ResponseArchive
+
+# Самый короткий интервал дат публикации, до которого делится поиск в get_vacancies_for_company_partitioned.
+MIN_SEARCH_WINDOW = timedelta(minutes=1)
+# Ответы, после которых запрос имеет смысл повторить: превышен лимит запросов и временные ошибки сервера.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRY_DELAY = 30.0  # Потолок паузы перед повтором, в том числе для Retry-After.
 
 
 class HHApi:
@@ -19,20 +30,47 @@ class HHApi:
     Задаёт таймауты для стабильности (чтобы запросы не "висели" вечно).
     Создаёт HTTP-сессию с правильным SSL и заголовками."""
 
-    BASE_URL = os.getenv("HH_API_URL", "https://api.hh.ru")  # Берём переменную окружения HH_API_URL из .env
-    # Если переменной нет → используем дефолтный адрес API https://api.hh.ru.
+    BASE_URL = "https://api.hh.ru"  # Адрес API по умолчанию; HH_API_URL из окружения (.env) важнее.
+    MAX_PER_PAGE = 100  # Больше вакансий за один запрос API не отдаёт.
+    MAX_SEARCH_DEPTH = 2000  # Глубина выдачи одного поиска: page * per_page не может превышать 2000.
 
-    def __init__(self, area: int = 113, per_page: int = 50, connect_timeout: int = 5, read_timeout: int = 10):
+    def __init__(
+        self,
+        area: int = 113,
+        per_page: int = 50,
+        connect_timeout: int = 5,
+        read_timeout: int = 10,
+        archive: Optional["ResponseArchive"] = None,
+        max_retries: int = 0,
+        retry_backoff: float = 0.5,
+    ):
         """
         :param area: ID региона (Россия = 113)
         :param per_page: количество вакансий за один запрос (максимум 100)
         :param connect_timeout: таймаут подключения
         :param read_timeout: таймаут ответа
+        :param archive: архив, в который сохраняются тела успешных ответов (src/response_archive.py)
+        :param max_retries: сколько раз повторять запрос после 429, 5xx, обрыва соединения или таймаута
+            (0 — не повторять: ошибка сразу уходит вызывающему коду)
+        :param retry_backoff: пауза перед первым повтором, дальше удваивается; Retry-After сервера важнее
         """
+        # Окружение читается при создании клиента, а не при импорте модуля: .env загружает main.py
+        # в начале main(), и модуль можно импортировать, не трогая окружение.
+        self.BASE_URL = os.getenv("HH_API_URL", self.BASE_URL)
         self.area = area  # Сохраняем параметры
         self.per_page = per_page  # Сохраняем параметры
         self.timeout = (connect_timeout, read_timeout)  # self.timeout хранится как кортеж, то, что передаётся
         # в requests.get(..., timeout=self.timeout).
+        # Число открытых вакансий по работодателям из последнего ответа /employers (get_companies):
+        # по нему get_vacancies_for_companies решает, кого объединять в общие запросы.
+        self.open_vacancies: Dict[int, int] = {}
+        # Вызывается перед каждым запросом с именем эндпоинта и ждёт, пока запрос разрешён
+        # (например, общий бюджет запросов обработчиков очереди в src/crawl_worker.py).
+        self.rate_limiter: Optional[Callable[[str], None]] = None
+        self.archive = archive
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.sleep: Callable[[float], None] = time.sleep
         self.session = requests.Session()  # Создаём HTTP-сессию
         # Сессия позволяет переиспользовать одно соединение.
         self.session.verify = certifi.where()  # Говорим requests, где лежат корневые сертификаты
@@ -45,12 +83,67 @@ class HHApi:
             }
         )
 
+    def _get(self, endpoint: str, params: Dict) -> requests.Response:
+        """GET-запрос к эндпоинту API (например "vacancies") с проверкой статуса и записью метрик:
+        число запросов по статусу, длительность и размер ответа. Временные ошибки повторяются
+        до max_retries раз (см. _retry_delay)."""
+        url = f"{self.BASE_URL}/{endpoint}"
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter(endpoint)
+            try:
+                with metrics.timer(metrics.HTTP_LATENCY, endpoint=endpoint):
+                    response = self.session.get(url, params=params, timeout=self.timeout)
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                status = e.response.status_code if e.response is not None else "error"
+                metrics.HTTP_REQUESTS.inc(endpoint=endpoint, status=status)
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                metrics.HTTP_RETRIES.inc(method=endpoint)
+                self.sleep(delay)
+                attempt += 1
+                continue
+            break
+        metrics.HTTP_REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+        metrics.HTTP_BYTES.observe(len(response.content), endpoint=endpoint)
+        if self.archive is not None:
+            self.archive.record(endpoint, params, response.content)
+        return response
+
+    def _retry_delay(self, error: requests.exceptions.RequestException, attempt: int) -> Optional[float]:
+        """Пауза перед повтором запроса или None, если повторять не нужно: попытки исчерпаны
+        или ошибка постоянная (400, 404 и т. п.). При 429 и 503 учитывается заголовок Retry-After."""
+        if attempt >= self.max_retries:
+            return None
+        response = error.response
+        if response is None:
+            if not isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+                return None
+        elif response.status_code not in RETRY_STATUSES:
+            return None
+        else:
+            retry_after = str(response.headers.get("Retry-After", ""))
+            if retry_after.isdigit():
+                return min(float(retry_after), MAX_RETRY_DELAY)
+        return min(self.retry_backoff * 2.0**attempt, MAX_RETRY_DELAY)
+
+    def get_employers_page(self, text: str, page: int = 0, per_page: int = 50) -> Dict:
+        """Одна страница поиска работодателей /employers как есть (items, page, pages, found).
+        Ошибки запроса не перехватываются — для обработчиков очереди, которые повторяют задачу сами."""
+        params = {"text": text, "area": self.area, "page": page, "per_page": per_page}
+        data = cast(Dict, json_codec.loads(self._get("employers", params).content))
+        for item in data.get("items", []):
+            self.open_vacancies[int(item["id"])] = item.get("open_vacancies", 0)
+        return data
+
     def get_companies(self, text: str = "IT") -> List[Dict]:
         """Получить список работодателей (компаний) с hh.ru по ключевому слову (по умолчанию "IT")."""
         companies: List[Dict] = []  # Инициализируется пустой список companies.
         page = 0  # Переменная page = 0 — будем ходить по страницам API.
         while len(companies) < 15:
-            url = f"{self.BASE_URL}/employers"  # Формируется URL https://api.hh.ru/employers.
             params: dict[str, str | int] = {
                 "text": text,
                 "area": self.area,
@@ -63,14 +156,15 @@ class HHApi:
             # page → номер страницы
             # per_page = 50 → по 50 компаний за раз.
             try:
-                response = self.session.get(url, params=params, timeout=self.timeout)
-                response.raise_for_status()
+                response = self._get("employers", params)  # Запрос к https://api.hh.ru/employers.
             except requests.exceptions.RequestException as e:
                 print(f"Ошибка при получении компаний: {e}")
                 break
-            data = response.json()  # Если запрос успешен: Берется JSON-ответ data.
+            data = json_codec.loads(response.content)  # Если запрос успешен: Берется JSON-ответ data
+            # (декодируется быстрым бэкендом из json_codec прямо из байтов ответа).
             for item in data.get("items", []):  # Перебираются все компании из data["items"].
                 if item.get("open_vacancies", 0) > 0:  # Если у компании есть открытые вакансии (open_vacancies > 0) →
+                    self.open_vacancies[int(item["id"])] = item["open_vacancies"]
 
                     companies.append({"id": int(item["id"]), "name": item["name"]})  # добавляем словарь
                     # {id, name} в список.
@@ -82,43 +176,245 @@ class HHApi:
         # Возвращается список максимум из 15 компаний.
         return companies[:15]
 
-    def get_vacancies_for_company(self, employer_id: int) -> List[Dict]:
-        """Получить список вакансий для конкретной компании по её employer_id с сайта hh.ru."""
-        vacancies: List[Dict] = []  # Создаётся пустой список vacancies.
-        page = 0  # Устанавливается page = 0 для постраничной загрузки вакансий.
+    def _iter_vacancy_pages(self, employer_id: int, start_page: int = 0, strict: bool = False) -> Iterator[Dict]:
+        """Постранично отдаёт «сырые» ответы /vacancies для компании employer_id, начиная со страницы start_page.
+        При strict=True ошибка запроса пробрасывается, иначе загрузка останавливается на ней."""
+        page = start_page  # Обычно загрузка идёт с page = 0, при продолжении по контрольной точке — с сохранённой.
         while True:  # В бесконечном цикле (while True):
-            url = f"{self.BASE_URL}/vacancies"  # Формируется запрос к API https://api.hh.ru/vacancies с параметрами:
-            params = {
+            params = {  # Формируется запрос к API https://api.hh.ru/vacancies с параметрами:
                 "employer_id": employer_id,  # employer_id → ID работодателя
                 "area": self.area,  # area → регион (по умолчанию Россия = 113)
                 "page": page,  # page → номер страницы
                 "per_page": self.per_page,  # per_page → сколько вакансий брать за один запрос
             }
             try:
-                response = self.session.get(url, params=params, timeout=self.timeout)  # Отправляется GET-запрос
-                # с requests.Session
-                response.raise_for_status()
+                response = self._get("vacancies", params)  # Отправляется GET-запрос с requests.Session
             except requests.exceptions.RequestException as e:
+                if strict:
+                    raise
                 print(f"Ошибка при получении вакансий для компании {employer_id}: {e}")
                 break
-            data = response.json()  # Если запрос успешен → берётся JSON-ответ.
-            for v in data.get("items", []):  # Для каждой вакансии в data["items"]:
-                salary_from, salary_to, currency = safe_get_salary(v.get("salary"))  # Извлекаются зарплата
-                # (from, to, currency) через метод safe_get_salary.
-
-                # Формируется словарь с ключевыми данными и добавляется в список vacancies.:
-                vacancies.append(
-                    {
-                        "vacancy_id": int(v["id"]),  # "vacancy_id": int(v["id"]),
-                        "company_id": employer_id,  # "company_id": employer_id,
-                        "name": v["name"],  # "name": v["name"],
-                        "salary_from": salary_from,  # "salary_from": salary_from,
-                        "salary_to": salary_to,  # "salary_to": salary_to,
-                        "salary_currency": currency,  # "salary_currency": currency,
-                        "url": v["alternate_url"],  # "url": v["alternate_url"]
-                    }
+            data = json_codec.loads(response.content)  # Если запрос успешен → берётся JSON-ответ (через json_codec).
+            if page == start_page and data.get("found", 0) > self.MAX_SEARCH_DEPTH:
+                print(
+                    f"Компания {employer_id}: найдено {data['found']} вакансий, постранично доступны только "
+                    f"{self.MAX_SEARCH_DEPTH} (см. get_vacancies_for_company_partitioned)"
                 )
+            yield data
             if page >= data.get("pages", 1) - 1:  # Если достигнута последняя страница цикл прерывается.
                 break
             page += 1  # Иначе page увеличивается на 1 и цикл продолжается.
+
+    @staticmethod
+    def _parse_vacancy_items(items: List[Dict], employer_id: int) -> List[Dict]:
+        """Вакансии одной страницы ответа в формате словарей для БД и выгрузки."""
+        vacancies: List[Dict] = []
+        for v in items:  # Для каждой вакансии в data["items"]:
+            salary_from, salary_to, currency = safe_get_salary(v.get("salary"))  # Извлекаются зарплата
+            # (from, to, currency) через метод safe_get_salary.
+
+            # Формируется словарь с ключевыми данными и добавляется в список vacancies.:
+            vacancies.append(
+                {
+                    "vacancy_id": int(v["id"]),  # "vacancy_id": int(v["id"]),
+                    "company_id": employer_id,  # "company_id": employer_id,
+                    "name": v["name"],  # "name": v["name"],
+                    "salary_from": salary_from,  # "salary_from": salary_from,
+                    "salary_to": salary_to,  # "salary_to": salary_to,
+                    "salary_currency": currency,  # "salary_currency": currency,
+                    "url": v["alternate_url"],  # "url": v["alternate_url"]
+                }
+            )
+        return vacancies
+
+    def get_vacancies_for_company(
+        self,
+        employer_id: int,
+        start_page: int = 0,
+        on_page: Optional[Callable[[int, int, List[Dict]], None]] = None,
+        strict: bool = False,
+    ) -> List[Dict]:
+        """Получить список вакансий для конкретной компании по её employer_id с сайта hh.ru.
+        :param start_page: с какой страницы начать (продолжение прерванной загрузки)
+        :param on_page: вызывается после каждой страницы как on_page(page, pages, vacancies) —
+            например, для записи контрольной точки (src/checkpoint.py)
+        :param strict: пробрасывать ошибки запросов вместо возврата неполного списка"""
+        vacancies: List[Dict] = []  # Создаётся пустой список vacancies.
+        for page, data in enumerate(self._iter_vacancy_pages(employer_id, start_page, strict), start_page):
+            page_vacancies = self._parse_vacancy_items(data.get("items", []), employer_id)
+            if on_page is not None:
+                on_page(page, data.get("pages", 1), page_vacancies)
+            vacancies.extend(page_vacancies)
         return vacancies
+
+    def _pack_employers(self, employer_ids: List[int], batch_size: int) -> List[List[int]]:
+        """Группы мелких работодателей для общих запросов: в группе не больше batch_size работодателей
+        и (если число вакансий известно) не больше MAX_PER_PAGE вакансий — то есть ровно один запрос."""
+        groups: List[List[int]] = []
+        group: List[int] = []
+        group_total = 0
+        for employer_id in employer_ids:
+            count = self.open_vacancies.get(employer_id, 0)
+            if group and (len(group) >= batch_size or group_total + count > self.MAX_PER_PAGE):
+                groups.append(group)
+                group, group_total = [], 0
+            group.append(employer_id)
+            group_total += count
+        if group:
+            groups.append(group)
+        return groups
+
+    def _fetch_employer_group(self, group: List[int]) -> Optional[Dict[int, List[Dict]]]:
+        """Все вакансии группы работодателей одним поиском (employer_id повторяется в запросе),
+        разложенные по работодателям. Если выдача группы глубже MAX_SEARCH_DEPTH, группа делится пополам;
+        при ошибке запроса возвращает None — вызывающий код загрузит этих работодателей по одному."""
+        items: List[Dict] = []
+        page = 0
+        while True:
+            params = {"employer_id": group, "area": self.area, "page": page, "per_page": self.MAX_PER_PAGE}
+            try:
+                response = self._get("vacancies", params)
+            except requests.exceptions.RequestException as e:
+                print(f"Ошибка при получении вакансий для компаний {group}: {e}")
+                return None
+            data = json_codec.loads(response.content)
+            if page == 0 and len(group) > 1 and data.get("found", 0) > self.MAX_SEARCH_DEPTH:
+                middle = len(group) // 2
+                first = self._fetch_employer_group(group[:middle])
+                second = self._fetch_employer_group(group[middle:])
+                if first is None or second is None:
+                    return None
+                return {**first, **second}
+            items.extend(data.get("items", []))
+            if page >= data.get("pages", 1) - 1:
+                break
+            page += 1
+        by_employer: Dict[int, List[Dict]] = {employer_id: [] for employer_id in group}
+        for item in items:
+            employer_id = int((item.get("employer") or {}).get("id", 0))
+            if employer_id in by_employer:
+                by_employer[employer_id].append(item)
+        return {
+            employer_id: self._parse_vacancy_items(employer_items, employer_id)
+            for employer_id, employer_items in by_employer.items()
+        }
+
+    def _search_window(self, employer_id: int, window: Tuple[Optional[datetime], datetime], page: int) -> Dict:
+        """Страница поиска вакансий работодателя, опубликованных в интервале window = (date_from, date_to).
+        date_from=None — интервал без начала: все вакансии, опубликованные не позже date_to."""
+        date_from, date_to = window
+        params: Dict[str, Any] = {
+            "employer_id": employer_id,
+            "area": self.area,
+            "date_to": date_to.isoformat(timespec="seconds"),
+            "page": page,
+            "per_page": self.MAX_PER_PAGE,
+        }
+        if date_from is not None:
+            params["date_from"] = date_from.isoformat(timespec="seconds")
+        return cast(Dict, json_codec.loads(self._get("vacancies", params).content))
+
+    def get_vacancies_for_company_partitioned(
+        self,
+        employer_id: int,
+        lookback_days: int = 30,
+        workers: int = 4,
+        now: Optional[datetime] = None,
+        on_page: Optional[Callable[[], None]] = None,
+    ) -> List[Dict]:
+        """Все вакансии крупного работодателя в обход ограничения глубины выдачи (MAX_SEARCH_DEPTH).
+        Интервал дат публикации [now - lookback_days, now] делится пополам, пока выдача каждого
+        подынтервала не станет меньше MAX_SEARCH_DEPTH; вакансии, опубликованные раньше этого интервала,
+        запрашиваются отдельным интервалом без начала (он не делится: если и его выдача упирается
+        в MAX_SEARCH_DEPTH, недостача пишется в лог). Затем страницы всех подынтервалов загружаются
+        параллельно (workers потоков), а вакансии на границах интервалов, попавшие в два соседних
+        подынтервала, отбрасываются по vacancy_id.
+        :param on_page: вызывается без аргументов после каждой полученной страницы, в потоке вызывающего
+            кода (не в потоках загрузки) — например, для продления аренды задачи (src/crawl_worker.py)
+        :return: вакансии в формате get_vacancies_for_company, от новых интервалов к старым
+        :raises requests.exceptions.RequestException: если не удался запрос любого из подынтервалов"""
+        now = now or datetime.now(timezone.utc).replace(microsecond=0)
+        start = now - timedelta(days=lookback_days)
+        frontier: List[Tuple[Optional[datetime], datetime]] = [(start, now), (None, start)]
+        leaves: List[Tuple[Tuple[Optional[datetime], datetime], Dict]] = []  # (интервал, первая страница выдачи)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Разбиение по уровням: все интервалы уровня запрашиваются параллельно.
+            while frontier:
+                next_frontier: List[Tuple[Optional[datetime], datetime]] = []
+                first_pages = pool.map(lambda w: self._search_window(employer_id, w, 0), frontier)
+                for window, first in zip(frontier, first_pages):
+                    if on_page is not None:
+                        on_page()
+                    date_from, date_to = window
+                    found = first.get("found", 0)
+                    too_deep = found > self.MAX_SEARCH_DEPTH
+                    if too_deep and date_from is not None and date_to - date_from > MIN_SEARCH_WINDOW:
+                        middle = date_from + (date_to - date_from) / 2
+                        next_frontier += [(middle, date_to), (date_from, middle)]  # Сначала более новые.
+                        continue
+                    if too_deep:  # Дальше делить некуда — выдача этого интервала будет неполной.
+                        since = f"с {date_from:%Y-%m-%d %H:%M}" if date_from else f"до {date_to:%Y-%m-%d %H:%M}"
+                        missing = found - self.MAX_SEARCH_DEPTH
+                        print(f"Компания {employer_id}: неполная выдача за интервал {since}, не получено {missing}")
+                    leaves.append((window, first))
+                frontier = next_frontier
+            leaves.sort(key=lambda leaf: leaf[0][1], reverse=True)  # Концы интервалов не повторяются.
+            # Остальные страницы всех подынтервалов — одной очередью задач.
+            tasks = [(window, page) for window, first in leaves for page in range(1, first.get("pages", 1))]
+            rest = pool.map(lambda task: self._search_window(employer_id, *task), tasks)
+            pages: Dict[Tuple[Optional[datetime], datetime], List[Dict]] = {
+                window: [first] for window, first in leaves
+            }
+            for (window, _), data in zip(tasks, rest):
+                if on_page is not None:
+                    on_page()
+                pages[window].append(data)
+        vacancies: List[Dict] = []
+        seen: Set[int] = set()
+        for window, _ in leaves:
+            for data in pages[window]:
+                for vacancy in self._parse_vacancy_items(data.get("items", []), employer_id):
+                    if vacancy["vacancy_id"] not in seen:
+                        seen.add(vacancy["vacancy_id"])
+                        vacancies.append(vacancy)
+        return vacancies
+
+    def _fetch_employer(self, employer_id: int, partitioned: bool = False) -> Optional[Dict[int, List[Dict]]]:
+        """Все вакансии одного работодателя ({employer_id: вакансии}) или None, если запрос не удался."""
+        try:
+            if partitioned:
+                return {employer_id: self.get_vacancies_for_company_partitioned(employer_id)}
+            return {employer_id: self.get_vacancies_for_company(employer_id, strict=True)}
+        except requests.exceptions.RequestException as e:
+            print(f"Ошибка при получении вакансий для компании {employer_id}: {e}")
+            return None
+
+    def get_vacancies_for_companies(self, employer_ids: Iterable[int], batch_size: int = 20) -> Dict[int, List[Dict]]:
+        """Вакансии нескольких работодателей с минимальным числом запросов: мелкие работодатели
+        (по open_vacancies из get_companies — не больше MAX_PER_PAGE вакансий) объединяются в один поиск
+        /vacancies с несколькими employer_id, крупные и с неизвестным числом вакансий загружаются по одному.
+        :param batch_size: сколько работодателей объединять в один запрос
+        :return: {employer_id: вакансии в формате get_vacancies_for_company}; работодатели, чей запрос
+            завершился ошибкой, в результат не попадают (неполный список не выдаётся за полный)"""
+        ids = list(dict.fromkeys(employer_ids))
+        unknown = self.MAX_PER_PAGE + 1  # Неизвестный работодатель может оказаться крупным.
+        large = [
+            employer_id for employer_id in ids if self.open_vacancies.get(employer_id, unknown) > self.MAX_PER_PAGE
+        ]
+        small = [employer_id for employer_id in ids if employer_id not in large]
+        result: Dict[int, List[Dict]] = {}
+        for group in self._pack_employers(small, batch_size):
+            fetched = self._fetch_employer(group[0]) if len(group) == 1 else self._fetch_employer_group(group)
+            if fetched is not None:
+                result.update(fetched)
+        for employer_id in large:
+            fetched = self._fetch_employer(
+                employer_id, self.open_vacancies.get(employer_id, 0) > self.MAX_SEARCH_DEPTH
+            )
+            if fetched is not None:
+                result.update(fetched)
+        return {employer_id: result[employer_id] for employer_id in ids if employer_id in result}
+
+    def get_vacancy_columns_for_company(self, employer_id: int) -> VacancyColumns:
+        """То же, что get_vacancies_for_company, но все страницы разбираются сразу в колонки (VacancyColumns)."""
+        return parse_vacancy_pages(self._iter_vacancy_pages(employer_id), employer_id=employer_id)
@@ -0,0 +1,122 @@
+# Единая точка кодирования/декодирования JSON для проекта.
+# Использует самый быстрый доступный бэкенд: orjson → msgspec → стандартный json.
+# Бэкенд можно зафиксировать переменной окружения HH_JSON_BACKEND (orjson / msgspec / json).
+
+import datetime
+import json
+import os
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional, Union, cast
+
+BACKENDS = ("orjson", "msgspec", "json")  # Порядок предпочтения бэкендов.
+
+
+def _default(obj: Any) -> Any:
+    """Преобразует типы, которые JSON не умеет сериализовать (NUMERIC из PostgreSQL, даты)."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime.date, datetime.datetime)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(obj: Any, indent: Optional[int] = None) -> bytes:
+    # ensure_ascii=False — кириллица пишется как есть, а не в виде \uXXXX.
+    return json.dumps(obj, ensure_ascii=False, indent=indent, default=_default).encode("utf-8")
+
+
+def _make_orjson() -> Dict[str, Callable]:
+    import orjson
+
+    def dumps(obj: Any, indent: Optional[int] = None) -> bytes:
+        # orjson умеет только отступ в 2 пробела. Другой отступ (например, 4 в data/*.json) пишет stdlib,
+        # чтобы формат файлов не зависел от установленного бэкенда.
+        if indent and indent != 2:
+            return _stdlib_dumps(obj, indent)
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_INDENT_2 if indent else 0)
+
+    # orjson.JSONDecodeError — подкласс json.JSONDecodeError, поэтому ошибки разбора совместимы со stdlib.
+    return {"loads": orjson.loads, "dumps": dumps}
+
+
+def _make_msgspec() -> Dict[str, Callable]:
+    import msgspec  # type: ignore[import-not-found]
+
+    decoder = msgspec.json.Decoder()  # Декодер и энкодер переиспользуются между вызовами.
+    # msgspec сам кодирует Decimal, по умолчанию строкой; NUMERIC из PostgreSQL нужен числом, как у остальных бэкендов.
+    encoder = msgspec.json.Encoder(enc_hook=_default, decimal_format="number")
+
+    def loads(data: Union[bytes, str]) -> Any:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:  # Приводим ошибку к json.JSONDecodeError, как у остальных бэкендов.
+            doc = data.decode("utf-8", "replace") if isinstance(data, bytes) else data
+            raise json.JSONDecodeError(str(e), doc, 0) from e
+
+    def dumps(obj: Any, indent: Optional[int] = None) -> bytes:
+        raw: bytes = encoder.encode(obj)
+        return cast(bytes, msgspec.json.format(raw, indent=indent)) if indent else raw
+
+    return {"loads": loads, "dumps": dumps}
+
+
+def _make_stdlib() -> Dict[str, Callable]:
+    def loads(data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+    return {"loads": loads, "dumps": _stdlib_dumps}
+
+
+_FACTORIES: Dict[str, Callable[[], Dict[str, Callable]]] = {
+    "orjson": _make_orjson,
+    "msgspec": _make_msgspec,
+    "json": _make_stdlib,
+}
+
+# Имя активного бэкенда. None — ещё не выбран: выбор откладывается до первого вызова loads/dumps,
+# чтобы HH_JSON_BACKEND из .env (загружается в main.py после импорта модулей) не игнорировалась.
+BACKEND: Optional[str] = None
+_impl: Dict[str, Callable] = {}
+
+
+def set_backend(name: Optional[str] = None) -> str:
+    """Выбирает JSON-бэкенд. Без аргумента берёт первый установленный из BACKENDS.
+    :param name: orjson, msgspec или json
+    :return: имя выбранного бэкенда"""
+    global BACKEND, _impl
+    candidates = [name] if name else list(BACKENDS)
+    for candidate in candidates:
+        if candidate not in _FACTORIES:
+            raise ValueError(f"Неизвестный JSON-бэкенд: {candidate}")
+        try:
+            _impl = _FACTORIES[candidate]()
+        except ImportError:
+            if name:  # Явно запрошенный, но не установленный бэкенд — это ошибка конфигурации.
+                raise
+            continue
+        BACKEND = candidate
+        break
+    return cast(str, BACKEND)
+
+
+def _active() -> Dict[str, Callable]:
+    """Функции активного бэкенда; при первом обращении выбирает его по HH_JSON_BACKEND."""
+    if BACKEND is None:
+        set_backend(os.getenv("HH_JSON_BACKEND") or None)
+    return _impl
+
+
+def backend() -> str:
+    """Имя активного JSON-бэкенда (выбирает его, если выбор ещё не сделан)."""
+    _active()
+    return cast(str, BACKEND)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Декодирует JSON из bytes или str активным бэкендом."""
+    return _active()["loads"](data)
+
+
+def dumps(obj: Any, indent: Optional[int] = None) -> bytes:
+    """Кодирует объект в JSON (UTF-8 bytes) активным бэкендом."""
+    return cast(bytes, _active()["dumps"](obj, indent))
@@ -0,0 +1,210 @@
+# Встроенные метрики: счётчики и гистограммы с метками, вывод в текстовом формате Prometheus,
+# дамп в файл, HTTP-эндпоинт /metrics и краткая сводка по итогам запуска.
+# Все метрики проекта регистрируются в общем реестре REGISTRY (см. конец модуля).
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+LabelKey = Tuple[Tuple[str, str], ...]  # Отсортированные пары (метка, значение) — ключ серии.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # секунды
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)  # байты или строки
+
+
+def _key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    """Монотонно растущий счётчик (число запросов, ошибок, повторов, записанных строк)."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, value: float = 1, **labels: Any) -> None:
+        key = _key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(_key(labels), 0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(key)} {value:g}" for key, value in sorted(self._values.items())]
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин (задержки, размеры ответов, строки на запрос)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        # Для каждой серии: [счётчики по корзинам..., +Inf], сумма, количество, максимум.
+        self._series: Dict[LabelKey, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0, value]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+            series[3] = max(series[3], value)
+
+    def stats(self, **labels: Any) -> Dict[str, float]:
+        """Количество, сумма, среднее и максимум по серии с метками labels."""
+        series = self._series.get(_key(labels))
+        if series is None:
+            return {"count": 0, "sum": 0.0, "avg": 0.0, "max": 0.0}
+        return {"count": series[2], "sum": series[1], "avg": series[1] / series[2], "max": series[3]}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, (counts, total, count, _) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(list(self.buckets) + [float("inf")], counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', le))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total:g}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Реестр метрик: создание, вывод в формате Prometheus, дамп в файл и сводка."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Union[Counter, Histogram]] = {}
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        metric = Counter(name, help_text)
+        self._metrics[name] = metric
+        return metric
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, buckets)
+        self._metrics[name] = metric
+        return metric
+
+    def reset(self) -> None:
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def render_prometheus(self) -> str:
+        """Все метрики в текстовом формате Prometheus (exposition format 0.0.4)."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: Union[str, Path]) -> None:
+        """Записывает метрики в файл (подходит для node_exporter textfile collector)."""
+        target = Path(path)
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_text(self.render_prometheus(), encoding="utf-8")
+        tmp.replace(target)  # Атомарная замена: сборщик никогда не увидит наполовину записанный файл.
+
+    def summary(self) -> str:
+        """Краткая человекочитаемая сводка: счётчики и среднее/максимум по каждой серии гистограмм."""
+        lines = []
+        for metric in self._metrics.values():
+            if isinstance(metric, Counter):
+                for key, value in sorted(metric._values.items()):
+                    lines.append(f"{metric.name}{_format_labels(key)}: {value:g}")
+            else:
+                for key, (_, total, count, peak) in sorted(metric._series.items()):
+                    lines.append(
+                        f"{metric.name}{_format_labels(key)}: n={count} avg={total / count:.4g} max={peak:.4g}"
+                    )
+        return "\n".join(lines)
+
+
+@contextmanager
+def timer(histogram: Histogram, **labels: Any) -> Iterator[None]:
+    """Замеряет время выполнения блока и записывает его в гистограмму (в том числе при исключении)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start, **labels)
+
+
+def start_http_server(port: int, host: str = "0.0.0.0", registry: Optional[MetricsRegistry] = None) -> Any:
+    """Поднимает в фоновом потоке HTTP-эндпоинт /metrics для Prometheus. Возвращает объект сервера."""
+    # http.server (и за ним email, http.client) нужен только здесь: импорт метрик не замедляет запуск.
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    target = registry or REGISTRY
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - имя задано BaseHTTPRequestHandler
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = target.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+REGISTRY = MetricsRegistry()
+
+# --- HHApi ---
+HTTP_REQUESTS = REGISTRY.counter("hh_api_requests_total", "Запросы к API hh.ru по эндпоинту и статусу")
+HTTP_LATENCY = REGISTRY.histogram("hh_api_request_seconds", "Длительность запросов к API hh.ru")
+HTTP_BYTES = REGISTRY.histogram("hh_api_response_bytes", "Размер ответов API hh.ru", SIZE_BUCKETS)
+HTTP_RETRIES = REGISTRY.counter("hh_api_retries_total", "Повторные попытки запросов к API hh.ru")
+
+# --- DBManager ---
+DB_QUERIES = REGISTRY.counter("db_queries_total", "SQL-запросы DBManager по имени и статусу")
+DB_LATENCY = REGISTRY.histogram("db_query_seconds", "Длительность SQL-запросов DBManager")
+DB_ROWS = REGISTRY.histogram("db_query_rows", "Строк прочитано/записано одним запросом", SIZE_BUCKETS)
+DB_READ_ROUTES = REGISTRY.counter("db_read_routes_total", "Чтения DBManager по серверу: реплика или основной")
+
+# --- Экспорт в файлы ---
+EXPORT_LATENCY = REGISTRY.histogram("export_seconds", "Длительность экспорта в файл по формату")
+EXPORT_ROWS = REGISTRY.counter("export_rows_total", "Строк выгружено в файлы по формату")
+EXPORT_BYTES = REGISTRY.counter("export_bytes_total", "Байт записано в файлы по формату")
@@ -0,0 +1,102 @@
+# Вывод списков вакансий в консоль (меню main.py и python main.py --query). Строки читаются из VacancyCursor
+# (Storage.open_vacancy_cursor) пачками, форматируются целиком и пишутся в поток одним вызовом write:
+# на 100 000 вакансий — сотня записей в терминал вместо ста тысяч print. VacancyPager показывает список
+# страницами: первая страница появляется сразу, без чтения всего результата, а число строк для строки
+# состояния считается отдельно (на сервере, без передачи строк).
+
+import sys
+from typing import Callable, Dict, Iterable, Optional, TextIO
+
+from src.services import format_vacancy
+from src.storage import VacancyCursor
+
+PAGER_PROMPT = "Enter/n — дальше, p — назад, номер — к странице, q — выход: "
+
+
+def format_rows(rows: Iterable[Dict], formatter: Callable[[Dict], str] = format_vacancy) -> str:
+    """Строки списка одним текстом, по строке на вакансию."""
+    return "".join(formatter(row) + "\n" for row in rows)
+
+
+def write_vacancies(
+    cursor: VacancyCursor,
+    out: Optional[TextIO] = None,
+    batch_size: int = 1000,
+    formatter: Callable[[Dict], str] = format_vacancy,
+) -> int:
+    """Печатает все строки курсора в out (по умолчанию stdout) пачками по batch_size. Возвращает число строк."""
+    out = out or sys.stdout
+    written = 0
+    for rows in cursor.iter_batches(batch_size):
+        out.write(format_rows(rows, formatter))
+        written += len(rows)
+    out.flush()
+    return written
+
+
+class VacancyPager:
+    """Постраничный просмотр списка вакансий.
+
+    with db.open_vacancy_cursor("all") as cursor:
+        VacancyPager(cursor, page_size=20).run()
+    """
+
+    def __init__(
+        self,
+        cursor: VacancyCursor,
+        page_size: int = 20,
+        out: Optional[TextIO] = None,
+        read: Optional[Callable[[str], str]] = None,
+        formatter: Callable[[Dict], str] = format_vacancy,
+    ):
+        """
+        :param read: чтение команды пользователя (по умолчанию input)
+        """
+        self.cursor = cursor
+        self.page_size = max(page_size, 1)
+        self.out = out or sys.stdout
+        self.read = read or input
+        self.formatter = formatter
+
+    @property
+    def pages(self) -> int:
+        return max(1, -(-self.cursor.count() // self.page_size))
+
+    def show(self, page: int) -> int:
+        """Печатает страницу page (с нуля) и строку состояния. Возвращает число строк на странице."""
+        rows = self.cursor.fetch(page * self.page_size, self.page_size)
+        self.out.write(format_rows(rows, self.formatter))
+        self.out.flush()  # Строки видны до того, как посчитано их общее число.
+        if rows:
+            self.out.write(f"--- Страница {page + 1} из {self.pages}, вакансий {self.cursor.count()} ---\n")
+            self.out.flush()
+        return len(rows)
+
+    def run(self) -> int:
+        """Показывает первую страницу и листает список по командам до q.
+        Возвращает число строк списка (0 — список пуст, ничего не выведено)."""
+        page = 0
+        if not self.show(page):
+            return 0
+        while True:
+            try:
+                command = self.read(PAGER_PROMPT).strip().lower()
+            except (EOFError, KeyboardInterrupt):  # Ctrl+D / Ctrl+C или закрытый stdin — как команда q.
+                self.out.write("\n")
+                command = "q"
+            if command == "q":
+                return self.cursor.count()
+            if command in ("", "n"):
+                target = page + 1
+            elif command == "p":
+                target = page - 1
+            elif command.isdigit():
+                target = int(command) - 1
+            else:
+                self.out.write("Некорректная команда.\n")
+                continue
+            if not 0 <= target < self.pages:
+                self.out.write(f"Нет страницы {target + 1}: всего страниц {self.pages}.\n")
+                continue
+            page = target
+            self.show(page)
@@ -0,0 +1,129 @@
+# Общие для всех хранилищ запросы чтения: DBManager, AsyncDBManager и SQLiteManager (через схему hh_schema)
+# выполняют одни и те же SELECT. Модуль не зависит от драйвера БД, поэтому SQLite-хранилище и короткие
+# запросы из main.py --query не загружают psycopg2. Запросы в синтаксисе psycopg2 (плейсхолдеры %s).
+
+SQL_VACANCY_CHANGES = """
+    SELECT change_id, vacancy_id, changed_at, changes
+    FROM hh_schema.vacancy_changes
+    WHERE vacancy_id = %s
+    ORDER BY changed_at, change_id;
+    """
+
+# Дневной снимок зарплат по компании и валюте (hh_schema.salary_daily) за дату %s. Снимки пишутся только
+# добавлением в конец по дате, поэтому BRIN-индекс по snapshot_date крошечный и при этом отсекает всё,
+# что не попадает в запрошенный период.
+SQL_RECORD_SALARY_SNAPSHOT = """
+    INSERT INTO hh_schema.salary_daily
+    (snapshot_date, company_id, salary_currency, vacancies_count, salary_count, avg_salary, min_salary, max_salary)
+    SELECT %s, company_id, COALESCE(salary_currency, ''), COUNT(*), COUNT(salary),
+           AVG(salary), MIN(salary), MAX(salary)
+    FROM (
+        SELECT company_id, salary_currency,
+               (COALESCE(salary_from, salary_to) + COALESCE(salary_to, salary_from))/2.0 AS salary
+        FROM hh_schema.vacancies
+        WHERE company_id IS NOT NULL
+    ) v
+    GROUP BY company_id, COALESCE(salary_currency, '')
+    ON CONFLICT (snapshot_date, company_id, salary_currency) DO UPDATE
+    SET vacancies_count = EXCLUDED.vacancies_count,
+        salary_count = EXCLUDED.salary_count,
+        avg_salary = EXCLUDED.avg_salary,
+        min_salary = EXCLUDED.min_salary,
+        max_salary = EXCLUDED.max_salary;
+    """
+
+# Средняя по дню взвешивается числом вакансий с зарплатой; скользящее среднее — по последним N снимкам.
+SQL_SALARY_TREND = """
+    SELECT snapshot_date, vacancies_count, avg_salary,
+           AVG(avg_salary) OVER (ORDER BY snapshot_date ROWS BETWEEN %s::int PRECEDING AND CURRENT ROW) AS moving_avg,
+           avg_salary - LAG(avg_salary) OVER (ORDER BY snapshot_date) AS delta
+    FROM (
+        SELECT snapshot_date, SUM(vacancies_count) AS vacancies_count,
+               SUM(avg_salary * salary_count) / NULLIF(SUM(salary_count), 0) AS avg_salary
+        FROM hh_schema.salary_daily
+        WHERE salary_currency = %s
+          AND snapshot_date >= %s::date
+          AND (%s::bigint IS NULL OR company_id = %s)
+        GROUP BY snapshot_date
+    ) d
+    ORDER BY snapshot_date;
+    """
+
+SQL_COMPANIES_AND_VACANCIES_COUNT = """
+    SELECT c.company_id, c.name, COUNT(v.vacancy_id) AS vacancies_count
+    FROM hh_schema.companies c
+    LEFT JOIN hh_schema.vacancies v ON c.company_id = v.company_id
+    GROUP BY c.company_id, c.name
+    ORDER BY vacancies_count DESC;
+    """
+
+SQL_ALL_VACANCIES = """
+    SELECT v.vacancy_id, c.name AS company, v.name AS vacancy,
+           v.salary_from, v.salary_to, v.salary_currency, v.url
+    FROM hh_schema.vacancies v
+    JOIN hh_schema.companies c ON v.company_id = c.company_id
+    ORDER BY v.vacancy_id;
+    """
+
+# Выгрузка вакансий в файлы: те же поля, что в data/vacancies.json (формат parse_vacancy).
+SQL_EXPORT_VACANCIES = """
+    SELECT vacancy_id, company_id, name, salary_from, salary_to, salary_currency, url
+    FROM hh_schema.vacancies
+    ORDER BY vacancy_id;
+    """
+
+SQL_VACANCIES_PAGE = """
+    SELECT v.vacancy_id, c.name AS company, v.name AS vacancy,
+           v.salary_from, v.salary_to, v.salary_currency, v.url
+    FROM hh_schema.vacancies v
+    JOIN hh_schema.companies c ON v.company_id = c.company_id
+    WHERE v.vacancy_id > %s
+    ORDER BY v.vacancy_id
+    LIMIT %s;
+    """
+
+SQL_COUNT_VACANCIES = """
+    SELECT COUNT(*) FROM hh_schema.vacancies;
+    """
+
+SQL_VACANCIES_BY_IDS = """
+    SELECT v.vacancy_id, c.name AS company, v.name AS vacancy,
+           v.salary_from, v.salary_to, v.salary_currency, v.url
+    FROM hh_schema.vacancies v
+    JOIN hh_schema.companies c ON v.company_id = c.company_id
+    WHERE v.vacancy_id = ANY(%s::bigint[])
+    ORDER BY v.vacancy_id;
+    """
+
+SQL_VACANCIES_BY_COMPANY = """
+    SELECT v.vacancy_id, c.name AS company, v.name AS vacancy,
+           v.salary_from, v.salary_to, v.salary_currency, v.url
+    FROM hh_schema.vacancies v
+    JOIN hh_schema.companies c ON v.company_id = c.company_id
+    WHERE v.company_id = %s
+    ORDER BY v.vacancy_id;
+    """
+
+SQL_AVG_SALARY = """
+    SELECT AVG((COALESCE(salary_from, salary_to) + COALESCE(salary_to, salary_from))/2.0) AS avg_salary
+    FROM hh_schema.vacancies
+    WHERE salary_from IS NOT NULL OR salary_to IS NOT NULL;
+    """
+
+SQL_VACANCIES_WITH_HIGHER_SALARY = """
+    SELECT v.vacancy_id, c.name AS company, v.name AS vacancy,
+           v.salary_from, v.salary_to, v.salary_currency, v.url
+    FROM hh_schema.vacancies v
+    JOIN hh_schema.companies c ON v.company_id = c.company_id
+    WHERE ((COALESCE(v.salary_from, v.salary_to) + COALESCE(v.salary_to, v.salary_from))/2.0) > %s
+    ORDER BY ((COALESCE(v.salary_from, v.salary_to) + COALESCE(v.salary_to, v.salary_from))/2.0) DESC;
+    """
+
+SQL_VACANCIES_WITH_KEYWORD = """
+    SELECT v.vacancy_id, c.name AS company, v.name AS vacancy,
+           v.salary_from, v.salary_to, v.salary_currency, v.url
+    FROM hh_schema.vacancies v
+    JOIN hh_schema.companies c ON v.company_id = c.company_id
+    WHERE v.name ILIKE %s
+    ORDER BY v.vacancy_id;
+    """
@@ -0,0 +1,128 @@
+# Режим профилирования запросов DBManager: длительность и число строк каждого SQL-запроса,
+# пометка медленных запросов и (по желанию) захват плана EXPLAIN (ANALYZE, BUFFERS) для них в лог.
+
+import re
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Sequence, Union
+
+from src import json_codec
+
+# Планы снимаются только для запросов, начинающихся с SELECT или WITH. EXPLAIN ANALYZE выполняет запрос
+# повторно, поэтому если в нём есть изменение данных (WITH ... UPDATE/DELETE, SELECT pg_notify, nextval),
+# план снимается без ANALYZE.
+_READ_ONLY_PREFIXES = ("select", "with")
+_WRITES = re.compile(r"\b(insert|update|delete|merge|pg_notify|nextval|setval)\b", re.IGNORECASE)
+
+
+@dataclass
+class QueryRecord:
+    """Одна запись профиля: какой запрос, сколько длился, сколько строк, медленный ли и его план."""
+
+    query: str  # имя запроса (имя метода DBManager)
+    started_at: str  # время начала, ISO 8601 UTC
+    duration_ms: float
+    rows: int  # cursor.rowcount (-1, если драйвер не знает)
+    slow: bool
+    sql: Optional[str] = None  # текст SQL сохраняется только для медленных запросов
+    plan: Optional[str] = None
+
+
+class QueryProfiler:
+    """Собирает профиль SQL-запросов DBManager.
+    :param slow_threshold_ms: порог (мс), начиная с которого запрос считается медленным
+    :param explain: снимать EXPLAIN (ANALYZE, BUFFERS) для медленных SELECT-запросов (для изменяющих данные — EXPLAIN
+        без ANALYZE)
+    :param log_path: файл (JSON Lines), куда пишутся медленные запросы с планами; без него — вывод в консоль
+    :param keep: сколько последних записей хранить в памяти"""
+
+    def __init__(
+        self,
+        slow_threshold_ms: float = 100.0,
+        explain: bool = False,
+        log_path: Optional[Union[str, Path]] = None,
+        keep: int = 1000,
+    ):
+        self.slow_threshold_ms = slow_threshold_ms
+        self.explain = explain
+        self.log_path = Path(log_path) if log_path else None
+        self.records: Deque[QueryRecord] = deque(maxlen=keep)
+        # Накопленная статистика по имени запроса не ограничена размером records.
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def record(
+        self, cur: Any, query: str, sql: str, params: Optional[Sequence[Any]], duration: float, rows: int
+    ) -> QueryRecord:
+        """Регистрирует выполненный запрос. Вызывается DBManager._execute сразу после cur.execute,
+        пока курсор и соединение ещё открыты (план снимается через отдельный курсор того же соединения)."""
+        duration_ms = duration * 1000
+        slow = duration_ms >= self.slow_threshold_ms
+        entry = QueryRecord(
+            query=query,
+            started_at=(datetime.now(timezone.utc) - timedelta(seconds=duration)).isoformat(timespec="milliseconds"),
+            duration_ms=round(duration_ms, 3),
+            rows=rows,
+            slow=slow,
+        )
+        if slow:
+            entry.sql = " ".join(sql.split())  # SQL в одну строку, чтобы лог читался построчно.
+            if self.explain and entry.sql.lower().startswith(_READ_ONLY_PREFIXES):
+                entry.plan = self._explain(cur, sql, params)
+            self._log(entry)
+        self.records.append(entry)
+
+        stats = self._stats.setdefault(query, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0, "slow": 0})
+        stats["count"] += 1
+        stats["total_ms"] += duration_ms
+        stats["max_ms"] = max(stats["max_ms"], duration_ms)
+        stats["rows"] += max(rows, 0)
+        stats["slow"] += slow
+        return entry
+
+    def _explain(self, cur: Any, sql: str, params: Optional[Sequence[Any]]) -> Optional[str]:
+        """Снимает план на отдельном курсоре, не трогая результат основного. EXPLAIN выполняется внутри точки
+        сохранения, которая затем откатывается: ни его изменения, ни его ошибка не попадают в транзакцию
+        вызывающего кода (иначе её commit молча превратился бы в откат)."""
+        explain = "EXPLAIN " if _WRITES.search(sql) else "EXPLAIN (ANALYZE, BUFFERS) "
+        try:
+            with cur.connection.cursor() as explain_cur:
+                explain_cur.execute("SAVEPOINT hh_explain")
+                try:
+                    explain_cur.execute(explain + sql, params)
+                    return "\n".join(row[0] for row in explain_cur.fetchall())
+                finally:
+                    explain_cur.execute("ROLLBACK TO SAVEPOINT hh_explain")
+                    explain_cur.execute("RELEASE SAVEPOINT hh_explain")
+        except Exception as e:  # Профилирование не должно ломать сам запрос.
+            return f"EXPLAIN не выполнен: {e}"
+
+    def _log(self, entry: QueryRecord) -> None:
+        if self.log_path is None:
+            print(f"Медленный запрос {entry.query}: {entry.duration_ms:.1f} мс, строк: {entry.rows}")
+            if entry.plan:
+                print(entry.plan)
+            return
+        with open(self.log_path, "ab") as f:  # JSON Lines: одна запись — одна строка.
+            f.write(json_codec.dumps(asdict(entry)) + b"\n")
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Статистика по именам запросов: count, total_ms, avg_ms, max_ms, rows, slow."""
+        return {
+            query: dict(values, avg_ms=values["total_ms"] / values["count"]) for query, values in self._stats.items()
+        }
+
+    def slow_queries(self) -> List[QueryRecord]:
+        """Медленные запросы среди последних сохранённых записей."""
+        return [r for r in self.records if r.slow]
+
+    def report(self) -> str:
+        """Таблица по запросам, отсортированная по суммарному времени."""
+        lines = [f"{'запрос':<36} {'вызовов':>8} {'всего, мс':>10} {'сред., мс':>10} {'макс., мс':>10} {'медл.':>6}"]
+        for query, s in sorted(self.stats().items(), key=lambda item: -item[1]["total_ms"]):
+            lines.append(
+                f"{query:<36} {s['count']:>8.0f} {s['total_ms']:>10.1f} {s['avg_ms']:>10.2f} "
+                f"{s['max_ms']:>10.2f} {s['slow']:>6.0f}"
+            )
+        return "\n".join(lines)
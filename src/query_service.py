@@ -0,0 +1,312 @@
+# Лёгкий HTTP/JSON-сервис только для чтения поверх отчётов DBManager (для внутренних дашбордов).
+# Эндпоинты:
+#   GET /vacancies?limit=100&after=0          — страница вакансий (keyset-пагинация, next_after в ответе)
+#   GET /vacancies/stream                     — все вакансии потоком (NDJSON, chunked, серверный курсор)
+#   GET /vacancies/search?keyword=python      — поиск по названию
+#   GET /vacancies/above-average              — вакансии с зарплатой выше средней
+#   GET /companies                            — компании с количеством вакансий
+#   GET /salary/avg                           — средняя зарплата
+#   GET /reports?names=avg_salary,companies_and_vacancies_count — несколько отчётов за одно обращение к БД
+#   GET /health                               — проверка живости (без обращения к БД)
+# Соединения с БД берутся из пула DBManager, ответы кэшируются на cache_ttl секунд с ETag
+# (If-None-Match → 304), тела больше 1 КБ сжимаются gzip, если клиент это поддерживает.
+# Запуск: python -m src.query_service (параметры БД — те же переменные DB_* из .env, что и у main.py).
+
+import gzip
+import hashlib
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import psycopg2
+from dotenv import load_dotenv
+
+from src import json_codec
+from src.db_manager import DBConfig, DBManager, parse_replicas
+
+GZIP_MIN_SIZE = 1024  # Маленькие ответы не сжимаем: выигрыш меньше накладных расходов.
+MAX_PAGE_SIZE = 1000
+
+
+class BadRequest(Exception):
+    """Некорректные параметры запроса → 400."""
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    expires: float  # time.monotonic(), после которого запись устарела
+    gzipped: Optional[bytes] = None  # сжатая версия создаётся при первом запросе с Accept-Encoding: gzip
+
+
+class ResponseCache:
+    """LRU-кэш готовых JSON-ответов с ограничением по времени жизни и числу записей."""
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, body: bytes) -> CachedResponse:
+        entry = CachedResponse(body=body, etag=make_etag(body), expires=time.monotonic() + self.ttl)
+        if self.ttl <= 0:  # Кэш выключен — ответ всё равно получает ETag.
+            return entry
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def make_etag(body: bytes) -> str:
+    """Сильный ETag по содержимому ответа."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _int_param(query: Dict[str, str], name: str, default: int, low: int, high: int) -> int:
+    raw = query.get(name)
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise BadRequest(f"Параметр {name} должен быть целым числом")
+    if not low <= value <= high:
+        raise BadRequest(f"Параметр {name} должен быть в диапазоне {low}..{high}")
+    return value
+
+
+def _vacancies_page(db: DBManager, query: Dict[str, str]) -> Any:
+    limit = _int_param(query, "limit", 100, 1, MAX_PAGE_SIZE)
+    after = _int_param(query, "after", 0, 0, 2**63 - 1)
+    items = db.get_vacancies_page(limit=limit, after_id=after)
+    next_after = items[-1]["vacancy_id"] if len(items) == limit else None
+    return {"items": items, "next_after": next_after}
+
+
+def _search(db: DBManager, query: Dict[str, str]) -> Any:
+    keyword = query.get("keyword", "").strip()
+    if not keyword:
+        raise BadRequest("Не задан параметр keyword")
+    return db.get_vacancies_with_keyword(keyword)
+
+
+def _find(db: DBManager, query: Dict[str, str]) -> Any:
+    text = query.get("q", "").strip()
+    if not text:
+        raise BadRequest("Не задан параметр q")
+    mode = query.get("mode", "and")
+    if mode not in ("and", "or"):
+        raise BadRequest("Параметр mode должен быть and или or")
+    return db.search_vacancies(text, mode=mode, limit=_int_param(query, "limit", 100, 1, MAX_PAGE_SIZE))
+
+
+def _reports(db: DBManager, query: Dict[str, str]) -> Any:
+    names = [name for name in query.get("names", "").split(",") if name]
+    try:
+        if not names:
+            return db.get_reports(keyword=query.get("keyword"))
+        return db.get_reports(names, keyword=query.get("keyword"))
+    except ValueError as e:
+        raise BadRequest(str(e))
+
+
+# Маршруты JSON-отчётов: путь → функция (db, параметры запроса) → данные ответа.
+ROUTES: Dict[str, Callable[[DBManager, Dict[str, str]], Any]] = {
+    "/vacancies": _vacancies_page,
+    "/vacancies/search": _search,
+    "/vacancies/find": _find,
+    "/vacancies/above-average": lambda db, query: db.get_vacancies_with_higher_salary(),
+    "/companies": lambda db, query: db.get_companies_and_vacancies_count(),
+    "/salary/avg": lambda db, query: {"avg_salary": db.get_avg_salary()},
+    "/reports": _reports,
+}
+STREAM_PATH = "/vacancies/stream"
+
+
+class QueryService:
+    """HTTP-сервис отчётов. Одновременно к БД обращаются не больше max_connections потоков —
+    столько же соединений держит пул DBManager; остальные запросы ждут своей очереди."""
+
+    def __init__(self, db_config: DBConfig, max_connections: int = 10, cache_ttl: float = 30.0):
+        self.db = DBManager(db_config, max_connections=max_connections)
+        self.cache = ResponseCache(ttl=cache_ttl)
+        self.cache_ttl = cache_ttl
+        self._db_slots = threading.BoundedSemaphore(max_connections)
+
+    def query(self, path: str, query: Dict[str, str]) -> CachedResponse:
+        """Готовый (возможно, закэшированный) JSON-ответ для маршрута path."""
+        key = path + "?" + "&".join(f"{k}={v}" for k, v in sorted(query.items()))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        with self._db_slots:
+            data = ROUTES[path](self.db, query)
+        return self.cache.put(key, json_codec.dumps(data))
+
+    def make_server(self, host: str = "127.0.0.1", port: int = 8080) -> ThreadingHTTPServer:
+        server = ThreadingHTTPServer((host, port), make_handler(self))
+        server.daemon_threads = True
+        return server
+
+    def close(self) -> None:
+        self.db.close()
+
+
+def make_handler(service: QueryService) -> type:
+    """Класс обработчика запросов, привязанный к сервису."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self) -> None:  # noqa: N802 - имя задано BaseHTTPRequestHandler
+            parsed = urlparse(self.path)
+            query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+            try:
+                if parsed.path == "/health":
+                    self._send_json(200, b'{"status": "ok"}')
+                elif parsed.path == STREAM_PATH:
+                    self._stream_vacancies(query)
+                elif parsed.path in ROUTES:
+                    self._send_cached(service.query(parsed.path, query))
+                else:
+                    self._send_json(404, json_codec.dumps({"error": "not found"}))
+            except BadRequest as e:
+                self._send_json(400, json_codec.dumps({"error": str(e)}))
+            except psycopg2.Error as e:
+                self._send_json(503, json_codec.dumps({"error": f"database error: {e.__class__.__name__}"}))
+
+        def _accepts_gzip(self) -> bool:
+            return "gzip" in self.headers.get("Accept-Encoding", "")
+
+        def _send_json(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_cached(self, entry: CachedResponse) -> None:
+            headers = {
+                "ETag": entry.etag,
+                "Cache-Control": f"max-age={int(service.cache_ttl)}",
+                "Vary": "Accept-Encoding",
+            }
+            if entry.etag in self.headers.get("If-None-Match", ""):
+                self.send_response(304)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                return
+            body = entry.body
+            if self._accepts_gzip() and len(body) >= GZIP_MIN_SIZE:
+                if entry.gzipped is None:
+                    entry.gzipped = gzip.compress(body, compresslevel=5)
+                body = entry.gzipped
+                headers["Content-Encoding"] = "gzip"
+            self._send_json(200, body, headers)
+
+        def _write_chunk(self, data: bytes) -> None:
+            if data:
+                self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+
+        def _stream_vacancies(self, query: Dict[str, str]) -> None:
+            """Все вакансии построчно в NDJSON: строки читаются серверным курсором и сразу уходят клиенту."""
+            batch_size = _int_param(query, "batch", 1000, 1, 10_000)
+            compressor = zlib.compressobj(5, zlib.DEFLATED, 31) if self._accepts_gzip() else None  # 31 — gzip
+            with service._db_slots:
+                batches = service.db.iter_all_vacancies(batch_size=batch_size)
+                try:
+                    batch = next(batches, [])  # Ошибка БД проявится до отправки заголовков → корректный 503.
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    if compressor:
+                        self.send_header("Content-Encoding", "gzip")
+                    self.end_headers()
+                    try:
+                        while batch:
+                            data = b"".join(json_codec.dumps(row) + b"\n" for row in batch)
+                            self._write_chunk(compressor.compress(data) if compressor else data)
+                            batch = next(batches, [])
+                    except psycopg2.Error:
+                        # Заголовки 200 уже ушли, и 503 в тело не запишешь: соединение закрывается без
+                        # завершающего чанка, чтобы клиент увидел неполную выдачу, а не конец потока.
+                        self.close_connection = True
+                        return
+                finally:
+                    batches.close()  # Если клиент отключился, серверный курсор и соединение освобождаются сразу.
+            if compressor:
+                self._write_chunk(compressor.flush())
+            self.wfile.write(b"0\r\n\r\n")
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return Handler
+
+
+def config_from_env() -> Tuple[DBConfig, str, int, int, float]:
+    """Параметры БД и сервиса из переменных окружения (.env)."""
+    load_dotenv(encoding="utf-8")
+    db_config = DBConfig(
+        name=os.getenv("DB_NAME", "hh_db"),
+        user=os.getenv("DB_USER", "postgres"),
+        password=os.getenv("DB_PASSWORD", "postgres"),
+        host=os.getenv("DB_HOST", "localhost"),
+        port=int(os.getenv("DB_PORT", 5432)),
+        replicas=parse_replicas(os.getenv("DB_REPLICAS")),
+        max_replica_lag=float(os.getenv("DB_MAX_REPLICA_LAG", 30)),
+    )
+    return (
+        db_config,
+        os.getenv("QUERY_SERVICE_HOST", "127.0.0.1"),
+        int(os.getenv("QUERY_SERVICE_PORT", 8080)),
+        int(os.getenv("QUERY_SERVICE_DB_CONNECTIONS", 10)),
+        float(os.getenv("QUERY_SERVICE_CACHE_TTL", 30)),
+    )
+
+
+def main() -> None:
+    db_config, host, port, connections, cache_ttl = config_from_env()
+    service = QueryService(db_config, max_connections=connections, cache_ttl=cache_ttl)
+    server = service.make_server(host, port)
+    print(f"Сервис запросов слушает http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
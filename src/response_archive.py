@@ -0,0 +1,187 @@
+# Архив «сырых» ответов API hh.ru: HHApi(archive=...) дописывает тело каждого успешного ответа в сжатые
+# сегменты (segment-00000.gz, ...), а в index.jsonl — строку с эндпоинтом, параметрами запроса и положением
+# ответа в сегменте. Архив только дополняется; каждый ответ — отдельный член gzip, поэтому читается
+# по смещению без распаковки соседних. replay_archive прогоняет архив через тот же разбор (HHApi,
+# safe_get_salary) и загрузку в БД (sync_vacancies), что и обычный сбор, но без сети — со скоростью диска:
+# после изменения разбора или новой колонки набор данных пересобирается без повторного обхода hh.ru.
+
+import gzip
+import json
+import os
+import threading
+import time
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from src import json_codec
+
+INDEX_FILE = "index.jsonl"
+
+
+def request_key(endpoint: str, params: Dict[str, Any]) -> str:
+    """Ключ запроса: эндпоинт и параметры в каноническом виде (порядок параметров не важен)."""
+    return endpoint + "?" + json.dumps(params, sort_keys=True, ensure_ascii=False)
+
+
+class ResponseArchive:
+    """Архив ответов API в каталоге path.
+
+    archive = ResponseArchive("data/archive")
+    HHApi(archive=archive).get_companies("python")   # ответы попадают в архив
+    archive.get("employers", {...})                  # тело ответа по параметрам запроса
+    replay_archive(archive, db)                      # повторная загрузка в БД без сети
+
+    Строка index.jsonl: {"endpoint", "params", "segment", "offset", "length", "fetched_at"}.
+    Оборванная при падении последняя строка индекса отрезается при открытии; ответы, записанные
+    в сегмент, но не попавшие в индекс, просто не читаются."""
+
+    def __init__(self, path: Union[str, Path] = "data/archive", segment_bytes: int = 64 << 20, compresslevel: int = 6):
+        """
+        :param segment_bytes: размер сегмента, после которого ответы пишутся в следующий
+        :param compresslevel: уровень сжатия gzip (1 — быстрее, 9 — компактнее)
+        """
+        self.path = Path(path)
+        self.segment_bytes = segment_bytes
+        self.compresslevel = compresslevel
+        self.entries: List[Dict[str, Any]] = []
+        self._latest: Dict[str, int] = {}  # ключ запроса → номер последней записи в entries
+        self._lock = threading.Lock()  # HHApi пишет из нескольких потоков (get_vacancies_for_company_partitioned).
+        if (self.path / INDEX_FILE).exists():
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.path / f"segment-{segment:05d}.gz"
+
+    def _load(self) -> None:
+        sizes: Dict[int, int] = {}
+        valid = 0
+        with open(self.path / INDEX_FILE, "rb+") as f:
+            for line in f:
+                try:
+                    entry = json_codec.loads(line)
+                except ValueError:
+                    f.truncate(valid)  # Недописанная строка: новые записи не должны оказаться после мусора.
+                    break
+                valid += len(line)
+                segment = entry["segment"]
+                if segment not in sizes:
+                    path = self._segment_path(segment)
+                    sizes[segment] = path.stat().st_size if path.exists() else 0
+                if entry["offset"] + entry["length"] <= sizes[segment]:
+                    self._add(entry)
+
+    def _add(self, entry: Dict[str, Any]) -> None:
+        self._latest[request_key(entry["endpoint"], entry["params"])] = len(self.entries)
+        self.entries.append(entry)
+
+    def record(self, endpoint: str, params: Dict[str, Any], content: bytes) -> None:
+        """Дописывает тело ответа в текущий сегмент и строку в индекс."""
+        blob = gzip.compress(content, compresslevel=self.compresslevel, mtime=0)
+        with self._lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            segment = self.entries[-1]["segment"] if self.entries else 0
+            current = self._segment_path(segment)
+            if current.exists() and os.path.getsize(current) >= self.segment_bytes:
+                segment += 1
+            with open(self._segment_path(segment), "ab") as f:
+                offset = f.tell()
+                f.write(blob)
+            entry = {
+                "endpoint": endpoint,
+                "params": params,
+                "segment": segment,
+                "offset": offset,
+                "length": len(blob),
+                "fetched_at": round(time.time(), 3),
+            }
+            with open(self.path / INDEX_FILE, "ab") as f:
+                f.write(json_codec.dumps(entry) + b"\n")
+            self._add(entry)
+
+    def read(self, entry: Dict[str, Any]) -> bytes:
+        """Тело ответа по строке индекса."""
+        with open(self._segment_path(entry["segment"]), "rb") as f:
+            f.seek(entry["offset"])
+            return gzip.decompress(f.read(entry["length"]))
+
+    def get(self, endpoint: str, params: Dict[str, Any]) -> Optional[bytes]:
+        """Последний сохранённый ответ на такой же запрос или None."""
+        index = self._latest.get(request_key(endpoint, params))
+        return None if index is None else self.read(self.entries[index])
+
+    def iter_responses(self, endpoint: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, Any], bytes]]:
+        """Все ответы (или только ответы endpoint) в порядке записи: (эндпоинт, параметры, тело).
+        Каждый сегмент открывается один раз и читается последовательно."""
+        entries = [entry for entry in self.entries if endpoint is None or entry["endpoint"] == endpoint]
+        for segment, group in groupby(entries, key=lambda entry: entry["segment"]):
+            with open(self._segment_path(segment), "rb") as f:
+                for entry in group:
+                    f.seek(entry["offset"])
+                    yield entry["endpoint"], entry["params"], gzip.decompress(f.read(entry["length"]))
+
+
+def _employer_ids(params: Dict[str, Any]) -> List[int]:
+    value = params.get("employer_id")
+    if value is None:
+        return []
+    return [int(v) for v in value] if isinstance(value, list) else [int(value)]
+
+
+def iter_archived_companies(archive: ResponseArchive) -> Iterator[Dict]:
+    """Компании с открытыми вакансиями из ответов /employers (как HHApi.get_companies), без повторов."""
+    seen = set()
+    for _, _, content in archive.iter_responses("employers"):
+        for item in json_codec.loads(content).get("items", []):
+            company_id = int(item["id"])
+            if item.get("open_vacancies", 0) > 0 and company_id not in seen:
+                seen.add(company_id)
+                yield {"id": company_id, "name": item["name"]}
+
+
+def iter_archived_vacancies(archive: ResponseArchive) -> Iterator[List[Dict]]:
+    """Вакансии каждого ответа /vacancies, разобранные HHApi._parse_vacancy_items. Работодатель вакансии
+    берётся из параметров запроса, а для общих запросов по нескольким employer_id — из самой вакансии."""
+    from src.hh_api import HHApi  # Разбор вакансий тот же, что при сборе; requests нужен только здесь.
+
+    for _, params, content in archive.iter_responses("vacancies"):
+        employers = _employer_ids(params)
+        vacancies: List[Dict] = []
+        for item in json_codec.loads(content).get("items", []):
+            employer_id = int((item.get("employer") or {}).get("id", 0))
+            if employer_id not in employers:
+                if len(employers) != 1:
+                    continue  # Вакансия чужого работодателя — так же отбрасывается при сборе.
+                employer_id = employers[0]
+            vacancies.extend(HHApi._parse_vacancy_items([item], employer_id))
+        yield vacancies
+
+
+def replay_archive(archive: ResponseArchive, db: Any, batch_size: int = 5000) -> Dict[str, int]:
+    """Загружает в БД компании и вакансии из архива тем же путём, что и обычный сбор (insert_companies,
+    sync_vacancies). Повторы вакансии в разных ответах схлопываются: побеждает более поздний ответ.
+    :return: {"companies": ..., "responses": ..., "inserted": ..., "updated": ..., "unchanged": ...}"""
+    companies = list(iter_archived_companies(archive))
+    if companies:
+        db.insert_companies(companies)
+    totals = {"companies": len(companies), "responses": 0, "inserted": 0, "updated": 0, "unchanged": 0}
+    batch: Dict[int, Dict] = {}
+
+    def flush() -> None:
+        if batch:
+            for key, count in db.sync_vacancies(list(batch.values())).items():
+                totals[key] += count
+            batch.clear()
+
+    for vacancies in iter_archived_vacancies(archive):
+        totals["responses"] += 1
+        for vacancy in vacancies:
+            batch.pop(vacancy["vacancy_id"], None)  # Новая версия встаёт в конец пачки.
+            batch[vacancy["vacancy_id"]] = vacancy
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    return totals
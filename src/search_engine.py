@@ -0,0 +1,174 @@
+# Поиск вакансий по названию через обратный индекс: названия разбиваются на термы (нижний регистр,
+# ё → е, упрощённый стемминг русского и английского, транслитерация технологий: «питон» → python),
+# по термам строится индекс «терм → вакансии», запросы из нескольких слов выполняются как AND или OR
+# с ранжированием tf·idf. Тот же анализатор используется DBManager для таблицы hh_schema.vacancy_terms.
+
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Слово, а также названия вида c++, c#, 1с (плюсы и решётка после буквы — часть терма).
+_TOKEN = re.compile(r"[^\W_]+(?:\+\+|#)?")
+
+# Окончания для упрощённого стемминга: сначала длинные, основа после отсечения — не короче _MIN_STEM.
+_RU_ENDINGS = sorted(
+    """
+    иями ями ами ией иям ием иях ими ыми его ого ему ому ев ов ие ье еи ии ей ой ий ям ем ам ом ах ях ию ью ия ья
+    ее ые ое ий ый им ым их ых ую юю ая яя ою ею а е и й о у ы ь ю я
+    """.split(),
+    key=len,
+    reverse=True,
+)
+_MIN_STEM = 3
+
+# Русские написания технологий и распространённые сокращения → каноническое английское название.
+TERM_ALIASES: Dict[str, str] = {
+    "питон": "python",
+    "пайтон": "python",
+    "джава": "java",
+    "ява": "java",
+    "джаваскрипт": "javascript",
+    "яваскрипт": "javascript",
+    "js": "javascript",
+    "тайпскрипт": "typescript",
+    "ts": "typescript",
+    "голанг": "go",
+    "golang": "go",
+    "котлин": "kotlin",
+    "свифт": "swift",
+    "руби": "ruby",
+    "пхп": "php",
+    "раст": "rust",
+    "скала": "scala",
+    "реакт": "react",
+    "ангуляр": "angular",
+    "джанго": "django",
+    "фласк": "flask",
+    "ларавел": "laravel",
+    "спринг": "spring",
+    "докер": "docker",
+    "кубернетес": "kubernetes",
+    "k8s": "kubernetes",
+    "линукс": "linux",
+    "постгрес": "postgresql",
+    "postgres": "postgresql",
+    "девопс": "devops",
+    "фронтенд": "frontend",
+    "фронтэнд": "frontend",
+    "бэкенд": "backend",
+    "бекенд": "backend",
+    "фулстек": "fullstack",
+    "1с": "1c",  # кириллическая «с»
+    "с++": "c++",
+    "с#": "c#",
+}
+
+
+def stem(word: str) -> str:
+    """Упрощённый стемминг: для кириллицы отсекается падежное/родовое окончание, для латиницы —
+    окончания множественного числа (developers → developer, vacancies → vacancy)."""
+    if word.isascii():
+        if len(word) > 4 and word.endswith("ies"):
+            return word[:-3] + "y"
+        if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+            return word[:-1]
+        return word
+    for ending in _RU_ENDINGS:
+        cut = len(word) - len(ending)
+        if cut >= _MIN_STEM and word.endswith(ending):
+            return word[:cut]
+    return word
+
+
+# Синонимы ищутся и по слову, и по его основе: «питона» → «питон» → python. Целевое название тоже проходит
+# стемминг, как и само это слово в тексте: k8s и Kubernetes дают один терм «kubernete».
+_ALIASES = {
+    **{stem(key): stem(value) for key, value in TERM_ALIASES.items()},
+    **{key: stem(value) for key, value in TERM_ALIASES.items()},
+}
+
+
+def analyze(text: Optional[str]) -> List[str]:
+    """Термы текста в порядке появления (с повторами)."""
+    if not text:
+        return []
+    terms = []
+    for token in _TOKEN.findall(text.lower().replace("ё", "е")):
+        alias = _ALIASES.get(token)
+        if alias is None:
+            token = stem(token)
+            alias = _ALIASES.get(token)
+        terms.append(alias or token)
+    return terms
+
+
+def term_weight(tf: int, df: int, total: int) -> float:
+    """Вес терма в документе: tf · ln(1 + N / df). Та же формула используется в SQL DBManager.search_vacancies."""
+    return tf * math.log(1 + total / df)
+
+
+class SearchIndex:
+    """Инкрементальный обратный индекс в памяти: документы добавляются, обновляются и удаляются по одному,
+    без перестройки всего индекса.
+
+        index = SearchIndex()
+        index.add(1, "Python-разработчик")
+        index.search("питон разработчики")  # [(1, score)]
+    """
+
+    def __init__(self) -> None:
+        self.postings: Dict[str, Dict[int, int]] = {}  # терм → {doc_id: частота терма в документе}
+        self._doc_terms: Dict[int, Counter] = {}  # doc_id → термы документа (для удаления и обновления)
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self._doc_terms
+
+    def add(self, doc_id: int, text: Optional[str]) -> None:
+        """Добавляет документ; если он уже есть — заменяет его термы."""
+        if doc_id in self._doc_terms:
+            self.remove(doc_id)
+        terms = Counter(analyze(text))
+        self._doc_terms[doc_id] = terms
+        for term, tf in terms.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+
+    def add_many(self, documents: Iterable[Tuple[int, Optional[str]]]) -> None:
+        for doc_id, text in documents:
+            self.add(doc_id, text)
+
+    def remove(self, doc_id: int) -> None:
+        """Удаляет документ из индекса (отсутствующий документ игнорируется)."""
+        for term in self._doc_terms.pop(doc_id, ()):
+            docs = self.postings[term]
+            del docs[doc_id]
+            if not docs:
+                del self.postings[term]
+
+    def search(self, query: str, mode: str = "and", limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Документы по запросу, от более релевантных к менее: [(doc_id, score)].
+        :param mode: "and" — документ содержит все термы запроса, "or" — хотя бы один
+        :param limit: сколько результатов вернуть (по умолчанию все)"""
+        if mode not in ("and", "or"):
+            raise ValueError("mode должен быть 'and' или 'or'")
+        terms = set(analyze(query))
+        if not terms:
+            return []
+        found = [self.postings.get(term, {}) for term in terms]
+        if mode == "and":
+            found.sort(key=len)  # Пересечение начинаем с самого редкого терма.
+            candidates: Set[int] = set(found[0])
+            for docs in found[1:]:
+                candidates &= docs.keys()
+        else:
+            candidates = set().union(*found)
+        total = len(self._doc_terms)
+        scores = {
+            doc_id: sum(term_weight(docs[doc_id], len(docs), total) for docs in found if doc_id in docs)
+            for doc_id in candidates
+        }
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit is not None else ranked
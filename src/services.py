@@ -1,4 +1,4 @@
-from typing import Dict, Optional, Tuple, Any
+from typing import Any, Dict, Optional, Tuple
 
 
 def safe_get_salary(salary: Optional[Dict]) -> Tuple[Optional[float], Optional[float], Optional[str]]:
@@ -55,12 +55,12 @@ def format_vacancy(vacancy: Dict[str, Any]) -> str:
     # "от 100000 до 150000 RUB" или "не указана".
 
     # Формируем строку с ключевой информацией о вакансии:
-    # Название вакансии (vacancy.get('name'))
+    # Название вакансии (vacancy.get('name'); в строках отчётов БД — ключ vacancy)
     # Компания (vacancy.get('company'))
     # Зарплата (вывод из salary_str)
     # Ссылка на вакансию (vacancy.get('url'))
     return (
-        f"{vacancy.get('name')} | Компания: {vacancy.get('company')} | "
+        f"{vacancy.get('name', vacancy.get('vacancy'))} | Компания: {vacancy.get('company')} | "
         f"Зарплата: {format_salary(vacancy.get('salary_from'), vacancy.get('salary_to'), vacancy.get('salary_currency'))} | "
         f"Ссылка: {vacancy.get('url')}"
     )
@@ -0,0 +1,353 @@
+# Встроенное хранилище на SQLite (модуль sqlite3 стандартной библиотеки) с теми же методами, что и DBManager:
+# анализ на ноутбуке и прогон в CI без сервера PostgreSQL, запросы выполняются внутри процесса.
+# Файл БД подключается как схема hh_schema, поэтому общие SELECT-запросы (константы SQL_* из src/queries.py)
+# выполняются здесь без переписывания. Поиск по названию идёт через полнотекстовый индекс FTS5
+# с токенизатором trigram: он ищет подстроку без учёта регистра, как ILIKE '%слово%' в PostgreSQL.
+
+import re
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+from src import json_codec, metrics, queries
+from src.storage import Storage, VacancyCursor
+from src.work_vacancies import HASH_FIELDS, VacancyColumns, diff_vacancy_fields, normalize_vacancy_fields, vacancy_hash
+
+SQLITE_CREATE_TABLES = """
+    CREATE TABLE IF NOT EXISTS hh_schema.companies (
+        company_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS hh_schema.vacancies (
+        vacancy_id INTEGER PRIMARY KEY,
+        company_id INTEGER REFERENCES companies(company_id),
+        name TEXT NOT NULL,
+        salary_from REAL,
+        salary_to REAL,
+        salary_currency TEXT,
+        url TEXT,
+        content_hash BLOB
+    );
+    CREATE INDEX IF NOT EXISTS hh_schema.vacancies_company_id_idx ON vacancies (company_id);
+
+    CREATE TABLE IF NOT EXISTS hh_schema.vacancy_changes (
+        change_id INTEGER PRIMARY KEY,
+        vacancy_id INTEGER NOT NULL,
+        changed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        changes TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS hh_schema.vacancy_changes_vacancy_id_idx ON vacancy_changes (vacancy_id, changed_at);
+
+    CREATE TABLE IF NOT EXISTS hh_schema.salary_daily (
+        snapshot_date TEXT NOT NULL,
+        company_id INTEGER NOT NULL,
+        salary_currency TEXT NOT NULL,
+        vacancies_count INTEGER NOT NULL,
+        salary_count INTEGER NOT NULL,
+        avg_salary REAL,
+        min_salary REAL,
+        max_salary REAL,
+        PRIMARY KEY (snapshot_date, company_id, salary_currency)
+    );
+
+    -- Внешний FTS5-индекс по названиям вакансий (хранит только токены), синхронизируется триггерами.
+    CREATE VIRTUAL TABLE IF NOT EXISTS hh_schema.vacancies_fts
+        USING fts5(name, content='vacancies', content_rowid='vacancy_id', tokenize='trigram');
+    CREATE TRIGGER IF NOT EXISTS hh_schema.vacancies_fts_insert AFTER INSERT ON vacancies BEGIN
+        INSERT INTO vacancies_fts (rowid, name) VALUES (new.vacancy_id, new.name);
+    END;
+    CREATE TRIGGER IF NOT EXISTS hh_schema.vacancies_fts_delete AFTER DELETE ON vacancies BEGIN
+        INSERT INTO vacancies_fts (vacancies_fts, rowid, name) VALUES ('delete', old.vacancy_id, old.name);
+    END;
+    CREATE TRIGGER IF NOT EXISTS hh_schema.vacancies_fts_update AFTER UPDATE OF name ON vacancies BEGIN
+        INSERT INTO vacancies_fts (vacancies_fts, rowid, name) VALUES ('delete', old.vacancy_id, old.name);
+        INSERT INTO vacancies_fts (rowid, name) VALUES (new.vacancy_id, new.name);
+    END;
+    """
+
+SQLITE_INSERT_COMPANY = "INSERT INTO hh_schema.companies (company_id, name) VALUES (?, ?) ON CONFLICT DO NOTHING;"
+
+SQLITE_INSERT_VACANCY = """
+    INSERT INTO hh_schema.vacancies
+    (vacancy_id, company_id, name, salary_from, salary_to, salary_currency, url, content_hash)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (vacancy_id) DO NOTHING;
+    """
+
+SQLITE_UPDATE_VACANCY = """
+    UPDATE hh_schema.vacancies
+    SET company_id = ?, name = ?, salary_from = ?, salary_to = ?, salary_currency = ?, url = ?, content_hash = ?
+    WHERE vacancy_id = ?;
+    """
+
+SQLITE_VACANCIES_WITH_KEYWORD = """
+    SELECT v.vacancy_id, c.name AS company, v.name AS vacancy,
+           v.salary_from, v.salary_to, v.salary_currency, v.url
+    FROM hh_schema.vacancies_fts f
+    JOIN hh_schema.vacancies v ON v.vacancy_id = f.rowid
+    JOIN hh_schema.companies c ON v.company_id = c.company_id
+    WHERE f.vacancies_fts MATCH ?
+    ORDER BY v.vacancy_id;
+    """
+
+# Триграммам нужно хотя бы 3 символа; более короткие слова ищутся перебором (casefold — и для кириллицы).
+SQLITE_VACANCIES_WITH_SHORT_KEYWORD = """
+    SELECT v.vacancy_id, c.name AS company, v.name AS vacancy,
+           v.salary_from, v.salary_to, v.salary_currency, v.url
+    FROM hh_schema.vacancies v
+    JOIN hh_schema.companies c ON v.company_id = c.company_id
+    WHERE instr(casefold(v.name), casefold(?)) > 0
+    ORDER BY v.vacancy_id;
+    """
+
+_SELECT_CHUNK = 500  # Сколько id передаётся в одном IN (...): лимит параметров SQLite.
+
+
+SQLITE_EXPORT_VACANCIES_PAGE = """
+    SELECT vacancy_id, company_id, name, salary_from, salary_to, salary_currency, url
+    FROM hh_schema.vacancies
+    WHERE vacancy_id > ?
+    ORDER BY vacancy_id
+    LIMIT ?;
+    """
+
+
+def _from_postgres(sql: str) -> str:
+    """Запрос DBManager в диалекте SQLite: плейсхолдеры ? вместо %s, без приведений типов ::type."""
+    return re.sub(r"::\w+", "", sql.replace("%s", "?"))
+
+
+def _casefold(value: Optional[str]) -> Optional[str]:
+    return None if value is None else value.casefold()
+
+
+class _SQLiteVacancyCursor(VacancyCursor):
+    """Список вакансий SQLiteManager: каждая страница — тот же запрос с LIMIT/OFFSET (база в том же процессе,
+    поэтому держать курсор открытым между страницами незачем), число строк — COUNT(*) по запросу."""
+
+    def __init__(self, manager: "SQLiteManager", query: str, sql: str, params: Sequence[Any]):
+        super().__init__()
+        self._manager = manager
+        self._query = query
+        self._sql = sql.strip().rstrip(";")
+        self._params = tuple(params)
+        self._count: Optional[int] = None
+
+    def fetch(self, offset: int, limit: int) -> List[Dict]:
+        return self._manager._fetchall(self._query, self._sql + " LIMIT ? OFFSET ?", (*self._params, limit, offset))
+
+    def iter_batches(self, batch_size: int = 1000) -> Iterator[List[Dict]]:
+        """Весь список одним запросом: OFFSET для каждой пачки заново проходил бы все предыдущие строки.
+        Блокировка соединения берётся только на время чтения одной пачки."""
+        with self._manager._lock:
+            cur = self._manager._execute(self._query, self._sql, self._params)
+        while True:
+            with self._manager._lock:
+                rows = [dict(row) for row in cur.fetchmany(batch_size)]
+            if not rows:
+                return
+            yield rows
+
+    def count(self) -> int:
+        if self._count is None:
+            with self._manager._lock:
+                cur = self._manager._execute(
+                    f"{self._query}_count", f"SELECT COUNT(*) FROM ({self._sql})", self._params
+                )
+                self._count = int(cur.fetchone()[0])
+        return self._count
+
+
+class SQLiteManager(Storage):
+    """Хранилище вакансий в одном файле SQLite (по умолчанию data/hh.sqlite3; ":memory:" — в памяти).
+    Одно соединение на объект; обращения из разных потоков выполняются по очереди."""
+
+    def __init__(self, path: Union[str, Path] = "data/hh.sqlite3"):
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(":memory:", check_same_thread=False, isolation_level=None)
+        self._conn.execute("ATTACH DATABASE ? AS hh_schema", (self.path,))
+        self._conn.execute("PRAGMA hh_schema.journal_mode = WAL")
+        self._conn.create_function("casefold", 1, _casefold, deterministic=True)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+
+    def _execute(self, query: str, sql: str, params: Sequence[Any] = ()) -> sqlite3.Cursor:
+        """Выполняет запрос и записывает те же метрики, что и DBManager._execute."""
+        start = time.perf_counter()
+        try:
+            cur = self._conn.execute(sql, params)
+        except sqlite3.Error:
+            metrics.DB_QUERIES.inc(query=query, status="error")
+            raise
+        finally:
+            metrics.DB_LATENCY.observe(time.perf_counter() - start, query=query)
+        metrics.DB_QUERIES.inc(query=query, status="ok")
+        if cur.rowcount >= 0:
+            metrics.DB_ROWS.observe(cur.rowcount, query=query)
+        return cur
+
+    def _fetchall(self, query: str, sql: str, params: Sequence[Any] = ()) -> List[Dict]:
+        with self._lock:
+            return [dict(row) for row in self._execute(query, sql, params).fetchall()]
+
+    def ping(self) -> None:
+        with self._lock:
+            self._conn.execute("SELECT 1;")
+
+    def create_tables(self) -> None:
+        """Создает таблицы, индекс FTS5 и триггеры для него в файле БД."""
+        with self._lock:
+            self._conn.executescript(SQLITE_CREATE_TABLES)
+
+    def insert_companies(self, companies: List[Dict[str, Union[str, int]]]) -> None:
+        with self._lock, self._conn:  # with self._conn — одна транзакция на весь список.
+            self._conn.execute("BEGIN")
+            self._conn.executemany(SQLITE_INSERT_COMPANY, [(int(c["id"]), c["name"]) for c in companies])
+
+    def insert_vacancies(self, vacancies: List[Dict]) -> None:
+        rows = []
+        for v in vacancies:
+            values = normalize_vacancy_fields(v)
+            rows.append((int(v["vacancy_id"]), *(values[name] for name in HASH_FIELDS), vacancy_hash(v)))
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(SQLITE_INSERT_VACANCY, rows)
+
+    def sync_vacancies(self, vacancies: Union[List[Dict], VacancyColumns], page_size: int = 1000) -> Dict[str, int]:
+        """То же, что DBManager.sync_vacancies: неизменённые строки не переписываются, для изменённых
+        в vacancy_changes пишутся изменившиеся поля. page_size в SQLite не используется."""
+        records = vacancies.to_records() if isinstance(vacancies, VacancyColumns) else vacancies
+        incoming = {int(v["vacancy_id"]): v for v in records}
+        if not incoming:
+            return {"inserted": 0, "updated": 0, "unchanged": 0}
+        hashes = {vacancy_id: vacancy_hash(v) for vacancy_id, v in incoming.items()}
+        ids = list(incoming)
+
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            stored: Dict[int, Dict[str, Any]] = {}
+            for start in range(0, len(ids), _SELECT_CHUNK):
+                end = start + _SELECT_CHUNK
+                chunk = ids[start:end]
+                sql = (
+                    "SELECT vacancy_id, company_id, name, salary_from, salary_to, salary_currency, url, content_hash "
+                    f"FROM hh_schema.vacancies WHERE vacancy_id IN ({', '.join('?' * len(chunk))})"
+                )
+                for row in self._execute("sync_vacancies_hashes", sql, chunk):
+                    stored[row["vacancy_id"]] = dict(row)
+
+            new_rows, changed_rows, history = [], [], []
+            for vacancy_id, vacancy in incoming.items():
+                values = normalize_vacancy_fields(vacancy)
+                old = stored.get(vacancy_id)
+                if old is None:
+                    new_rows.append((vacancy_id, *(values[name] for name in HASH_FIELDS), hashes[vacancy_id]))
+                elif old["content_hash"] != hashes[vacancy_id]:
+                    changed_rows.append((*(values[name] for name in HASH_FIELDS), hashes[vacancy_id], vacancy_id))
+                    diff = diff_vacancy_fields(old, vacancy)
+                    if diff:
+                        history.append((vacancy_id, json_codec.dumps(diff).decode("utf-8")))
+
+            self._conn.executemany(SQLITE_INSERT_VACANCY, new_rows)
+            self._conn.executemany(SQLITE_UPDATE_VACANCY, changed_rows)
+            self._conn.executemany(
+                "INSERT INTO hh_schema.vacancy_changes (vacancy_id, changes) VALUES (?, ?);", history
+            )
+        return {
+            "inserted": len(new_rows),
+            "updated": len(history),
+            "unchanged": len(incoming) - len(new_rows) - len(history),
+        }
+
+    def get_vacancy_changes(self, vacancy_id: int) -> List[Dict]:
+        """История изменений вакансии; changes — уже разобранный словарь."""
+        rows = self._fetchall("get_vacancy_changes", _from_postgres(queries.SQL_VACANCY_CHANGES), (vacancy_id,))
+        for row in rows:
+            row["changes"] = json_codec.loads(row["changes"])
+        return rows
+
+    def get_companies_and_vacancies_count(self) -> List[Dict]:
+        return self._fetchall("get_companies_and_vacancies_count", queries.SQL_COMPANIES_AND_VACANCIES_COUNT)
+
+    def get_all_vacancies(self) -> List[Dict]:
+        return self._fetchall("get_all_vacancies", queries.SQL_ALL_VACANCIES)
+
+    def get_vacancies_page(self, limit: int = 100, after_id: int = 0) -> List[Dict]:
+        return self._fetchall("get_vacancies_page", _from_postgres(queries.SQL_VACANCIES_PAGE), (after_id, limit))
+
+    def get_vacancies_by_company(self, company_id: int) -> List[Dict]:
+        return self._fetchall(
+            "get_vacancies_by_company", _from_postgres(queries.SQL_VACANCIES_BY_COMPANY), (company_id,)
+        )
+
+    def iter_vacancy_records(self, batch_size: int = 5000) -> Iterator[List[Dict]]:
+        """Keyset-пагинация по vacancy_id: блокировка соединения берётся только на время чтения одной пачки."""
+        after_id = 0
+        while True:
+            rows = self._fetchall("iter_vacancy_records", SQLITE_EXPORT_VACANCIES_PAGE, (after_id, batch_size))
+            if not rows:
+                return
+            yield rows
+            after_id = rows[-1]["vacancy_id"]
+
+    def get_avg_salary(self) -> Optional[float]:
+        with self._lock:
+            row = self._execute("get_avg_salary", queries.SQL_AVG_SALARY).fetchone()
+        return row[0] if row else None
+
+    def get_vacancies_with_higher_salary(self) -> List[Dict]:
+        avg = self.get_avg_salary()
+        if avg is None:
+            return []
+        return self._fetchall(
+            "get_vacancies_with_higher_salary", _from_postgres(queries.SQL_VACANCIES_WITH_HIGHER_SALARY), (avg,)
+        )
+
+    def get_vacancies_with_keyword(self, keyword: str) -> List[Dict]:
+        if len(keyword) < 3:
+            return self._fetchall("get_vacancies_with_keyword", SQLITE_VACANCIES_WITH_SHORT_KEYWORD, (keyword,))
+        phrase = '"' + keyword.replace('"', '""') + '"'  # Фраза FTS5: спецсимволы запроса не интерпретируются.
+        return self._fetchall("get_vacancies_with_keyword", SQLITE_VACANCIES_WITH_KEYWORD, (phrase,))
+
+    def open_vacancy_cursor(self, listing: str, keyword: str = "") -> VacancyCursor:
+        if listing == "all":
+            return _SQLiteVacancyCursor(self, "get_all_vacancies", queries.SQL_ALL_VACANCIES, ())
+        if listing == "higher":
+            avg = self.get_avg_salary()
+            if avg is None:
+                return VacancyCursor()
+            sql = _from_postgres(queries.SQL_VACANCIES_WITH_HIGHER_SALARY)
+            return _SQLiteVacancyCursor(self, "get_vacancies_with_higher_salary", sql, (avg,))
+        if listing == "keyword":
+            if len(keyword) < 3:
+                sql, param = SQLITE_VACANCIES_WITH_SHORT_KEYWORD, keyword
+            else:
+                sql, param = SQLITE_VACANCIES_WITH_KEYWORD, '"' + keyword.replace('"', '""') + '"'
+            return _SQLiteVacancyCursor(self, "get_vacancies_with_keyword", sql, (param,))
+        return super().open_vacancy_cursor(listing, keyword)
+
+    def record_salary_snapshot(self, snapshot_date: Optional[date] = None) -> int:
+        day = (snapshot_date or date.today()).isoformat()
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            cur = self._execute("record_salary_snapshot", _from_postgres(queries.SQL_RECORD_SALARY_SNAPSHOT), (day,))
+            return cur.rowcount
+
+    def get_salary_trend(
+        self, currency: str = "RUR", days: int = 90, window: int = 7, company_id: Optional[int] = None
+    ) -> List[Dict]:
+        since = (date.today() - timedelta(days=days)).isoformat()
+        params = (max(window, 1) - 1, currency, since, company_id, company_id)
+        rows = self._fetchall("get_salary_trend", _from_postgres(queries.SQL_SALARY_TREND), params)
+        for row in rows:
+            row["snapshot_date"] = date.fromisoformat(row["snapshot_date"])
+        return rows
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
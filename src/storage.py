@@ -0,0 +1,138 @@
+# Общий интерфейс хранилища вакансий. Его реализуют DBManager (PostgreSQL) и SQLiteManager (встроенная БД
+# в одном файле), поэтому main.py и отчёты работают с любым из них одинаково.
+
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from src.work_vacancies import VacancyColumns
+
+# Списки вакансий, которые можно читать страницами через Storage.open_vacancy_cursor.
+LISTINGS = ("all", "higher", "keyword")
+
+
+class VacancyCursor:
+    """Результат списка вакансий (формат get_all_vacancies), читаемый по частям с любой позиции:
+    страницы консольного вывода (src/pager.py) и потоковая печать пачками. Базовая реализация держит
+    строки в памяти; DBManager и SQLiteManager читают только запрошенный диапазон строк.
+
+    with db.open_vacancy_cursor("keyword", "python") as cursor:
+        cursor.fetch(0, 20)   # первые 20 строк
+        cursor.count()        # всего строк
+    """
+
+    def __init__(self, rows: Optional[List[Dict]] = None):
+        self._rows = rows or []
+
+    def fetch(self, offset: int, limit: int) -> List[Dict]:
+        """Строки с offset (с нуля) по offset + limit - 1."""
+        end = offset + limit
+        return self._rows[offset:end]
+
+    def count(self) -> int:
+        """Число строк результата."""
+        return len(self._rows)
+
+    def iter_batches(self, batch_size: int = 1000) -> Iterator[List[Dict]]:
+        """Все строки по порядку пачками по batch_size."""
+        offset = 0
+        while True:
+            rows = self.fetch(offset, batch_size)
+            if not rows:
+                return
+            yield rows
+            offset += len(rows)
+
+    def close(self) -> None:
+        """Освобождает ресурсы результата (соединение, серверный курсор)."""
+
+    def __enter__(self) -> "VacancyCursor":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class Storage(ABC):
+    """Хранилище компаний и вакансий: загрузка данных и отчёты.
+    Строки отчётов — словари с ключами vacancy_id, company, vacancy, salary_from, salary_to, salary_currency, url."""
+
+    @abstractmethod
+    def ping(self) -> None:
+        """Проверяет доступность хранилища; при недоступности выбрасывает исключение."""
+
+    @abstractmethod
+    def create_tables(self) -> None:
+        """Создает таблицы, если их ещё нет."""
+
+    @abstractmethod
+    def insert_companies(self, companies: List[Dict[str, Union[str, int]]]) -> None:
+        """Сохраняет список компаний (ключи id, name); существующие компании пропускаются."""
+
+    @abstractmethod
+    def insert_vacancies(self, vacancies: List[Dict]) -> None:
+        """Сохраняет список вакансий (формат parse_vacancy); существующие вакансии пропускаются."""
+
+    @abstractmethod
+    def sync_vacancies(self, vacancies: Union[List[Dict], VacancyColumns], page_size: int = 1000) -> Dict[str, int]:
+        """Загружает вакансии с учётом изменений (по хэшу содержимого) и ведёт историю изменений.
+        :return: {"inserted": ..., "updated": ..., "unchanged": ...}"""
+
+    @abstractmethod
+    def get_companies_and_vacancies_count(self) -> List[Dict]:
+        """Все компании с количеством вакансий, по убыванию количества."""
+
+    @abstractmethod
+    def get_all_vacancies(self) -> List[Dict]:
+        """Список всех вакансий с названием компании, зарплатой и ссылкой."""
+
+    @abstractmethod
+    def get_vacancies_page(self, limit: int = 100, after_id: int = 0) -> List[Dict]:
+        """Страница вакансий с vacancy_id больше after_id (keyset-пагинация)."""
+
+    @abstractmethod
+    def iter_vacancy_records(self, batch_size: int = 5000) -> Iterator[List[Dict]]:
+        """Все вакансии в формате data/vacancies.json (vacancy_id, company_id, name, salary_from, salary_to,
+        salary_currency, url) по возрастанию vacancy_id, пачками по batch_size строк."""
+
+    @abstractmethod
+    def get_avg_salary(self) -> Optional[float]:
+        """Средняя зарплата по вакансиям, где указана хотя бы одна граница."""
+
+    @abstractmethod
+    def get_vacancies_with_higher_salary(self) -> List[Dict]:
+        """Вакансии с зарплатой выше средней."""
+
+    @abstractmethod
+    def get_vacancies_with_keyword(self, keyword: str) -> List[Dict]:
+        """Все вакансии, в названии которых есть keyword (регистронезависимо)."""
+
+    @abstractmethod
+    def record_salary_snapshot(self, snapshot_date: Optional[date] = None) -> int:
+        """Сохраняет дневной снимок зарплат по компаниям и валютам. Возвращает число строк снимка."""
+
+    @abstractmethod
+    def get_salary_trend(
+        self, currency: str = "RUR", days: int = 90, window: int = 7, company_id: Optional[int] = None
+    ) -> List[Dict]:
+        """Динамика средней зарплаты по дневным снимкам: snapshot_date, vacancies_count, avg_salary,
+        moving_avg, delta."""
+
+    def mark_closed_vacancies(self, company_id: int, open_ids: Iterable[int]) -> Dict[str, int]:
+        """Отмечает закрытыми вакансии компании, которых нет среди open_ids (после полного сбора компании).
+        Базовая реализация — хранилище без архива закрытых вакансий: ничего не меняет."""
+        return {"closed": 0, "reopened": 0}
+
+    def open_vacancy_cursor(self, listing: str, keyword: str = "") -> VacancyCursor:
+        """Список вакансий listing (см. LISTINGS: all — все, higher — с зарплатой выше средней, keyword — по
+        ключевому слову) для чтения по частям. Базовая реализация читает весь список сразу."""
+        if listing == "all":
+            return VacancyCursor(self.get_all_vacancies())
+        if listing == "higher":
+            return VacancyCursor(self.get_vacancies_with_higher_salary())
+        if listing == "keyword":
+            return VacancyCursor(self.get_vacancies_with_keyword(keyword))
+        raise ValueError(f"Неизвестный список вакансий: {listing}")
+
+    def close(self) -> None:
+        """Освобождает соединения хранилища."""
@@ -1,22 +1,28 @@
 import csv
-import json
 from pathlib import Path
-from typing import Any, Dict, List, Union, cast
+from typing import Any, Dict, List, Optional, Union, cast
 
+from src import json_codec, metrics
 
-def save_to_json(filename: Union[str, Path], data: Any) -> None:
-    """Сохраняет список словарей в JSON файл."""
+
+def save_to_json(filename: Union[str, Path], data: Any, indent: Optional[int] = 4) -> None:
+    """Сохраняет список словарей в JSON файл.
+    :param indent: отступ; None — компактная запись (самая быстрая у orjson/msgspec, для машинных выгрузок)"""
     # В файле filename появится JSON с красиво отформатированными данными из списка словарей.
     # Определяет функцию save_to_json, которая принимает:
     # filename — имя файла, куда нужно сохранить данные (строка),
     # data — список словарей (каждый словарь представляет, например, вакансию или компанию).
 
-    # Открывает файл с именем filename для записи ("w") с кодировкой UTF-8.
-    with open(filename, "w", encoding="utf-8") as f:
-        # json.dump — функция для записи Python-объектов (списков, словарей) в файл в формате JSON.
-        # ensure_ascii=False — сохраняет кириллицу и другие символы напрямую, а не в виде \uXXXX.
-        # indent=4 — делает JSON «красивым» с отступами 4 пробела для читаемости.
-        json.dump(data, f, ensure_ascii=False, indent=4)
+    # Открывает файл с именем filename для записи в двоичном режиме ("wb"): json_codec.dumps уже возвращает
+    # UTF-8 bytes, поэтому лишнего перекодирования строки не происходит.
+    with metrics.timer(metrics.EXPORT_LATENCY, format="json"), open(filename, "wb") as f:
+        # json_codec.dumps — кодирование через самый быстрый доступный бэкенд (orjson / msgspec / json).
+        # Кириллица сохраняется напрямую, а не в виде \uXXXX; indent=4 — отступы для читаемости
+        # (orjson умеет только отступ в 2 пробела, поэтому такой файл пишет stdlib — см. json_codec).
+        written = f.write(json_codec.dumps(data, indent=indent))
+    # Метрики экспорта: сколько строк (элементов списка) и байт ушло в файл.
+    metrics.EXPORT_ROWS.inc(len(data) if isinstance(data, list) else 1, format="json")
+    metrics.EXPORT_BYTES.inc(written, format="json")
 
 
 def load_from_json(filename: Union[str, Path]) -> List[Dict[str, Any]]:
@@ -26,10 +32,10 @@ def load_from_json(filename: Union[str, Path]) -> List[Dict[str, Any]]:
     # В нашем случае ожидается, что JSON содержит список словарей, например вакансий или компаний.
     # После этого функция возвращает этот список.
 
-    with open(filename, "r", encoding="utf-8") as f:  # Открывает файл filename для чтения ("r") с кодировкой UTF-8.
-        data = json.load(f)
-        return cast(List[Dict[str, Any]], data)  # Функция json.load(f) читает содержимое файла и превращает его из
-        # формата JSON в Python-объект. В нашем случае ожидается, что JSON содержит список словарей,
+    with open(filename, "rb") as f:  # Открывает файл filename для чтения в двоичном режиме ("rb").
+        data = json_codec.loads(f.read())
+        return cast(List[Dict[str, Any]], data)  # Функция json_codec.loads читает содержимое файла и превращает его
+        # из формата JSON в Python-объект. В нашем случае ожидается, что JSON содержит список словарей,
         # например вакансий или компаний. После этого функция возвращает этот список.
 
 
@@ -40,9 +46,12 @@ def save_to_csv(filename: Union[str, Path], data: List[Dict], fieldnames: List[s
     # ddata — список словарей, каждый словарь соответствует одной строке CSV.
     # fieldnames — список названий столбцов (ключей словарей), которые будут записаны в CSV.
 
-    with open(filename, "w", newline="", encoding="utf-8") as f:  # Открытие файла,
-        # newline="" — предотвращает добавление лишних пустых строк между строками в Windows.
-        # encoding="utf-8" — сохраняет файл в кодировке UTF-8, чтобы корректно обрабатывать
+    # Открытие файла, newline="" — предотвращает добавление лишних пустых строк между строками в Windows.
+    # encoding="utf-8" — сохраняет файл в кодировке UTF-8, чтобы корректно обрабатывать
+    with metrics.timer(metrics.EXPORT_LATENCY, format="csv"), open(filename, "w", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)  # объект, который умеет записывать словари в CSV.
         writer.writeheader()  # Создаёт первую строку CSV с названиями колонок из fieldnames.
         writer.writerows(data)  # Проходит по списку словарей data и записывает каждую строку в CSV.
+        written = f.tell()  # Позиция в конце файла — число записанных байт.
+    metrics.EXPORT_ROWS.inc(len(data), format="csv")
+    metrics.EXPORT_BYTES.inc(written, format="csv")
@@ -1,7 +1,15 @@
-from typing import Dict, List
+import hashlib
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from src.services import safe_get_salary
 
+NAN = float("nan")  # Маркер отсутствующей зарплаты в колоночном представлении.
+
+# Поля вакансии, по которым считается хэш содержимого (всё, что может измениться у вакансии с тем же id).
+HASH_FIELDS = ("company_id", "name", "salary_from", "salary_to", "salary_currency", "url")
+
 
 def parse_vacancy(vacancy: Dict) -> Dict:
     """Преобразует вакансию из API в словарь для вставки в БД.
@@ -40,3 +48,159 @@ def parse_vacancies(vacancies: List[Dict]) -> List[Dict]:
     # Используется list comprehension: для каждой вакансии v из списка vacancies вызывается функция parse_vacancy(v).
     # Результатом работы будет новый список словарей, где каждая вакансия уже подготовлена для базы данных.
     return [parse_vacancy(v) for v in vacancies]
+
+
+def normalize_vacancy_fields(vacancy: Dict) -> Dict[str, Any]:
+    """Значения HASH_FIELDS в едином виде независимо от источника (API, VacancyColumns или строка БД):
+    company_id — int, зарплаты — float (Decimal из БД и int из API совпадут), NaN и отсутствующие — None."""
+    result: Dict[str, Any] = {}
+    for name in HASH_FIELDS:
+        value = vacancy.get(name)
+        if name == "company_id" and value is not None:
+            value = int(value)
+        elif name in ("salary_from", "salary_to") and value is not None:
+            value = float(value)
+            if math.isnan(value):
+                value = None
+        result[name] = value
+    return result
+
+
+def diff_vacancy_fields(old: Dict, new: Dict) -> Dict[str, List[Any]]:
+    """Изменившиеся поля вакансии в виде {"поле": [старое, новое]} (значения нормализованы)."""
+    before = normalize_vacancy_fields(old)
+    after = normalize_vacancy_fields(new)
+    return {name: [before[name], after[name]] for name in HASH_FIELDS if before[name] != after[name]}
+
+
+def vacancy_hash(vacancy: Dict) -> bytes:
+    """Хэш содержимого вакансии (16 байт) по нормализованным HASH_FIELDS.
+    Не зависит от JSON-бэкенда: значения сериализуются через repr."""
+    values = normalize_vacancy_fields(vacancy)
+    payload = "\x1f".join(repr(values[name]) for name in HASH_FIELDS).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+@dataclass
+class VacancyColumns:
+    """Колоночное представление пачки вакансий: по одному списку на каждое поле таблицы vacancies.
+    Отсутствующие зарплаты хранятся как NaN, чтобы колонки salary_from/salary_to были чисто float."""
+
+    vacancy_id: List[int] = field(default_factory=list)
+    company_id: List[Optional[int]] = field(default_factory=list)
+    name: List[str] = field(default_factory=list)
+    salary_from: List[float] = field(default_factory=list)
+    salary_to: List[float] = field(default_factory=list)
+    salary_currency: List[Optional[str]] = field(default_factory=list)
+    url: List[Optional[str]] = field(default_factory=list)
+
+    # Порядок колонок совпадает с порядком столбцов в INSERT INTO hh_schema.vacancies.
+    FIELDS = ("vacancy_id", "company_id", "name", "salary_from", "salary_to", "salary_currency", "url")
+
+    def __len__(self) -> int:
+        return len(self.vacancy_id)
+
+    def extend(self, other: "VacancyColumns") -> None:
+        """Дописывает колонки другой пачки в конец текущей."""
+        for name in self.FIELDS:
+            getattr(self, name).extend(getattr(other, name))
+
+    def iter_rows(self) -> Iterator[Tuple[Any, ...]]:
+        """Построчный обход в порядке FIELDS; NaN заменяется на None (в БД пойдёт NULL)."""
+        for row in zip(*(getattr(self, name) for name in self.FIELDS)):
+            yield (
+                row[0],
+                row[1],
+                row[2],
+                None if math.isnan(row[3]) else row[3],
+                None if math.isnan(row[4]) else row[4],
+                row[5],
+                row[6],
+            )
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> "VacancyColumns":
+        """Колонки из списка словарей (формат parse_vacancy / data/vacancies.json)."""
+        columns = cls()
+        for v in records:
+            values = normalize_vacancy_fields(v)
+            columns.vacancy_id.append(int(v["vacancy_id"]))
+            columns.company_id.append(values["company_id"])
+            columns.name.append(values["name"])
+            columns.salary_from.append(NAN if values["salary_from"] is None else values["salary_from"])
+            columns.salary_to.append(NAN if values["salary_to"] is None else values["salary_to"])
+            columns.salary_currency.append(values["salary_currency"])
+            columns.url.append(values["url"])
+        return columns
+
+    def to_records(self) -> List[Dict]:
+        """Обратное преобразование в список словарей (формат parse_vacancy / insert_vacancies)."""
+        return [dict(zip(self.FIELDS, row)) for row in self.iter_rows()]
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """Возвращает колонки как массивы NumPy: id — int64, зарплаты — float64 с NaN, строки — object."""
+        try:
+            import numpy as np  # type: ignore[import-not-found]
+        except ImportError as e:  # NumPy — необязательная зависимость.
+            raise ImportError("Для to_numpy() требуется пакет numpy") from e
+        return {
+            "vacancy_id": np.asarray(self.vacancy_id, dtype=np.int64),
+            # company_id может отсутствовать, поэтому храним его во float64 (NaN вместо None).
+            "company_id": np.asarray([NAN if c is None else c for c in self.company_id], dtype=np.float64),
+            "name": np.asarray(self.name, dtype=object),
+            "salary_from": np.asarray(self.salary_from, dtype=np.float64),
+            "salary_to": np.asarray(self.salary_to, dtype=np.float64),
+            "salary_currency": np.asarray(self.salary_currency, dtype=object),
+            "url": np.asarray(self.url, dtype=object),
+        }
+
+    def to_arrow(self) -> Any:
+        """Возвращает pyarrow.Table; NaN в зарплатах превращаются в null."""
+        try:
+            import pyarrow as pa  # type: ignore[import-not-found]
+        except ImportError as e:  # pyarrow — необязательная зависимость.
+            raise ImportError("Для to_arrow() требуется пакет pyarrow") from e
+        return pa.table(
+            {
+                "vacancy_id": pa.array(self.vacancy_id, type=pa.int64()),
+                "company_id": pa.array(self.company_id, type=pa.int64()),
+                "name": pa.array(self.name, type=pa.string()),
+                "salary_from": pa.array(self.salary_from, type=pa.float64(), from_pandas=True),
+                "salary_to": pa.array(self.salary_to, type=pa.float64(), from_pandas=True),
+                "salary_currency": pa.array(self.salary_currency, type=pa.string()),
+                "url": pa.array(self.url, type=pa.string()),
+            }
+        )
+
+
+def parse_vacancy_pages(pages: Iterable[Dict], employer_id: Optional[int] = None) -> VacancyColumns:
+    """Разбирает одну или несколько страниц ответа /vacancies в колоночный вид за один проход.
+    :param pages: страницы ответа API (словари с ключом "items")
+    :param employer_id: ID работодателя; если не задан, берётся из item["employer"]["id"]
+    :return: VacancyColumns"""
+    columns = VacancyColumns()
+    # Методы append связываем заранее: в горячем цикле это экономит поиск атрибутов на каждой вакансии.
+    add_id = columns.vacancy_id.append
+    add_company = columns.company_id.append
+    add_name = columns.name.append
+    add_from = columns.salary_from.append
+    add_to = columns.salary_to.append
+    add_currency = columns.salary_currency.append
+    add_url = columns.url.append
+    for page in pages:
+        for v in page.get("items", []):
+            add_id(int(v["id"]))
+            if employer_id is not None:
+                add_company(employer_id)
+            else:
+                company = (v.get("employer") or {}).get("id")
+                add_company(int(company) if company is not None else None)
+            add_name(v.get("name"))
+            salary = v.get("salary") or {}  # Без safe_get_salary: разбираем словарь зарплаты на месте.
+            salary_from = salary.get("from")
+            salary_to = salary.get("to")
+            add_from(NAN if salary_from is None else float(salary_from))
+            add_to(NAN if salary_to is None else float(salary_to))
+            add_currency(salary.get("currency"))
+            add_url(v.get("alternate_url"))
+    return columns
@@ -0,0 +1,123 @@
+# Тесты аналитики в памяти: отчёты VacancyAnalytics должны совпадать по смыслу и формату с DBManager,
+# поиск по ключевому слову совпадает с ILIKE (проверяется на SQLiteManager), поиск по словам идёт по обратному
+# индексу src/search_engine.py, перцентили считаются с интерполяцией как percentile_cont.
+
+import math
+from pathlib import Path
+from typing import Dict, List, Union
+
+import pytest
+
+from src.analytics import VacancyAnalytics, percentile
+from src.sqlite_manager import SQLiteManager
+from src.work_files import save_to_json
+
+VACANCIES: List[Dict] = [
+    {"vacancy_id": 3, "company_id": "1", "name": "Python Разработчик", "salary_from": 100000, "salary_to": 140000,
+     "salary_currency": "RUR", "url": "u3"},
+    {"vacancy_id": 1, "company_id": "1", "name": "Senior Python Developer", "salary_from": 5000, "salary_to": None,
+     "salary_currency": "USD", "url": "u1"},
+    {"vacancy_id": 2, "company_id": "2", "name": "Java-разработчик", "salary_from": None, "salary_to": 200000,
+     "salary_currency": "RUR", "url": "u2"},
+    {"vacancy_id": 4, "company_id": "2", "name": "QA", "salary_from": None, "salary_to": None,
+     "salary_currency": None, "url": "u4"},
+]  # fmt: skip
+COMPANIES: List[Dict[str, Union[str, int]]] = [
+    {"id": 1, "name": "Яндекс"},
+    {"id": 2, "name": "Ozon"},
+    {"id": 3, "name": "Пустая"},
+]
+
+
+@pytest.fixture
+def analytics() -> VacancyAnalytics:
+    return VacancyAnalytics.from_records(VACANCIES, COMPANIES)
+
+
+def test_percentile() -> None:
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+    assert percentile([10.0], 90) == 10.0
+    assert math.isnan(percentile([], 50))
+
+
+@pytest.mark.parametrize(
+    "keyword, expected",
+    [("python", [1, 3]), ("РАЗРАБ", [2, 3]), ("python разраб", [3]), ("qa", [4]), ("rust", []), ("", [1, 2, 3, 4])],
+)
+def test_keyword_search(analytics: VacancyAnalytics, keyword: str, expected: List[int]) -> None:
+    assert [v["vacancy_id"] for v in analytics.get_vacancies_with_keyword(keyword)] == expected
+
+
+@pytest.mark.parametrize("keyword", ["c++", "C#", "dev", "Разработчик", "python разраб", "java-", "1с", "go", ""])
+def test_keyword_search_matches_sql(keyword: str) -> None:
+    # Отчёт по ключевому слову — подстрока, как ILIKE: «c++» не сводится к слову «c» и не находит всё подряд.
+    vacancies = VACANCIES + [
+        {"vacancy_id": 5, "company_id": "2", "name": "C++ Developer", "url": "u5"},
+        {"vacancy_id": 6, "company_id": "2", "name": "C# / .NET разработчик", "url": "u6"},
+        {"vacancy_id": 7, "company_id": "1", "name": "Программист 1С", "url": "u7"},
+        {"vacancy_id": 8, "company_id": "1", "name": "Golang-разработчик", "url": "u8"},
+    ]
+    db = SQLiteManager(":memory:")
+    db.create_tables()
+    db.insert_companies(COMPANIES)
+    db.insert_vacancies(vacancies)
+    analytics = VacancyAnalytics.from_records(vacancies, COMPANIES)
+
+    found = [(v["vacancy_id"], v["vacancy"]) for v in analytics.get_vacancies_with_keyword(keyword)]
+    assert found == [(v["vacancy_id"], v["vacancy"]) for v in db.get_vacancies_with_keyword(keyword)]
+
+
+def test_find_uses_search_terms(analytics: VacancyAnalytics) -> None:
+    assert [v["vacancy_id"] for v in analytics.search_vacancies("питон разработчики")] == [3]
+    assert sorted(analytics.columns.vacancy_id[i] for i in analytics.find("питон java", mode="or")) == [1, 2, 3]
+
+
+def test_rows_format(analytics: VacancyAnalytics) -> None:
+    assert analytics.get_all_vacancies()[1] == {
+        "vacancy_id": 2,
+        "company": "Ozon",
+        "vacancy": "Java-разработчик",
+        "salary_from": None,
+        "salary_to": 200000.0,
+        "salary_currency": "RUR",
+        "url": "u2",
+    }
+
+
+def test_salary_reports(analytics: VacancyAnalytics) -> None:
+    assert analytics.get_avg_salary() == pytest.approx((120000 + 5000 + 200000) / 3)
+    assert [v["vacancy_id"] for v in analytics.get_vacancies_with_higher_salary()] == [2, 3]
+
+
+def test_companies_count(analytics: VacancyAnalytics) -> None:
+    assert analytics.get_companies_and_vacancies_count() == [
+        {"company_id": 1, "name": "Яндекс", "vacancies_count": 2},
+        {"company_id": 2, "name": "Ozon", "vacancies_count": 2},
+        {"company_id": 3, "name": "Пустая", "vacancies_count": 0},
+    ]
+
+
+def test_filter(analytics: VacancyAnalytics) -> None:
+    assert analytics.filter(currency="RUR", min_salary=150000) == [2]
+    assert analytics.filter(keyword="python", company_id=1, max_salary=10000) == [1]
+
+
+def test_salary_percentiles(analytics: VacancyAnalytics) -> None:
+    result = analytics.salary_percentiles((0, 50, 100))
+
+    assert result["RUR"] == {0: 120000.0, 50: 160000.0, 100: 200000.0}
+    assert result["USD"] == {0: 5000.0, 50: 5000.0, 100: 5000.0}
+    assert None not in result  # Вакансии без зарплаты в перцентили не попадают.
+    assert math.isnan(analytics.salary_percentiles((50,), currency="EUR")["EUR"][50])
+
+
+def test_from_json(tmp_path: Path) -> None:
+    save_to_json(tmp_path / "vacancies.json", VACANCIES)
+    save_to_json(tmp_path / "companies.json", COMPANIES)
+
+    analytics = VacancyAnalytics.from_json(tmp_path / "vacancies.json", tmp_path / "companies.json")
+    without_companies = VacancyAnalytics.from_json(tmp_path / "vacancies.json", tmp_path / "missing.json")
+
+    assert len(analytics) == 4
+    assert analytics.get_all_vacancies()[0]["company"] == "Яндекс"
+    assert without_companies.get_all_vacancies()[0]["company"] is None
@@ -0,0 +1,104 @@
+# Тесты AsyncDBManager без настоящей БД: пул соединений подменяется заглушкой,
+# проверяется, какие SQL и параметры уходят в курсор и как возвращаются результаты.
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+pytest.importorskip("psycopg_pool")
+
+from src import db_manager  # noqa: E402
+from src.async_db_manager import AsyncDBManager  # noqa: E402
+
+
+class FakeCursor:
+    def __init__(self, rows: List[Any]):
+        self.rows = rows
+        self.execute = AsyncMock()
+        self.executemany = AsyncMock()
+        self.close = AsyncMock()
+
+    async def fetchall(self) -> List[Any]:
+        return self.rows
+
+    async def __aenter__(self) -> "FakeCursor":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        pass
+
+
+class FakeConnection:
+    def __init__(self, results: List[List[Any]]):
+        self.cursors = [FakeCursor(rows) for rows in results]
+        self._next = iter(self.cursors)
+        self.execute = AsyncMock()
+        self.pipeline_used = False
+
+    def cursor(self, **kwargs: Any) -> FakeCursor:
+        return next(self._next)
+
+    @asynccontextmanager
+    async def pipeline(self) -> AsyncIterator[None]:
+        self.pipeline_used = True
+        yield
+
+
+def make_db(*results: List[Any]) -> tuple:
+    db = AsyncDBManager(db_manager.DBConfig("db", "u", "p", "localhost", 5432))
+    conn = FakeConnection(list(results))
+
+    @asynccontextmanager
+    async def connection() -> AsyncIterator[FakeConnection]:
+        yield conn
+
+    db._pool = MagicMock(connection=connection)
+    return db, conn
+
+
+def test_get_vacancies_with_keyword() -> None:
+    rows = [{"vacancy_id": 1, "company": "C", "vacancy": "Python Dev"}]
+    db, conn = make_db(rows)
+
+    result = asyncio.run(db.get_vacancies_with_keyword("python"))
+
+    assert result == rows
+    conn.cursors[0].execute.assert_awaited_once_with(db_manager.SQL_VACANCIES_WITH_KEYWORD, ("%python%",))
+
+
+def test_get_vacancies_with_higher_salary_uses_avg() -> None:
+    db, conn = make_db([{"avg_salary": 1500}], [{"vacancy_id": 2}])
+
+    result = asyncio.run(db.get_vacancies_with_higher_salary())
+
+    assert result == [{"vacancy_id": 2}]
+    conn.cursors[1].execute.assert_awaited_once_with(db_manager.SQL_VACANCIES_WITH_HIGHER_SALARY, (1500,))
+
+
+def test_get_vacancies_with_higher_salary_no_avg() -> None:
+    db, conn = make_db([{"avg_salary": None}])
+    assert asyncio.run(db.get_vacancies_with_higher_salary()) == []
+
+
+def test_keywords_run_in_one_pipeline() -> None:
+    db, conn = make_db([{"vacancy_id": 1}], [])
+
+    result = asyncio.run(db.get_vacancies_with_keywords(["python", "java"]))
+
+    assert conn.pipeline_used
+    assert result == {"python": [{"vacancy_id": 1}], "java": []}
+    conn.cursors[1].execute.assert_awaited_once_with(db_manager.SQL_VACANCIES_WITH_KEYWORD, ("%java%",))
+
+
+def test_insert_vacancies_executemany() -> None:
+    db, conn = make_db([])
+    vacancy = {"vacancy_id": 1, "company_id": 2, "name": "Dev", "url": "http://x"}
+
+    asyncio.run(db.insert_vacancies([vacancy]))
+
+    conn.cursors[0].executemany.assert_awaited_once_with(
+        db_manager.SQL_INSERT_VACANCY, [(1, 2, "Dev", None, None, None, "http://x")]
+    )
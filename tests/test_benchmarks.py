@@ -0,0 +1,117 @@
+# Тесты инфраструктуры замеров: детерминированность генераторов, заглушка hh.ru и сравнение отчётов.
+
+from contextlib import ExitStack
+from typing import Any, Dict
+
+import pytest
+
+from benchmarks.generators import iter_parsed_vacancies, make_raw_pages, make_raw_vacancies
+from benchmarks.load_test import format_load_report, run_load_test
+from benchmarks.runner import Benchmark, SkipBenchmark, compare_reports, run_benchmark
+from benchmarks.stub_server import Faults, StubData, run_stub_server
+from src.hh_api import HHApi
+
+
+def test_generators_are_deterministic() -> None:
+    assert make_raw_vacancies(50, seed=1) == make_raw_vacancies(50, seed=1)
+    assert make_raw_vacancies(50, seed=1) != make_raw_vacancies(50, seed=2)
+
+
+def test_make_raw_pages_split() -> None:
+    pages = make_raw_pages(250, per_page=100)
+    assert [len(p["items"]) for p in pages] == [100, 100, 50]
+    assert all(p["pages"] == 3 for p in pages)
+
+
+def test_iter_parsed_vacancies_shape() -> None:
+    vacancy = next(iter_parsed_vacancies(1))
+    assert set(vacancy) == {"vacancy_id", "company_id", "name", "salary_from", "salary_to", "salary_currency", "url"}
+
+
+def test_stub_server_serves_hh_api() -> None:
+    data = StubData(employers=3, vacancies_per_employer=120)
+    with run_stub_server(data) as base_url:
+        api = HHApi(per_page=50)
+        api.BASE_URL = base_url
+        companies = api.get_companies()
+        vacancies = api.get_vacancies_for_company(companies[0]["id"])
+
+    assert len(companies) == 3
+    assert len(vacancies) == 120
+    assert len({v["vacancy_id"] for v in vacancies}) == 120
+
+
+def test_run_benchmark_skip() -> None:
+    def factory(size: int, stack: ExitStack) -> Any:
+        raise SkipBenchmark("нет БД")
+
+    result = run_benchmark(Benchmark("db", "x", factory), size=10, repeat=3)
+    assert result.skipped == "нет БД"
+    assert result.timings == []
+
+
+def test_run_benchmark_counts_items() -> None:
+    result = run_benchmark(Benchmark("parsing", "x", lambda size, stack: lambda: size), size=10, repeat=3)
+    assert result.items == 10
+    assert len(result.timings) == 3
+
+
+def _report(commit: str, median: float) -> Dict[str, Any]:
+    return {"commit": commit, "results": [{"suite": "db", "name": "q", "median": median, "skipped": None}]}
+
+
+@pytest.mark.parametrize("new_median, mark", [(0.2, "REGRESSION"), (0.05, "faster"), (0.1, "x 1.00")])
+def test_compare_reports(new_median: float, mark: str) -> None:
+    lines = compare_reports(_report("a", 0.1), _report("b", new_median))
+    assert lines[1].endswith(mark)
+
+
+def test_faults_decide_is_deterministic() -> None:
+    first = Faults(error_rate=0.3, timeout_rate=0.2, seed=1)
+    second = Faults(error_rate=0.3, timeout_rate=0.2, seed=1)
+    outcomes = [first.decide()[0] for _ in range(200)]
+
+    assert outcomes == [second.decide()[0] for _ in range(200)]
+    assert {"ok", "hang"} <= set(outcomes) and {"500", "502", "503"} & set(outcomes)
+    assert 0.4 < outcomes.count("ok") / 200 < 0.6
+    with pytest.raises(ValueError):
+        Faults(latency_dist="pareto")
+
+
+def test_faults_latency_distributions() -> None:
+    assert Faults(latency_ms=20).latency() == 0.02
+    assert 0.01 <= Faults(latency_ms=20, latency_dist="uniform").latency() <= 0.03
+    lognormal = Faults(latency_ms=20, latency_dist="lognormal", latency_spread=1.0)
+    samples = sorted(lognormal.latency() for _ in range(501))
+    assert 0.015 < samples[250] < 0.025  # Медиана около latency_ms, хвост длиннее.
+    assert samples[-1] > 0.06
+
+
+def test_stub_rate_limit_and_client_retries() -> None:
+    faults = Faults(rate_limit=1, burst=1)
+    with run_stub_server(StubData(employers=1, vacancies_per_employer=10), faults=faults) as base_url:
+        api = HHApi(max_retries=2)
+        api.BASE_URL = base_url
+        delays: list = []
+        api.sleep = delays.append  # Паузы по Retry-After не ждём, поэтому повторы снова получают 429.
+        companies = api.get_companies()  # Единственный токен уходит на этот запрос.
+        vacancies = api.get_vacancies_for_company(1)
+
+    assert len(companies) == 1
+    assert vacancies == []  # Попытки исчерпаны — ошибка обработана как раньше.
+    assert delays == [1.0, 1.0]  # Retry-After: 1
+    assert faults.counts == {"ok": 1, "429": 3}
+
+
+def test_run_load_test_with_errors() -> None:
+    data = StubData(employers=4, vacancies_per_employer=150)
+    faults = Faults(latency_ms=1, latency_dist="exponential", error_rate=0.2, seed=3)
+
+    result = run_load_test(data, faults, workers=2, max_retries=5, retry_backoff=0.001)
+    report = result.to_dict()
+
+    assert result.completeness == 1.0  # Все ошибки 5xx закрыты повторами.
+    assert result.retries == sum(count for status, count in result.statuses.items() if status != "200")
+    assert report["requests"] == len(result.latencies) == sum(result.statuses.values())
+    assert report["latency"]["p50"] <= report["latency"]["p99"] <= report["latency"]["max"]
+    assert "Вакансий:       600 из 600" in format_load_report(result)
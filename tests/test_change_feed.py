@@ -0,0 +1,72 @@
+# Тесты подписчика на канал изменений вакансий: соединение PostgreSQL заменено MagicMock,
+# уведомления подкладываются в conn.notifies, ожидание select.select подменяется.
+
+import json
+from types import SimpleNamespace
+from typing import Iterable, List
+from unittest.mock import MagicMock, patch
+
+import psycopg2
+import pytest
+
+from src.change_feed import VacancyChange, VacancyChangeSubscriber, changed_ids
+
+
+def notify(company_id: int, inserted: Iterable[int] = (), updated: Iterable[int] = ()) -> SimpleNamespace:
+    payload = json.dumps({"company_id": company_id, "inserted": list(inserted), "updated": list(updated)})
+    return SimpleNamespace(channel="hh_vacancy_changes", payload=payload, pid=1)
+
+
+@pytest.fixture
+def db() -> MagicMock:
+    db = MagicMock()
+    db.listen_connection.return_value.notifies = []
+    return db
+
+
+def test_connect_listens_on_dedicated_connection(db: MagicMock) -> None:
+    with VacancyChangeSubscriber(db) as subscriber:
+        conn: MagicMock = db.listen_connection.return_value
+        conn.cursor.return_value.__enter__.return_value.execute.assert_called_once()
+        assert subscriber._conn is db.listen_connection.return_value
+    conn.close.assert_called_once()
+
+
+@patch("src.change_feed.select.select")
+def test_poll_decodes_notifications(mock_select: MagicMock, db: MagicMock) -> None:
+    conn = db.listen_connection.return_value
+    mock_select.return_value = ([conn], [], [])
+    conn.poll.side_effect = lambda: conn.notifies.extend(
+        [notify(10, inserted=[3], updated=[2]), SimpleNamespace(payload="{oops"), notify(11, updated=[2])]
+    )
+    subscriber = VacancyChangeSubscriber(db)
+
+    changes = subscriber.poll(timeout=1)
+
+    assert changes == [VacancyChange(10, [3], [2]), VacancyChange(11, [], [2])]  # Битое уведомление пропущено.
+    assert changed_ids(changes) == {2, 3}
+    mock_select.return_value = ([], [], [])
+    assert subscriber.poll(timeout=0) == []
+
+
+def test_fetch_reads_only_changed_rows(db: MagicMock) -> None:
+    db.get_vacancies_by_ids.return_value = [{"vacancy_id": 3}]
+
+    result = VacancyChangeSubscriber(db).fetch([VacancyChange(10, [3], [2]), VacancyChange(11, [2])])
+
+    assert result == [{"vacancy_id": 3}]
+    db.get_vacancies_by_ids.assert_called_once_with({2, 3})
+
+
+@patch("src.change_feed.select.select")
+def test_listen_reconnects_and_requests_resync(mock_select: MagicMock, db: MagicMock) -> None:
+    conn = db.listen_connection.return_value
+    mock_select.side_effect = [psycopg2.OperationalError("server closed the connection"), ([conn], [], [])]
+    conn.poll.side_effect = lambda: conn.notifies.append(notify(10, inserted=[1]))
+    sleeps: List[float] = []
+    listener = VacancyChangeSubscriber(db, reconnect_delay=2, sleep=sleeps.append).listen(timeout=1)
+
+    assert next(listener) == [VacancyChange(None, resync=True)]
+    assert next(listener) == [VacancyChange(10, [1], [])]
+    assert sleeps == [2]
+    assert db.listen_connection.call_count == 2
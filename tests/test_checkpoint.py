@@ -0,0 +1,69 @@
+# Тесты журнала контрольных точек CrawlCheckpoint: запись страниц и компаний, продолжение после
+# перезапуска, обрезка недописанной строки после падения.
+
+from pathlib import Path
+
+from src.checkpoint import CrawlCheckpoint
+
+COMPANIES = [{"id": 1, "name": "A"}, {"id": 2, "name": "B"}]
+
+
+def vacancy(vacancy_id: int, company_id: int) -> dict:
+    return {"vacancy_id": vacancy_id, "company_id": company_id, "name": f"V{vacancy_id}", "url": "u"}
+
+
+def test_progress_survives_restart(tmp_path: Path) -> None:
+    path = tmp_path / "state" / "crawl.jsonl"
+    checkpoint = CrawlCheckpoint(path)
+    assert not checkpoint.active
+
+    checkpoint.start("python", COMPANIES, {1: 1, 2: 2500})
+    checkpoint.record_page(1, 0, 1, [vacancy(10, 1)])
+    checkpoint.mark_complete(1)
+    checkpoint.mark_synced(1)
+    checkpoint.record_page(2, 0, 3, [vacancy(20, 2)])
+    checkpoint.record_page(2, 1, 3, [vacancy(21, 2)])
+
+    resumed = CrawlCheckpoint(path)
+
+    assert resumed.active
+    assert (resumed.keyword, resumed.companies) == ("python", COMPANIES)
+    assert resumed.open_vacancies == {1: 1, 2: 2500}
+    assert resumed.synced == {1}
+    assert resumed.is_complete(1) and not resumed.is_complete(2)
+    assert resumed.is_fetched(1)
+    assert not resumed.is_fetched(2)
+    assert resumed.next_page(2) == 2
+    assert resumed.next_page(3) == 0
+    assert [v["vacancy_id"] for v in resumed.vacancies(2)] == [20, 21]
+
+
+def test_torn_last_line_is_dropped(tmp_path: Path) -> None:
+    path = tmp_path / "crawl.jsonl"
+    checkpoint = CrawlCheckpoint(path)
+    checkpoint.start("it", COMPANIES)
+    checkpoint.record_page(1, 0, 2, [vacancy(10, 1)])
+    with open(path, "ab") as f:
+        f.write(b'{"type": "page", "employer_id": 1, "pa')  # Падение во время записи.
+
+    resumed = CrawlCheckpoint(path)
+    resumed.record_page(1, 1, 2, [vacancy(11, 1)])
+
+    assert [v["vacancy_id"] for v in CrawlCheckpoint(path).vacancies(1)] == [10, 11]
+    assert CrawlCheckpoint(path).is_fetched(1)
+
+
+def test_start_and_clear(tmp_path: Path) -> None:
+    path = tmp_path / "crawl.jsonl"
+    checkpoint = CrawlCheckpoint(path)
+    checkpoint.start("old", COMPANIES)
+    checkpoint.mark_synced(1)
+
+    checkpoint.start("new", COMPANIES[:1])  # Новый сбор начинается с чистого журнала.
+    assert CrawlCheckpoint(path).synced == set()
+    assert CrawlCheckpoint(path).keyword == "new"
+
+    checkpoint.clear()
+    checkpoint.clear()
+    assert not path.exists()
+    assert not CrawlCheckpoint(path).active
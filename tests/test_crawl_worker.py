@@ -0,0 +1,162 @@
+# Тесты обработчика очереди задач сбора: БД и API заменены MagicMock, проверяется, какие задачи ставятся
+# в очередь, как завершаются успешные и упавшие задачи и как обработчик ждёт общий бюджет запросов.
+
+from typing import Callable, Dict, List
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.crawl_worker import (RATE_BUCKET, TASK_EMPLOYER_VACANCIES, TASK_EMPLOYERS_PAGE, CrawlWorker, LeaseLost,
+                              employers_task)
+from src.hh_api import HHApi
+
+
+@pytest.fixture
+def db() -> MagicMock:
+    db = MagicMock()
+    db.claim_crawl_tasks.return_value = []
+    db.get_crawl_queue_stats.return_value = {}
+    return db
+
+
+@pytest.fixture
+def api() -> MagicMock:
+    api = MagicMock()
+    api.MAX_SEARCH_DEPTH = HHApi.MAX_SEARCH_DEPTH
+    return api
+
+
+def make_worker(db: MagicMock, api: MagicMock, sleeps: List[float]) -> CrawlWorker:
+    return CrawlWorker(db, api, worker_id="test:1", retry_base_delay=10, sleep=sleeps.append)
+
+
+def task(kind: str, payload: dict, attempts: int = 1) -> dict:
+    return {"task_id": 5, "kind": kind, "payload": payload, "attempts": attempts, "max_attempts": 5}
+
+
+def test_employers_first_page_enqueues_companies_and_pages(db: MagicMock, api: MagicMock) -> None:
+    api.get_employers_page.return_value = {
+        "pages": 3,
+        "items": [{"id": "1", "name": "A", "open_vacancies": 4}, {"id": "2", "name": "B", "open_vacancies": 0}],
+    }
+    kind, payload = employers_task("python", max_pages=2)
+    db.claim_crawl_tasks.return_value = [task(kind, payload)]
+
+    assert make_worker(db, api, []).run_once() is True
+
+    db.insert_companies.assert_called_once_with([{"id": 1, "name": "A"}])
+    db.enqueue_crawl_tasks.assert_called_once_with(
+        [
+            (TASK_EMPLOYER_VACANCIES, {"employer_id": 1, "open_vacancies": 4}),
+            (TASK_EMPLOYERS_PAGE, {"text": "python", "page": 1, "max_pages": 2}),
+        ]
+    )
+    db.complete_crawl_task.assert_called_once_with(5, "test:1")
+
+
+def test_employer_vacancies_extends_lease_and_syncs(db: MagicMock, api: MagicMock) -> None:
+    vacancies = [{"vacancy_id": 1}]
+
+    def fetch(employer_id: int, on_page: Callable[[int, int, List[Dict]], None], strict: bool) -> List[Dict]:
+        on_page(0, 1, vacancies)
+        return vacancies
+
+    api.get_vacancies_for_company.side_effect = fetch
+    db.claim_crawl_tasks.return_value = [task(TASK_EMPLOYER_VACANCIES, {"employer_id": 9, "open_vacancies": 1})]
+
+    make_worker(db, api, []).run_once()
+
+    db.extend_crawl_lease.assert_called_once_with(5, "test:1", 300)
+    db.sync_vacancies.assert_called_once_with(vacancies)
+    db.mark_closed_vacancies.assert_called_once_with(9, [1])
+    api.get_vacancies_for_company_partitioned.assert_not_called()
+
+
+def test_large_employer_uses_partitioned_fetch(db: MagicMock, api: MagicMock) -> None:
+    def fetch(employer_id: int, on_page: Callable[[], None]) -> List[Dict]:
+        on_page()
+        on_page()
+        return []
+
+    api.get_vacancies_for_company_partitioned.side_effect = fetch
+    db.claim_crawl_tasks.return_value = [task(TASK_EMPLOYER_VACANCIES, {"employer_id": 9, "open_vacancies": 5000})]
+
+    make_worker(db, api, []).run_once()
+
+    api.get_vacancies_for_company_partitioned.assert_called_once()
+    assert api.get_vacancies_for_company_partitioned.call_args.args == (9,)
+    assert db.extend_crawl_lease.call_count == 2  # Аренда продлевается на каждой странице.
+    api.get_vacancies_for_company.assert_not_called()
+    db.mark_closed_vacancies.assert_not_called()  # Разбиение по датам не гарантирует полного списка.
+
+
+def test_truncated_result_does_not_close_vacancies(db: MagicMock, api: MagicMock) -> None:
+    api.MAX_SEARCH_DEPTH = 2
+    api.get_vacancies_for_company.return_value = [{"vacancy_id": 1}, {"vacancy_id": 2}]
+    db.claim_crawl_tasks.return_value = [task(TASK_EMPLOYER_VACANCIES, {"employer_id": 9, "open_vacancies": 2})]
+
+    make_worker(db, api, []).run_once()
+
+    db.sync_vacancies.assert_called_once()
+    db.mark_closed_vacancies.assert_not_called()  # Выдача могла быть обрезана на MAX_SEARCH_DEPTH.
+
+
+def test_failed_task_retried_with_backoff(db: MagicMock, api: MagicMock) -> None:
+    api.get_employers_page.side_effect = RuntimeError("502")
+    db.claim_crawl_tasks.return_value = [task(TASK_EMPLOYERS_PAGE, {"text": "python", "page": 0}, attempts=3)]
+
+    make_worker(db, api, []).run_once()
+
+    db.fail_crawl_task.assert_called_once_with(5, "test:1", "RuntimeError: 502", 40)
+    db.complete_crawl_task.assert_not_called()
+
+
+def test_lost_lease_neither_completes_nor_fails(db: MagicMock, api: MagicMock) -> None:
+    api.get_vacancies_for_company.side_effect = lambda employer_id, on_page, strict: on_page(0, 2, [])
+    db.extend_crawl_lease.return_value = False
+    db.claim_crawl_tasks.return_value = [task(TASK_EMPLOYER_VACANCIES, {"employer_id": 9})]
+
+    make_worker(db, api, []).run_once()
+
+    db.complete_crawl_task.assert_not_called()
+    db.fail_crawl_task.assert_not_called()
+    db.sync_vacancies.assert_not_called()
+    assert issubclass(LeaseLost, Exception)
+
+
+def test_lost_lease_during_partitioned_fetch_skips_sync(db: MagicMock, api: MagicMock) -> None:
+    def fetch(employer_id: int, on_page: Callable[[], None]) -> List[Dict]:
+        on_page()  # Крупный работодатель загружается дольше lease_seconds — задачу забрал другой обработчик.
+        return [{"vacancy_id": 1}]
+
+    api.get_vacancies_for_company_partitioned.side_effect = fetch
+    db.extend_crawl_lease.return_value = False
+    db.claim_crawl_tasks.return_value = [task(TASK_EMPLOYER_VACANCIES, {"employer_id": 9, "open_vacancies": 5000})]
+
+    make_worker(db, api, []).run_once()
+
+    db.sync_vacancies.assert_not_called()
+    db.complete_crawl_task.assert_not_called()
+    db.fail_crawl_task.assert_not_called()
+
+
+def test_run_waits_for_delayed_tasks_and_stops_when_empty(db: MagicMock, api: MagicMock) -> None:
+    api.get_employers_page.return_value = {"pages": 1, "items": []}
+    db.claim_crawl_tasks.side_effect = [[task(TASK_EMPLOYERS_PAGE, {"text": "python", "page": 0})], [], []]
+    db.get_crawl_queue_stats.side_effect = [{"pending": 1, "done": 1}, {"done": 2}]
+    sleeps: List[float] = []
+
+    assert make_worker(db, api, sleeps).run(idle_sleep=2) == 1
+    assert sleeps == [2]
+
+
+def test_shared_rate_budget(db: MagicMock, api: MagicMock) -> None:
+    db.take_rate_tokens.side_effect = [0.5, 0.25, 0.0]
+    sleeps: List[float] = []
+
+    worker = CrawlWorker(db, api, worker_id="test:1", rate_per_second=4, sleep=sleeps.append)
+    api.rate_limiter("/vacancies")
+
+    db.setup_rate_budget.assert_called_once_with(RATE_BUCKET, 4)
+    assert api.rate_limiter == worker._wait_for_budget
+    assert sleeps == [0.5, 0.25]
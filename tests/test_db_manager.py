@@ -10,10 +10,17 @@
 # Методы с fetchall() и fetchone() возвращают реальные списки/числа, а не MagicMock.#
 
 
+import json
 import unittest
+from datetime import date
+from typing import Any, List, Set
 from unittest.mock import MagicMock, patch
 
-from src.db_manager import DBConfig, DBManager
+import psycopg2
+
+from src.db_manager import (NOTIFY_MAX_IDS, REPORTS, VACANCY_CHANGES_CHANNEL, DBConfig, DBManager, _to_positional,
+                            parse_replicas)
+from src.work_vacancies import VacancyColumns, parse_vacancy_pages, vacancy_hash
 
 
 class TestDBManager(unittest.TestCase):
@@ -35,6 +42,63 @@ class TestDBManager(unittest.TestCase):
         self.assertTrue(mock_cursor.execute.called)
         mock_conn.commit.assert_called_once()
 
+    @patch("psycopg2.connect")
+    def test_connect_timeout(self, mock_connect: MagicMock) -> None:
+        self.db_manager._get_conn()
+        self.assertNotIn("connect_timeout", mock_connect.call_args.kwargs)  # По умолчанию — как в libpq.
+
+        config = DBConfig(name="testdb", user="user", password="pass", host="localhost", port=5432, connect_timeout=3)
+        DBManager(config)._get_conn()
+        self.assertEqual(mock_connect.call_args.kwargs["connect_timeout"], 3)
+        self.assertEqual(mock_connect.call_args.kwargs["dbname"], "testdb")
+
+    @patch("psycopg2.connect")
+    def test_listen_connection_autocommit(self, mock_connect: MagicMock) -> None:
+        conn = self.db_manager.listen_connection()
+        self.assertIs(conn, mock_connect.return_value)
+        self.assertTrue(conn.autocommit)  # NOTIFY доходит только до соединения вне транзакции.
+
+    @patch("psycopg2.connect")
+    def test_iter_vacancy_records(self, mock_connect: MagicMock) -> None:
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value.__enter__.return_value = mock_conn
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.fetchmany.side_effect = [[{"vacancy_id": 1}, {"vacancy_id": 2}], [{"vacancy_id": 3}], []]
+
+        batches = list(self.db_manager.iter_vacancy_records(batch_size=2))
+
+        self.assertEqual(batches, [[{"vacancy_id": 1}, {"vacancy_id": 2}], [{"vacancy_id": 3}]])
+        self.assertEqual(mock_conn.cursor.call_args.kwargs["name"], "iter_vacancy_records")  # Серверный курсор.
+        self.assertIn("company_id", mock_cursor.execute.call_args[0][0])
+        self.assertEqual(mock_cursor.itersize, 2)
+
+    @patch("psycopg2.connect")
+    def test_open_vacancy_cursor(self, mock_connect: MagicMock) -> None:
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value.__enter__.return_value = mock_conn
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.fetchmany.return_value = [{"vacancy_id": 21}]
+        mock_cursor.rowcount = 45
+
+        with self.db_manager.open_vacancy_cursor("keyword", "python") as cursor:
+            self.assertEqual(cursor.fetch(20, 20), [{"vacancy_id": 21}])
+            self.assertEqual(cursor.count(), 45)
+            self.assertEqual(cursor.count(), 45)
+            mock_connect.return_value.close.assert_not_called()  # Соединение занято, пока курсор открыт.
+
+        kwargs = mock_conn.cursor.call_args_list[0].kwargs
+        self.assertEqual((kwargs["name"], kwargs["scrollable"]), ("vacancy_listing", True))
+        sql, params = mock_cursor.execute.call_args_list[0][0]
+        self.assertIn("ILIKE", sql)
+        self.assertEqual(params, ("%python%",))
+        mock_cursor.scroll.assert_any_call(20, mode="absolute")  # Страница 2 — MOVE ABSOLUTE и FETCH 20 строк.
+        mock_cursor.fetchmany.assert_called_once_with(20)
+        moves = [c for c in mock_cursor.execute.call_args_list if "MOVE ALL" in c[0][0]]
+        self.assertEqual(len(moves), 1)  # Число строк считается один раз.
+        mock_connect.return_value.close.assert_called_once()
+
     @patch("psycopg2.connect")
     def test_insert_companies(self, mock_connect: MagicMock) -> None:
         companies: list[dict[str, str | int]] = [{"id": 1, "name": "Company1"}, {"id": 2, "name": "Company2"}]
@@ -144,3 +208,535 @@ class TestDBManager(unittest.TestCase):
         result = self.db_manager.get_vacancies_with_keyword("Python")
 
         self.assertEqual(result, expected_result)
+
+    @patch("src.db_manager.execute_values")
+    @patch("psycopg2.connect")
+    def test_insert_vacancy_columns(self, mock_connect: MagicMock, mock_execute_values: MagicMock) -> None:
+        columns = parse_vacancy_pages(
+            [{"items": [{"id": "1", "name": "Dev", "salary": None, "alternate_url": "http://example.com"}]}],
+            employer_id=1,
+        )
+
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+
+        mock_connect.return_value.__enter__.return_value = mock_conn
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+        self.db_manager.insert_vacancy_columns(columns)
+
+        rows = list(mock_execute_values.call_args[0][2])
+        self.assertEqual(rows, [(1, 1, "Dev", None, None, None, "http://example.com")])
+        mock_conn.commit.assert_called_once()
+
+    @patch("psycopg2.connect")
+    def test_insert_vacancy_columns_empty(self, mock_connect: MagicMock) -> None:
+        self.db_manager.insert_vacancy_columns(VacancyColumns())
+        mock_connect.assert_not_called()
+
+
+class TestSyncVacancies(unittest.TestCase):
+    """sync_vacancies: новые вставляются, изменённые обновляются с записью истории, остальные пропускаются."""
+
+    def setUp(self) -> None:
+        self.db_manager = DBManager(DBConfig("testdb", "user", "pass", "localhost", 5432))
+        self.vacancies = [
+            {
+                "vacancy_id": 1,
+                "company_id": "10",
+                "name": "Dev",
+                "salary_from": 100,
+                "salary_to": None,
+                "salary_currency": "RUR",
+                "url": "u1",
+            },
+            {
+                "vacancy_id": 2,
+                "company_id": "10",
+                "name": "QA",
+                "salary_from": 200,
+                "salary_to": None,
+                "salary_currency": "RUR",
+                "url": "u2",
+            },
+            {
+                "vacancy_id": 3,
+                "company_id": "10",
+                "name": "Ops",
+                "salary_from": None,
+                "salary_to": None,
+                "salary_currency": None,
+                "url": "u3",
+            },
+        ]
+
+    @patch("src.db_manager.execute_values")
+    @patch("psycopg2.connect")
+    def test_sync_vacancies(self, mock_connect: MagicMock, mock_execute_values: MagicMock) -> None:
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value.__enter__.return_value = mock_conn
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        changed = dict(self.vacancies[1], salary_from=150)
+        mock_cursor.fetchall.side_effect = [
+            # Хэши в БД: 1 — без изменений, 2 — другой хэш, 3 — нет в БД.
+            [(1, memoryview(vacancy_hash(self.vacancies[0]))), (2, memoryview(vacancy_hash(changed)))],
+            # Старые значения изменённой вакансии.
+            [(2, 10, "QA", 150, None, "RUR", "u2")],
+        ]
+
+        result = self.db_manager.sync_vacancies(self.vacancies)
+
+        self.assertEqual(result, {"inserted": 1, "updated": 1, "unchanged": 1})
+        insert_call, update_call, history_call, terms_call = mock_execute_values.call_args_list
+        self.assertIn("content_hash", insert_call[0][1])
+        self.assertEqual([row[0] for row in insert_call[0][2]], [3])
+        self.assertIn("UPDATE hh_schema.vacancies", update_call[0][1])
+        self.assertEqual(update_call[0][2][0][:4], (2, 10, "QA", 200.0))
+        ((history_id, history_json),) = history_call[0][2]
+        self.assertEqual((history_id, json.loads(history_json)), (2, {"salary_from": [150.0, 200.0]}))
+        # Термы поиска добавляются только для новой вакансии: название изменённой осталось прежним.
+        self.assertIn("vacancy_terms", terms_call[0][1])
+        self.assertEqual(terms_call[0][2], [("ops", 3, 1)])
+        # Одно событие NOTIFY на компанию: новая и изменённая вакансии.
+        notify_sql, (channel, payloads) = mock_cursor.execute.call_args[0]
+        self.assertIn("pg_notify", notify_sql)
+        self.assertEqual(channel, VACANCY_CHANGES_CHANNEL)
+        self.assertEqual([json.loads(p) for p in payloads], [{"company_id": 10, "inserted": [3], "updated": [2]}])
+        mock_conn.commit.assert_called_once()
+
+    @patch("src.db_manager.execute_values")
+    @patch("psycopg2.connect")
+    def test_sync_vacancies_all_unchanged(self, mock_connect: MagicMock, mock_execute_values: MagicMock) -> None:
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value.__enter__.return_value = mock_conn
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = [(v["vacancy_id"], vacancy_hash(v)) for v in self.vacancies]
+
+        result = self.db_manager.sync_vacancies(self.vacancies)
+
+        self.assertEqual(result, {"inserted": 0, "updated": 0, "unchanged": 3})
+        mock_execute_values.assert_not_called()
+        self.assertEqual(mock_cursor.execute.call_count, 1)  # Только чтение хэшей.
+
+    def test_change_payloads_split(self) -> None:
+        incoming = {i: {"company_id": 1 if i < 1000 else None} for i in range(1001)}
+
+        payloads = [json.loads(p) for p in self.db_manager._change_payloads(incoming, list(range(1001)), [])]
+
+        self.assertEqual([len(p["inserted"]) for p in payloads], [NOTIFY_MAX_IDS, NOTIFY_MAX_IDS, 200, 1])
+        self.assertEqual(payloads[-1], {"company_id": None, "inserted": [1000], "updated": []})
+        self.assertTrue(all(len(json.dumps(p)) < 8000 for p in payloads))
+
+    @patch("psycopg2.connect")
+    def test_get_vacancies_by_ids(self, mock_connect: MagicMock) -> None:
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_connect.return_value.__enter__.return_value = mock_conn
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = [{"vacancy_id": 2}, {"vacancy_id": 5}]
+
+        self.assertEqual(self.db_manager.get_vacancies_by_ids([5, 2, 5]), [{"vacancy_id": 2}, {"vacancy_id": 5}])
+        self.assertEqual(mock_cursor.execute.call_args[0][1], ([2, 5],))
+        self.assertEqual(self.db_manager.get_vacancies_by_ids([]), [])
+        mock_connect.assert_called_once()
+
+    def test_sync_vacancies_empty(self) -> None:
+        with patch("psycopg2.connect") as mock_connect:
+            self.assertEqual(self.db_manager.sync_vacancies([]), {"inserted": 0, "updated": 0, "unchanged": 0})
+        mock_connect.assert_not_called()
+
+
+class TestSearchVacancies(unittest.TestCase):
+    """Поиск по таблице термов hh_schema.vacancy_terms."""
+
+    def setUp(self) -> None:
+        self.db_manager = DBManager(DBConfig("testdb", "user", "pass", "localhost", 5432))
+        connect_patcher = patch("psycopg2.connect")
+        mock_connect = connect_patcher.start()
+        self.addCleanup(connect_patcher.stop)
+        self.mock_conn = MagicMock()
+        self.mock_cursor = MagicMock()
+        mock_connect.return_value.__enter__.return_value = self.mock_conn
+        self.mock_conn.cursor.return_value.__enter__.return_value = self.mock_cursor
+
+    def test_search_vacancies_and(self) -> None:
+        self.mock_cursor.fetchall.return_value = [{"vacancy_id": 1, "score": 2.5}]
+
+        result = self.db_manager.search_vacancies("Разработчики на питоне", limit=10)
+
+        self.assertEqual(result, [{"vacancy_id": 1, "score": 2.5}])
+        sql, params = self.mock_cursor.execute.call_args[0]
+        self.assertIn("hh_schema.vacancy_terms", sql)
+        self.assertEqual(params, (["python", "на", "разработчик"], 3, 10))
+
+    def test_search_vacancies_or(self) -> None:
+        self.mock_cursor.fetchall.return_value = []
+
+        self.db_manager.search_vacancies("java kotlin", mode="or")
+
+        self.assertEqual(self.mock_cursor.execute.call_args[0][1], (["java", "kotlin"], 1, 100))
+
+    def test_search_vacancies_invalid(self) -> None:
+        self.assertEqual(self.db_manager.search_vacancies(" - "), [])
+        with self.assertRaises(ValueError):
+            self.db_manager.search_vacancies("python", mode="xor")
+        self.mock_cursor.execute.assert_not_called()
+
+    def test_rebuild_search_index(self) -> None:
+        with patch("src.db_manager.execute_values") as mock_execute_values:
+            self.mock_cursor.fetchmany.side_effect = [[(1, "Python Developer"), (2, None)], []]
+
+            self.assertEqual(self.db_manager.rebuild_search_index(), 2)
+
+        self.assertIn("TRUNCATE hh_schema.vacancy_terms", self.mock_cursor.execute.call_args_list[0][0][0])
+        self.assertEqual(mock_execute_values.call_args[0][2], [("python", 1, 1), ("developer", 1, 1)])
+        self.mock_conn.commit.assert_called_once()
+
+
+class TestCrawlQueue(unittest.TestCase):
+    """Очередь задач сбора hh_schema.crawl_tasks и общий бюджет запросов hh_schema.crawl_rate."""
+
+    def setUp(self) -> None:
+        self.db_manager = DBManager(DBConfig("testdb", "user", "pass", "localhost", 5432))
+        connect_patcher = patch("psycopg2.connect")
+        mock_connect = connect_patcher.start()
+        self.addCleanup(connect_patcher.stop)
+        self.mock_conn = MagicMock()
+        self.mock_cursor = MagicMock()
+        mock_connect.return_value.__enter__.return_value = self.mock_conn
+        self.mock_conn.cursor.return_value.__enter__.return_value = self.mock_cursor
+
+    def test_enqueue_crawl_tasks(self) -> None:
+        with patch("src.db_manager.execute_values") as mock_execute_values:
+            self.mock_cursor.rowcount = 1
+            added = self.db_manager.enqueue_crawl_tasks([("employer_vacancies", {"employer_id": 1})])
+
+        self.assertEqual(added, 1)
+        sql, rows = mock_execute_values.call_args[0][1:3]
+        self.assertIn("ON CONFLICT", sql)
+        self.assertEqual(rows[0][0], "employer_vacancies")
+        self.assertEqual(json.loads(rows[0][1]), {"employer_id": 1})
+        self.assertEqual(self.db_manager.enqueue_crawl_tasks([]), 0)
+
+    def test_claim_crawl_tasks(self) -> None:
+        task = {"task_id": 7, "kind": "employers_page", "payload": {"text": "python"}, "attempts": 1}
+        self.mock_cursor.fetchall.return_value = [task]
+
+        result = self.db_manager.claim_crawl_tasks("host:1", limit=2, lease_seconds=60)
+
+        self.assertEqual(result, [task])
+        expire_sql = self.mock_cursor.execute.call_args_list[0][0][0]
+        claim_sql, params = self.mock_cursor.execute.call_args_list[1][0]
+        self.assertIn("lease_until < now()", expire_sql)
+        self.assertIn("FOR UPDATE SKIP LOCKED", claim_sql)
+        self.assertEqual(params, (2, "host:1", 60))
+        self.mock_conn.commit.assert_called_once()
+
+    def test_complete_and_fail_crawl_task(self) -> None:
+        self.mock_cursor.rowcount = 0
+        self.assertFalse(self.db_manager.complete_crawl_task(7, "host:1"))
+
+        self.mock_cursor.fetchone.return_value = ("pending",)
+        self.assertEqual(self.db_manager.fail_crawl_task(7, "host:1", "HTTPError: 502", retry_delay=60), "pending")
+        self.assertEqual(self.mock_cursor.execute.call_args[0][1], (60, "HTTPError: 502", 7, "host:1"))
+
+        self.mock_cursor.fetchone.return_value = None
+        self.assertIsNone(self.db_manager.fail_crawl_task(7, "host:1", "error"))
+
+    def test_take_rate_tokens(self) -> None:
+        self.mock_cursor.fetchone.return_value = (0.4,)
+        self.assertEqual(self.db_manager.take_rate_tokens("hh_api"), 0.4)
+        self.assertEqual(self.mock_cursor.execute.call_args[0][1], ("hh_api", 1.0, 1.0, 1.0))
+
+        self.mock_cursor.fetchone.return_value = None
+        with self.assertRaises(ValueError):
+            self.db_manager.take_rate_tokens("missing")
+
+
+class TestSalaryHistory(unittest.TestCase):
+    """Дневные снимки зарплат и запросы динамики."""
+
+    def setUp(self) -> None:
+        self.db_manager = DBManager(DBConfig("testdb", "user", "pass", "localhost", 5432))
+        connect_patcher = patch("psycopg2.connect")
+        mock_connect = connect_patcher.start()
+        self.addCleanup(connect_patcher.stop)
+        self.mock_conn = MagicMock()
+        self.mock_cursor = MagicMock()
+        mock_connect.return_value.__enter__.return_value = self.mock_conn
+        self.mock_conn.cursor.return_value.__enter__.return_value = self.mock_cursor
+
+    def test_record_salary_snapshot(self) -> None:
+        self.mock_cursor.rowcount = 12
+
+        self.assertEqual(self.db_manager.record_salary_snapshot(date(2026, 1, 5)), 12)
+
+        sql, params = self.mock_cursor.execute.call_args[0]
+        self.assertIn("INSERT INTO hh_schema.salary_daily", sql)
+        self.assertIn("ON CONFLICT (snapshot_date, company_id, salary_currency) DO UPDATE", sql)
+        self.assertEqual(params, (date(2026, 1, 5),))
+        self.mock_conn.commit.assert_called_once()
+
+    def test_get_salary_trend(self) -> None:
+        rows = [{"snapshot_date": date(2026, 1, 5), "vacancies_count": 3, "avg_salary": 100, "moving_avg": 100}]
+        self.mock_cursor.fetchall.return_value = rows
+
+        result = self.db_manager.get_salary_trend(currency="USD", days=30, window=7, company_id=5)
+
+        self.assertEqual(result, rows)
+        sql, params = self.mock_cursor.execute.call_args[0]
+        self.assertIn("FROM hh_schema.salary_daily", sql)
+        self.assertNotIn("hh_schema.vacancies", sql)  # Тренды читают только агрегаты.
+        self.assertEqual(params[:2], (6, "USD"))
+        self.assertEqual(params[3:], (5, 5))
+
+    def test_get_salary_deltas(self) -> None:
+        self.mock_cursor.fetchall.return_value = []
+
+        self.assertEqual(self.db_manager.get_salary_deltas(period_days=30, currency="RUR"), [])
+        self.assertEqual(self.mock_cursor.execute.call_args[0][1], (30, "RUR"))
+
+
+class TestArchive(unittest.TestCase):
+    """Закрытые вакансии и их перенос в архив."""
+
+    def setUp(self) -> None:
+        self.db_manager = DBManager(DBConfig("testdb", "user", "pass", "localhost", 5432))
+        connect_patcher = patch("psycopg2.connect")
+        mock_connect = connect_patcher.start()
+        self.addCleanup(connect_patcher.stop)
+        self.mock_conn = MagicMock()
+        self.mock_cursor = MagicMock()
+        mock_connect.return_value.__enter__.return_value = self.mock_conn
+        self.mock_conn.cursor.return_value.__enter__.return_value = self.mock_cursor
+
+    def test_mark_closed_vacancies(self) -> None:
+        self.mock_cursor.fetchall.return_value = [(True,), (True,), (False,)]
+        self.mock_cursor.rowcount = 3
+
+        result = self.db_manager.mark_closed_vacancies(5, iter([1, 2]))
+
+        self.assertEqual(result, {"closed": 2, "reopened": 1})
+        sql, params = self.mock_cursor.execute.call_args[0]
+        self.assertIn("SET closed_at = CASE", sql)
+        self.assertEqual(params, ([1, 2], 5, [1, 2]))
+        self.mock_conn.commit.assert_called_once()
+
+    def test_archive_closed_vacancies_in_batches(self) -> None:
+        self.mock_cursor.fetchone.side_effect = [(100,), (100,), (40,)]
+
+        self.assertEqual(self.db_manager.archive_closed_vacancies(closed_days=7, batch_size=100), 240)
+
+        self.assertEqual(self.mock_cursor.execute.call_count, 3)
+        sql, params = self.mock_cursor.execute.call_args[0]
+        self.assertIn("FOR UPDATE SKIP LOCKED", sql)
+        self.assertIn("DELETE FROM hh_schema.vacancy_terms", sql)
+        self.assertIn("INSERT INTO hh_schema.vacancies_archive", sql)
+        self.assertEqual(params, (7, 100))
+        self.assertEqual(self.mock_conn.commit.call_count, 3)  # Каждая пачка — своя транзакция.
+
+    def test_get_archive_stats(self) -> None:
+        self.mock_cursor.fetchone.return_value = {"hot": 10, "closed": 2, "archived": 50}
+
+        self.assertEqual(self.db_manager.get_archive_stats(), {"hot": 10, "closed": 2, "archived": 50})
+
+    def test_include_archive(self) -> None:
+        self.mock_cursor.fetchall.return_value = []
+
+        self.db_manager.get_all_vacancies()
+        self.assertNotIn("vacancies_archive", self.mock_cursor.execute.call_args[0][0])
+
+        self.db_manager.get_all_vacancies(include_archive=True)
+        sql = self.mock_cursor.execute.call_args[0][0]
+        self.assertIn("UNION ALL", sql)
+        self.assertIn("jsonb_to_recordset(a.vacancies)", sql)
+
+        self.db_manager.get_vacancies_with_keyword("python", include_archive=True)
+        sql, params = self.mock_cursor.execute.call_args[0]
+        self.assertIn("r.name ILIKE %s", sql)
+        self.assertEqual(params, ("%python%", "%python%"))
+
+
+class TestReadReplicas(unittest.TestCase):
+    """Отчёты на репликах по кругу, пропуск отстающих и недоступных реплик, запись — на основной сервер."""
+
+    def setUp(self) -> None:
+        config = DBConfig(
+            "testdb", "user", "pass", "primary", 5432, replicas=[("r1", 5432), ("r2", 5433)], max_replica_lag=10
+        )
+        self.db_manager = DBManager(config)
+        self.lags = {"r1": 0.0, "r2": 0.0}
+        self.down: Set[str] = set()
+        self.broken: Set[str] = set()  # реплики, обрывающие соединение посреди запроса
+        self.queries: List[str] = []  # сервер каждого запроса (кроме проверки отставания)
+        self.probes: List[str] = []
+        connect_patcher = patch("psycopg2.connect", side_effect=self._connect)
+        self.mock_connect = connect_patcher.start()
+        self.addCleanup(connect_patcher.stop)
+
+    def _connect(self, **kwargs: Any) -> MagicMock:
+        host = kwargs["host"]
+        if host in self.down:
+            raise psycopg2.OperationalError("connection refused")
+        conn = MagicMock()
+        conn.__enter__.return_value = conn
+        cursor = conn.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = (self.lags.get(host),)
+        cursor.fetchall.return_value = []
+
+        def execute(sql: str, params: Any = None) -> None:
+            (self.probes if "pg_is_in_recovery" in sql else self.queries).append(host)
+            if host in self.broken and "pg_is_in_recovery" not in sql:
+                raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+        cursor.execute.side_effect = execute
+        return conn
+
+    def test_parse_replicas(self) -> None:
+        self.assertEqual(parse_replicas("r1:5433, r2,"), [("r1", 5433), ("r2", 5432)])
+        self.assertEqual(parse_replicas(None), [])
+        config = DBConfig("testdb", "user", "pass", "primary", 5432, replicas=[("r1", 5433)])
+        self.assertEqual([(c.host, c.port, c.replicas) for c in config.replica_configs()], [("r1", 5433, [])])
+
+    def test_reads_round_robin_writes_on_primary(self) -> None:
+        for _ in range(2):
+            self.db_manager.get_all_vacancies()
+            self.db_manager.get_salary_trend()
+        self.db_manager.insert_companies([{"id": 1, "name": "A"}])
+
+        self.assertEqual(self.queries, ["r1", "r2", "r1", "r2", "primary"])
+        self.assertEqual(self.probes, ["r1", "r2"])  # Отставание проверяется не чаще REPLICA_CHECK_INTERVAL.
+
+    def test_lagging_replica_skipped(self) -> None:
+        self.lags["r1"] = 60.0
+        for _ in range(3):
+            self.db_manager.get_vacancies_with_keyword("python")
+        self.assertEqual(self.queries, ["r2", "r2", "r2"])
+
+        self.lags["r2"] = 60.0
+        self.db_manager._replicas[1].checked_at = float("-inf")  # Пора проверить отставание снова.
+        self.db_manager.get_avg_salary()
+        self.assertEqual(self.queries[-1], "primary")
+
+    def test_failover_when_replica_down(self) -> None:
+        self.down.add("r1")
+        for _ in range(3):
+            self.db_manager.get_all_vacancies()
+        self.assertEqual(self.queries, ["r2", "r2", "r2"])
+        hosts = [c.kwargs["host"] for c in self.mock_connect.call_args_list]
+        self.assertEqual(hosts.count("r1"), 1)  # Недоступная реплика пропускается REPLICA_RETRY_DELAY секунд.
+
+        self.down.add("r2")
+        self.db_manager._replicas[1].checked_at = float("-inf")
+        self.db_manager.get_all_vacancies()
+        self.assertEqual(self.queries[-1], "primary")
+
+    def test_connection_lost_during_read_marks_replica_down(self) -> None:
+        with self.assertRaises(psycopg2.OperationalError):
+            with self.db_manager._connection(replica=True):
+                raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+        self.db_manager.get_all_vacancies()
+        self.db_manager.get_all_vacancies()
+        self.assertEqual(self.queries, ["r2", "r2"])
+
+    def test_read_retried_on_primary_when_replica_fails_mid_query(self) -> None:
+        self.broken.add("r1")
+        self.assertEqual(self.db_manager.get_all_vacancies(), [])
+        self.assertEqual(self.queries, ["r1", "primary"])  # Повтор один и сразу на основном сервере.
+
+        self.db_manager.get_avg_salary()
+        self.assertEqual(self.queries[-1], "r2")  # Оборвавшаяся реплика пропускается, остальные читают дальше.
+
+    def test_primary_failure_not_retried(self) -> None:
+        self.down.update({"r1", "r2"})
+        self.broken.add("primary")
+        with self.assertRaises(psycopg2.OperationalError):
+            self.db_manager.get_all_vacancies()
+        self.assertEqual(self.queries, ["primary"])
+
+
+class TestPreparedStatements(unittest.TestCase):
+    """Подготовленные запросы на соединениях пула и пакетные отчёты."""
+
+    def setUp(self) -> None:
+        config = DBConfig(name="testdb", user="user", password="pass", host="localhost", port=5432)
+        self.db_manager = DBManager(config, max_connections=2)
+        pool_patcher = patch("src.db_manager.ThreadedConnectionPool")
+        self.mock_pool_cls = pool_patcher.start()
+        self.addCleanup(pool_patcher.stop)
+
+        self.mock_conn = MagicMock()
+        self.mock_cursor = MagicMock()
+        self.prepare_cursor = MagicMock()
+        raw = self.mock_pool_cls.return_value.getconn.return_value
+        raw.__enter__.return_value = self.mock_conn
+        self.mock_conn.cursor.return_value.__enter__.side_effect = self._cursor
+        self.mock_cursor.connection = self.mock_conn
+
+    def _cursor(self) -> MagicMock:
+        # Первый курсор вызова — основной; курсор без cursor_factory внутри _prepared_sql — для PREPARE.
+        if self.mock_conn.cursor.call_args.kwargs.get("cursor_factory") is None:
+            return self.prepare_cursor
+        return self.mock_cursor
+
+    def test_to_positional(self) -> None:
+        self.assertEqual(_to_positional("SELECT %s, %s;\n"), "SELECT $1, $2")
+
+    def test_prepare_once_per_connection(self) -> None:
+        self.mock_cursor.fetchall.return_value = [{"vacancy_id": 1}]
+
+        self.db_manager.get_vacancies_with_keyword("python")
+        self.db_manager.get_vacancies_with_keyword("java")
+
+        self.prepare_cursor.execute.assert_called_once()
+        prepare_sql = self.prepare_cursor.execute.call_args[0][0]
+        self.assertTrue(prepare_sql.startswith("PREPARE hh_get_vacancies_with_keyword AS"))
+        self.assertIn("ILIKE $1", prepare_sql)
+        self.assertEqual(
+            self.mock_cursor.execute.call_args[0], ("EXECUTE hh_get_vacancies_with_keyword (%s)", ("%java%",))
+        )
+
+    def test_reprepare_after_session_reset(self) -> None:
+        # Пулер выполнил DISCARD ALL: первый EXECUTE не находит запрос, он готовится заново и повторяется.
+        self.mock_cursor.fetchall.return_value = [{"vacancy_id": 1}]
+        self.db_manager.get_vacancies_with_keyword("python")
+        self.mock_cursor.execute.side_effect = [psycopg2.errors.InvalidSqlStatementName("gone"), None]
+
+        self.assertEqual(self.db_manager.get_vacancies_with_keyword("java"), [{"vacancy_id": 1}])
+
+        self.assertEqual(self.prepare_cursor.execute.call_count, 2)
+        self.mock_conn.rollback.assert_called_once()
+        self.assertEqual(
+            self.mock_cursor.execute.call_args[0], ("EXECUTE hh_get_vacancies_with_keyword (%s)", ("%java%",))
+        )
+
+    def test_without_pool_plain_sql(self) -> None:
+        db = DBManager(DBConfig("testdb", "user", "pass", "localhost", 5432))
+        with patch("psycopg2.connect") as mock_connect:
+            mock_connect.return_value.__enter__.return_value = self.mock_conn
+            self.mock_cursor.fetchall.return_value = []
+            db.get_vacancies_by_company(1)
+        self.prepare_cursor.execute.assert_not_called()
+        self.assertIn("WHERE v.company_id = %s", self.mock_cursor.execute.call_args[0][0])
+
+    def test_get_reports_single_query(self) -> None:
+        self.mock_cursor.fetchone.return_value = {"avg_salary": 100, "vacancies_with_keyword": []}
+
+        result = self.db_manager.get_reports(["avg_salary", "vacancies_with_keyword"], keyword="python")
+
+        self.assertEqual(result, {"avg_salary": 100, "vacancies_with_keyword": []})
+        self.mock_cursor.execute.assert_called_once()
+        sql, params = self.mock_cursor.execute.call_args[0]
+        self.assertIn("AS avg_salary", sql)
+        self.assertIn("json_agg", sql)
+        self.assertEqual(params, ["%python%"])
+
+    def test_get_reports_validation(self) -> None:
+        with self.assertRaises(ValueError):
+            self.db_manager.get_reports(["nope"])
+        with self.assertRaises(ValueError):
+            self.db_manager.get_reports(["vacancies_with_keyword"])
+        self.assertNotIn("%s", REPORTS["vacancies_with_higher_salary"])
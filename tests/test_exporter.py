@@ -0,0 +1,69 @@
+# Тесты параллельной выгрузки: нарезка на шарды, запись в нескольких форматах в процессах пула
+# и в текущем процессе (workers=0), проверка форматов.
+
+import csv
+import json
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from src.exporter import EXPORT_FIELDS, ParallelExporter
+
+
+def make_batches(total: int, batch_size: int) -> List[List[Dict]]:
+    rows = [
+        {"vacancy_id": i, "company_id": i % 3, "name": f"Вакансия {i}", "salary_from": 1000 * i, "salary_to": None,
+         "salary_currency": "RUR", "url": f"u{i}"}
+        for i in range(1, total + 1)
+    ]  # fmt: skip
+    batches = []
+    for start in range(0, total, batch_size):
+        end = start + batch_size
+        batches.append(rows[start:end])
+    return batches
+
+
+def read_json(paths: List[str]) -> List[Dict]:
+    rows: List[Dict] = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            rows.extend(json.load(f))
+    return rows
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_sharded_export(tmp_path: Path, workers: int) -> None:
+    exporter = ParallelExporter(tmp_path, formats=("json", "csv"), shard_size=4, workers=workers)
+
+    files = exporter.export(make_batches(10, batch_size=3))
+
+    assert [Path(p).name for p in files["json"]] == [
+        "vacancies-00000.json",
+        "vacancies-00001.json",
+        "vacancies-00002.json",
+    ]
+    assert [len(read_json([p])) for p in files["json"]] == [4, 4, 2]
+    assert [row["vacancy_id"] for row in read_json(files["json"])] == list(range(1, 11))
+    with open(files["csv"][2], encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        assert reader.fieldnames == EXPORT_FIELDS
+        assert [row["vacancy_id"] for row in reader] == ["9", "10"]
+
+
+def test_single_file_export(tmp_path: Path) -> None:
+    exporter = ParallelExporter(tmp_path, formats=("json",), shard_size=0, workers=0)
+
+    files = exporter.export(make_batches(5, batch_size=2))
+
+    assert files == {"json": [str(tmp_path / "vacancies.json")]}
+    assert len(read_json(files["json"])) == 5
+
+
+def test_empty_export(tmp_path: Path) -> None:
+    assert ParallelExporter(tmp_path, shard_size=10, workers=0).export([]) == {"json": [], "csv": []}
+
+
+def test_unknown_format(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        ParallelExporter(tmp_path, formats=("xml",))
@@ -7,8 +7,14 @@
 # Проверяется: фильтрация компаний без вакансий, правильность парсинга вакансий и зарплат,
 # корректная работа при пустом ответе.
 
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 from unittest.mock import MagicMock, patch
 
+import pytest
+import requests
+
 from src.hh_api import HHApi
 
 
@@ -18,14 +24,16 @@ def test_get_companies(mock_get: MagicMock) -> None:
     # Подменяем ответ API
     mock_response = MagicMock()
     mock_response.raise_for_status = lambda: None
-    mock_response.json.return_value = {
-        "items": [
-            {"id": "1", "name": "Company1", "open_vacancies": 5},
-            {"id": "2", "name": "Company2", "open_vacancies": 0},  # Должна быть пропущена
-            {"id": "3", "name": "Company3", "open_vacancies": 10},
-        ],
-        "pages": 1,
-    }
+    mock_response.content = json.dumps(
+        {
+            "items": [
+                {"id": "1", "name": "Company1", "open_vacancies": 5},
+                {"id": "2", "name": "Company2", "open_vacancies": 0},  # Должна быть пропущена
+                {"id": "3", "name": "Company3", "open_vacancies": 10},
+            ],
+            "pages": 1,
+        }
+    ).encode()
     mock_get.return_value = mock_response
 
     api = HHApi()
@@ -35,6 +43,7 @@ def test_get_companies(mock_get: MagicMock) -> None:
     assert companies[0]["id"] == 1
     assert companies[1]["id"] == 3
     assert companies[0]["name"] == "Company1"
+    assert api.open_vacancies == {1: 5, 3: 10}  # Для объединения мелких работодателей в общие запросы.
 
 
 # --- Тест get_vacancies_for_company --- #
@@ -43,17 +52,19 @@ def test_get_companies(mock_get: MagicMock) -> None:
 def test_get_vacancies_for_company(mock_get: MagicMock, mock_safe_salary: MagicMock) -> None:
     mock_response = MagicMock()
     mock_response.raise_for_status = lambda: None
-    mock_response.json.return_value = {
-        "items": [
-            {
-                "id": "101",
-                "name": "Dev1",
-                "salary": {"from": 100000, "to": 150000, "currency": "RUR"},
-                "alternate_url": "http://hh.ru/vacancy/101",
-            }
-        ],
-        "pages": 1,
-    }
+    mock_response.content = json.dumps(
+        {
+            "items": [
+                {
+                    "id": "101",
+                    "name": "Dev1",
+                    "salary": {"from": 100000, "to": 150000, "currency": "RUR"},
+                    "alternate_url": "http://hh.ru/vacancy/101",
+                }
+            ],
+            "pages": 1,
+        }
+    ).encode()
     mock_get.return_value = mock_response
 
     api = HHApi()
@@ -75,7 +86,7 @@ def test_get_vacancies_for_company(mock_get: MagicMock, mock_safe_salary: MagicM
 def test_get_companies_empty(mock_get: MagicMock) -> None:
     mock_response = MagicMock()
     mock_response.raise_for_status = lambda: None
-    mock_response.json.return_value = {"items": [], "pages": 1}
+    mock_response.content = json.dumps({"items": [], "pages": 1}).encode()
     mock_get.return_value = mock_response
 
     api = HHApi()
@@ -87,9 +98,250 @@ def test_get_companies_empty(mock_get: MagicMock) -> None:
 def test_get_vacancies_for_company_empty(mock_get: MagicMock) -> None:
     mock_response = MagicMock()
     mock_response.raise_for_status = lambda: None
-    mock_response.json.return_value = {"items": [], "pages": 1}
+    mock_response.content = json.dumps({"items": [], "pages": 1}).encode()
     mock_get.return_value = mock_response
 
     api = HHApi()
     vacancies = api.get_vacancies_for_company(999)
     assert vacancies == []
+
+
+@patch("src.hh_api.requests.Session.get")
+def test_get_vacancy_columns_for_company(mock_get: MagicMock) -> None:
+    first_page = MagicMock()
+    first_page.raise_for_status = lambda: None
+    first_page.content = json.dumps(
+        {
+            "items": [{"id": "101", "name": "Dev1", "salary": {"from": 1000}, "alternate_url": "http://hh.ru/101"}],
+            "pages": 2,
+        }
+    ).encode()
+    second_page = MagicMock()
+    second_page.raise_for_status = lambda: None
+    second_page.content = json.dumps(
+        {
+            "items": [{"id": "102", "name": "Dev2", "salary": None, "alternate_url": "http://hh.ru/102"}],
+            "pages": 2,
+        }
+    ).encode()
+    mock_get.side_effect = [first_page, second_page]
+
+    api = HHApi()
+    columns = api.get_vacancy_columns_for_company(7)
+
+    assert columns.vacancy_id == [101, 102]
+    assert columns.company_id == [7, 7]
+    assert columns.salary_from[0] == 1000.0
+    assert mock_get.call_count == 2
+
+
+@patch("src.hh_api.requests.Session.get")
+def test_get_vacancies_for_company_resume(mock_get: MagicMock) -> None:
+    pages = []
+    for page in (2, 3):
+        response = MagicMock()
+        response.raise_for_status = lambda: None
+        response.content = json.dumps(
+            {
+                "items": [{"id": str(100 + page), "name": "Dev", "salary": None, "alternate_url": "u"}],
+                "pages": 4,
+            }
+        ).encode()
+        pages.append(response)
+    mock_get.side_effect = pages
+    seen = []
+
+    vacancies = HHApi().get_vacancies_for_company(
+        7,
+        start_page=2,
+        on_page=lambda page, total, items: seen.append((page, total, [v["vacancy_id"] for v in items])),
+    )
+
+    assert [v["vacancy_id"] for v in vacancies] == [102, 103]
+    assert seen == [(2, 4, [102]), (3, 4, [103])]
+    assert [c.kwargs["params"]["page"] for c in mock_get.call_args_list] == [2, 3]
+
+
+def _vacancies_response(employer_ids: list, found: int = 0) -> MagicMock:
+    response = MagicMock()
+    response.raise_for_status = lambda: None
+    items = [
+        {"id": str(employer_id * 10 + i), "name": "Dev", "salary": None, "alternate_url": "u",
+         "employer": {"id": str(employer_id)}}
+        for employer_id in employer_ids
+        for i in range(2)
+    ]  # fmt: skip
+    response.content = json.dumps({"items": items, "found": found or len(items), "pages": 1}).encode()
+    return response
+
+
+@patch("src.hh_api.requests.Session.get")
+def test_get_vacancies_for_companies_batches_small_employers(mock_get: MagicMock) -> None:
+    mock_get.side_effect = lambda url, params, timeout: _vacancies_response(
+        params["employer_id"] if isinstance(params["employer_id"], list) else [params["employer_id"]]
+    )
+    api = HHApi()
+    api.open_vacancies = {1: 2, 2: 2, 3: 2, 4: 500}
+
+    result = api.get_vacancies_for_companies([1, 2, 3, 4], batch_size=2)
+
+    assert list(result) == [1, 2, 3, 4]
+    assert [v["vacancy_id"] for v in result[2]] == [20, 21]
+    assert all(v["company_id"] == 3 for v in result[3])
+    # Запросы: [1, 2] вместе, 3 отдельно (batch_size=2), крупный 4 — постранично сам по себе.
+    assert [c.kwargs["params"]["employer_id"] for c in mock_get.call_args_list] == [[1, 2], 3, 4]
+
+
+@patch("src.hh_api.requests.Session.get")
+def test_get_vacancies_for_companies_splits_deep_results(mock_get: MagicMock) -> None:
+    def respond(url: str, params: dict, timeout: tuple) -> MagicMock:
+        group = params["employer_id"]
+        return _vacancies_response(group, found=HHApi.MAX_SEARCH_DEPTH + 1 if len(group) > 1 else 0)
+
+    mock_get.side_effect = respond
+    api = HHApi()
+    api.open_vacancies = {1: 2, 2: 2}
+
+    result = api.get_vacancies_for_companies([1, 2])
+
+    assert [len(result[1]), len(result[2])] == [2, 2]
+    assert [c.kwargs["params"]["employer_id"] for c in mock_get.call_args_list] == [[1, 2], [1], [2]]
+
+
+@patch("src.hh_api.requests.Session.get")
+def test_get_vacancies_for_companies_unknown_count_not_batched(mock_get: MagicMock) -> None:
+    def respond(url: str, params: dict, timeout: tuple) -> MagicMock:
+        group = params["employer_id"]
+        return _vacancies_response(group if isinstance(group, list) else [group])
+
+    mock_get.side_effect = respond
+    api = HHApi()
+    api.open_vacancies = {1: 2, 2: 2}  # Про работодателя 3 get_companies ничего не сообщал.
+
+    api.get_vacancies_for_companies([1, 2, 3])
+
+    assert [c.kwargs["params"]["employer_id"] for c in mock_get.call_args_list] == [[1, 2], 3]
+
+
+@patch("src.hh_api.requests.Session.get")
+def test_get_vacancies_for_companies_skips_failed_group(mock_get: MagicMock) -> None:
+    mock_get.side_effect = requests.exceptions.ConnectionError("down")
+
+    assert HHApi().get_vacancies_for_companies([1, 2]) == {}
+
+
+@patch("src.hh_api.requests.Session.get")
+def test_get_vacancies_for_companies_skips_failed_single_employer(mock_get: MagicMock) -> None:
+    mock_get.side_effect = requests.exceptions.ConnectionError("down")
+    api = HHApi()
+    api.open_vacancies = {1: 80, 2: 50, 3: 3, 4: 500}
+
+    # Группы [1], [2, 3] и крупный 4: ни один не загружен — пустой список не выдаётся за полный.
+    assert api.get_vacancies_for_companies([1, 2, 3, 4]) == {}
+
+
+def test_get_vacancies_for_company_partitioned() -> None:
+    now = datetime(2026, 1, 31, tzinfo=timezone.utc)
+    # 50 вакансий, по одной в час; глубина выдачи в тесте — 10 вакансий, страница — 4.
+    published = {1000 + i: now - timedelta(hours=i) for i in range(50)}
+    published.update({2000 + i: now - timedelta(days=10 + i) for i in range(3)})  # Опубликованы до lookback_days.
+
+    def respond(url: str, params: dict, timeout: tuple) -> MagicMock:
+        date_from = datetime.fromisoformat(params["date_from"]) if "date_from" in params else datetime.min
+        date_from = date_from.replace(tzinfo=timezone.utc)
+        date_to = datetime.fromisoformat(params["date_to"])
+        ids = [vid for vid, at in published.items() if date_from <= at <= date_to]  # Границы включаются.
+        start = params["page"] * params["per_page"]
+        end = start + params["per_page"]
+        response = MagicMock()
+        response.raise_for_status = lambda: None
+        response.content = json.dumps(
+            {
+                "items": [
+                    {"id": str(vid), "name": "Dev", "salary": None, "alternate_url": "u"} for vid in ids[start:end]
+                ],
+                "found": len(ids),
+                "pages": -(-len(ids) // params["per_page"]),
+            }
+        ).encode()
+        return response
+
+    on_page = MagicMock()
+    with (
+        patch("src.hh_api.requests.Session.get", side_effect=respond) as mock_get,
+        patch.object(HHApi, "MAX_SEARCH_DEPTH", 10),
+        patch.object(HHApi, "MAX_PER_PAGE", 4),
+    ):
+        vacancies = HHApi().get_vacancies_for_company_partitioned(
+            5, lookback_days=3, workers=3, now=now, on_page=on_page
+        )
+
+    assert sorted(v["vacancy_id"] for v in vacancies) == sorted(published)  # Все, без дублей на границах.
+    assert all(v["company_id"] == 5 for v in vacancies)
+    assert vacancies[0]["vacancy_id"] == 1000  # От новых интервалов к старым.
+    assert [v["vacancy_id"] for v in vacancies[-3:]] == [2000, 2001, 2002]  # Интервал без начала — последний.
+    assert on_page.call_count == mock_get.call_count  # По вызову на каждую полученную страницу.
+
+
+@patch("src.hh_api.requests.Session.get")
+def test_get_employers_page_with_rate_limiter(mock_get: MagicMock) -> None:
+    mock_response = MagicMock()
+    mock_response.raise_for_status = lambda: None
+    mock_response.content = json.dumps({"items": [{"id": "7", "name": "A", "open_vacancies": 3}], "pages": 2}).encode()
+    mock_get.return_value = mock_response
+    limiter = MagicMock()
+
+    api = HHApi()
+    api.rate_limiter = limiter
+    data = api.get_employers_page("python", page=1)
+
+    assert data["pages"] == 2
+    assert api.open_vacancies == {7: 3}
+    limiter.assert_called_once_with("employers")
+    assert mock_get.call_args[1]["params"]["page"] == 1
+
+    mock_response.raise_for_status = MagicMock(side_effect=requests.exceptions.HTTPError("502"))
+    with pytest.raises(requests.exceptions.HTTPError):  # Ошибку обрабатывает очередь задач, а не клиент.
+        api.get_employers_page("python")
+
+
+def _http_error(status: int, headers: Optional[dict] = None) -> requests.exceptions.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return requests.exceptions.HTTPError(f"{status}", response=response)
+
+
+def test_retry_delay() -> None:
+    api = HHApi(max_retries=3, retry_backoff=0.5)
+
+    assert api._retry_delay(requests.exceptions.ConnectionError("down"), 0) == 0.5
+    assert api._retry_delay(requests.exceptions.ReadTimeout("slow"), 2) == 2.0  # Пауза удваивается.
+    assert api._retry_delay(_http_error(429, {"Retry-After": "7"}), 0) == 7.0
+    assert api._retry_delay(_http_error(503, {"Retry-After": "600"}), 0) == 30.0  # Не дольше MAX_RETRY_DELAY.
+    assert api._retry_delay(_http_error(502), 1) == 1.0
+    assert api._retry_delay(_http_error(400), 0) is None  # Постоянная ошибка не повторяется.
+    assert api._retry_delay(requests.exceptions.ConnectionError("down"), 3) is None  # Попытки исчерпаны.
+    assert HHApi()._retry_delay(requests.exceptions.ConnectionError("down"), 0) is None  # По умолчанию без повторов.
+
+
+@patch("src.hh_api.requests.Session.get")
+def test_get_retries_transient_errors(mock_get: MagicMock) -> None:
+    ok = MagicMock()
+    ok.raise_for_status = lambda: None
+    ok.content = json.dumps({"items": [], "pages": 1}).encode()
+    mock_get.side_effect = [requests.exceptions.ConnectionError("reset"), ok]
+    api = HHApi(max_retries=2)
+    delays: list = []
+    api.sleep = delays.append
+
+    assert api.get_employers_page("python")["pages"] == 1
+    assert mock_get.call_count == 2
+    assert delays == [0.5]
+
+
+def test_base_url_read_from_env_on_init(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("HH_API_URL", raising=False)
+    assert HHApi().BASE_URL == "https://api.hh.ru"
+    monkeypatch.setenv("HH_API_URL", "http://127.0.0.1:8080")  # Переменная из .env, загруженного после импорта.
+    assert HHApi().BASE_URL == "http://127.0.0.1:8080"
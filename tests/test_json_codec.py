@@ -0,0 +1,83 @@
+# Тесты для json_codec: каждый доступный бэкенд проверяется на одинаковое поведение
+# (кодирование кириллицы, Decimal/даты, ошибки разбора как json.JSONDecodeError).
+
+import datetime
+import importlib.util
+import json
+from decimal import Decimal
+from typing import Iterator
+
+import pytest
+
+from src import json_codec
+
+AVAILABLE = [name for name in json_codec.BACKENDS if name == "json" or importlib.util.find_spec(name)]
+
+
+@pytest.fixture(params=AVAILABLE)
+def backend(request: pytest.FixtureRequest) -> Iterator[str]:
+    previous = json_codec.backend()
+    json_codec.set_backend(request.param)
+    yield request.param
+    json_codec.set_backend(previous)
+
+
+def test_roundtrip(backend: str) -> None:
+    data = [{"id": 1, "name": "Разработчик", "salary": None}]
+    raw = json_codec.dumps(data)
+    assert isinstance(raw, bytes)
+    assert "Разработчик".encode("utf-8") in raw
+    assert json_codec.loads(raw) == data
+
+
+def test_dumps_indent(backend: str) -> None:
+    raw = json_codec.dumps({"a": 1}, indent=4)
+    assert raw.splitlines()[1] == b'    "a": 1'  # Отступ 4, как у data/*.json, независимо от бэкенда.
+    assert json.loads(raw) == {"a": 1}
+
+
+def test_dumps_decimal_and_date(backend: str) -> None:
+    raw = json_codec.dumps({"salary": Decimal("1500.5"), "day": datetime.date(2024, 1, 2)})
+    assert json.loads(raw) == {"salary": 1500.5, "day": "2024-01-02"}
+
+
+def test_decimal_encoded_as_number_by_every_backend() -> None:
+    previous = json_codec.backend()
+    try:
+        decoded = {}
+        for name in AVAILABLE:
+            json_codec.set_backend(name)
+            decoded[name] = json.loads(json_codec.dumps({"salary_from": Decimal("100000.00")}))
+    finally:
+        json_codec.set_backend(previous)
+    assert all(value == {"salary_from": 100000.0} for value in decoded.values()), decoded
+
+
+def test_loads_invalid(backend: str) -> None:
+    with pytest.raises(json.JSONDecodeError):
+        json_codec.loads(b"invalid json")
+
+
+def test_set_backend_unknown() -> None:
+    with pytest.raises(ValueError):
+        json_codec.set_backend("yaml")
+
+
+def test_set_backend_auto_picks_first_available() -> None:
+    previous = json_codec.backend()
+    try:
+        assert json_codec.set_backend() == AVAILABLE[0]
+    finally:
+        json_codec.set_backend(previous)
+
+
+def test_backend_selected_lazily_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    # HH_JSON_BACKEND из .env появляется в окружении уже после импорта модуля.
+    previous = json_codec.backend()
+    monkeypatch.setattr(json_codec, "BACKEND", None)
+    monkeypatch.setenv("HH_JSON_BACKEND", "json")
+    try:
+        assert json_codec.loads(b"[1]") == [1]
+        assert json_codec.backend() == "json"
+    finally:
+        json_codec.set_backend(previous)
@@ -0,0 +1,129 @@
+# Тесты точки входа main.py: быстрый запуск без тяжёлых импортов, режим --query к SQLite
+# и проверка доступности БД без лишних пауз.
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+import main
+from src.checkpoint import CrawlCheckpoint
+from src.hh_api import HHApi
+from src.sqlite_manager import SQLiteManager
+from src.storage import VacancyCursor
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def run_main(*args: str, **env: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "main.py", *args],
+        cwd=ROOT,
+        env=dict(os.environ, **env),
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+def test_import_main_skips_heavy_dependencies() -> None:
+    heavy = ["requests", "psycopg2", "tqdm", "dotenv", "http.server", "src.exporter"]
+    code = f"import sys, main; print(sorted(m for m in {heavy!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def test_query_keyword_sqlite(tmp_path: Path) -> None:
+    path = str(tmp_path / "hh.sqlite3")
+    db = SQLiteManager(path)
+    db.create_tables()
+    db.insert_companies([{"id": 1, "name": "Яндекс"}])
+    db.insert_vacancies(
+        [
+            {"vacancy_id": 1, "company_id": 1, "name": "Python Developer", "salary_from": 100000, "url": "u1"},
+            {"vacancy_id": 2, "company_id": 1, "name": "Java Developer", "salary_from": 90000, "url": "u2"},
+        ]
+    )
+    db.close()
+
+    result = run_main("--query", "keyword", "--keyword", "python", DB_BACKEND="sqlite", SQLITE_PATH=path)
+
+    assert result.returncode == 0, result.stderr
+    assert "Python Developer" in result.stdout
+    assert "Java Developer" not in result.stdout
+
+
+def test_run_query_empty_results() -> None:
+    db = MagicMock()
+    db.open_vacancy_cursor.return_value = VacancyCursor()
+    with patch("builtins.print") as mock_print:
+        main.run_query(db, "higher")
+        main.run_query(db, "keyword", "python", page_size=20)
+    db.open_vacancy_cursor.assert_called_with("keyword", "python")
+    assert [c[0][0] for c in mock_print.call_args_list] == [
+        "Вакансий с зарплатой выше средней нет.",
+        "Вакансий не найдено.",
+    ]
+
+
+def test_run_query_pager(capsys: pytest.CaptureFixture) -> None:
+    db = MagicMock()
+    db.open_vacancy_cursor.return_value = VacancyCursor([{"vacancy": f"V{i}", "url": f"u{i}"} for i in range(5)])
+    with patch("builtins.input", side_effect=["n", "q"]):
+        main.run_query(db, "all", page_size=3)
+    out = capsys.readouterr().out
+    assert "Страница 1 из 2, вакансий 5" in out and "Страница 2 из 2, вакансий 5" in out
+    assert out.count("Ссылка:") == 5
+
+
+def test_fetch_company_vacancies_marks_complete_only_after_full_fetch(tmp_path: Path) -> None:
+    checkpoint = CrawlCheckpoint(tmp_path / "crawl.jsonl")
+    hh = MagicMock(MAX_SEARCH_DEPTH=2000)
+
+    def fail_on_second_page(
+        employer_id: int, start_page: int, on_page: Callable[[int, int, List[Dict]], None], strict: bool
+    ) -> List[Dict]:
+        assert strict
+        on_page(0, 2, [{"vacancy_id": 1}])
+        raise requests.exceptions.ConnectionError("down")
+
+    hh.get_vacancies_for_company.side_effect = fail_on_second_page
+    with patch.object(main.time, "sleep"), patch("builtins.print"):
+        assert main.safe_hh_request(main.fetch_company_vacancies, hh, checkpoint, 7, retries=1) == []
+    assert not checkpoint.is_complete(7)
+
+    hh.get_vacancies_for_company.side_effect = lambda employer_id, start_page, on_page, strict: on_page(
+        start_page, 2, [{"vacancy_id": 2}]
+    )
+    main.fetch_company_vacancies(hh, checkpoint, 7)
+    assert hh.get_vacancies_for_company.call_args.kwargs["start_page"] == 1
+    assert checkpoint.is_fetched(7) and checkpoint.is_complete(7)
+
+
+def test_resume_keeps_large_employer_out_of_batches(tmp_path: Path) -> None:
+    path = tmp_path / "crawl.jsonl"
+    companies = [{"id": 1, "name": "A"}, {"id": 2, "name": "B"}, {"id": 3, "name": "C"}]
+    CrawlCheckpoint(path).start("it", companies, {1: 5000, 2: 3, 3: 4})
+
+    # --resume: новый процесс, get_companies не вызывался, и число вакансий известно только из журнала.
+    checkpoint = CrawlCheckpoint(path)
+    assert main.small_employers(HHApi(), checkpoint, checkpoint.companies) == []  # Неизвестные — по одному.
+    hh = HHApi()
+    hh.open_vacancies.update(checkpoint.open_vacancies)
+    assert main.small_employers(hh, checkpoint, checkpoint.companies) == [2, 3]
+    assert hh.open_vacancies[1] > hh.MAX_SEARCH_DEPTH  # Крупный снова пойдёт через разбиение выдачи по датам.
+
+
+def test_wait_for_db_single_probe_does_not_sleep() -> None:
+    db = MagicMock()
+    db.ping.side_effect = OSError("connection refused")
+    with patch.object(main.time, "sleep") as mock_sleep, patch("builtins.print"):
+        assert main.wait_for_db(db, retries=1) is False
+        mock_sleep.assert_not_called()
+        assert main.wait_for_db(db, retries=3, delay=0.5) is False
+    assert mock_sleep.call_count == 2  # После последней попытки пауза не нужна.
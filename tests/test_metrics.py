@@ -0,0 +1,117 @@
+# Тесты метрик: счётчики и гистограммы с метками, формат Prometheus, дамп в файл, эндпоинт /metrics
+# и запись метрик из HHApi, DBManager и экспорта в файлы.
+
+import json
+import urllib.request
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from src import metrics
+from src.db_manager import DBConfig, DBManager
+from src.hh_api import HHApi
+from src.work_files import save_to_csv, save_to_json
+
+
+@pytest.fixture(autouse=True)
+def clean_registry() -> None:
+    metrics.REGISTRY.reset()
+
+
+def test_counter_labels() -> None:
+    counter = metrics.MetricsRegistry().counter("c_total", "help")
+    counter.inc(endpoint="a")
+    counter.inc(2, endpoint="a")
+    counter.inc(endpoint="b")
+    assert counter.value(endpoint="a") == 3
+    assert counter.value(endpoint="b") == 1
+    assert counter.value(endpoint="c") == 0
+
+
+def test_histogram_prometheus_format() -> None:
+    registry = metrics.MetricsRegistry()
+    hist = registry.histogram("lat_seconds", "Latency", buckets=(0.1, 1.0))
+    hist.observe(0.05, q="x")
+    hist.observe(0.5, q="x")
+    hist.observe(5, q="x")
+
+    text = registry.render_prometheus()
+    assert "# TYPE lat_seconds histogram" in text
+    assert 'lat_seconds_bucket{q="x",le="0.1"} 1' in text
+    assert 'lat_seconds_bucket{q="x",le="1"} 2' in text
+    assert 'lat_seconds_bucket{q="x",le="+Inf"} 3' in text
+    assert 'lat_seconds_count{q="x"} 3' in text
+    assert hist.stats(q="x")["max"] == 5
+
+
+def test_label_escaping() -> None:
+    registry = metrics.MetricsRegistry()
+    registry.counter("c_total", "help").inc(name='a"b')
+    assert 'c_total{name="a\\"b"} 1' in registry.render_prometheus()
+
+
+def test_dump_and_summary(tmp_path: Path) -> None:
+    metrics.DB_LATENCY.observe(0.2, query="q")
+    path = tmp_path / "metrics.prom"
+    metrics.REGISTRY.dump(path)
+    assert 'db_query_seconds_count{query="q"} 1' in path.read_text(encoding="utf-8")
+    assert 'db_query_seconds{query="q"}: n=1' in metrics.REGISTRY.summary()
+
+
+def test_http_endpoint() -> None:
+    metrics.HTTP_RETRIES.inc(method="get_companies")
+    server = metrics.start_http_server(0, host="127.0.0.1")
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        body = urllib.request.urlopen(url, timeout=5).read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert 'hh_api_retries_total{method="get_companies"} 1' in body
+
+
+@patch("src.hh_api.requests.Session.get")
+def test_hh_api_records_requests(mock_get: MagicMock) -> None:
+    response = MagicMock()
+    response.status_code = 200
+    response.raise_for_status = lambda: None
+    response.content = json.dumps({"items": [], "pages": 1}).encode()
+    mock_get.return_value = response
+
+    HHApi().get_vacancies_for_company(1)
+
+    assert metrics.HTTP_REQUESTS.value(endpoint="vacancies", status=200) == 1
+    assert metrics.HTTP_BYTES.stats(endpoint="vacancies")["sum"] == len(response.content)
+    assert metrics.HTTP_LATENCY.stats(endpoint="vacancies")["count"] == 1
+
+
+@patch("src.hh_api.requests.Session.get", side_effect=requests.exceptions.ConnectionError("down"))
+def test_hh_api_records_errors(mock_get: MagicMock) -> None:
+    assert HHApi().get_companies() == []
+    assert metrics.HTTP_REQUESTS.value(endpoint="employers", status="error") == 1
+
+
+@patch("psycopg2.connect")
+def test_db_manager_records_queries(mock_connect: MagicMock) -> None:
+    mock_cursor = MagicMock()
+    mock_cursor.rowcount = 3
+    mock_cursor.fetchall.return_value = []
+    mock_connect.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+
+    DBManager(DBConfig("db", "u", "p", "localhost", 5432)).get_all_vacancies()
+
+    assert metrics.DB_QUERIES.value(query="get_all_vacancies", status="ok") == 1
+    assert metrics.DB_ROWS.stats(query="get_all_vacancies")["sum"] == 3
+
+
+def test_exports_record_rows_and_bytes(tmp_path: Path) -> None:
+    data = [{"id": 1, "name": "A"}, {"id": 2, "name": "B"}]
+    save_to_json(tmp_path / "d.json", data)
+    save_to_csv(tmp_path / "d.csv", data, ["id", "name"])
+
+    assert metrics.EXPORT_ROWS.value(format="json") == 2
+    assert metrics.EXPORT_ROWS.value(format="csv") == 2
+    assert metrics.EXPORT_BYTES.value(format="json") == (tmp_path / "d.json").stat().st_size
+    assert metrics.EXPORT_BYTES.value(format="csv") == (tmp_path / "d.csv").stat().st_size
@@ -0,0 +1,63 @@
+# Тесты вывода списков вакансий: пачечная запись в поток и постраничный просмотр с переходами
+# вперёд, назад и на страницу по номеру. Список — VacancyCursor над строками в памяти.
+
+import io
+from typing import Dict, List, Type
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.pager import VacancyPager, format_rows, write_vacancies
+from src.storage import VacancyCursor
+
+ROWS: List[Dict] = [{"vacancy_id": i, "vacancy": f"Vacancy {i}"} for i in range(1, 46)]
+
+
+def short(row: Dict) -> str:
+    return str(row["vacancy_id"])
+
+
+def test_write_vacancies_one_write_per_batch() -> None:
+    out = MagicMock()
+
+    assert write_vacancies(VacancyCursor(ROWS), out, batch_size=20, formatter=short) == 45
+
+    assert out.write.call_count == 3
+    assert out.write.call_args_list[0][0][0] == format_rows(ROWS[:20], short)
+    out.flush.assert_called_once()
+
+
+def test_pager_navigation() -> None:
+    out = io.StringIO()
+    commands = iter(["", "p", "3", "9", "q"])
+    pager = VacancyPager(
+        VacancyCursor(ROWS), page_size=20, out=out, read=lambda prompt: next(commands), formatter=short
+    )
+
+    assert pager.run() == 45
+
+    lines = out.getvalue().splitlines()
+    first_rows = [lines[0]] + [lines[i + 1] for i, line in enumerate(lines[:-1]) if line.startswith("---")]
+    assert first_rows == ["1", "21", "1", "41", "Нет страницы 9: всего страниц 3."]  # Страницы 1, 2, снова 1, 3.
+    assert "--- Страница 3 из 3, вакансий 45 ---" in out.getvalue()
+
+
+def test_pager_empty() -> None:
+    out = io.StringIO()
+    read = MagicMock()
+
+    assert VacancyPager(VacancyCursor(), out=out, read=read).run() == 0
+
+    assert out.getvalue() == ""
+    read.assert_not_called()
+
+
+@pytest.mark.parametrize("error", [EOFError, KeyboardInterrupt])
+def test_pager_eof_quits(error: Type[BaseException]) -> None:
+    out = io.StringIO()
+    read = MagicMock(side_effect=error)
+
+    assert VacancyPager(VacancyCursor(ROWS), page_size=20, out=out, read=read, formatter=short).run() == 45
+
+    read.assert_called_once()
+    assert out.getvalue().endswith("---\n\n")  # Первая страница и перевод строки после подсказки.
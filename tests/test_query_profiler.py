@@ -0,0 +1,124 @@
+# Тесты QueryProfiler: пороги медленных запросов, захват EXPLAIN только для SELECT (в точке сохранения),
+# запись в лог JSON Lines, статистика и интеграция с DBManager._execute.
+
+import json
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.db_manager import DBConfig, DBManager
+from src.query_profiler import QueryProfiler
+
+
+def _cursor_with_plan(plan_lines: list) -> MagicMock:
+    cur = MagicMock()
+    explain_cur = MagicMock()
+    explain_cur.fetchall.return_value = [(line,) for line in plan_lines]
+    cur.connection.cursor.return_value.__enter__.return_value = explain_cur
+    return cur
+
+
+def test_fast_query_not_logged(capsys: pytest.CaptureFixture[str]) -> None:
+    profiler = QueryProfiler(slow_threshold_ms=100)
+    entry = profiler.record(MagicMock(), "q", "SELECT 1", None, duration=0.01, rows=1)
+
+    assert not entry.slow
+    assert entry.sql is None
+    assert capsys.readouterr().out == ""
+
+
+def test_slow_select_captures_plan(tmp_path: Path) -> None:
+    log = tmp_path / "slow.jsonl"
+    profiler = QueryProfiler(slow_threshold_ms=10, explain=True, log_path=log)
+    cur = _cursor_with_plan(["Seq Scan on vacancies", "Buffers: shared hit=10"])
+
+    entry = profiler.record(cur, "get_all", "SELECT *\n FROM t WHERE x > %s", (5,), duration=0.5, rows=3)
+
+    explain_cur = cur.connection.cursor.return_value.__enter__.return_value
+    assert [c.args for c in explain_cur.execute.call_args_list] == [
+        ("SAVEPOINT hh_explain",),
+        ("EXPLAIN (ANALYZE, BUFFERS) SELECT *\n FROM t WHERE x > %s", (5,)),
+        ("ROLLBACK TO SAVEPOINT hh_explain",),
+        ("RELEASE SAVEPOINT hh_explain",),
+    ]
+    assert entry.plan == "Seq Scan on vacancies\nBuffers: shared hit=10"
+    logged = json.loads(log.read_text(encoding="utf-8").splitlines()[0])
+    assert logged["query"] == "get_all"
+    assert logged["sql"] == "SELECT * FROM t WHERE x > %s"
+    assert logged["rows"] == 3
+
+
+def test_slow_insert_not_explained(tmp_path: Path) -> None:
+    profiler = QueryProfiler(slow_threshold_ms=10, explain=True, log_path=tmp_path / "slow.jsonl")
+    cur = MagicMock()
+    entry = profiler.record(cur, "insert", "INSERT INTO t VALUES (%s)", (1,), duration=1.0, rows=1)
+
+    assert entry.slow
+    assert entry.plan is None
+    cur.connection.cursor.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "WITH claimed AS (SELECT task_id FROM t FOR UPDATE SKIP LOCKED) UPDATE t SET status = 'running'",
+        "WITH moved AS (DELETE FROM v RETURNING *) INSERT INTO a SELECT * FROM moved",
+        "SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload",
+    ],
+)
+def test_slow_write_explained_without_analyze(tmp_path: Path, sql: str) -> None:
+    profiler = QueryProfiler(slow_threshold_ms=10, explain=True, log_path=tmp_path / "slow.jsonl")
+    cur = _cursor_with_plan(["Update on t"])
+
+    profiler.record(cur, "write", sql, None, duration=1.0, rows=1)
+
+    explain_cur = cur.connection.cursor.return_value.__enter__.return_value
+    assert explain_cur.execute.call_args_list[1].args[0] == "EXPLAIN " + sql  # Без ANALYZE: запрос не выполняется.
+
+
+def test_failed_explain_rolled_back_to_savepoint(tmp_path: Path) -> None:
+    profiler = QueryProfiler(slow_threshold_ms=0, explain=True, log_path=tmp_path / "slow.jsonl")
+    cur = MagicMock()
+    explain_cur = cur.connection.cursor.return_value.__enter__.return_value
+    explain_cur.execute.side_effect = lambda sql, params=None: sql.startswith("EXPLAIN") and 1 / 0
+
+    entry = profiler.record(cur, "q", "SELECT 1", None, duration=0.1, rows=1)
+
+    assert entry.plan is not None and "division by zero" in entry.plan
+    assert explain_cur.execute.call_args_list[-2].args == ("ROLLBACK TO SAVEPOINT hh_explain",)
+
+
+def test_explain_failure_does_not_raise(tmp_path: Path) -> None:
+    profiler = QueryProfiler(slow_threshold_ms=0, explain=True, log_path=tmp_path / "slow.jsonl")
+    cur = MagicMock()
+    cur.connection.cursor.side_effect = RuntimeError("closed")
+    entry = profiler.record(cur, "q", "SELECT 1", None, duration=0.1, rows=1)
+    assert entry.plan is not None and "closed" in entry.plan
+
+
+def test_stats_and_report() -> None:
+    profiler = QueryProfiler(slow_threshold_ms=100, log_path=None)
+    profiler.record(MagicMock(), "a", "SELECT 1", None, duration=0.05, rows=2)
+    profiler.record(MagicMock(), "a", "SELECT 1", None, duration=0.15, rows=-1)
+
+    stats = profiler.stats()["a"]
+    assert stats["count"] == 2
+    assert stats["rows"] == 2
+    assert stats["slow"] == 1
+    assert round(stats["avg_ms"]) == 100
+    assert len(profiler.slow_queries()) == 1
+    assert "a" in profiler.report()
+
+
+@patch("psycopg2.connect")
+def test_db_manager_feeds_profiler(mock_connect: MagicMock) -> None:
+    mock_cursor = MagicMock()
+    mock_cursor.rowcount = 4
+    mock_cursor.fetchall.return_value = []
+    mock_connect.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+    profiler = QueryProfiler(slow_threshold_ms=10_000)
+
+    DBManager(DBConfig("db", "u", "p", "localhost", 5432), profiler=profiler).get_vacancies_with_keyword("py")
+
+    assert profiler.stats()["get_vacancies_with_keyword"]["rows"] == 4
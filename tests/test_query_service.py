@@ -0,0 +1,179 @@
+# Тесты HTTP-сервиса запросов: сервис поднимается на свободном порту, DBManager подменяется MagicMock.
+# Проверяются маршруты, кэш с ETag/304, gzip, потоковая выдача NDJSON и ошибки параметров.
+
+import gzip
+import json
+import socket
+import threading
+import urllib.error
+import urllib.request
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from unittest.mock import MagicMock
+
+import psycopg2
+import pytest
+
+from src.db_manager import DBConfig
+from src.query_service import QueryService, ResponseCache
+
+ROWS = [
+    {"vacancy_id": i, "company": "C", "vacancy": f"Python dev {i}", "salary_from": Decimal("1000.50"), "url": "u"}
+    for i in range(1, 41)
+]
+
+
+def _batches(batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Имитация DBManager.iter_all_vacancies: генератор пачек строк."""
+    for start in range(0, len(ROWS), batch_size):
+        end = start + batch_size
+        yield ROWS[start:end]
+
+
+@pytest.fixture
+def service() -> Iterator[Tuple[MagicMock, str]]:
+    """Сервис на свободном порту; возвращает подменённый DBManager (MagicMock) и базовый URL."""
+    svc = QueryService(DBConfig("db", "u", "p", "localhost", 5432), max_connections=2, cache_ttl=60)
+    db = MagicMock()
+    db.get_vacancies_page.side_effect = lambda limit, after_id: [r for r in ROWS if r["vacancy_id"] > after_id][:limit]
+    db.get_vacancies_with_keyword.return_value = ROWS[:2]
+    db.search_vacancies.return_value = ROWS[:1]
+    db.get_companies_and_vacancies_count.return_value = [{"company_id": 1, "name": "C", "vacancies_count": 40}]
+    db.iter_all_vacancies.side_effect = _batches
+    svc.db = db
+    server = svc.make_server(port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield db, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def get(url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+    request = urllib.request.Request(url, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), e.read()
+
+
+def test_vacancies_page_keyset(service: Tuple[MagicMock, str]) -> None:
+    db, base = service
+    status, _, body = get(f"{base}/vacancies?limit=10&after=5")
+    data: Any = json.loads(body)
+
+    assert status == 200
+    assert [r["vacancy_id"] for r in data["items"]] == list(range(6, 16))
+    assert data["next_after"] == 15
+    assert data["items"][0]["salary_from"] == 1000.5
+
+
+def test_cache_and_etag(service: Tuple[MagicMock, str]) -> None:
+    db, base = service
+    status, headers, _ = get(f"{base}/companies")
+    assert status == 200
+    status2, _, _ = get(f"{base}/companies")
+    assert status2 == 200
+    assert db.get_companies_and_vacancies_count.call_count == 1
+
+    status3, _, body = get(f"{base}/companies", {"If-None-Match": headers["ETag"]})
+    assert status3 == 304
+    assert body == b""
+
+
+def test_gzip_large_response(service: Tuple[MagicMock, str]) -> None:
+    _, base = service
+    status, headers, body = get(f"{base}/vacancies?limit=40", {"Accept-Encoding": "gzip"})
+    assert status == 200
+    assert headers["Content-Encoding"] == "gzip"
+    assert len(json.loads(gzip.decompress(body))["items"]) == 40
+
+
+def test_stream_ndjson(service: Tuple[MagicMock, str]) -> None:
+    _, base = service
+    status, headers, body = get(f"{base}/vacancies/stream?batch=7")
+    lines = body.decode("utf-8").splitlines()
+    assert status == 200
+    assert headers["Transfer-Encoding"] == "chunked"
+    assert [json.loads(line)["vacancy_id"] for line in lines] == list(range(1, 41))
+
+
+def test_stream_gzip(service: Tuple[MagicMock, str]) -> None:
+    _, base = service
+    _, headers, body = get(f"{base}/vacancies/stream", {"Accept-Encoding": "gzip"})
+    assert headers["Content-Encoding"] == "gzip"
+    assert len(gzip.decompress(body).splitlines()) == 40
+
+
+def test_stream_db_error_after_headers_closes_connection(service: Tuple[MagicMock, str]) -> None:
+    db, base = service
+
+    def failing(batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+        yield ROWS[:batch_size]
+        raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+    db.iter_all_vacancies.side_effect = failing
+    host, port = base.rsplit("/", 1)[1].split(":")
+    with socket.create_connection((host, int(port)), timeout=5) as sock:
+        sock.sendall(b"GET /vacancies/stream?batch=5 HTTP/1.1\r\nHost: test\r\n\r\n")
+        raw = b""
+        while chunk := sock.recv(65536):  # Сервер сам закрывает соединение (иначе — таймаут).
+            raw += chunk
+
+    assert raw.startswith(b"HTTP/1.1 200")
+    assert b"503" not in raw  # Второй ответ в тело не пишется.
+    assert not raw.endswith(b"0\r\n\r\n")  # Нет завершающего чанка — клиент видит обрыв.
+    assert raw.count(b'"vacancy_id"') == 5
+
+
+@pytest.mark.parametrize("path", ["/vacancies?limit=0", "/vacancies?limit=abc", "/vacancies/search"])
+def test_bad_request(service: Tuple[MagicMock, str], path: str) -> None:
+    _, base = service
+    status, _, body = get(base + path)
+    assert status == 400
+    assert "error" in json.loads(body)
+
+
+def test_not_found_and_db_error(service: Tuple[MagicMock, str]) -> None:
+    db, base = service
+    assert get(f"{base}/nope")[0] == 404
+    db.get_vacancies_with_higher_salary.side_effect = psycopg2.OperationalError("down")
+    assert get(f"{base}/vacancies/above-average")[0] == 503
+
+
+def test_reports_batch(service: Tuple[MagicMock, str]) -> None:
+    db, base = service
+    db.get_reports.return_value = {"avg_salary": Decimal("100.5"), "count_vacancies": 40}
+    status, _, body = get(f"{base}/reports?names=avg_salary,count_vacancies")
+
+    assert status == 200
+    assert json.loads(body) == {"avg_salary": 100.5, "count_vacancies": 40}
+    db.get_reports.assert_called_once_with(["avg_salary", "count_vacancies"], keyword=None)
+
+    db.get_reports.side_effect = ValueError("Неизвестные отчёты: nope")
+    assert get(f"{base}/reports?names=nope")[0] == 400
+
+
+def test_response_cache_lru_and_ttl() -> None:
+    cache = ResponseCache(ttl=60, max_entries=2)
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    cache.get("a")
+    cache.put("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+    expired = ResponseCache(ttl=0)
+    expired.put("a", b"1")
+    assert expired.get("a") is None
+
+
+def test_find_ranked(service: Tuple[MagicMock, str]) -> None:
+    db, base = service
+    status, _, body = get(f"{base}/vacancies/find?q=%D0%BF%D0%B8%D1%82%D0%BE%D0%BD&mode=or&limit=5")
+
+    assert status == 200
+    assert json.loads(body) == ROWS[:1]
+    db.search_vacancies.assert_called_once_with("питон", mode="or", limit=5)
+    assert get(f"{base}/vacancies/find?q=x&mode=xor")[0] == 400
+    assert get(f"{base}/vacancies/find")[0] == 400
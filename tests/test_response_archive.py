@@ -0,0 +1,91 @@
+# Тесты архива ответов API: запись в сжатые сегменты с индексом, чтение по ключу запроса,
+# восстановление после оборванной записи и повторная загрузка архива в хранилище без сети.
+
+import json
+from pathlib import Path
+from typing import Dict, List
+from unittest.mock import MagicMock
+
+from benchmarks.stub_server import StubData, run_stub_server
+from src.hh_api import HHApi
+from src.response_archive import INDEX_FILE, ResponseArchive, iter_archived_vacancies, replay_archive
+
+
+def page(items: List[Dict], pages: int = 1) -> bytes:
+    return json.dumps({"items": items, "pages": pages, "found": len(items)}).encode()
+
+
+def raw_vacancy(vacancy_id: int, employer_id: int, name: str = "Dev") -> Dict:
+    salary = {"from": 100, "to": None, "currency": "RUR"}
+    return {"id": str(vacancy_id), "name": name, "employer": {"id": str(employer_id)}, "salary": salary,
+            "alternate_url": f"u{vacancy_id}"}  # fmt: skip
+
+
+def test_record_and_get(tmp_path: Path) -> None:
+    archive = ResponseArchive(tmp_path, segment_bytes=1)
+    archive.record("vacancies", {"employer_id": 1, "page": 0}, b'{"items": []}')
+    archive.record("vacancies", {"page": 1, "employer_id": 1}, b'{"items": [1]}')
+    archive.record("vacancies", {"employer_id": 1, "page": 0}, b'{"items": [2]}')
+
+    assert archive.get("vacancies", {"page": 0, "employer_id": 1}) == b'{"items": [2]}'  # Последний ответ.
+    assert archive.get("vacancies", {"page": 1, "employer_id": 1}) == b'{"items": [1]}'
+    assert archive.get("employers", {"page": 0}) is None
+    assert len(list(tmp_path.glob("segment-*.gz"))) == 3  # segment_bytes=1 — каждый ответ в новом сегменте.
+    assert len(ResponseArchive(tmp_path)) == 3
+
+
+def test_torn_tail_is_dropped(tmp_path: Path) -> None:
+    archive = ResponseArchive(tmp_path)
+    archive.record("employers", {"page": 0}, b"first")
+    archive.record("employers", {"page": 1}, b"second")
+    segment = tmp_path / "segment-00000.gz"
+    segment.write_bytes(segment.read_bytes()[:-3])  # Второй ответ дописан не полностью.
+    with open(tmp_path / INDEX_FILE, "ab") as f:
+        f.write(b'{"endpoint": "empl')  # И строка индекса оборвана.
+
+    reopened = ResponseArchive(tmp_path)
+    reopened.record("employers", {"page": 2}, b"third")
+
+    assert [params["page"] for _, params, _ in reopened.iter_responses()] == [0, 2]
+    assert ResponseArchive(tmp_path).get("employers", {"page": 2}) == b"third"
+
+
+def test_iter_archived_vacancies_assigns_employers(tmp_path: Path) -> None:
+    archive = ResponseArchive(tmp_path)
+    archive.record("vacancies", {"employer_id": 7, "page": 0}, page([raw_vacancy(1, 999)]))
+    archive.record("vacancies", {"employer_id": [1, 2], "page": 0}, page([raw_vacancy(2, 2), raw_vacancy(3, 5)]))
+
+    batches = list(iter_archived_vacancies(archive))
+
+    assert [[(v["vacancy_id"], v["company_id"]) for v in batch] for batch in batches] == [[(1, 7)], [(2, 2)]]
+    assert batches[0][0]["salary_from"] == 100
+
+
+def test_replay_archive(tmp_path: Path) -> None:
+    archive = ResponseArchive(tmp_path)
+    employers = [{"id": "1", "name": "A", "open_vacancies": 2}, {"id": "2", "name": "B", "open_vacancies": 0}]
+    archive.record("employers", {"text": "python", "page": 0}, page(employers))
+    archive.record("vacancies", {"employer_id": 1, "page": 0}, page([raw_vacancy(1, 1), raw_vacancy(2, 1)]))
+    archive.record("vacancies", {"employer_id": 1, "page": 0}, page([raw_vacancy(2, 1, "Senior Dev")]))
+    db = MagicMock()
+    db.sync_vacancies.side_effect = lambda rows: {"inserted": len(rows), "updated": 0, "unchanged": 0}
+
+    totals = replay_archive(archive, db)
+
+    db.insert_companies.assert_called_once_with([{"id": 1, "name": "A"}])
+    (synced,) = db.sync_vacancies.call_args[0]
+    assert [(v["vacancy_id"], v["name"]) for v in synced] == [(1, "Dev"), (2, "Senior Dev")]  # Поздний ответ.
+    assert totals == {"companies": 1, "responses": 2, "inserted": 2, "updated": 0, "unchanged": 0}
+
+
+def test_hh_api_records_responses(tmp_path: Path) -> None:
+    archive = ResponseArchive(tmp_path)
+    with run_stub_server(StubData(employers=2, vacancies_per_employer=30)) as base_url:
+        api = HHApi(per_page=20, archive=archive)
+        api.BASE_URL = base_url
+        companies = api.get_companies()
+        live = api.get_vacancies_for_company(companies[0]["id"])
+
+    assert [endpoint for endpoint, _, _ in archive.iter_responses()] == ["employers", "vacancies", "vacancies"]
+    replayed = [v for batch in iter_archived_vacancies(archive) for v in batch]
+    assert replayed == live
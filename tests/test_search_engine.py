@@ -0,0 +1,85 @@
+# Тесты анализатора названий и обратного индекса SearchIndex.
+
+import pytest
+
+from src.search_engine import SearchIndex, analyze, stem, term_weight
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Разработчики на питоне", ["разработчик", "на", "python"]),
+        ("Ведущий Python-разработчик (Django)", ["ведущ", "python", "разработчик", "django"]),
+        ("Разработчик C++ / С#", ["разработчик", "c++", "c#"]),
+        ("Программист 1С", ["программист", "1c"]),
+        ("Senior Developers, K8s", ["senior", "developer", "kubernete"]),
+        ("Ёлка", ["елк"]),
+        (None, []),
+    ],
+)
+def test_analyze(text: str, expected: list) -> None:
+    assert analyze(text) == expected
+
+
+@pytest.mark.parametrize(
+    "alias, canonical",
+    [("девопс", "DevOps"), ("k8s", "Kubernetes"), ("кубернетес", "Kubernetes"), ("питон", "Python"), ("1С", "1C")],
+)
+def test_alias_and_canonical_find_same_document(alias: str, canonical: str) -> None:
+    assert analyze(alias) == analyze(canonical)
+    for title in (f"{canonical} инженер", f"{alias} инженер"):
+        search_index = SearchIndex()
+        search_index.add(1, title)
+        assert [doc for doc, _ in search_index.search(alias)] == [1]
+        assert [doc for doc, _ in search_index.search(canonical)] == [1]
+
+
+def test_stem() -> None:
+    assert stem("vacancies") == "vacancy"
+    assert stem("class") == "class"
+    assert stem("разработчика") == stem("разработчиком") == "разработчик"
+    assert stem("qa") == "qa"
+    assert stem("ию") == "ию"  # Слишком короткая основа — слово не меняется.
+
+
+@pytest.fixture
+def index() -> SearchIndex:
+    search_index = SearchIndex()
+    search_index.add_many(
+        [
+            (1, "Python-разработчик"),
+            (2, "Java-разработчик"),
+            (3, "Python Python Developer"),
+            (4, "Тестировщик"),
+        ]
+    )
+    return search_index
+
+
+def test_search_and_or(index: SearchIndex) -> None:
+    assert [doc for doc, _ in index.search("разработчики питон")] == [1]
+    assert [doc for doc, _ in index.search("python java", mode="or")] == [3, 2, 1]  # java реже python
+    assert index.search("rust") == []
+    assert index.search("") == []
+    with pytest.raises(ValueError):
+        index.search("python", mode="not")
+
+
+def test_search_scores(index: SearchIndex) -> None:
+    ((doc, score),) = index.search("developer")
+
+    assert doc == 3
+    assert score == pytest.approx(term_weight(1, 1, 4))
+    assert index.search("python", mode="or", limit=1)[0][0] == 3  # tf = 2
+
+
+def test_update_and_remove(index: SearchIndex) -> None:
+    index.add(2, "Kotlin-разработчик")
+    index.remove(4)
+    index.remove(100)
+
+    assert len(index) == 3
+    assert 4 not in index
+    assert index.search("java") == []
+    assert [doc for doc, _ in index.search("котлин")] == [2]
+    assert "тестировщик" not in index.postings
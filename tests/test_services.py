@@ -55,6 +55,11 @@ class TestSalaryUtils(unittest.TestCase):
         )
         self.assertEqual(format_vacancy(vacancy), expected)
 
+    def test_format_vacancy_report_row(self) -> None:
+        # Строки отчётов DBManager/SQLiteManager: название вакансии в ключе vacancy.
+        row = {"vacancy_id": 1, "vacancy": "Python Developer", "company": "TechCorp", "url": "http://example.com"}
+        self.assertTrue(format_vacancy(row).startswith("Python Developer | Компания: TechCorp"))
+
     def test_format_vacancy_no_salary(self) -> None:
         vacancy = {
             "name": "Python Developer",
@@ -0,0 +1,138 @@
+# Тесты встроенного хранилища SQLiteManager: работают на настоящей БД SQLite в памяти, без моков.
+# Проверяется, что отчёты совпадают по формату с DBManager, поиск идёт через FTS5,
+# а sync_vacancies и дневные снимки зарплат ведут себя так же, как в PostgreSQL.
+
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import pytest
+
+from src.db_manager import DBManager
+from src.sqlite_manager import SQLiteManager
+from src.storage import Storage
+
+VACANCIES: List[Dict] = [
+    {"vacancy_id": 1, "company_id": "1", "name": "Python Разработчик", "salary_from": 100000, "salary_to": 140000,
+     "salary_currency": "RUR", "url": "u1"},
+    {"vacancy_id": 2, "company_id": "1", "name": "Java Developer", "salary_from": 200000, "salary_to": None,
+     "salary_currency": "RUR", "url": "u2"},
+    {"vacancy_id": 3, "company_id": "2", "name": "QA", "salary_from": None, "salary_to": None,
+     "salary_currency": None, "url": "u3"},
+]  # fmt: skip
+
+
+@pytest.fixture
+def db() -> Iterator[SQLiteManager]:
+    manager = SQLiteManager(":memory:")
+    manager.create_tables()
+    manager.insert_companies([{"id": "1", "name": "Яндекс"}, {"id": 2, "name": "Ozon"}])
+    manager.insert_vacancies(VACANCIES)
+    yield manager
+    manager.close()
+
+
+def test_implements_storage() -> None:
+    assert issubclass(SQLiteManager, Storage)
+    assert issubclass(DBManager, Storage)
+
+
+def test_reports(db: SQLiteManager) -> None:
+    assert db.get_companies_and_vacancies_count() == [
+        {"company_id": 1, "name": "Яндекс", "vacancies_count": 2},
+        {"company_id": 2, "name": "Ozon", "vacancies_count": 1},
+    ]
+    assert db.get_all_vacancies()[0] == {
+        "vacancy_id": 1,
+        "company": "Яндекс",
+        "vacancy": "Python Разработчик",
+        "salary_from": 100000.0,
+        "salary_to": 140000.0,
+        "salary_currency": "RUR",
+        "url": "u1",
+    }
+    assert db.get_avg_salary() == 160000.0
+    assert [v["vacancy_id"] for v in db.get_vacancies_with_higher_salary()] == [2]
+    assert [v["vacancy_id"] for v in db.get_vacancies_page(limit=1, after_id=1)] == [2]
+    assert [v["vacancy_id"] for v in db.get_vacancies_by_company(1)] == [1, 2]
+
+
+@pytest.mark.parametrize(
+    "keyword, expected",
+    [("разраб", [1]), ("PYTHON", [1]), ("dev", [2]), ("qa", [3]), ("va d", [2]), ('"', []), ("rust", [])],
+)
+def test_keyword_search(db: SQLiteManager, keyword: str, expected: List[int]) -> None:
+    assert [v["vacancy_id"] for v in db.get_vacancies_with_keyword(keyword)] == expected
+
+
+def test_search_index_follows_updates(db: SQLiteManager) -> None:
+    db.sync_vacancies([dict(VACANCIES[1], name="Kotlin Developer")])
+
+    assert db.get_vacancies_with_keyword("java") == []
+    assert [v["vacancy_id"] for v in db.get_vacancies_with_keyword("kotlin")] == [2]
+
+
+def test_sync_vacancies(db: SQLiteManager) -> None:
+    changed = [dict(VACANCIES[0], salary_from=120000), VACANCIES[1], VACANCIES[2]]
+    new = {"vacancy_id": 4, "company_id": 2, "name": "Go", "salary_from": None, "salary_to": None,
+           "salary_currency": None, "url": "u4"}  # fmt: skip
+
+    assert db.sync_vacancies(changed + [new]) == {"inserted": 1, "updated": 1, "unchanged": 2}
+    assert db.sync_vacancies(changed + [new]) == {"inserted": 0, "updated": 0, "unchanged": 4}
+    history = db.get_vacancy_changes(1)
+    assert [h["changes"] for h in history] == [{"salary_from": [100000.0, 120000.0]}]
+
+
+def test_salary_snapshot_and_trend(db: SQLiteManager) -> None:
+    assert db.record_salary_snapshot(date.today()) == 2  # Яндекс/RUR и Ozon/без валюты
+    assert db.record_salary_snapshot(date.today()) == 2  # Повтор за тот же день перезаписывает снимок.
+
+    trend = db.get_salary_trend(currency="RUR", days=7)
+
+    assert len(trend) == 1
+    assert trend[0]["snapshot_date"] == date.today()
+    assert trend[0]["vacancies_count"] == 2
+    assert trend[0]["avg_salary"] == 160000.0
+    assert trend[0]["delta"] is None
+
+
+def test_file_database_persists(tmp_path: Path) -> None:
+    path = tmp_path / "nested" / "hh.sqlite3"
+    first = SQLiteManager(path)
+    first.create_tables()
+    first.insert_companies([{"id": 1, "name": "C"}])
+    first.close()
+
+    second = SQLiteManager(path)
+    second.ping()
+    assert second.get_companies_and_vacancies_count() == [{"company_id": 1, "name": "C", "vacancies_count": 0}]
+    second.close()
+
+
+def test_iter_vacancy_records(db: SQLiteManager) -> None:
+    batches = list(db.iter_vacancy_records(batch_size=2))
+
+    assert [[v["vacancy_id"] for v in batch] for batch in batches] == [[1, 2], [3]]
+    assert batches[0][0] == {
+        "vacancy_id": 1,
+        "company_id": 1,
+        "name": "Python Разработчик",
+        "salary_from": 100000.0,
+        "salary_to": 140000.0,
+        "salary_currency": "RUR",
+        "url": "u1",
+    }
+
+
+def test_open_vacancy_cursor(db: SQLiteManager) -> None:
+    with db.open_vacancy_cursor("all") as cursor:
+        assert cursor.count() == 3
+        assert [v["vacancy_id"] for v in cursor.fetch(1, 5)] == [2, 3]
+        assert [[v["vacancy_id"] for v in batch] for batch in cursor.iter_batches(2)] == [[1, 2], [3]]
+    with db.open_vacancy_cursor("keyword", "разработчик") as cursor:
+        assert cursor.count() == 1
+        assert cursor.fetch(0, 10) == db.get_vacancies_with_keyword("разработчик")
+    with db.open_vacancy_cursor("higher") as cursor:
+        assert cursor.fetch(0, 10) == db.get_vacancies_with_higher_salary()
+    with pytest.raises(ValueError):
+        db.open_vacancy_cursor("unknown")
@@ -10,12 +10,13 @@
 # Тестовый кейс для вакансии без ключа employer, чтобы company_id корректно возвращался как None.#
 # Проверка работы функции parse_vacancies на списке вакансий с и без работодателя.
 
-from typing import Any
+import math
+from typing import Any, Dict, List
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from src.work_vacancies import parse_vacancies, parse_vacancy
+from src.work_vacancies import VacancyColumns, parse_vacancies, parse_vacancy, parse_vacancy_pages, vacancy_hash
 
 
 @pytest.mark.parametrize(
@@ -132,3 +133,92 @@ def test_parse_vacancies_list_with_missing_employer(mock_safe_get_salary: MagicM
     result = parse_vacancies(vacancies)
     assert result == expected
     assert mock_safe_get_salary.call_count == 2
+
+
+# ------------------ Колоночный разбор страниц ------------------
+
+RAW_PAGES: List[Dict[str, Any]] = [
+    {
+        "items": [
+            {
+                "id": "1",
+                "name": "Python Developer",
+                "employer": {"id": "10"},
+                "salary": {"from": 50000, "to": 70000, "currency": "RUR"},
+                "alternate_url": "http://example.com/1",
+            },
+            {"id": "2", "name": "Java Developer", "employer": {"id": "11"}, "salary": None, "alternate_url": None},
+        ]
+    },
+    {"items": [{"id": "3", "name": "Go Developer", "salary": {"to": 90000, "currency": "USD"}}]},
+]
+
+
+def test_parse_vacancy_pages_columns() -> None:
+    columns = parse_vacancy_pages(RAW_PAGES)
+
+    assert len(columns) == 3
+    assert columns.vacancy_id == [1, 2, 3]
+    assert columns.company_id == [10, 11, None]
+    assert columns.salary_from[0] == 50000.0
+    assert math.isnan(columns.salary_from[1]) and math.isnan(columns.salary_from[2])
+    assert columns.salary_to[2] == 90000.0
+    assert columns.salary_currency == ["RUR", None, "USD"]
+
+
+def test_parse_vacancy_pages_employer_override() -> None:
+    columns = parse_vacancy_pages(RAW_PAGES, employer_id=42)
+    assert columns.company_id == [42, 42, 42]
+
+
+def test_vacancy_columns_to_records_matches_parse_vacancy() -> None:
+    items = RAW_PAGES[0]["items"]
+    records = parse_vacancy_pages([{"items": items}]).to_records()
+
+    assert records[0] == {
+        "vacancy_id": 1,
+        "company_id": 10,
+        "name": "Python Developer",
+        "salary_from": 50000.0,
+        "salary_to": 70000.0,
+        "salary_currency": "RUR",
+        "url": "http://example.com/1",
+    }
+    assert records[1]["salary_from"] is None and records[1]["salary_to"] is None
+
+
+def test_vacancy_columns_extend() -> None:
+    columns = VacancyColumns()
+    columns.extend(parse_vacancy_pages(RAW_PAGES[:1]))
+    columns.extend(parse_vacancy_pages(RAW_PAGES[1:]))
+    assert columns.vacancy_id == [1, 2, 3]
+
+
+def test_vacancy_columns_to_numpy() -> None:
+    np = pytest.importorskip("numpy")
+    arrays = parse_vacancy_pages(RAW_PAGES).to_numpy()
+
+    assert arrays["vacancy_id"].dtype == np.int64
+    assert np.isnan(arrays["salary_from"]).sum() == 2
+    assert np.isnan(arrays["company_id"][2])
+
+
+def test_vacancy_hash_normalizes_sources() -> None:
+    from decimal import Decimal
+
+    api = {
+        "vacancy_id": 1,
+        "company_id": "10",
+        "name": "Dev",
+        "salary_from": 100000,
+        "salary_to": None,
+        "salary_currency": "RUR",
+        "url": "u",
+    }
+    db_row = dict(api, company_id=10, salary_from=Decimal("100000.00"))
+    columns_row = dict(api, company_id=10, salary_from=100000.0, salary_to=math.nan)
+
+    assert len(vacancy_hash(api)) == 16
+    assert vacancy_hash(api) == vacancy_hash(db_row) == vacancy_hash(columns_row)
+    assert vacancy_hash(api) != vacancy_hash(dict(api, salary_to=150000))
+    assert vacancy_hash(api) == vacancy_hash(dict(api, vacancy_id=2))  # id в хэш не входит